@@ -1,6 +1,97 @@
 import os
 import sys
 import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+def file_hash(name, block=2 ** 20):
+    """
+    Computes the hash of a file content.
+    """
+    m = hashlib.sha256()
+    with open(name, "rb") as f:
+        while True:
+            data = f.read(block)
+            if not data:
+                break
+            m.update(data)
+    return m.hexdigest()
+
+
+def is_same_file(src, dst, use_hash=False):
+    """
+    Tells if *dst* is a copy of *src*. Files are compared based on
+    their size and modification time or their content
+    if *use_hash* is True.
+    """
+    if not os.path.exists(dst):
+        return False
+    st_src = os.stat(src)
+    st_dst = os.stat(dst)
+    if st_src.st_size != st_dst.st_size:
+        return False
+    if use_hash:
+        return file_hash(src) == file_hash(dst)
+    return int(st_src.st_mtime) <= int(st_dst.st_mtime)
+
+
+def sync_files(pairs, use_hash=False, max_workers=8, prefix="copy", fLOG=print):
+    """
+    Copies files if the destination is missing or different.
+    Copies run in parallel.
+
+    @param      pairs           list of *(source, destination)*, destination is a filename
+    @param      use_hash        compares the content and not size and modification time
+    @param      max_workers     number of threads
+    @param      prefix          prefix for the displayed messages
+    @param      fLOG            logging function
+    @return                     dictionary with keys *copied*, *skipped*, *bytes*
+    """
+    todo = []
+    skipped = 0
+    for src, dst in pairs:
+        if is_same_file(src, dst, use_hash=use_hash):
+            skipped += 1
+        else:
+            todo.append((src, dst))
+
+    def copy(pair):
+        src, dst = pair
+        if fLOG:
+            fLOG("{0} '{1}'".format(prefix, src))
+        shutil.copy2(src, dst)
+        return os.stat(dst).st_size
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sizes = list(executor.map(copy, todo))
+    else:
+        sizes = []
+    return dict(copied=len(todo), skipped=skipped, bytes=sum(sizes))
+
+
+def write_if_changed(filename, content):
+    """
+    Writes a file only if its content changes.
+
+    @return                     True if the file was written
+    """
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+def print_summary(summary, fLOG=print):
+    """
+    Displays the summary returned by @see fn sync_files.
+    """
+    fLOG("{0} file(s) copied ({1} bytes), {2} file(s) skipped".format(
+        summary['copied'], summary['bytes'], summary['skipped']))
 
 
 def main(args):
@@ -16,7 +107,7 @@ def main(args):
     dest = args[2]
     if not os.path.exists(dest):
         os.makedirs(dest)
-    
+
     folder = os.path.join("machinelearningext")
     names = {}
     file, rep = [], []
@@ -31,16 +122,13 @@ def main(args):
             last_name = os.path.split(a)[-1]
             if last_name not in names:
                 names[last_name] = full
-    
-    for _, name in sorted(names.items()):
-        print("copy '{0}'".format(name))
-        shutil.copy(name, dest)
-    
-    shutil.copy(os.path.join("machinelearning", "BuildToolsVersion.txt"), dest)
-    shutil.copy(os.path.join("machinelearning", "THIRD-PARTY-NOTICES.TXT"), dest)
+
+    pairs = [(name, os.path.join(dest, last_name)) for last_name, name in sorted(names.items())]
+    for name in ["BuildToolsVersion.txt", "THIRD-PARTY-NOTICES.TXT"]:
+        pairs.append((os.path.join("machinelearning", name), os.path.join(dest, name)))
+    print_summary(sync_files(pairs))
 
 
 if __name__ == "__main__":
     args = sys.argv
     main(args)
-    
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Exchanges data between :epkg:`numpy` and
+``Scikit.ML.DataManipulation.DataFrame`` through :epkg:`pythonnet`.
+Numerical columns are pinned in memory and wrapped by :epkg:`numpy`
+without any copy. @see fn predict_batch calls a ``ScikitPipeline``
+once for a whole matrix of features.
+See the LICENSE file in the project root for more information.
+"""
+import ctypes
+import numpy
+
+
+_ctypes = {
+    'int32': ctypes.c_int32,
+    'uint32': ctypes.c_uint32,
+    'int64': ctypes.c_int64,
+    'float32': ctypes.c_float,
+    'float64': ctypes.c_double,
+}
+
+# Numerical types without an equivalent column,
+# they are cast into the smallest type which holds every value.
+_casts = {
+    'int8': 'int32',
+    'int16': 'int32',
+    'uint8': 'uint32',
+    'uint16': 'uint32',
+    'float16': 'float32',
+}
+
+
+def load_dataframe_assembly(folder=None):
+    """
+    Loads ``Scikit.ML.DataManipulation``.
+
+    @param      folder          folder which contains the assembly,
+                                it must be already in ``sys.path`` if None
+    @return                     module ``Scikit.ML.DataManipulation``
+    """
+    if folder is not None:
+        import sys
+        if folder not in sys.path:
+            sys.path.append(folder)
+    from clr import AddReference
+    AddReference('Scikit.ML.DataManipulation')
+    import Scikit.ML.DataManipulation as dm
+    return dm
+
+
+def pinned_to_numpy(pin):
+    """
+    Wraps a ``PinnedColumn`` into a :epkg:`numpy` array without any copy.
+    The array keeps a reference on the pinned column so that
+    the buffer is not released while the array is alive.
+
+    @param      pin             ``Scikit.ML.DataManipulation.PinnedColumn``
+    @return                     :epkg:`numpy` array
+    """
+    dtype = pin.DType
+    buffer = (_ctypes[dtype] * pin.Length).from_address(pin.Address.ToInt64())
+    buffer.pinned_column = pin
+    return numpy.frombuffer(buffer, dtype=dtype)
+
+
+def column_to_numpy(df, name):
+    """
+    Returns a view on a numerical column of a ``DataFrame``.
+    Modifying the array modifies the dataframe.
+
+    @param      df              ``Scikit.ML.DataManipulation.DataFrame``
+    @param      name            column name
+    @return                     :epkg:`numpy` array
+    """
+    dm = load_dataframe_assembly()
+    return pinned_to_numpy(dm.PinnedColumn.Pin(df, name))
+
+
+def dataframe_to_numpy(df, columns=None):
+    """
+    Returns views on the numerical columns of a ``DataFrame``,
+    other columns are copied.
+
+    @param      df              ``Scikit.ML.DataManipulation.DataFrame``
+    @param      columns         columns to return, all if None
+    @return                     dictionary ``{name: array}``
+    """
+    if columns is None:
+        columns = list(df.Columns)
+    dm = load_dataframe_assembly()
+    res = {}
+    for name in columns:
+        try:
+            res[name] = column_to_numpy(df, name)
+        except dm.DataTypeError:
+            # Boolean, text and vector columns cannot be pinned.
+            col = df.GetColumn(name)
+            res[name] = numpy.array([col.Get(i) for i in range(col.Length)])
+    return res
+
+
+def numpy_to_dataframe(data):
+    """
+    Creates a ``DataFrame`` from a dictionary of :epkg:`numpy` arrays.
+    Numerical columns are allocated by the CLR and filled
+    with a single copy, boolean and text columns go through
+    :epkg:`pythonnet` conversion. Small numerical types
+    (*int8*, *int16*, *uint8*, *uint16*, *float16*) are cast
+    into a wider type, other types raise an exception.
+
+    @param      data            dictionary ``{name: array}``
+    @return                     ``Scikit.ML.DataManipulation.DataFrame``
+    """
+    dm = load_dataframe_assembly()
+    from System import Array, Boolean, String
+    df = dm.DataFrame()
+    for name, values in data.items():
+        values = numpy.asarray(values)
+        if len(values.shape) != 1:
+            raise ValueError("Column '{0}' must be a 1D array not {1}.".format(name, values.shape))
+        dtype = str(values.dtype)
+        if dtype in _casts:
+            dtype = _casts[dtype]
+            values = values.astype(dtype)
+        if dtype in _ctypes:
+            pin = dm.PinnedColumn.AddColumn(df, name, dtype, values.shape[0])
+            view = pinned_to_numpy(pin)
+            view[:] = values
+        elif dtype == 'bool':
+            df.AddColumn(name, Array[Boolean](values.tolist()))
+        elif values.dtype.kind in 'USO':
+            df.AddColumn(name, Array[String]([str(v) for v in values]))
+        else:
+            raise TypeError("Column '{0}' has an unsupported type {1}.".format(name, dtype))
+    return df
+
+
+def _to_intptr(address):
+    from System import IntPtr, Int64
+    return IntPtr.__overloads__[Int64](Int64(address))
+
+
+def predict_batch(pipeline, features, output_column="Score", feature_column="Feature", conc=1):
+    """
+    Computes predictions for a matrix of features with a single call
+    to ``ScikitPipeline.PredictBatch``, no ``DataFrame`` is created.
+    The pipeline must take a single vector of floats as input.
+
+    @param      pipeline        ``Scikit.ML.ScikitAPI.ScikitPipeline``
+    @param      features        2D :epkg:`numpy` array, converted into a
+                                contiguous float32 matrix if needed
+    @param      output_column   output column, a float, a vector of floats,
+                                a key or a boolean
+    @param      feature_column  name of the features column
+    @param      conc            number of threads used by :epkg:`ML.net`
+    @return                     float32 matrix *(number of rows, output dimension)*
+    """
+    features = numpy.ascontiguousarray(features, dtype=numpy.float32)
+    if len(features.shape) != 2:
+        raise ValueError("features must be a matrix not {0}.".format(features.shape))
+    nrows, ncols = features.shape
+    dim = pipeline.GetBatchOutputDimension(feature_column, output_column, conc)
+    output = numpy.empty((nrows, dim), dtype=numpy.float32)
+    pipeline.PredictBatch(_to_intptr(features.ctypes.data), nrows, ncols,
+                          _to_intptr(output.ctypes.data), output.size,
+                          feature_column, output_column, conc)
+    return output
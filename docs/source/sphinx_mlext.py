@@ -7,35 +7,170 @@ from docutils.statemachine import StringList
 from pyquickhelper.sphinxext.sphinx_runpython_extension import RunPythonDirective
 from csharpy.sphinxext import RunCSharpDirective
 
+import io
 import os
+import re
 import sys
 import shutil
+import json
+import time
+import hashlib
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, redirect_stdout
+from textwrap import dedent
 import jinja2
+from sphinx.util import logging
 this = os.path.abspath(os.path.dirname(__file__))
-dll = os.path.normpath(os.path.join(this, "..", "..", "machinelearningext", "bin",
-                                    "AnyCPU.Debug", "DocHelperMlExt"))
-if not os.path.exists(dll):
-    raise FileNotFoundError("Unable to find '{0}'.".format(dll))
-folds = [_ for _ in os.listdir(dll) if 'nupkg' not in _]
-if len(folds) != 1:
-    raise FileNotFoundError("Unable to guess where the DLL is in '{0}' (1)".format(dll))
-dll = os.path.join(dll, folds[0])
-if not os.path.exists(dll):
-    raise FileNotFoundError("Unable to guess where the DLL is in '{0}' (2)".format(dll))
-mldll = os.path.join(dll, "Scikit.ML.DocHelperMlExt.dll")
-if not os.path.exists(mldll):
-    raise FileNotFoundError("Unable to find '{0}'".format(mldll))
-sys.path.append(dll)
-
-docs = os.path.normpath(os.path.join(this, "..", "..", "machinelearning", "docs"))
-if not os.path.exists(docs):
-    raise FileNotFoundError("Unable to guess where the documentation is in '{0}' (2)".format(docs))
 
 
-def copy_missing_dll():
+startup_timings = {}
+startup_calls = {}
+startup_memory = {}
+
+
+@contextmanager
+def timeit_phase(phase):
+    """
+    Measures the time spent in a phase and adds it to *startup_timings*,
+    increments the number of calls in *startup_calls* and stores
+    the memory allocated by the CLR at the end of the phase
+    in *startup_memory*.
+    """
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[phase] = startup_timings.get(phase, 0.) + time.perf_counter() - begin
+        startup_calls[phase] = startup_calls.get(phase, 0) + 1
+        startup_memory[phase] = clr_memory()
+
+
+def clr_memory():
+    """
+    Returns the memory allocated by the CLR or None
+    if it was not loaded yet.
+    """
+    if MamlHelper is None:
+        return None
+    from System import GC
+    return GC.GetTotalMemory(False)
+
+
+class ProfiledDirective:
+    """
+    Records the wall time and the memory allocated by the CLR
+    for every call to a directive in ``env.mlext_profile``.
+    It must be placed before the directive class in the bases.
+    """
+
+    def run(self):
+        env = self.state.document.settings.env
+        memory = clr_memory()
+        begin = time.perf_counter()
+        try:
+            return super().run()
+        finally:
+            wall = time.perf_counter() - begin
+            after = clr_memory()
+            if not hasattr(env, 'mlext_profile'):
+                env.mlext_profile = []
+            env.mlext_profile.append(dict(
+                directive=self.name, docname=env.docname, lineno=self.lineno, wall=wall,
+                clr_memory=after, clr_memory_delta=None if memory is None or after is None else after - memory))
+
+
+_dll_folder = None
+
+
+def get_dll_folder():
+    """
+    Returns the folder which contains ``Scikit.ML.DocHelperMlExt.dll``.
+    The result is computed once.
     """
-    Copies missing DLL.
+    global _dll_folder
+    if _dll_folder is not None:
+        return _dll_folder
+    with timeit_phase("path discovery"):
+        dll = os.path.normpath(os.path.join(this, "..", "..", "machinelearningext", "bin",
+                                            "AnyCPU.Debug", "DocHelperMlExt"))
+        if not os.path.exists(dll):
+            raise FileNotFoundError("Unable to find '{0}'.".format(dll))
+        folds = [_ for _ in os.listdir(dll) if 'nupkg' not in _]
+        if len(folds) != 1:
+            raise FileNotFoundError("Unable to guess where the DLL is in '{0}' (1)".format(dll))
+        dll = os.path.join(dll, folds[0])
+        if not os.path.exists(dll):
+            raise FileNotFoundError("Unable to guess where the DLL is in '{0}' (2)".format(dll))
+        mldll = os.path.join(dll, "Scikit.ML.DocHelperMlExt.dll")
+        if not os.path.exists(mldll):
+            raise FileNotFoundError("Unable to find '{0}'".format(mldll))
+    _dll_folder = dll
+    return dll
+
+
+def get_mlnet_docs_folder():
     """
+    Returns the folder which contains the documentation of :epkg:`ML.net`.
+    """
+    with timeit_phase("path discovery"):
+        docs = os.path.normpath(os.path.join(this, "..", "..", "machinelearning", "docs"))
+        if not os.path.exists(docs):
+            raise FileNotFoundError("Unable to guess where the documentation is in '{0}' (2)".format(docs))
+    return docs
+
+
+MamlHelper = None
+
+
+def load_mlnet(copy=True):
+    """
+    Copies the missing DLL, loads ``Scikit.ML.DocHelperMlExt``
+    into the CLR and returns class *MamlHelper*. The runtime
+    is only started by the first call.
+
+    @param      copy        copies the missing DLL first (see @see fn ensure_dll_copied),
+                            worker processes rely on the copy done by their parent
+    """
+    global MamlHelper
+    if MamlHelper is not None:
+        return MamlHelper
+    dll = get_dll_folder()
+    if copy:
+        ensure_dll_copied()
+    with timeit_phase("assembly load"):
+        if dll not in sys.path:
+            sys.path.append(dll)
+        from clr import AddReference
+        AddReference('Scikit.ML.DocHelperMlExt')
+        from Scikit.ML.DocHelperMlExt import MamlHelper as _MamlHelper
+        # Set before the phase ends so that its memory is recorded.
+        MamlHelper = _MamlHelper
+    return MamlHelper
+
+
+_dll_copied = False
+
+
+def ensure_dll_copied():
+    """
+    Calls @see fn copy_missing_dll once per process.
+    """
+    global _dll_copied
+    if _dll_copied:
+        return
+    with timeit_phase("DLL copy"):
+        copy_missing_dll()
+    _dll_copied = True
+
+
+def _missing_dll_pairs():
+    """
+    Returns the list of *(source, destination)* for every DLL
+    @see fn copy_missing_dll copies.
+    """
+    dll = get_dll_folder()
     rootpkg = os.path.normpath(os.path.join(this, "..", "..", "machinelearning", "packages"))
               
     misses = []
@@ -55,6 +190,7 @@ def copy_missing_dll():
     misses += [os.path.join(rootpkg, "system.codedom", "4.4.0", "lib", "netstandard2.0")]
 
     skipif = ['testhost', 'TestPlatform']
+    pairs = []
     for miss in misses:
         cont = True
         for skip in skipif:
@@ -66,30 +202,51 @@ def copy_missing_dll():
         
         if os.path.isfile(miss):
             miss, dl = os.path.split(miss)
-            dst = os.path.join(dll, dl)
-            if not os.path.exists(dst):
-                print("1>copy '{0}' from '{1}'".format(dl, miss))
-                shutil.copy(os.path.join(miss, dl), dll)
+            pairs.append((os.path.join(miss, dl), os.path.join(dll, dl)))
         else:
             for dl in os.listdir(miss):
                 src = os.path.join(miss, dl)
                 if not os.path.isfile(src):
                     continue
-                dst = os.path.join(dll, dl)
                 if "TestPlatform" in dl:
                     continue
-                if not os.path.exists(dst):
-                    print("2>copy '{0}' from '{1}'".format(dl, miss))
-                    shutil.copy(os.path.join(miss, dl), dll)
+                pairs.append((src, os.path.join(dll, dl)))
+    return pairs
+
+
+def copy_missing_dll():
+    """
+    Copies missing or modified DLL.
+    """
+    pairs = _missing_dll_pairs()
+    sync_files, _, print_summary = _import_sync()
+    summary = sync_files(pairs, prefix="1>copy")
+    print_summary(summary, fLOG=lambda s: print("1>" + s))
+    return summary
+
+
+def _import_sync():
+    """
+    Imports the functions synchronizing files from ``copy_binaries.py``.
+    """
+    root = os.path.normpath(os.path.join(this, "..", ".."))
+    if root not in sys.path:
+        sys.path.append(root)
+    from copy_binaries import sync_files, write_if_changed, print_summary
+    return sync_files, write_if_changed, print_summary
+
 
 def copy_missing_md_docs(source):
     """
-    Copies missing markdown documentation.
+    Copies missing or modified markdown documentation.
+    Generated pages are only written if their content changed
+    so that :epkg:`Sphinx` does not read them again.
     """
     try:
         from .sphinx_mlext_templates import mddocs_index_template_docs, mddocs_index_template_releases
     except (ModuleNotFoundError, ImportError):
         from sphinx_mlext_templates import mddocs_index_template_docs, mddocs_index_template_releases
+    sync_files, write_if_changed, print_summary = _import_sync()
 
     dest = os.path.join(os.path.dirname(__file__), "mlnetdocs")
     if not os.path.exists(dest):
@@ -100,20 +257,13 @@ def copy_missing_md_docs(source):
             
     # code
     docs = []
-    code = os.path.join(source, "code")
-    for name_ in os.listdir(code):
-        name = name_.lower()
-        docs.append(os.path.splitext(name)[0])
-        print("3> copy '{0}'".format(name))
-        dst = os.path.join(dest, name)
-        shutil.copy(os.path.join(code, name), dst)
-    code = os.path.join(source, "specs")
-    for name_ in os.listdir(code):
-        name = name_.lower()
-        docs.append(os.path.splitext(name)[0])
-        print("3> copy '{0}'".format(name))
-        dst = os.path.join(dest, name)
-        shutil.copy(os.path.join(code, name), dst)
+    pairs = []
+    for sub in ["code", "specs"]:
+        code = os.path.join(source, sub)
+        for name_ in os.listdir(code):
+            name = name_.lower()
+            docs.append(os.path.splitext(name)[0])
+            pairs.append((os.path.join(code, name_), os.path.join(dest, name)))
     
     # release notes
     releases = []
@@ -122,19 +272,19 @@ def copy_missing_md_docs(source):
         for name_ in os.listdir(os.path.join(rele, sub)):
             name = name_.lower().replace(".md", "").replace(".", "").replace("-", "") + ".md"
             releases.append(os.path.splitext(name)[0])
-            print("3> copy '{0}'".format(name))
-            dst = os.path.join(rel, name)
-            shutil.copy(os.path.join(rele, sub, name_), dst)
+            pairs.append((os.path.join(rele, sub, name_), os.path.join(rel, name)))
+
+    summary = sync_files(pairs, prefix="3> copy")
+    print_summary(summary, fLOG=lambda s: print("3> " + s))
     
     tpl = jinja2.Template(mddocs_index_template_docs)
     page = tpl.render(docs=docs)
-    with open(os.path.join(dest, "index.rst"), "w", encoding="utf-8") as f:
-        f.write(page)    
+    write_if_changed(os.path.join(dest, "index.rst"), page)
 
     tpl = jinja2.Template(mddocs_index_template_releases)
     page = tpl.render(releases=releases)
-    with open(os.path.join(dest, "changes.rst"), "w", encoding="utf-8") as f:
-        f.write(page)    
+    write_if_changed(os.path.join(dest, "changes.rst"), page)
+    return summary
 
 
 def maml_pythonnet(script, chdir=False, verbose=2):
@@ -154,28 +304,325 @@ def maml_pythonnet(script, chdir=False, verbose=2):
     
         C:/Users/<user>/.nuget/packages/system.codedom/4.4.0/lib/net461
     """
+    helper = load_mlnet()
     if chdir:
         cur = os.getcwd()
-        os.chdir(dll)
-    res = MamlHelper.MamlScriptConsole(script, True, verbose)
+        os.chdir(get_dll_folder())
+    res = helper.MamlScriptConsole(script, True, verbose)
     if chdir:
         os.chdir(cur)
     return res
 
 
+_dll_fingerprints = {}
+
+
+def dll_fingerprint(folder=None):
+    """
+    Computes a fingerprint of the assemblies stored in a folder.
+    It only relies on names, sizes and modification times
+    and is computed once per folder and process.
+    For the default folder, the missing DLL are copied first
+    and the fingerprint also covers the copied sources
+    (:epkg:`ML.net` *dist* folder and dependencies), a rebuilt
+    :epkg:`ML.net` changes the fingerprint.
+
+    @param      folder          folder, @see fn get_dll_folder by default
+    @return                     hexadecimal string
+    """
+    sources = []
+    if folder is None:
+        folder = get_dll_folder()
+        if folder not in _dll_fingerprints:
+            ensure_dll_copied()
+            sources = [src for src, _ in _missing_dll_pairs()]
+    if folder in _dll_fingerprints:
+        return _dll_fingerprints[folder]
+    m = hashlib.sha256()
+    files = [os.path.join(folder, name) for name in sorted(os.listdir(folder))]
+    for name in files + sorted(sources):
+        if os.path.splitext(name)[-1].lower() not in {'.dll', '.so', '.json'}:
+            continue
+        st = os.stat(name)
+        m.update("{0}|{1}|{2}\n".format(os.path.split(name)[-1], st.st_size,
+                                          int(st.st_mtime)).encode("utf-8"))
+    res = m.hexdigest()
+    _dll_fingerprints[folder] = res
+    return res
+
+
+class MamlResultCache:
+    """
+    On-disk cache for the outputs of *maml scripts*
+    (or :epkg:`C#` snippets).
+    Every entry is a file named after a hash of the script,
+    the verbosity and the fingerprint of the assemblies.
+    The least recently used entries are removed once
+    the total size exceeds *max_size* bytes.
+
+    @param      folder          cache location
+    @param      max_size        maximum size in bytes
+    """
+
+    def __init__(self, folder, max_size=2 ** 26):
+        self.folder = folder
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __str__(self):
+        return "MamlResultCache(hits={0}, misses={1}, evictions={2}, folder='{3}')".format(
+            self.hits, self.misses, self.evictions, self.folder)
+
+    @staticmethod
+    def key(script, verbose, fingerprint):
+        """
+        Returns the key for a script.
+        """
+        m = hashlib.sha256()
+        m.update(script.strip().encode("utf-8"))
+        m.update("|{0}|{1}".format(verbose, fingerprint).encode("utf-8"))
+        return m.hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self.folder, key + ".txt")
+
+    def __contains__(self, key):
+        return os.path.exists(self._filename(key))
+
+    def get(self, key):
+        """
+        Returns the cached output or None if the key is missing.
+        """
+        name = self._filename(key)
+        try:
+            with open(name, "r", encoding="utf-8") as f:
+                res = f.read()
+        except (FileNotFoundError, OSError):
+            self.misses += 1
+            return None
+        # Touches the file to keep track of the last access.
+        try:
+            os.utime(name, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return res
+
+    def set(self, key, value):
+        """
+        Stores an output and evicts old entries if needed.
+        """
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder, exist_ok=True)
+        name = self._filename(key)
+        tmp = "{0}.{1}.tmp".format(name, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp, name)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until
+        the cache size is below *max_size*.
+        """
+        if not os.path.exists(self.folder):
+            return
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(".txt"):
+                continue
+            full = os.path.join(self.folder, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+        total = sum(e[1] for e in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(full)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+
+maml_cache = MamlResultCache(os.path.join(this, "_mlcache"))
+
+
+def maml_pythonnet_cached(script, chdir=False, verbose=2, cache=None):
+    """
+    Runs a *maml script* through :epkg:`ML.net` unless
+    the output is already stored in the cache.
+
+    @param      script          script
+    @param      chdir           to change directory to the DLL location
+    @param      verbose         adjust the verbosity
+    @param      cache           @see cl MamlResultCache, *maml_cache* by default
+    @return                     stdout and stderr
+    """
+    if cache is None:
+        cache = maml_cache
+    key = cache.key(dedent(script), verbose, dll_fingerprint())
+    res = cache.get(key)
+    if res is None:
+        res = maml_pythonnet(script, chdir=chdir, verbose=verbose)
+        cache.set(key, res)
+    return res
+
+
+def _maml_worker_init():
+    """
+    Loads the assemblies once in every worker process.
+    The parent process already copied the DLL
+    (see @see fn run_maml_scripts_in_pool), the workers do not
+    write into the same folder at the same time.
+    """
+    load_mlnet(copy=False)
+
+
+def _maml_worker_run(script, verbose, cwd):
+    """
+    Runs one script in a worker process from folder *cwd*.
+    Exceptions raised by the CLR cannot be pickled,
+    they are returned as strings.
+
+    @return                     tuple *(success, output or error message)*
+    """
+    os.chdir(cwd)
+    try:
+        return True, maml_pythonnet(script, verbose=verbose)
+    except Exception as e:
+        return False, "{0}: {1}".format(type(e).__name__, e)
+
+
+_mlcmd_directive = re.compile("^( *)[.][.] +mlcmd::")
+
+
+def find_mlcmd_scripts(filename):
+    """
+    Extracts the scripts of every directive *mlcmd* in a file.
+
+    @param      filename        rst file
+    @return                     list of *(line number, dedented script)*
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    res = []
+    i = 0
+    while i < len(lines):
+        match = _mlcmd_directive.match(lines[i])
+        if match is None:
+            i += 1
+            continue
+        indent = len(match.group(1))
+        lineno = i + 1
+        i += 1
+        # options
+        while i < len(lines) and lines[i].strip().startswith(":"):
+            i += 1
+        content = []
+        while i < len(lines):
+            line = lines[i]
+            if line.strip() and len(line) - len(line.lstrip()) <= indent:
+                break
+            content.append(line)
+            i += 1
+        script = dedent("\n".join(content)).strip()
+        if script:
+            res.append((lineno, script))
+    return res
+
+
+def run_maml_scripts_in_pool(jobs, nb_workers, cache=None, verbose=2):
+    """
+    Runs *maml scripts* in a pool of processes and stores
+    the outputs in the cache. Every worker loads the assemblies once
+    and captures its own standard output.
+
+    @param      jobs            list of *(docname, lineno, script, folder)*,
+                                the script runs from *folder*
+    @param      nb_workers      number of processes
+    @param      cache           @see cl MamlResultCache, *maml_cache* by default
+    @param      verbose         adjust the verbosity
+    @return                     list of *(docname, lineno, error message)*
+    """
+    if cache is None:
+        cache = maml_cache
+    # Copies the DLL in the parent process before the workers start.
+    fingerprint = dll_fingerprint()
+    todo = {}
+    for docname, lineno, script, cwd in jobs:
+        key = cache.key(script, verbose, fingerprint)
+        if key not in todo and key not in cache:
+            todo[key] = (docname, lineno, script, cwd)
+    if len(todo) == 0:
+        return []
+
+    errors = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(nb_workers, len(todo)), mp_context=context,
+                             initializer=_maml_worker_init) as executor:
+        futures = {executor.submit(_maml_worker_run, script, verbose, cwd): (key, docname, lineno)
+                   for key, (docname, lineno, script, cwd) in todo.items()}
+        for future in as_completed(futures):
+            key, docname, lineno = futures[future]
+            try:
+                ok, out = future.result()
+            except Exception as e:
+                ok, out = False, "{0}: {1}".format(type(e).__name__, e)
+            if ok:
+                cache.set(key, out)
+            else:
+                errors.append((docname, lineno, out))
+    return errors
+
+
+def prefetch_maml_scripts(app, env, docnames):
+    """
+    Runs in parallel the scripts of every directive *mlcmd*
+    found in the documents to read. The directive then picks up
+    the outputs from the cache. Failing scripts are not cached,
+    the directive runs them again and fails in the right document.
+    """
+    nb_workers = app.config.mlext_maml_workers
+    if not nb_workers:
+        return
+    if nb_workers < 0:
+        nb_workers = os.cpu_count() or 1
+    jobs = []
+    for docname in docnames:
+        filename = env.doc2path(docname)
+        if not os.path.exists(filename):
+            continue
+        for lineno, script in find_mlcmd_scripts(filename):
+            jobs.append((docname, lineno, script, os.path.dirname(filename)))
+    logger = logging.getLogger(__name__)
+    with timeit_phase("mlcmd prefetch"):
+        errors = run_maml_scripts_in_pool(jobs, nb_workers)
+    for docname, lineno, msg in errors:
+        logger.warning("[mlcmd] %s", msg, location=(docname, lineno))
+
+
 def maml_test():
     """
     Tests the assembly.
     """
-    MamlHelper.TestScikitAPI()
-    MamlHelper.TestScikitAPI2()
+    helper = load_mlnet()
+    helper.TestScikitAPI()
+    helper.TestScikitAPI2()
     iris = os.path.abspath(os.path.join(os.path.dirname(__file__), "iris.txt"))
     if not os.path.exists(iris):
         raise FileNotFoundError("Unable to find '{0}'.".format(iris))
-    MamlHelper.TestScikitAPITrain(iris)
+    helper.TestScikitAPITrain(iris)
 
 
-class MlCmdDirective(RunPythonDirective):
+class MlCmdDirective(ProfiledDirective, RunPythonDirective):
     """
     Runs a command line based on :epkg:`ML.net`.
     """
@@ -185,12 +632,12 @@ class MlCmdDirective(RunPythonDirective):
         The methods modifies ``self.content``.
         """
         script = ["from textwrap import dedent",
-                  "from sphinx_mlext import maml_pythonnet",
+                  "from sphinx_mlext import maml_pythonnet_cached",
                   "content = dedent('''",
                   script,
                   "''')"
                   "",
-                  "out = maml_pythonnet(content)",
+                  "out = maml_pythonnet_cached(content)",
                   "print(out)",
                   ]
         return "\n".join(script)
@@ -200,9 +647,7 @@ def mlnet_components_kinds():
     """
     Retrieves all kinds.
     """
-    from Scikit.ML.DocHelperMlExt import MamlHelper
-
-    kinds = list(MamlHelper.GetAllKinds())
+    kinds = list(load_mlnet().GetAllKinds())
     kinds += ["argument", "command"]
     kinds = list(set(kinds))
     titles = {
@@ -226,9 +671,95 @@ def mlnet_components_kinds():
     return {k: titles[k] for k in kinds if k in titles}
 
 
-def builds_components_pages(epkg):
+def enumerate_components_catalog():
+    """
+    Enumerates all components once through :epkg:`ML.net`
+    and converts them into plain :epkg:`Python` structures.
+
+    @return                     dictionary ``{'kinds': {kind: title},
+                                'components': {kind: [component]}}``
+    """
+    kinds = mlnet_components_kinds()
+    helper = load_mlnet()
+    components = {}
+    for k in sorted(kinds):
+        try:
+            comps = list(helper.EnumerateComponents(k))
+        except Exception as e:
+            print("Issue with kind '{0}'\n{1}".format(k, e))
+            continue
+        if len(comps) == 0:
+            print("Empty kind '{0}'".format(k))
+            continue
+        rows = []
+        for comp in comps:
+            if comp.Arguments is None:
+                args = None
+            else:
+                args = [dict(Name=arg.Name, ShortName=arg.ShortName, DefaultValue=arg.DefaultValue,
+                             Help=arg.Help) for arg in comp.Arguments]
+            rows.append(dict(Name=comp.Name, Description=comp.Description,
+                             Aliases=list(comp.Aliases), Namespace=comp.Namespace,
+                             AssemblyName=comp.AssemblyName, Arguments=args))
+        components[k] = rows
+    return dict(kinds=kinds, components=components)
+
+
+_fingerprinted_objects = {}
+
+
+def load_fingerprinted_json(prefix, build, folder=None):
+    """
+    Returns an object which only depends on the assemblies.
+    It is serialized in *folder* and keyed by their fingerprint,
+    *build* is only called when they change.
+
+    @param      prefix          filename prefix
+    @param      build           function building the object, the result must be
+                                serializable in :epkg:`JSON`
+    @param      folder          cache location, *maml_cache.folder* by default
+    @return                     object
+    """
+    fingerprint = dll_fingerprint()
+    if (prefix, fingerprint) in _fingerprinted_objects:
+        return _fingerprinted_objects[prefix, fingerprint]
+    if folder is None:
+        folder = maml_cache.folder
+    name = os.path.join(folder, "{0}_{1}.json".format(prefix, fingerprint))
+    if os.path.exists(name):
+        with open(name, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+    else:
+        obj = build()
+        if not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        tmp = "{0}.{1}.tmp".format(name, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(obj, f)
+        os.replace(tmp, name)
+    _fingerprinted_objects[prefix, fingerprint] = obj
+    return obj
+
+
+def load_components_catalog(folder=None):
+    """
+    Returns the catalog of components (see @see fn enumerate_components_catalog).
+    The catalog is serialized in *folder* and keyed by the fingerprint
+    of the assemblies, reflection only happens when they change.
+
+    @param      folder          cache location, *maml_cache.folder* by default
+    @return                     catalog
+    """
+    return load_fingerprinted_json("components", enumerate_components_catalog, folder)
+
+
+def builds_components_pages(epkg, catalog=None):
     """
     Returns components pages.
+
+    @param      epkg            dictionary of links
+    @param      catalog         see @see fn load_components_catalog, loaded if None
+    @return                     dictionary ``{page name: content}``
     """
     try:
         from .sphinx_mlext_templates import index_template, kind_template, component_template
@@ -244,7 +775,7 @@ def builds_components_pages(epkg):
         warnings.warn("Update pyquickhelper to a newer version.")
     
     if "OPTICS" not in epkg:
-        raise KeyErro("OPTICS not found in epkg")
+        raise KeyError("OPTICS not found in epkg")
     
     def process_default(default_value):
         if not default_value:
@@ -268,7 +799,10 @@ def builds_components_pages(epkg):
             raise TypeError("desc must be a string not {0}".format(type(desc)))
         return add_rst_links(desc, epkg)
     
-    kinds = mlnet_components_kinds()
+    if catalog is None:
+        catalog = load_components_catalog()
+    kinds = catalog['kinds']
+    all_comps = catalog['components']
     pages = {}
     
     # index
@@ -282,67 +816,52 @@ def builds_components_pages(epkg):
     # builds references
     refs = {}
     for v, k in sorted_kinds:
-        enumc = MamlHelper.EnumerateComponents(k)
-        try:
-            comps = list(enumc)
-        except Exception as e:
-            print("Issue with kind '{0}'\n{1}".format(k, e))
-            continue
-        if len(comps) == 0:
-            print("Empty kind '{0}'\n{1}".format(k, e))
-            continue
-        for comp in comps:
-            refs[comp.Name] = ":ref:`l-{0}`".format(comp.Name.lower().replace(".", "-"))
+        for comp in all_comps.get(k, []):
+            refs[comp['Name']] = ":ref:`l-{0}`".format(comp['Name'].lower().replace(".", "-"))
     
     # kinds and components
     for v, k in sorted_kinds:
-        enumc = MamlHelper.EnumerateComponents(k)
-        try:
-            comps = list(enumc)
-        except Exception as e:
-            print("Issue with kind '{0}'\n{1}".format(k, e))
-            continue
-        if len(comps) == 0:
-            print("Empty kind '{0}'\n{1}".format(k, e))
+        comps = all_comps.get(k, None)
+        if not comps:
             continue
             
-        comp_names = list(sorted(c.Name.replace(" ", "_").replace(".", "_").lower() for c in comps))
+        comp_names = list(sorted(c['Name'].replace(" ", "_").replace(".", "_").lower() for c in comps))
         kind_name = v
         kind_kind = k
         pages[k] = kind_tpl.render(title=kind_name, fnames=comp_names, len=len)
         
         for comp in comps:
             
-            if comp.Arguments is None and "version" not in comp.Name.lower():
-                print("---- SKIP ----", k, comp.Name, comp.Description)
+            if comp['Arguments'] is None and "version" not in comp['Name'].lower():
+                print("---- SKIP ----", k, comp['Name'], comp['Description'])
             else:
-                assembly_name = comp.AssemblyName
+                assembly_name = comp['AssemblyName']
                 args = {}
-                if comp.Arguments is not None:
-                    for arg in comp.Arguments:
-                        dv = process_default(arg.DefaultValue)
-                        args[arg.Name] = dict(Name=arg.Name, ShortName=arg.ShortName or '',
-                                          Default=refs.get(dv, dv), Description=arg.Help)
+                if comp['Arguments'] is not None:
+                    for arg in comp['Arguments']:
+                        dv = process_default(arg['DefaultValue'])
+                        args[arg['Name']] = dict(Name=arg['Name'], ShortName=arg['ShortName'] or '',
+                                                 Default=refs.get(dv, dv), Description=arg['Help'])
                 sorted_params = [v for k, v in sorted(args.items())]
-                aliases = ", ".join(comp.Aliases)
+                aliases = ", ".join(comp['Aliases'])
 
                 if assembly_name.startswith("Microsoft.ML"):
                     linkdocs = "**Microsoft Documentation:** `{0} <https://docs.microsoft.com/dotnet/api/{1}.{2}>`_"
-                    linkdocs = linkdocs.format(comp.Name, comp.Namespace.lower(), comp.Name.lower())
+                    linkdocs = linkdocs.format(comp['Name'], comp['Namespace'].lower(), comp['Name'].lower())
                 else:
                     linkdocs = ""
 
 
-                comp_name = comp.Name.replace(" ", "_").replace(".", "_").lower()
-                pages[comp_name] = comp_tpl.render(title=comp.Name,
+                comp_name = comp['Name'].replace(" ", "_").replace(".", "_").lower()
+                pages[comp_name] = comp_tpl.render(title=comp['Name'],
                                         aliases=aliases, 
-                                        summary=process_description(comp.Description),
+                                        summary=process_description(comp['Description']),
                                         kind=kind_kind, 
-                                        namespace=comp.Namespace,
+                                        namespace=comp['Namespace'],
                                         sorted_params=sorted_params,
                                         assembly=assembly_name,
                                         len=len, linkdocs=linkdocs,
-                                        docadd=components.get(comp.Name, ''),
+                                        docadd=components.get(comp['Name'], ''),
                                         MicrosoftML="Microsoft.ML" in assembly_name,
                                         ScikitML="Scikit.ML" in assembly_name)
     
@@ -353,6 +872,11 @@ def write_components_pages(app, env, docnames):
     """
     Writes documentation pages.
     """
+    with timeit_phase("components pages"):
+        _write_components_pages(app, env)
+
+
+def _write_components_pages(app, env):
     pages = builds_components_pages(app.config.epkg_dictionary)
     docdir = env.srcdir
     dest = os.path.join(docdir, "components")
@@ -375,10 +899,11 @@ def get_mlnet_assemblies(chdir=False):
     """
     Retrieves assemblies.
     """
+    helper = load_mlnet()
     if chdir:
         cur = os.getcwd()
-        os.chdir(dll)
-    res = MamlHelper.GetLoadedAssembliesLocation(True)
+        os.chdir(get_dll_folder())
+    res = helper.GetLoadedAssembliesLocation(True)
     if chdir:
         os.chdir(cur)
     dependencies = []
@@ -413,12 +938,55 @@ def get_mlnet_assemblies(chdir=False):
             "Microsoft.ML.Transforms.Text",
             "Microsoft.ML.Runtime.Sweeper",
         ])
-    res = MamlHelper.GetAssemblies()
+    res = helper.GetAssemblies()
     usings.extend([a.FullName.split(',')[0] for a in res if "Scikit" in a.FullName])
     return dependencies, usings
+
+
+def load_mlnet_assemblies():
+    """
+    Returns the result of @see fn get_mlnet_assemblies,
+    the CLR is only started if the assemblies changed since the last build.
+    """
+    deps, uss = load_fingerprinted_json("assemblies", lambda: list(get_mlnet_assemblies()))
+    return list(deps), list(uss)
+
+
+csharp_cache = MamlResultCache(os.path.join(this, "_mlcache", "csharp"))
+
+
+def csharp_snippet_key(script, usings, dependencies):
+    """
+    Returns the key of a :epkg:`C#` snippet in *csharp_cache*.
+    It depends on the snippet, the usings and the dependencies.
+    """
+    m = hashlib.sha256()
+    m.update(dedent(script).strip().encode("utf-8"))
+    m.update("|".join(usings).encode("utf-8"))
+    m.update("|".join(sorted(dependencies)).encode("utf-8"))
+    m.update(dll_fingerprint().encode("utf-8"))
+    return m.hexdigest()
+
+
+def run_csharp_cached(key, code):
+    """
+    Runs the :epkg:`Python` code generated by :epkg:`csharpy`
+    to compile and run a snippet unless its output is already cached.
+
+    @param      key             see @see fn csharp_snippet_key
+    @param      code            code generated by :epkg:`csharpy`
+    """
+    res = csharp_cache.get(key)
+    if res is None:
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            exec(compile(code, "<runcsharpml>", "exec"), {'__name__': '__main__'})
+        res = buf.getvalue()
+        csharp_cache.set(key, res)
+    print(res, end='')
     
 
-class RunCSharpMLDirective(RunCSharpDirective):
+class RunCSharpMLDirective(ProfiledDirective, RunCSharpDirective):
     """
     Implicits "and dependencies.
     """
@@ -429,29 +997,131 @@ class RunCSharpMLDirective(RunCSharpDirective):
         run :epkg:`C#` from :epkg:`Python`.
         """
         if not hasattr(RunCSharpDirective, 'deps_using'):
-            RunCSharpDirective.deps_using = get_mlnet_assemblies()
+            RunCSharpDirective.deps_using = load_mlnet_assemblies()
         dependencies, usings = RunCSharpMLDirective.deps_using
-        return self._modify_script_before_running(script, usings, dependencies)
+        code = self._modify_script_before_running(script, usings, dependencies)
+        key = csharp_snippet_key(script, usings, dependencies)
+        script = ["from sphinx_mlext import run_csharp_cached",
+                  "run_csharp_cached({0}, {1})".format(repr(key), repr(code)),
+                  ]
+        return "\n".join(script)
     
 
+def configure_maml_cache(app):
+    """
+    Configures the caches used by directives *mlcmd* and *runcsharpml*.
+    """
+    if app.config.mlext_cache_dir:
+        maml_cache.folder = app.config.mlext_cache_dir
+        csharp_cache.folder = os.path.join(app.config.mlext_cache_dir, "csharp")
+    maml_cache.max_size = app.config.mlext_cache_size
+    csharp_cache.max_size = app.config.mlext_cache_size
+
+
+def copy_mlnet_md_docs(app):
+    """
+    Copies the markdown documentation of :epkg:`ML.net`.
+    """
+    docs = get_mlnet_docs_folder()
+    with timeit_phase("markdown copy"):
+        copy_missing_md_docs(docs)
+
+
+def report_maml_cache(app, exception):
+    """
+    Displays the caches statistics and the time spent
+    in every startup phase at the end of the build.
+    """
+    print("[sphinx_mlext] {0}".format(maml_cache))
+    print("[sphinx_mlext] {0}".format(csharp_cache))
+    for phase in ["path discovery", "DLL copy", "markdown copy", "assembly load"]:
+        if phase in startup_timings:
+            print("[sphinx_mlext] {0}: {1:.3f}s".format(phase, startup_timings[phase]))
+
+
+def purge_profile(app, env, docname):
+    """
+    Removes the measures of a document read again.
+    """
+    if hasattr(env, 'mlext_profile'):
+        env.mlext_profile = [r for r in env.mlext_profile if r['docname'] != docname]
+
+
+def merge_profile(app, env, docnames, other):
+    """
+    Merges the measures collected by parallel readers.
+    """
+    if not hasattr(env, 'mlext_profile'):
+        env.mlext_profile = []
+    env.mlext_profile.extend(getattr(other, 'mlext_profile', []))
+
+
+def write_profile_report(app, exception):
+    """
+    Writes the time spent in every setup phase and directive
+    into a :epkg:`JSON` file, displays the slowest blocks and
+    raises a warning for every page exceeding *mlext_profile_budget*
+    (in seconds).
+    """
+    if exception is not None:
+        return
+    blocks = list(getattr(app.env, 'mlext_profile', []))
+    pages = {}
+    for r in blocks:
+        pages[r['docname']] = pages.get(r['docname'], 0.) + r['wall']
+    phases = {k: dict(wall=v, calls=startup_calls.get(k, 0), clr_memory=startup_memory.get(k, None))
+              for k, v in startup_timings.items()}
+    report = dict(phases=phases, blocks=blocks, pages=pages)
+
+    name = app.config.mlext_profile_file or os.path.join(app.outdir, "mlext_profile.json")
+    with open(name, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print("[sphinx_mlext] profile written in '{0}'".format(name))
+
+    top = list(sorted(blocks, key=lambda r: -r['wall']))[:app.config.mlext_profile_top]
+    if top:
+        print("[sphinx_mlext] slowest blocks")
+        for r in top:
+            print("[sphinx_mlext] {0:8.3f}s  {1}:{2}  {3}".format(
+                r['wall'], r['docname'], r['lineno'], r['directive']))
+
+    budget = app.config.mlext_profile_budget
+    if budget:
+        logger = logging.getLogger(__name__)
+        for docname, wall in sorted(pages.items()):
+            if wall > budget:
+                logger.warning("[sphinx_mlext] page '%s' took %1.3fs to run its blocks, budget is %1.3fs.",
+                               docname, wall, budget, location=docname)
+
+
 def setup(app):
     """
-    Adds the custom directive.
+    Adds the custom directive. :epkg:`ML.net` is loaded
+    on the first call to a directive or when the pages
+    describing the components are generated.
     """
-    copy_missing_md_docs(docs)
-    copy_missing_dll()
+    app.add_config_value('mlext_cache_dir', None, 'env')
+    app.add_config_value('mlext_cache_size', 2 ** 26, 'env')
+    app.add_config_value('mlext_maml_workers', 0, 'env')
+    app.add_config_value('mlext_profile_file', None, '')
+    app.add_config_value('mlext_profile_top', 10, '')
+    app.add_config_value('mlext_profile_budget', None, '')
     app.add_directive('mlcmd', MlCmdDirective)
+    app.connect("builder-inited", configure_maml_cache)
+    app.connect("builder-inited", copy_mlnet_md_docs)
+    app.connect("build-finished", report_maml_cache)
+    app.connect("build-finished", write_profile_report)
+    app.connect("env-purge-doc", purge_profile)
+    app.connect("env-merge-info", merge_profile)
     app.connect("env-before-read-docs", write_components_pages)
+    app.connect("env-before-read-docs", prefetch_maml_scripts)
     app.add_directive('runcsharpml', RunCSharpMLDirective)
     return {'version': sphinx.__display_version__, 'parallel_read_safe': True}
 
 
 if __name__ == "__main__":
-    copy_missing_md_docs(docs)
-    copy_missing_dll()
-    from clr import AddReference
-    AddReference('Scikit.ML.DocHelperMlExt')
-    from Scikit.ML.DocHelperMlExt import MamlHelper
+    copy_missing_md_docs(get_mlnet_docs_folder())
+    load_mlnet()
     class dummy:
         pass
     deps, uss = get_mlnet_assemblies()
@@ -477,8 +1147,3 @@ if __name__ == "__main__":
     out = rst2html(rst, layout="sphinx", writer="rst",
                    directives=[("mamlcmd", MlCmdDirective)])
     print(out)
-else:
-    from clr import AddReference
-    AddReference('Scikit.ML.DocHelperMlExt')
-    from System.IO import IOException
-    from Scikit.ML.DocHelperMlExt import MamlHelper
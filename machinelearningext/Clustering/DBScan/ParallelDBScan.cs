@@ -0,0 +1,242 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Scikit.ML.NearestNeighbors;
+
+
+namespace Scikit.ML.Clustering
+{
+    /// <summary>
+    /// Implements DBScan algorithm with several threads.
+    /// Points are identified by their index in a dense matrix.
+    /// Neighborhoods are computed by batches of points in parallel
+    /// with a <see cref="FlatKdTree"/>. Core points, the points with at least
+    /// <c>minPoints</c> neighbours (itself included), are found first,
+    /// the neighbours of the core points are then stored.
+    /// The clusters are finally built by replaying the visit order
+    /// of <see cref="DBScan.Cluster"/> over the stored neighbours and
+    /// the result is the same: a cluster is only expanded from points
+    /// with more than <c>minPoints</c> neighbours and a point labelled
+    /// as noise before a cluster reaches it remains noise.
+    /// </summary>
+    public class ParallelDBScan
+    {
+        #region Fields
+
+        public const int NOISE = DBScan.NOISE;
+
+        /// <summary>
+        /// Default number of points processed by a thread at once.
+        /// </summary>
+        public const int DefaultBatchSize = 1024;
+
+        private readonly float[] coordinates;
+        private readonly int dimension;
+        private readonly int count;
+        private readonly int batchSize;
+        private readonly int? numThreads;
+        private readonly FlatKdTree kdt;
+
+        #endregion
+
+        /// <summary>
+        /// Builds the tree on all points.
+        /// </summary>
+        /// <param name="coordinates">dense matrix (number of points x dimension), it is not modified</param>
+        /// <param name="dimension">dimension</param>
+        /// <param name="numThreads">number of threads, null for all cores</param>
+        /// <param name="batchSize">number of points processed by a thread at once</param>
+        public ParallelDBScan(float[] coordinates, int dimension, int? numThreads = null, int batchSize = DefaultBatchSize)
+        {
+            Contracts.CheckValue(coordinates, nameof(coordinates));
+            Contracts.CheckParam(dimension > 0, nameof(dimension), "must be positive");
+            Contracts.CheckParam(!numThreads.HasValue || numThreads.Value > 0, nameof(numThreads), "must be positive or null");
+            Contracts.CheckParam(batchSize > 0, nameof(batchSize), "must be positive");
+            if (coordinates.Length % dimension != 0)
+                throw Contracts.ExceptParam(nameof(coordinates), $"Length {coordinates.Length} is not a multiple of the dimension {dimension}.");
+
+            this.coordinates = coordinates;
+            this.dimension = dimension;
+            this.count = coordinates.Length / dimension;
+            this.batchSize = batchSize;
+            this.numThreads = numThreads;
+
+            // The tree stores a copy of the coordinates and
+            // returns the index of the points as ids.
+            var ids = new long[count];
+            for (int i = 0; i < count; ++i)
+                ids[i] = i;
+            this.kdt = new FlatKdTree(coordinates, ids, dimension);
+        }
+
+        /// <summary>
+        /// Builds the tree on a list of points, point <c>i</c> gets index <c>i</c>.
+        /// </summary>
+        public ParallelDBScan(IList<IPointIdFloat> points, int? numThreads = null, int batchSize = DefaultBatchSize) :
+            this(ToMatrix(points), points.Count == 0 ? 1 : points[0].dimension, numThreads, batchSize)
+        {
+        }
+
+        private static float[] ToMatrix(IList<IPointIdFloat> points)
+        {
+            Contracts.CheckValue(points, nameof(points));
+            int dim = points.Count == 0 ? 1 : points[0].dimension;
+            var res = new float[points.Count * dim];
+            for (int i = 0; i < points.Count; ++i)
+            {
+                if (points[i].dimension != dim)
+                    throw Contracts.ExceptParam(nameof(points), $"Point {i} has dimension {points[i].dimension}, expected {dim}.");
+                for (int j = 0; j < dim; ++j)
+                    res[i * dim + j] = points[i].ElementAt(j);
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Number of points.
+        /// </summary>
+        public int Count => count;
+
+        #region API
+
+        /// <summary>
+        /// Clusters the points.
+        /// </summary>
+        /// <param name="epsilon">radius of a neighborhood</param>
+        /// <param name="minPoints">minimum number of points in the neighborhood of a core point (itself included)</param>
+        /// <param name="onBatchProcessing">called after every batch with the number of region queries
+        /// done so far, two per point, it is called from several threads</param>
+        /// <returns>the cluster of every point, <see cref="NOISE"/> for noise, clusters start at 1</returns>
+        public int[] Cluster(float epsilon, int minPoints, Action<long> onBatchProcessing = null)
+        {
+            if (epsilon <= 0)
+                throw new ArgumentException(String.Format("Argument epsilon must be positive. Got {0}", epsilon));
+            if (minPoints <= 0)
+                throw new ArgumentException(String.Format("Argument minPoints must be positive. Got {0}", minPoints));
+
+            // First pass: number of neighbours, core points have at least minPoints neighbours.
+            var counts = new int[count];
+            RunBatches(epsilon, (i, neighbours) => counts[i] = neighbours.Count, onBatchProcessing);
+
+            // Second pass: neighbours of the core points, the only ones
+            // which can start or expand a cluster.
+            var neighbourhoods = new int[count][];
+            RunBatches(epsilon, (i, neighbours) =>
+            {
+                if (counts[i] < minPoints)
+                    return;
+                var links = new int[neighbours.Count];
+                for (int k = 0; k < links.Length; ++k)
+                    links[k] = (int)neighbours[k].Value;
+                neighbourhoods[i] = links;
+            }, onBatchProcessing == null ? (Action<long>)null : nb => onBatchProcessing(count + nb));
+
+            // Replays DBScan.Cluster, 0 means the point was not processed yet.
+            // The points reached by a cluster do not depend on the order
+            // the neighbours are visited in.
+            var clusters = new int[count];
+            var stack = new Stack<int>();
+            int C = 0;
+            for (int i = 0; i < count; ++i)
+            {
+                if (clusters[i] != 0)
+                    continue;
+                if (counts[i] < minPoints)
+                {
+                    clusters[i] = NOISE;
+                    continue;
+                }
+                clusters[i] = ++C;
+                foreach (var j in neighbourhoods[i])
+                    stack.Push(j);
+                while (stack.Count > 0)
+                {
+                    int q = stack.Pop();
+                    if (clusters[q] != 0)
+                        continue;
+                    clusters[q] = C;
+                    if (counts[q] > minPoints)
+                    {
+                        foreach (var j in neighbourhoods[q])
+                            stack.Push(j);
+                    }
+                }
+            }
+            return clusters;
+        }
+
+        /// <summary>
+        /// Computes the same score as <see cref="DBScan.Score"/> for every point,
+        /// <c>1 / (epsilon + d)</c> where <c>d</c> is the distance to the closest
+        /// neighbour in another cluster, 0 if there is none,
+        /// 1 if the point has no neighbour. Noise gets an infinite score.
+        /// </summary>
+        /// <param name="epsilon">radius of a neighborhood</param>
+        /// <param name="clusters">cluster of every point</param>
+        public float[] Score(float epsilon, int[] clusters)
+        {
+            Contracts.CheckValue(clusters, nameof(clusters));
+            if (clusters.Length != count)
+                throw Contracts.ExceptParam(nameof(clusters), $"Expecting {count} clusters not {clusters.Length}.");
+            var scores = new float[count];
+            RunBatches(epsilon, (i, neighbours) =>
+            {
+                if (clusters[i] == NOISE)
+                    scores[i] = float.PositiveInfinity;
+                else if (neighbours.Count <= 1)
+                    scores[i] = 1f;
+                else
+                {
+                    float score = 0f;
+                    foreach (var nb in neighbours)
+                    {
+                        if (clusters[nb.Value] != clusters[i])
+                            score = Math.Max(score, (float)(1 / (epsilon + nb.Key)));
+                    }
+                    scores[i] = score;
+                }
+            }, null);
+            return scores;
+        }
+
+        #endregion
+
+        #region Private
+
+        /// <summary>
+        /// Runs a region query for every point, points are split into batches
+        /// processed in parallel. The action receives the index of the point
+        /// and its neighbours, it must be thread safe.
+        /// </summary>
+        private void RunBatches(float epsilon, Action<int, List<KeyValuePair<float, long>>> action,
+                                Action<long> onBatchProcessing)
+        {
+            int nbBatches = (count + batchSize - 1) / batchSize;
+            long processed = 0;
+            var options = new ParallelOptions() { MaxDegreeOfParallelism = numThreads ?? Environment.ProcessorCount };
+            Parallel.For(0, nbBatches, options,
+                () => new Tuple<float[], List<KeyValuePair<float, long>>>(new float[dimension], new List<KeyValuePair<float, long>>()),
+                (batch, state, local) =>
+                {
+                    int end = Math.Min(count, (batch + 1) * batchSize);
+                    for (int i = batch * batchSize; i < end; ++i)
+                    {
+                        Array.Copy(coordinates, (long)i * dimension, local.Item1, 0, dimension);
+                        local.Item2.Clear();
+                        kdt.PointsWithinDistance(local.Item1, 0, epsilon, local.Item2);
+                        action(i, local.Item2);
+                    }
+                    long done = Interlocked.Add(ref processed, end - batch * batchSize);
+                    onBatchProcessing?.Invoke(done);
+                    return local;
+                },
+                local => { });
+        }
+
+        #endregion
+    }
+}
@@ -4,6 +4,7 @@ using System;
 using System.Collections.Generic;
 using System.Linq;
 using System.Diagnostics;
+using System.Threading;
 using Microsoft.ML;
 using Microsoft.ML.Data;
 using Microsoft.ML.CommandLine;
@@ -45,8 +46,8 @@ namespace Scikit.ML.Clustering
         {
             return new VersionInfo(
                 modelSignature: "DBSCANME",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(DBScanTransform).Assembly.FullName);
@@ -76,6 +77,9 @@ namespace Scikit.ML.Clustering
             [Argument(ArgumentType.AtMostOnce, HelpText = "Seed for the number generators.", ShortName = "s")]
             public int? seed = 42;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads, 1 runs the sequential algorithm, null uses all cores. The parallel version returns the same clusters.", ShortName = "nt")]
+            public int? numThreads = 1;
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(features);
@@ -84,6 +88,7 @@ namespace Scikit.ML.Clustering
                 ctx.Writer.Write(outCluster);
                 ctx.Writer.Write(outScore);
                 ctx.Writer.Write(seed ?? -1);
+                ctx.Writer.Write(numThreads ?? -1);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -95,6 +100,13 @@ namespace Scikit.ML.Clustering
                 outScore = ctx.Reader.ReadString();
                 int s = ctx.Reader.ReadInt32();
                 seed = s < 0 ? (int?)null : s;
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    int nt = ctx.Reader.ReadInt32();
+                    numThreads = nt < 0 ? (int?)null : nt;
+                }
+                else
+                    numThreads = 1;
             }
         }
 
@@ -120,6 +132,8 @@ namespace Scikit.ML.Clustering
                 Contracts.Check(false, "Parameter epsilon must be positive or null.");
             if (args.minPoints <= 0)
                 Contracts.Check(false, "Parameter minPoints must be positive.");
+            if (args.numThreads.HasValue && args.numThreads.Value <= 0)
+                Contracts.Check(false, "Parameter numThreads must be positive or null.");
             _args = args;
             _schema = Schema.Create(new ExtendedSchema(input.Schema, new string[] { args.outCluster, args.outScore },
                                                        new ColumnType[] { NumberType.I4, NumberType.R4 }));
@@ -244,6 +258,12 @@ namespace Scikit.ML.Clustering
 
                     using (var ch = _host.Start("DBScan"))
                     {
+                        if (_args.numThreads != 1)
+                        {
+                            TrainTransformParallel(ch);
+                            return;
+                        }
+
                         var sw = Stopwatch.StartNew();
                         sw.Start();
                         var points = new List<IPointIdFloat>();
@@ -335,7 +355,7 @@ namespace Scikit.ML.Clustering
                             if (mapprev[p.id] < 0)
                                 continue;
                             _reversedMapping[p.id] = new Tuple<int, float>(mapprev[p.id],
-                                        dbscanAlgo.Score(p, _args.epsilon, mapprev));
+                                        dbscanAlgo.Score(p, distance, mapprev));
                         }
 
                         // Adding points with no clusters.
@@ -355,8 +375,116 @@ namespace Scikit.ML.Clustering
                 }
             }
 
+            /// <summary>
+            /// Caches the features in a dense matrix instead of a list of points
+            /// and runs <see cref="ParallelDBScan"/>.
+            /// </summary>
+            void TrainTransformParallel(IChannel ch)
+            {
+                var sw = Stopwatch.StartNew();
+                var coordinates = new List<float>();
+                var ids = new List<long>();
+                int dimension = -1;
+                int index = SchemaHelper.GetColumnIndex(_input.Schema, _args.features);
+
+                // Caching data.
+                ch.Info(MessageSensitivity.None, "Caching the data.");
+                using (var cursor = _input.GetRowCursor(i => i == index))
+                {
+                    var getter = cursor.GetGetter<VBuffer<float>>(index);
+                    var getterId = cursor.GetIdGetter();
+                    RowId id = new RowId();
+
+                    VBuffer<float> tmp = new VBuffer<float>();
+
+                    while (cursor.MoveNext())
+                    {
+                        getter(ref tmp);
+                        getterId(ref id);
+                        if (id > long.MaxValue)
+                            throw ch.Except("An id is outside the range for long {0}", id);
+                        if (dimension == -1)
+                            dimension = tmp.Length;
+                        else if (dimension != tmp.Length)
+                            throw ch.Except("All features must have the same dimension {0} != {1}.", dimension, tmp.Length);
+                        coordinates.AddRange(tmp.DenseValues());
+                        ids.Add((long)id);
+                    }
+                }
+                if (ids.Count == 0)
+                    throw ch.Except("No point to cluster.");
+
+                var matrix = coordinates.ToArray();
+                coordinates = null;
+
+                float distance = _args.epsilon;
+                if (distance <= 0)
+                {
+                    float mind, maxd;
+                    distance = EstimateDistance(ch, ids.Count,
+                                    (i, j) => (float)Math.Sqrt(FlatKdTree.SquaredL2(matrix, i * dimension, matrix, j * dimension, dimension)),
+                                    out mind, out maxd);
+                    ch.Info(MessageSensitivity.UserData, "epsilon (=Radius) was estimating on random couples of points: {0} in [{1}, {2}]", distance, mind, maxd);
+                }
+
+                var dbscanAlgo = new ParallelDBScan(matrix, dimension, _args.numThreads);
+                // Clustering.
+                ch.Info(MessageSensitivity.UserData, "Clustering {0} points with {1} threads.", ids.Count,
+                        _args.numThreads ?? Environment.ProcessorCount);
+
+                long nQueries = ids.Count * 2L;
+                long step = Math.Max(nQueries / 10, ParallelDBScan.DefaultBatchSize);
+                long nextLog = step;
+                Action<long> progressLogger = nb =>
+                {
+                    if (nb >= Interlocked.Read(ref nextLog))
+                    {
+                        Interlocked.Add(ref nextLog, step);
+                        ch.Info(MessageSensitivity.UserData, "Processing {0}/{1} region queries", nb, nQueries);
+                    }
+                };
+                var results = dbscanAlgo.Cluster(distance, _args.minPoints, progressLogger);
+
+                // Cleaning small clusters.
+                ch.Info(MessageSensitivity.UserData, "Removing clusters with less than {0} points.", _args.minPoints);
+                var finalCounts = results.GroupBy(c => c).ToDictionary(c => c.Key, c => c.Count());
+                for (int i = 0; i < results.Length; ++i)
+                {
+                    if (finalCounts[results[i]] < _args.minPoints)
+                        results[i] = DBScan.NOISE;
+                }
+
+                ch.Info(MessageSensitivity.None, "Compute scores.");
+                var scores = dbscanAlgo.Score(distance, results);
+                _reversedMapping = new Dictionary<long, Tuple<int, float>>();
+                for (int i = 0; i < results.Length; ++i)
+                    _reversedMapping[ids[i]] = new Tuple<int, float>(results[i], scores[i]);
+
+                if (_reversedMapping.Count != ids.Count)
+                    throw ch.Except("Mismatch between the number of points. This means some ids are not unique {0} != {1}.", _reversedMapping.Count, ids.Count);
+
+                ch.Info(MessageSensitivity.UserData, "Found {0} clusters.", results.Where(c => c >= 0).Distinct().Count());
+                sw.Stop();
+                ch.Info(MessageSensitivity.UserData, "'DBScan' finished in {0}.", sw.Elapsed);
+            }
+
             public float EstimateDistance(IChannel ch, List<IPointIdFloat> points,
                                            out float minDistance, out float maxDistance)
+            {
+                return EstimateDistance(ch, points.Count, (i, j) => points[i].DistanceTo(points[j]),
+                                        out minDistance, out maxDistance);
+            }
+
+            /// <summary>
+            /// Estimates epsilon with the distances between random couples of points.
+            /// </summary>
+            /// <param name="ch">channel</param>
+            /// <param name="count">number of points</param>
+            /// <param name="distanceFunc">distance between two points given their indices</param>
+            /// <param name="minDistance">minimum observed distance</param>
+            /// <param name="maxDistance">maximum observed distance</param>
+            public float EstimateDistance(IChannel ch, int count, Func<int, int, float> distanceFunc,
+                                           out float minDistance, out float maxDistance)
             {
                 ch.Info(MessageSensitivity.UserData, "Estimating epsilon based on the data. We pick up two random random computes the average distance.");
                 var rand = _args.seed.HasValue ? new Random(_args.seed.Value) : new Random();
@@ -368,11 +496,11 @@ namespace Scikit.ML.Clustering
                 int i, j;
                 while (stack.Count < 10000)
                 {
-                    i = rand.Next(0, points.Count - 1);
-                    j = rand.Next(0, points.Count - 1);
+                    i = rand.Next(0, count - 1);
+                    j = rand.Next(0, count - 1);
                     if (i == j)
                         continue;
-                    d = points[i].DistanceTo(points[j]);
+                    d = distanceFunc(i, j);
                     sum += d;
                     sum2 += d * d;
                     stack.Add(d);
@@ -0,0 +1,295 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Scikit.ML.NearestNeighbors;
+
+
+namespace Scikit.ML.Clustering
+{
+    /// <summary>
+    /// Kd tree built over the coordinates of an <see cref="OpticsPointStore"/>.
+    /// It follows the layout of <see cref="FlatKdTree"/> (balanced tree,
+    /// node <c>i</c> has children <c>2i+1</c> and <c>2i+2</c>, buckets of at most
+    /// <c>leafSize</c> points) but it does not copy the coordinates:
+    /// the permutation of the points is stored in the store
+    /// and the coordinates are read from the store, in memory or mapped.
+    /// Only the split dimensions and values are kept in memory.
+    /// The distance is L2.
+    /// </summary>
+    internal class OpticsKdTree
+    {
+        private readonly OpticsPointStore _store;
+        private readonly int _dim;
+        private readonly int _n;
+        private readonly int _levels;
+        private readonly int[] _splitDim;
+        private readonly float[] _splitValue;
+
+        /// <summary>
+        /// Builds the tree, the store must be sealed.
+        /// </summary>
+        public OpticsKdTree(OpticsPointStore store, int leafSize = FlatKdTree.DefaultLeafSize)
+        {
+            Contracts.CheckValue(store, nameof(store));
+            Contracts.CheckParam(store.IsSealed, nameof(store), "must be sealed");
+            Contracts.CheckParam(leafSize > 0, nameof(leafSize), "must be positive");
+            _store = store;
+            _dim = store.Dimension;
+            _n = store.Count;
+            _levels = 0;
+            while (((long)_n + (1L << _levels) - 1) >> _levels > leafSize)
+                ++_levels;
+            int nbNodes = (1 << _levels) - 1;
+            _splitDim = new int[nbNodes];
+            _splitValue = new float[nbNodes];
+            for (int i = 0; i < _n; ++i)
+                _store.SetTreeIndex(i, i);
+            if (_n > 0)
+                Build(0, 0, _n, 0);
+        }
+
+        #region build
+
+        private void Build(int node, int begin, int end, int level)
+        {
+            if (level == _levels)
+                return;
+
+            // Splits along the dimension with the largest spread.
+            var row = new float[_dim];
+            var mini = new float[_dim];
+            var maxi = new float[_dim];
+            for (int d = 0; d < _dim; ++d)
+            {
+                mini[d] = float.MaxValue;
+                maxi[d] = float.MinValue;
+            }
+            for (int i = begin; i < end; ++i)
+            {
+                _store.CopyPoint(_store.GetTreeIndex(i), row, 0);
+                for (int d = 0; d < _dim; ++d)
+                {
+                    if (row[d] < mini[d])
+                        mini[d] = row[d];
+                    if (row[d] > maxi[d])
+                        maxi[d] = row[d];
+                }
+            }
+            int best = 0;
+            float bestSpread = -1;
+            for (int d = 0; d < _dim; ++d)
+            {
+                if (maxi[d] - mini[d] > bestSpread)
+                {
+                    bestSpread = maxi[d] - mini[d];
+                    best = d;
+                }
+            }
+
+            int mid = begin + (end - begin) / 2;
+            if (end - begin > 1)
+                Select(begin, end, mid, best);
+            _splitDim[node] = best;
+            _splitValue[node] = mid < end ? Coordinate(mid, best) : 0f;
+
+            if (end - begin > 1 << 16)
+                Parallel.Invoke(() => Build(node * 2 + 1, begin, mid, level + 1),
+                                () => Build(node * 2 + 2, mid, end, level + 1));
+            else
+            {
+                Build(node * 2 + 1, begin, mid, level + 1);
+                Build(node * 2 + 2, mid, end, level + 1);
+            }
+        }
+
+        private float Coordinate(int row, int d)
+        {
+            return _store.GetCoordinate(_store.GetTreeIndex(row), d);
+        }
+
+        private void Swap(int i, int j)
+        {
+            int tmp = _store.GetTreeIndex(i);
+            _store.SetTreeIndex(i, _store.GetTreeIndex(j));
+            _store.SetTreeIndex(j, tmp);
+        }
+
+        /// <summary>
+        /// Partial sort of the rows <c>[begin:end]</c> (quickselect) so that
+        /// row <c>nth</c> is at its sorted position for dimension <c>d</c>.
+        /// </summary>
+        private void Select(int begin, int end, int nth, int d)
+        {
+            while (end - begin > 1)
+            {
+                float a = Coordinate(begin, d);
+                float b = Coordinate((begin + end) / 2, d);
+                float c = Coordinate(end - 1, d);
+                float pivot = Math.Max(Math.Min(a, b), Math.Min(Math.Max(a, b), c));
+
+                // Three-way partition, duplicated keys end up in the middle.
+                int lt = begin, i = begin, gt = end - 1;
+                while (i <= gt)
+                {
+                    float v = Coordinate(i, d);
+                    if (v < pivot)
+                        Swap(lt++, i++);
+                    else if (v > pivot)
+                        Swap(gt--, i);
+                    else
+                        ++i;
+                }
+                if (nth < lt)
+                    end = lt;
+                else if (nth > gt)
+                    begin = gt + 1;
+                else
+                    return;
+            }
+        }
+
+        #endregion
+
+        #region search
+
+        /// <summary>
+        /// Buffers used by one thread to query the tree.
+        /// </summary>
+        public class Buffers
+        {
+            public readonly float[] row;
+            public readonly float[] dist;
+            public int count;
+
+            public Buffers(int dim, int k)
+            {
+                row = new float[dim];
+                dist = new float[k];
+            }
+
+            /// <summary>
+            /// Keeps the k smallest distances in a max-heap.
+            /// </summary>
+            public void Add(float d)
+            {
+                int i;
+                if (count < dist.Length)
+                {
+                    i = count++;
+                    while (i > 0)
+                    {
+                        int p = (i - 1) / 2;
+                        if (dist[p] >= d)
+                            break;
+                        dist[i] = dist[p];
+                        i = p;
+                    }
+                }
+                else
+                {
+                    if (d >= dist[0])
+                        return;
+                    i = 0;
+                    while (true)
+                    {
+                        int c = 2 * i + 1;
+                        if (c >= count)
+                            break;
+                        if (c + 1 < count && dist[c + 1] > dist[c])
+                            ++c;
+                        if (dist[c] <= d)
+                            break;
+                        dist[i] = dist[c];
+                        i = c;
+                    }
+                }
+                dist[i] = d;
+            }
+
+            public float Worst => count < dist.Length ? float.MaxValue : dist[0];
+        }
+
+        private float SquaredDistance(float[] target, int row, Buffers buffers)
+        {
+            _store.CopyPoint(_store.GetTreeIndex(row), buffers.row, 0);
+            return FlatKdTree.SquaredL2(target, 0, buffers.row, 0, _dim);
+        }
+
+        private void Search(float[] target, int node, int begin, int end, int level, Buffers buffers)
+        {
+            if (level == _levels)
+            {
+                for (int row = begin; row < end; ++row)
+                    buffers.Add(SquaredDistance(target, row, buffers));
+                return;
+            }
+            int mid = begin + (end - begin) / 2;
+            float diff = target[_splitDim[node]] - _splitValue[node];
+            if (diff <= 0)
+                Search(target, node * 2 + 1, begin, mid, level + 1, buffers);
+            else
+                Search(target, node * 2 + 2, mid, end, level + 1, buffers);
+            if (diff * diff <= buffers.Worst)
+            {
+                if (diff <= 0)
+                    Search(target, node * 2 + 2, mid, end, level + 1, buffers);
+                else
+                    Search(target, node * 2 + 1, begin, mid, level + 1, buffers);
+            }
+        }
+
+        private void SearchRadius(float[] target, int node, int begin, int end, int level,
+                                  float radius, Buffers buffers, List<KeyValuePair<float, int>> results)
+        {
+            if (level == _levels)
+            {
+                for (int row = begin; row < end; ++row)
+                {
+                    float d = SquaredDistance(target, row, buffers);
+                    if (d <= radius)
+                        results.Add(new KeyValuePair<float, int>((float)Math.Sqrt(d), _store.GetTreeIndex(row)));
+                }
+                return;
+            }
+            int mid = begin + (end - begin) / 2;
+            float diff = target[_splitDim[node]] - _splitValue[node];
+            bool close = diff * diff <= radius;
+            if (diff <= 0 || close)
+                SearchRadius(target, node * 2 + 1, begin, mid, level + 1, radius, buffers, results);
+            if (diff > 0 || close)
+                SearchRadius(target, node * 2 + 2, mid, end, level + 1, radius, buffers, results);
+        }
+
+        #endregion
+
+        #region API
+
+        /// <summary>
+        /// Returns the distance between a target and its k-th nearest neighbour
+        /// (infinite if there are less than k points). <paramref name="buffers"/>
+        /// must have been created with the same k, a thread must use its own buffers.
+        /// </summary>
+        public float KthDistance(float[] target, Buffers buffers)
+        {
+            buffers.count = 0;
+            if (_n > 0)
+                Search(target, 0, 0, _n, 0, buffers);
+            return buffers.count < buffers.dist.Length ? float.PositiveInfinity : (float)Math.Sqrt(buffers.dist[0]);
+        }
+
+        /// <summary>
+        /// Adds all points within a distance of a target to <paramref name="results"/>
+        /// as pairs (distance, index).
+        /// </summary>
+        public void PointsWithinDistance(float[] target, float distance, Buffers buffers, List<KeyValuePair<float, int>> results)
+        {
+            if (_n > 0)
+                SearchRadius(target, 0, 0, _n, 0, distance * distance, buffers, results);
+        }
+
+        #endregion
+    }
+}
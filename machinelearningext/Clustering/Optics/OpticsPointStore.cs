@@ -0,0 +1,339 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.MemoryMappedFiles;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+
+
+namespace Scikit.ML.Clustering
+{
+    /// <summary>
+    /// Stores the points clustered by <see cref="ParallelOptics"/> in one dense
+    /// matrix and the state of every point (core distance, reachability distance,
+    /// position in the ordering, position in the seed heap, position in the kd tree).
+    /// Points are identified by their index.
+    /// Everything is kept in arrays or spilled into a temporary
+    /// memory-mapped file which is removed when the store is disposed.
+    /// Points are added first, the store is then sealed and the state
+    /// can be read or modified by index. Undefined distances are infinite.
+    /// </summary>
+    public class OpticsPointStore : IDisposable
+    {
+        #region Fields
+
+        private readonly int dimension;
+        private readonly string filename;
+        private int count;
+        private bool isSealed;
+
+        // In memory.
+        private List<float> buffer;
+        private float[] coordinates;
+        private float[] core;
+        private float[] reachability;
+        private int[] order;
+        private int[] rank;
+        private int[] seed;
+        private int[] tree;
+
+        // On disk.
+        private FileStream stream;
+        private BinaryWriter writer;
+        private MemoryMappedFile file;
+        private MemoryMappedViewAccessor view;
+        private long coreOffset;
+        private long reachabilityOffset;
+        private long orderOffset;
+        private long rankOffset;
+        private long seedOffset;
+        private long treeOffset;
+
+        #endregion
+
+        /// <summary>
+        /// Creates an empty store.
+        /// </summary>
+        /// <param name="dimension">dimension of the points</param>
+        /// <param name="spill">stores everything in a temporary memory-mapped file</param>
+        /// <param name="folder">folder for the temporary file, the system temporary folder if null</param>
+        public OpticsPointStore(int dimension, bool spill = false, string folder = null)
+        {
+            Contracts.CheckParam(dimension > 0, nameof(dimension), "must be positive");
+            this.dimension = dimension;
+            if (spill)
+            {
+                filename = Path.Combine(folder ?? Path.GetTempPath(), string.Format("optics_{0}.bin", Guid.NewGuid().ToString("N")));
+                stream = new FileStream(filename, FileMode.CreateNew, FileAccess.ReadWrite, FileShare.None,
+                                        1 << 16, FileOptions.DeleteOnClose);
+                writer = new BinaryWriter(stream, System.Text.Encoding.UTF8, true);
+            }
+            else
+                buffer = new List<float>();
+        }
+
+        public void Dispose()
+        {
+            view?.Dispose();
+            view = null;
+            file?.Dispose();
+            file = null;
+            writer?.Dispose();
+            writer = null;
+            stream?.Dispose();
+            stream = null;
+        }
+
+        #region API
+
+        public int Dimension => dimension;
+        public int Count => count;
+        public bool IsSealed => isSealed;
+        public bool IsSpilled => filename != null;
+
+        /// <summary>
+        /// Temporary file, null if the store is in memory.
+        /// </summary>
+        public string Filename => filename;
+
+        /// <summary>
+        /// Adds a point stored at position <paramref name="offset"/> in <paramref name="values"/>.
+        /// </summary>
+        public void Add(float[] values, int offset = 0)
+        {
+            CheckNotSealed();
+            Contracts.CheckValue(values, nameof(values));
+            if (offset < 0 || offset + dimension > values.Length)
+                throw Contracts.ExceptParam(nameof(offset), $"Position {offset} + {dimension} is outside the buffer.");
+            for (int i = offset; i < offset + dimension; ++i)
+                AddValue(values[i]);
+            ++count;
+        }
+
+        /// <summary>
+        /// Adds a point, sparse vectors are densified.
+        /// </summary>
+        public void Add(in VBuffer<float> point)
+        {
+            CheckNotSealed();
+            if (point.Length != dimension)
+                throw Contracts.ExceptParam(nameof(point), $"Dimension mismatch {point.Length} != {dimension}.");
+            if (point.IsDense)
+            {
+                for (int i = 0; i < dimension; ++i)
+                    AddValue(point.Values[i]);
+            }
+            else
+            {
+                int k = 0;
+                for (int i = 0; i < dimension; ++i)
+                    AddValue(k < point.Count && point.Indices[k] == i ? point.Values[k++] : 0f);
+            }
+            ++count;
+        }
+
+        /// <summary>
+        /// No point can be added after this call, the state is allocated
+        /// and initialized with <see cref="Reset"/>.
+        /// </summary>
+        public void Seal()
+        {
+            if (isSealed)
+                return;
+            if (filename == null)
+            {
+                coordinates = buffer.ToArray();
+                buffer = null;
+                core = new float[count];
+                reachability = new float[count];
+                order = new int[count];
+                rank = new int[count];
+                seed = new int[count];
+                tree = new int[count];
+            }
+            else
+            {
+                writer.Flush();
+                coreOffset = (long)count * dimension * sizeof(float);
+                reachabilityOffset = coreOffset + (long)count * sizeof(float);
+                orderOffset = reachabilityOffset + (long)count * sizeof(float);
+                rankOffset = orderOffset + (long)count * sizeof(int);
+                seedOffset = rankOffset + (long)count * sizeof(int);
+                treeOffset = seedOffset + (long)count * sizeof(int);
+                long capacity = Math.Max(treeOffset + (long)count * sizeof(int), 1);
+                file = MemoryMappedFile.CreateFromFile(stream, null, capacity, MemoryMappedFileAccess.ReadWrite,
+                                                       HandleInheritability.None, true);
+                view = file.CreateViewAccessor(0, capacity);
+            }
+            isSealed = true;
+            Reset();
+        }
+
+        /// <summary>
+        /// Sets all distances to infinity and all positions to -1
+        /// except the positions in the kd tree which are kept.
+        /// </summary>
+        public void Reset()
+        {
+            CheckSealed();
+            for (int i = 0; i < count; ++i)
+            {
+                SetCore(i, float.PositiveInfinity);
+                SetReachability(i, float.PositiveInfinity);
+                SetOrder(i, -1);
+                SetRank(i, -1);
+                SetSeedPosition(i, -1);
+            }
+        }
+
+        /// <summary>
+        /// Copies the coordinates of a point into <paramref name="dest"/> at position <paramref name="offset"/>.
+        /// This method can be called from several threads.
+        /// </summary>
+        public void CopyPoint(int index, float[] dest, int offset)
+        {
+            CheckSealed();
+            if (view == null)
+                Array.Copy(coordinates, (long)index * dimension, dest, offset, dimension);
+            else
+                view.ReadArray((long)index * dimension * sizeof(float), dest, offset, dimension);
+        }
+
+        /// <summary>
+        /// Returns one coordinate of a point.
+        /// This method can be called from several threads.
+        /// </summary>
+        public float GetCoordinate(int index, int d)
+        {
+            long pos = (long)index * dimension + d;
+            return view == null ? coordinates[pos] : view.ReadSingle(pos * sizeof(float));
+        }
+
+        public float GetCore(int index)
+        {
+            return view == null ? core[index] : view.ReadSingle(coreOffset + (long)index * sizeof(float));
+        }
+
+        public void SetCore(int index, float value)
+        {
+            if (view == null)
+                core[index] = value;
+            else
+                view.Write(coreOffset + (long)index * sizeof(float), value);
+        }
+
+        public float GetReachability(int index)
+        {
+            return view == null ? reachability[index] : view.ReadSingle(reachabilityOffset + (long)index * sizeof(float));
+        }
+
+        public void SetReachability(int index, float value)
+        {
+            if (view == null)
+                reachability[index] = value;
+            else
+                view.Write(reachabilityOffset + (long)index * sizeof(float), value);
+        }
+
+        /// <summary>
+        /// Returns the index of the point at a given position in the ordering.
+        /// </summary>
+        public int GetOrder(int position)
+        {
+            return view == null ? order[position] : view.ReadInt32(orderOffset + (long)position * sizeof(int));
+        }
+
+        /// <summary>
+        /// Stores the point at a given position in the ordering,
+        /// the position of the point is updated as well.
+        /// </summary>
+        public void SetOrder(int position, int index)
+        {
+            if (view == null)
+                order[position] = index;
+            else
+                view.Write(orderOffset + (long)position * sizeof(int), index);
+            if (index >= 0)
+                SetRank(index, position);
+        }
+
+        /// <summary>
+        /// Returns the position of a point in the ordering, -1 if it was not processed yet.
+        /// </summary>
+        public int GetRank(int index)
+        {
+            return view == null ? rank[index] : view.ReadInt32(rankOffset + (long)index * sizeof(int));
+        }
+
+        /// <summary>
+        /// Returns the position of a point in the seed heap, -1 if it is not a seed.
+        /// </summary>
+        public int GetSeedPosition(int index)
+        {
+            return view == null ? seed[index] : view.ReadInt32(seedOffset + (long)index * sizeof(int));
+        }
+
+        public void SetSeedPosition(int index, int position)
+        {
+            if (view == null)
+                seed[index] = position;
+            else
+                view.Write(seedOffset + (long)index * sizeof(int), position);
+        }
+
+        /// <summary>
+        /// Returns the index of the point stored at a given row in the kd tree.
+        /// This method can be called from several threads.
+        /// </summary>
+        public int GetTreeIndex(int row)
+        {
+            return view == null ? tree[row] : view.ReadInt32(treeOffset + (long)row * sizeof(int));
+        }
+
+        public void SetTreeIndex(int row, int index)
+        {
+            if (view == null)
+                tree[row] = index;
+            else
+                view.Write(treeOffset + (long)row * sizeof(int), index);
+        }
+
+        #endregion
+
+        #region Private
+
+        private void SetRank(int index, int position)
+        {
+            if (view == null)
+                rank[index] = position;
+            else
+                view.Write(rankOffset + (long)index * sizeof(int), position);
+        }
+
+        private void AddValue(float value)
+        {
+            if (writer == null)
+                buffer.Add(value);
+            else
+                writer.Write(value);
+        }
+
+        private void CheckSealed()
+        {
+            if (!isSealed)
+                throw Contracts.Except("The store must be sealed.");
+        }
+
+        private void CheckNotSealed()
+        {
+            if (isSealed)
+                throw Contracts.Except("No point can be added once the store is sealed.");
+            if (stream == null && buffer == null)
+                throw new ObjectDisposedException(nameof(OpticsPointStore));
+        }
+
+        #endregion
+    }
+}
@@ -0,0 +1,276 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Threading.Tasks;
+using Microsoft.ML;
+
+
+namespace Scikit.ML.Clustering
+{
+    /// <summary>
+    /// Implements Optics algorithm on an <see cref="OpticsPointStore"/>.
+    /// Core distances are computed first in parallel by batches of points
+    /// with a kd tree built over the store, the ordering is then computed
+    /// on one thread with a seed heap which updates the priority of a point
+    /// when its reachability distance decreases. The coordinates and the state
+    /// of every point (including its position in the tree and in the heap)
+    /// stay in the store: the memory used besides the store is the
+    /// splits of the tree, the current seeds and one batch of points.
+    /// </summary>
+    public class ParallelOptics
+    {
+        #region Fields
+
+        public const int NOISE = Optics.NOISE;
+
+        /// <summary>
+        /// Default number of points processed by a thread at once.
+        /// </summary>
+        public const int DefaultBatchSize = 1024;
+
+        private readonly OpticsPointStore store;
+        private readonly OpticsKdTree kdt;
+        private readonly int? numThreads;
+        private readonly int batchSize;
+        private float epsilon;
+
+        #endregion
+
+        /// <summary>
+        /// Builds the tree, the store is sealed if it is not.
+        /// The tree reads the coordinates from the store.
+        /// </summary>
+        /// <param name="store">points</param>
+        /// <param name="numThreads">number of threads, null for all cores</param>
+        /// <param name="batchSize">number of points processed by a thread at once</param>
+        public ParallelOptics(OpticsPointStore store, int? numThreads = null, int batchSize = DefaultBatchSize)
+        {
+            Contracts.CheckValue(store, nameof(store));
+            Contracts.CheckParam(!numThreads.HasValue || numThreads.Value > 0, nameof(numThreads), "must be positive or null");
+            Contracts.CheckParam(batchSize > 0, nameof(batchSize), "must be positive");
+            store.Seal();
+            this.store = store;
+            this.numThreads = numThreads;
+            this.batchSize = batchSize;
+            kdt = new OpticsKdTree(store);
+        }
+
+        public OpticsPointStore Store => store;
+
+        #region API
+
+        /// <summary>
+        /// Computes the ordering, the results are stored in <see cref="Store"/>.
+        /// </summary>
+        /// <param name="epsilon">radius of a neighborhood</param>
+        /// <param name="minPoints">minimum number of points in the neighborhood of a core point (itself included)</param>
+        /// <param name="onPointProcessing">called with the number of ordered points</param>
+        public void Ordering(float epsilon, int minPoints, Action<int> onPointProcessing = null)
+        {
+            if (epsilon <= 0)
+                throw new ArgumentException(String.Format("Argument epsilon must be positive. Got {0}", epsilon));
+            if (minPoints <= 0)
+                throw new ArgumentException(String.Format("Argument minPoints must be positive. Got {0}", minPoints));
+
+            store.Reset();
+            ComputeCoreDistances(epsilon, minPoints);
+
+            int n = store.Count;
+            var seeds = new SeedHeap(store);
+            var center = new float[store.Dimension];
+            var buffers = new OpticsKdTree.Buffers(store.Dimension, 1);
+            var neighbours = new List<KeyValuePair<float, int>>();
+            int position = 0;
+
+            for (int i = 0; i < n; ++i)
+            {
+                if (store.GetRank(i) >= 0)
+                    continue;
+                int p = i;
+                while (true)
+                {
+                    store.SetOrder(position++, p);
+                    onPointProcessing?.Invoke(position);
+
+                    float coreDistance = store.GetCore(p);
+                    if (!float.IsPositiveInfinity(coreDistance))
+                    {
+                        store.CopyPoint(p, center, 0);
+                        neighbours.Clear();
+                        kdt.PointsWithinDistance(center, epsilon, buffers, neighbours);
+                        foreach (var nb in neighbours)
+                        {
+                            int o = nb.Value;
+                            if (store.GetRank(o) >= 0)
+                                continue;
+                            float reach = Math.Max(coreDistance, nb.Key);
+                            if (reach < store.GetReachability(o))
+                            {
+                                store.SetReachability(o, reach);
+                                seeds.Update(o, reach);
+                            }
+                        }
+                    }
+
+                    if (seeds.Count == 0)
+                        break;
+                    p = seeds.Pop();
+                }
+            }
+            this.epsilon = epsilon;
+        }
+
+        /// <summary>
+        /// Extracts clusters from the ordering as <see cref="OpticsOrdering.Cluster"/> does.
+        /// </summary>
+        /// <param name="eps">radius, it must not be greater than the radius used to compute the ordering</param>
+        /// <returns>the cluster of every point, <see cref="NOISE"/> for noise</returns>
+        public int[] Cluster(float eps)
+        {
+            if (eps <= 0 || eps > epsilon)
+                throw new ArgumentException(String.Format("Argument eps ({0}) must be positive and no larger than the original epsilon used for ordering ({1})", eps, epsilon));
+            var clusters = new int[store.Count];
+            int clusterId = NOISE;
+            for (int position = 0; position < store.Count; ++position)
+            {
+                int p = store.GetOrder(position);
+                if (store.GetReachability(p) <= eps)
+                    clusters[p] = clusterId;
+                else if (store.GetCore(p) <= eps)
+                    clusters[p] = ++clusterId;
+                else
+                    clusters[p] = NOISE;
+            }
+            return clusters;
+        }
+
+        #endregion
+
+        #region Private
+
+        /// <summary>
+        /// The core distance is the distance to the minPoints-th nearest neighbour
+        /// (the point itself included) if it is not greater than epsilon.
+        /// Every thread processes a batch of points at a time with its own buffers.
+        /// </summary>
+        private void ComputeCoreDistances(float epsilon, int minPoints)
+        {
+            int dim = store.Dimension;
+            int nbBatches = (store.Count + batchSize - 1) / batchSize;
+            var options = new ParallelOptions() { MaxDegreeOfParallelism = numThreads ?? Environment.ProcessorCount };
+            Parallel.For(0, nbBatches, options,
+                () => new Tuple<OpticsKdTree.Buffers, float[]>(new OpticsKdTree.Buffers(dim, minPoints), new float[dim]),
+                (batch, state, local) =>
+                {
+                    int end = Math.Min(store.Count, (batch + 1) * batchSize);
+                    for (int i = batch * batchSize; i < end; ++i)
+                    {
+                        store.CopyPoint(i, local.Item2, 0);
+                        float d = kdt.KthDistance(local.Item2, local.Item1);
+                        store.SetCore(i, d <= epsilon ? d : float.PositiveInfinity);
+                    }
+                    return local;
+                },
+                local => { });
+        }
+
+        /// <summary>
+        /// Binary heap of point indices sorted by reachability distance
+        /// then by index. The position of every point in the heap is kept
+        /// in the store so that its priority can be decreased,
+        /// a point is never stored twice.
+        /// </summary>
+        internal class SeedHeap
+        {
+            private readonly OpticsPointStore store;
+            private readonly List<KeyValuePair<float, int>> heap;
+
+            public SeedHeap(OpticsPointStore store)
+            {
+                this.store = store;
+                heap = new List<KeyValuePair<float, int>>();
+            }
+
+            public int Count => heap.Count;
+
+            /// <summary>
+            /// Inserts a point or decreases its priority.
+            /// </summary>
+            public void Update(int index, float key)
+            {
+                int pos = store.GetSeedPosition(index);
+                if (pos == -1)
+                {
+                    heap.Add(new KeyValuePair<float, int>(key, index));
+                    pos = heap.Count - 1;
+                    store.SetSeedPosition(index, pos);
+                }
+                else
+                    heap[pos] = new KeyValuePair<float, int>(key, index);
+                SiftUp(pos);
+            }
+
+            /// <summary>
+            /// Removes and returns the point with the lowest priority.
+            /// </summary>
+            public int Pop()
+            {
+                int res = heap[0].Value;
+                store.SetSeedPosition(res, -1);
+                var last = heap[heap.Count - 1];
+                heap.RemoveAt(heap.Count - 1);
+                if (heap.Count > 0)
+                {
+                    heap[0] = last;
+                    store.SetSeedPosition(last.Value, 0);
+                    SiftDown(0);
+                }
+                return res;
+            }
+
+            private static bool Less(KeyValuePair<float, int> a, KeyValuePair<float, int> b)
+            {
+                return a.Key < b.Key || (a.Key == b.Key && a.Value < b.Value);
+            }
+
+            private void Swap(int i, int j)
+            {
+                var t = heap[i];
+                heap[i] = heap[j];
+                heap[j] = t;
+                store.SetSeedPosition(heap[i].Value, i);
+                store.SetSeedPosition(heap[j].Value, j);
+            }
+
+            private void SiftUp(int pos)
+            {
+                while (pos > 0)
+                {
+                    int parent = (pos - 1) / 2;
+                    if (!Less(heap[pos], heap[parent]))
+                        break;
+                    Swap(pos, parent);
+                    pos = parent;
+                }
+            }
+
+            private void SiftDown(int pos)
+            {
+                while (true)
+                {
+                    int left = pos * 2 + 1;
+                    if (left >= heap.Count)
+                        break;
+                    int child = left + 1 < heap.Count && Less(heap[left + 1], heap[left]) ? left + 1 : left;
+                    if (!Less(heap[child], heap[pos]))
+                        break;
+                    Swap(pos, child);
+                    pos = child;
+                }
+            }
+        }
+
+        #endregion
+    }
+}
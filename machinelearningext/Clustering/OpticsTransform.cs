@@ -42,8 +42,8 @@ namespace Scikit.ML.Clustering
         {
             return new VersionInfo(
                 modelSignature: "OPTICSME",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(OpticsTransform).Assembly.FullName);
@@ -75,6 +75,12 @@ namespace Scikit.ML.Clustering
             [Argument(ArgumentType.AtMostOnce, HelpText = "Seed for the number generators.", ShortName = "s")]
             public int? seed = 42;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to compute core distances, null for all cores. 1 uses the original implementation unless spill is true.", ShortName = "nt")]
+            public int? numThreads = 1;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Stores the points and the reachability distances in a temporary memory-mapped file instead of memory.", ShortName = "spill")]
+            public bool spill = false;
+
             public int newColumnsNumber;
 
             public void PostProcess()
@@ -92,6 +98,8 @@ namespace Scikit.ML.Clustering
                 ctx.Writer.Write(outCluster);
                 ctx.Writer.Write(outScore);
                 ctx.Writer.Write(seed ?? -1);
+                ctx.Writer.Write(numThreads ?? -1);
+                ctx.Writer.Write(spill);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -105,6 +113,17 @@ namespace Scikit.ML.Clustering
                 outScore = ctx.Reader.ReadString();
                 int s = ctx.Reader.ReadInt32();
                 seed = s < 0 ? (int?)null : s;
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    int nt = ctx.Reader.ReadInt32();
+                    numThreads = nt < 0 ? (int?)null : nt;
+                    spill = ctx.Reader.ReadBoolean();
+                }
+                else
+                {
+                    numThreads = 1;
+                    spill = false;
+                }
             }
         }
 
@@ -138,6 +157,11 @@ namespace Scikit.ML.Clustering
                 Contracts.Check(false, "Parameter minPoints must be positive.");
             }
 
+            if (args.numThreads.HasValue && args.numThreads.Value <= 0)
+            {
+                Contracts.Check(false, "Parameter numThreads must be positive or null.");
+            }
+
             _args = args;
             string[] newColumnNames = null;
             ColumnType[] newColumnTypes = null;
@@ -300,6 +324,12 @@ namespace Scikit.ML.Clustering
 
                     using (var ch = _host.Start("Optics"))
                     {
+                        if (_args.numThreads != 1 || _args.spill)
+                        {
+                            TrainTransformStore(ch);
+                            return;
+                        }
+
                         var sw = Stopwatch.StartNew();
                         sw.Start();
                         var points = new List<IPointIdFloat>();
@@ -415,8 +445,139 @@ namespace Scikit.ML.Clustering
                 }
             }
 
+            /// <summary>
+            /// Caches the features in an <see cref="OpticsPointStore"/>
+            /// instead of a list of points and runs <see cref="ParallelOptics"/>.
+            /// </summary>
+            void TrainTransformStore(IChannel ch)
+            {
+                var sw = Stopwatch.StartNew();
+                var ids = new List<long>();
+                int index = SchemaHelper.GetColumnIndex(_input.Schema, _args.features);
+                OpticsPointStore store = null;
+
+                try
+                {
+                    // Caching data.
+                    ch.Info(MessageSensitivity.None, _args.spill ? "Caching the data on disk." : "Caching the data.");
+                    using (var cursor = _input.GetRowCursor(i => i == index))
+                    {
+                        var getter = cursor.GetGetter<VBuffer<float>>(index);
+                        var getterId = cursor.GetIdGetter();
+                        RowId id = new RowId();
+
+                        VBuffer<float> tmp = new VBuffer<float>();
+
+                        while (cursor.MoveNext())
+                        {
+                            getter(ref tmp);
+                            getterId(ref id);
+                            if (id > long.MaxValue)
+                                throw ch.Except("An id is outside the range for long {0}", id);
+                            if (store == null)
+                                store = new OpticsPointStore(tmp.Length, _args.spill);
+                            store.Add(in tmp);
+                            ids.Add((long)id);
+                        }
+                    }
+                    if (store == null)
+                        throw ch.Except("No point to cluster.");
+                    store.Seal();
+                    if (store.IsSpilled)
+                        ch.Info(MessageSensitivity.UserData, "Points are stored in '{0}'.", store.Filename);
+
+                    float[] distances = null;
+                    if (_args.epsilons == null || _args.epsilons.Count() == 0)
+                    {
+                        float mind, maxd;
+                        var p1 = new float[store.Dimension];
+                        var p2 = new float[store.Dimension];
+                        distances = new[] { EstimateDistance(ch, store.Count, (i, j) =>
+                        {
+                            store.CopyPoint(i, p1, 0);
+                            store.CopyPoint(j, p2, 0);
+                            return (float)Math.Sqrt(FlatKdTree.SquaredL2(p1, 0, p2, 0, p1.Length));
+                        }, out mind, out maxd) };
+                        ch.Info(MessageSensitivity.UserData, "epsilon (=Radius) was estimating on random couples of points: {0} in [{1}, {2}]", distances.First(), mind, maxd);
+                    }
+                    else
+                        distances = _args.epsilonsDouble;
+
+                    var maxEpsilon = distances.Max();
+                    _Results = new List<Dictionary<int, ClusteringResult>>();
+                    _reversedMapping = new List<Dictionary<long, int>>();
+
+                    var opticsAlgo = new ParallelOptics(store, _args.numThreads);
+                    //Ordering
+                    ch.Info(MessageSensitivity.UserData, "Generating OPTICS ordering for {0} points.", store.Count);
+                    int nPoints = store.Count;
+                    int cyclesBetweenLogging = Math.Max(1, Math.Min(1000, nPoints / 10));
+                    Action<int> progressLogger = nb =>
+                    {
+                        if (nb % cyclesBetweenLogging == 0)
+                            ch.Info(MessageSensitivity.UserData, "Processing {0}/{1}", nb, nPoints);
+                    };
+                    opticsAlgo.Ordering(maxEpsilon, _args.minPoints, progressLogger);
+
+                    // Clustering.
+                    foreach (var epsilon in distances)
+                    {
+                        ch.Info(MessageSensitivity.UserData, "Clustering {0} points using epsilon={1}.", nPoints, epsilon);
+                        var results = opticsAlgo.Cluster(epsilon);
+
+                        var mapprev = new Dictionary<long, int>();
+                        var clusterIds = new HashSet<int>();
+                        for (int i = 0; i < results.Length; ++i)
+                        {
+                            mapprev[ids[i]] = results[i];
+                            if (results[i] != DBScan.NOISE)
+                                clusterIds.Add(results[i]);
+                        }
+                        _reversedMapping.Add(mapprev);
+
+                        // Cleaning small clusters.
+                        ch.Info(MessageSensitivity.UserData, "Removing clusters with less than {0} points.", _args.minPoints);
+                        var finalCounts = results.GroupBy(c => c).ToDictionary(c => c.Key, c => c.Count());
+                        var runResults = new Dictionary<int, ClusteringResult>();
+                        for (int i = 0; i < results.Length; ++i)
+                        {
+                            int cl = finalCounts[results[i]] < _args.minPoints ? DBScan.NOISE : results[i];
+                            runResults[i] = new ClusteringResult()
+                            {
+                                cl = cl,
+                                score = cl != DBScan.NOISE ? 1f : 0f
+                            };
+                        }
+
+                        _Results.Add(runResults);
+                        ch.Info(MessageSensitivity.UserData, "Found {0} clusters.", clusterIds.Count);
+                    }
+                }
+                finally
+                {
+                    store?.Dispose();
+                }
+                sw.Stop();
+                ch.Info(MessageSensitivity.UserData, "'Optics' finished in {0}.", sw.Elapsed);
+            }
+
             public float EstimateDistance(IChannel ch, List<IPointIdFloat> points,
                                            out float minDistance, out float maxDistance)
+            {
+                return EstimateDistance(ch, points.Count, (i, j) => points[i].DistanceTo(points[j]),
+                                        out minDistance, out maxDistance);
+            }
+
+            /// <summary>
+            /// Estimates epsilon with the distances between random couples of points.
+            /// </summary>
+            /// <param name="ch">channel</param>
+            /// <param name="count">number of points</param>
+            /// <param name="distanceFunc">distance between two points given their indices</param>
+            /// <param name="minDistance">minimum observed distance</param>
+            /// <param name="maxDistance">maximum observed distance</param>
+            public float EstimateDistance(IChannel ch, int count, Func<int, int, float> distanceFunc,
+                                           out float minDistance, out float maxDistance)
             {
                 ch.Info(MessageSensitivity.UserData, "Estimating epsilon based on the data. We pick up two random random computes the average distance.");
                 var rand = _args.seed.HasValue ? new Random(_args.seed.Value) : new Random();
@@ -428,11 +589,11 @@ namespace Scikit.ML.Clustering
                 int i, j;
                 while (stack.Count < 10000)
                 {
-                    i = rand.Next(0, points.Count - 1);
-                    j = rand.Next(0, points.Count - 1);
+                    i = rand.Next(0, count - 1);
+                    j = rand.Next(0, count - 1);
                     if (i == j)
                         continue;
-                    d = points[i].DistanceTo(points[j]);
+                    d = distanceFunc(i, j);
                     sum += d;
                     sum2 += d * d;
                     stack.Add(d);
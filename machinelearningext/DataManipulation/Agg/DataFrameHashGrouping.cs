@@ -0,0 +1,568 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using DvText = Scikit.ML.PipelineHelper.DvText;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Implements a group by followed by an aggregation without sorting the rows.
+    /// Every key column is converted into integer codes with a hash table,
+    /// the codes are combined into one group id per row, then every
+    /// other column is aggregated by several threads, each of them
+    /// processing a contiguous block of rows into its own accumulators.
+    /// Accumulators are merged in the order of the blocks.
+    /// The results are the same as the ones returned by
+    /// <see cref="DataFrameViewGroupResults{KeyType}"/> except for
+    /// the rounding errors of sums over floats which are not computed in the same order.
+    /// </summary>
+    public static class DataFrameHashGrouping
+    {
+        /// <summary>
+        /// Minimum number of rows a thread processes.
+        /// </summary>
+        public const int MinRowsPerThread = 1 << 16;
+
+        /// <summary>
+        /// Groups are combined with an array instead of a hash table
+        /// if the number of possible combinations is below this number
+        /// or the number of rows.
+        /// </summary>
+        public const int DenseCombinationLimit = 1 << 22;
+
+        #region API
+
+        /// <summary>
+        /// Groups rows by the values of <i>columns</i> and aggregates the other columns.
+        /// </summary>
+        /// <param name="df">dataframe</param>
+        /// <param name="columns">key columns, there is no limit on their number</param>
+        /// <param name="func">aggregated function</param>
+        /// <param name="sort">sorts the groups by keys, otherwise groups follow the order of their first row</param>
+        /// <param name="numThreads">number of threads, null for all cores</param>
+        /// <returns>a dataframe with the keys first and the aggregated columns</returns>
+        public static DataFrame Aggregate(IDataFrameView df, IEnumerable<int> columns, AggregatedFunction func,
+                                          bool sort = true, int? numThreads = null)
+        {
+            var icols = columns.ToArray();
+            if (icols.Length == 0)
+                throw new DataValueError("At least one column is needed to group rows.");
+            if (numThreads.HasValue && numThreads.Value <= 0)
+                throw new DataValueError($"numThreads must be positive or null not {numThreads}.");
+            int nbThreads = numThreads ?? Environment.ProcessorCount;
+
+            int[] firstRows;
+            var groups = GroupRows(df, icols, sort, nbThreads, out firstRows);
+            var counts = new int[firstRows.Length];
+            foreach (var g in groups)
+                ++counts[g];
+
+            // Columns are retrieved by name, a view may only expose a subset of its source.
+            var names = df.Columns;
+            var res = new DataFrame(df.CanShuffle);
+            foreach (var c in icols)
+                res.AddColumn(names[c], df.GetColumn(names[c], firstRows).Column);
+            var keys = new HashSet<int>(icols);
+            for (int c = 0; c < names.Length; ++c)
+            {
+                if (keys.Contains(c))
+                    continue;
+                res.AddColumn(names[c], AggregateColumn(df.GetColumn(names[c]).Column, groups, counts, func, nbThreads));
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Computes a group id for every row. Group ids are consecutive and start at 0.
+        /// </summary>
+        /// <param name="df">dataframe</param>
+        /// <param name="columns">key columns</param>
+        /// <param name="sort">group ids follow the order of the keys, otherwise the order of their first row</param>
+        /// <param name="numThreads">number of threads</param>
+        /// <param name="firstRows">first row of every group</param>
+        /// <returns>group ids</returns>
+        public static int[] GroupRows(IDataFrameView df, int[] columns, bool sort, int numThreads, out int[] firstRows)
+        {
+            var names = df.Columns;
+            var codes = new int[columns.Length][];
+            var cards = new int[columns.Length];
+            Parallel.For(0, columns.Length, new ParallelOptions() { MaxDegreeOfParallelism = numThreads },
+                         c => codes[c] = Factorize(df.GetColumn(names[columns[c]]).Column, sort, out cards[c]));
+
+            var groups = codes[0];
+            int nbGroups = cards[0];
+            for (int c = 1; c < columns.Length; ++c)
+            {
+                nbGroups = Combine(groups, nbGroups, codes[c], cards[c], sort);
+                codes[c] = null;
+            }
+
+            firstRows = new int[nbGroups];
+            for (int g = 0; g < nbGroups; ++g)
+                firstRows[g] = -1;
+            for (int i = 0; i < groups.Length; ++i)
+                if (firstRows[groups[i]] == -1)
+                    firstRows[groups[i]] = i;
+            return groups;
+        }
+
+        #endregion
+
+        #region group ids
+
+        static int[] Factorize(IDataColumn col, bool sort, out int card)
+        {
+            switch (col)
+            {
+                case DataColumn<bool> cbl: return Factorize(cbl.Data, sort, out card);
+                case DataColumn<int> ci4: return Factorize(ci4.Data, sort, out card);
+                case DataColumn<uint> cu4: return Factorize(cu4.Data, sort, out card);
+                case DataColumn<long> ci8: return Factorize(ci8.Data, sort, out card);
+                case DataColumn<float> cr4: return Factorize(cr4.Data, sort, out card);
+                case DataColumn<double> cr8: return Factorize(cr8.Data, sort, out card);
+                case DataColumn<DvText> ctx: return Factorize(ctx.Data, sort, out card);
+                default:
+                    throw new NotImplementedException($"GroupBy is not implemented for type '{col.Kind}'.");
+            }
+        }
+
+        /// <summary>
+        /// Replaces every value by an integer code, the codes follow
+        /// the order of the values if <i>sort</i> is true.
+        /// </summary>
+        static int[] Factorize<T>(T[] values, bool sort, out int card)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            var map = new Dictionary<T, int>();
+            var codes = new int[values.Length];
+            int code;
+            for (int i = 0; i < values.Length; ++i)
+            {
+                if (!map.TryGetValue(values[i], out code))
+                {
+                    code = map.Count;
+                    map[values[i]] = code;
+                }
+                codes[i] = code;
+            }
+            card = map.Count;
+            if (sort)
+            {
+                var distinct = new T[card];
+                foreach (var pair in map)
+                    distinct[pair.Value] = pair.Key;
+                var ranks = SortedRanks(distinct);
+                for (int i = 0; i < codes.Length; ++i)
+                    codes[i] = ranks[codes[i]];
+            }
+            return codes;
+        }
+
+        /// <summary>
+        /// Returns the rank of every value once they are sorted.
+        /// </summary>
+        static int[] SortedRanks<T>(T[] values)
+            where T : IComparable<T>
+        {
+            var index = Enumerable.Range(0, values.Length).ToArray();
+            Array.Sort(values, index);
+            var ranks = new int[values.Length];
+            for (int r = 0; r < index.Length; ++r)
+                ranks[index[r]] = r;
+            return ranks;
+        }
+
+        /// <summary>
+        /// Replaces <i>groups</i> by the group id of the couple (group, code).
+        /// Returns the new number of groups.
+        /// </summary>
+        static int Combine(int[] groups, int nbGroups, int[] codes, int card, bool sort)
+        {
+            long size = (long)nbGroups * card;
+            int nb = 0;
+            if (size <= Math.Max(groups.Length, DenseCombinationLimit))
+            {
+                var map = new int[size];
+                for (int k = 0; k < map.Length; ++k)
+                    map[k] = -1;
+                if (sort)
+                {
+                    // Couples are numbered in increasing order.
+                    for (int i = 0; i < groups.Length; ++i)
+                        map[(long)groups[i] * card + codes[i]] = 0;
+                    for (int k = 0; k < map.Length; ++k)
+                        if (map[k] == 0)
+                            map[k] = nb++;
+                    for (int i = 0; i < groups.Length; ++i)
+                        groups[i] = map[(long)groups[i] * card + codes[i]];
+                }
+                else
+                {
+                    long k;
+                    for (int i = 0; i < groups.Length; ++i)
+                    {
+                        k = (long)groups[i] * card + codes[i];
+                        if (map[k] == -1)
+                            map[k] = nb++;
+                        groups[i] = map[k];
+                    }
+                }
+            }
+            else
+            {
+                var map = new Dictionary<long, int>();
+                long k;
+                int g;
+                for (int i = 0; i < groups.Length; ++i)
+                {
+                    k = (long)groups[i] * card + codes[i];
+                    if (!map.TryGetValue(k, out g))
+                    {
+                        g = map.Count;
+                        map[k] = g;
+                    }
+                    groups[i] = g;
+                }
+                nb = map.Count;
+                if (sort)
+                {
+                    var distinct = new long[nb];
+                    foreach (var pair in map)
+                        distinct[pair.Value] = pair.Key;
+                    var ranks = SortedRanks(distinct);
+                    for (int i = 0; i < groups.Length; ++i)
+                        groups[i] = ranks[groups[i]];
+                }
+            }
+            return nb;
+        }
+
+        #endregion
+
+        #region aggregation
+
+        /// <summary>
+        /// Splits rows into contiguous blocks, <i>fill</i> is called once per block
+        /// on its own accumulator. Accumulators are returned in the order of the blocks.
+        /// </summary>
+        static TAcc[] AccumulateBlocks<TAcc>(int length, int numThreads, Func<TAcc> create, Action<TAcc, int, int> fill)
+        {
+            int nbBlocks = Math.Max(1, Math.Min(numThreads, length / MinRowsPerThread));
+            var res = new TAcc[nbBlocks];
+            Parallel.For(0, nbBlocks, new ParallelOptions() { MaxDegreeOfParallelism = numThreads }, b =>
+            {
+                var acc = create();
+                fill(acc, (int)((long)length * b / nbBlocks), (int)((long)length * (b + 1) / nbBlocks));
+                res[b] = acc;
+            });
+            return res;
+        }
+
+        class IntegerAccumulator
+        {
+            public long[] sum;
+            public long[] min;
+            public long[] max;
+
+            public IntegerAccumulator(int nbGroups)
+            {
+                sum = new long[nbGroups];
+                min = new long[nbGroups];
+                max = new long[nbGroups];
+                for (int g = 0; g < nbGroups; ++g)
+                {
+                    min[g] = long.MaxValue;
+                    max[g] = long.MinValue;
+                }
+            }
+
+            public void Add(int g, long value)
+            {
+                sum[g] += value;
+                if (value < min[g])
+                    min[g] = value;
+                if (value > max[g])
+                    max[g] = value;
+            }
+
+            public void Merge(IntegerAccumulator acc)
+            {
+                for (int g = 0; g < sum.Length; ++g)
+                {
+                    sum[g] += acc.sum[g];
+                    min[g] = Math.Min(min[g], acc.min[g]);
+                    max[g] = Math.Max(max[g], acc.max[g]);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Follows the conventions of <see cref="Enumerable"/>:
+        /// the minimum is NaN if one value is NaN, the maximum ignores NaN
+        /// unless all values are NaN.
+        /// </summary>
+        class RealAccumulator
+        {
+            public double[] sum;
+            public double[] min;
+            public double[] max;
+            public int[] nan;
+
+            public RealAccumulator(int nbGroups)
+            {
+                sum = new double[nbGroups];
+                min = new double[nbGroups];
+                max = new double[nbGroups];
+                nan = new int[nbGroups];
+                for (int g = 0; g < nbGroups; ++g)
+                {
+                    min[g] = double.PositiveInfinity;
+                    max[g] = double.NegativeInfinity;
+                }
+            }
+
+            public void Add(int g, double value)
+            {
+                sum[g] += value;
+                if (double.IsNaN(value))
+                    ++nan[g];
+                else
+                {
+                    if (value < min[g])
+                        min[g] = value;
+                    if (value > max[g])
+                        max[g] = value;
+                }
+            }
+
+            public void Merge(RealAccumulator acc)
+            {
+                for (int g = 0; g < sum.Length; ++g)
+                {
+                    sum[g] += acc.sum[g];
+                    nan[g] += acc.nan[g];
+                    if (acc.min[g] < min[g])
+                        min[g] = acc.min[g];
+                    if (acc.max[g] > max[g])
+                        max[g] = acc.max[g];
+                }
+            }
+
+            public double Min(int g)
+            {
+                return nan[g] > 0 ? double.NaN : min[g];
+            }
+
+            public double Max(int g, int count)
+            {
+                return nan[g] == count ? double.NaN : max[g];
+            }
+        }
+
+        static T Merge<T>(T[] accs, Action<T, T> merge)
+        {
+            for (int i = 1; i < accs.Length; ++i)
+                merge(accs[0], accs[i]);
+            return accs[0];
+        }
+
+        static IDataColumn AggregateColumn(IDataColumn col, int[] groups, int[] counts, AggregatedFunction func, int numThreads)
+        {
+            int nb = counts.Length;
+            switch (col)
+            {
+                case DataColumn<bool> cbl:
+                    {
+                        var data = cbl.Data;
+                        var res = new bool[nb];
+                        if (func == AggregatedFunction.Count || func == AggregatedFunction.Mean)
+                            return new DataColumn<bool>(res);
+                        var trues = Merge(AccumulateBlocks(data.Length, numThreads, () => new int[nb], (acc, start, end) =>
+                            {
+                                for (int i = start; i < end; ++i)
+                                    if (data[i])
+                                        ++acc[groups[i]];
+                            }), (a, b) => { for (int g = 0; g < nb; ++g) a[g] += b[g]; });
+                        for (int g = 0; g < nb; ++g)
+                            res[g] = func == AggregatedFunction.Min ? trues[g] == counts[g] : trues[g] > 0;
+                        return new DataColumn<bool>(res);
+                    }
+                case DataColumn<int> ci4:
+                    {
+                        var data = ci4.Data;
+                        var acc = func == AggregatedFunction.Count ? null : Merge(AccumulateBlocks(data.Length, numThreads,
+                                    () => new IntegerAccumulator(nb), (a, start, end) =>
+                                    {
+                                        for (int i = start; i < end; ++i)
+                                            a.Add(groups[i], data[i]);
+                                    }), (a, b) => a.Merge(b));
+                        var res = new int[nb];
+                        for (int g = 0; g < nb; ++g)
+                        {
+                            switch (func)
+                            {
+                                case AggregatedFunction.Count: res[g] = counts[g]; break;
+                                case AggregatedFunction.Sum: res[g] = (int)acc.sum[g]; break;
+                                case AggregatedFunction.Mean: res[g] = (int)acc.sum[g] / counts[g]; break;
+                                case AggregatedFunction.Min: res[g] = (int)acc.min[g]; break;
+                                case AggregatedFunction.Max: res[g] = (int)acc.max[g]; break;
+                                default: throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+                            }
+                        }
+                        return new DataColumn<int>(res);
+                    }
+                case DataColumn<uint> cu4:
+                    {
+                        var data = cu4.Data;
+                        var acc = func == AggregatedFunction.Count ? null : Merge(AccumulateBlocks(data.Length, numThreads,
+                                    () => new IntegerAccumulator(nb), (a, start, end) =>
+                                    {
+                                        for (int i = start; i < end; ++i)
+                                            a.Add(groups[i], data[i]);
+                                    }), (a, b) => a.Merge(b));
+                        var res = new uint[nb];
+                        for (int g = 0; g < nb; ++g)
+                        {
+                            switch (func)
+                            {
+                                case AggregatedFunction.Count: res[g] = (uint)counts[g]; break;
+                                case AggregatedFunction.Sum: res[g] = (uint)acc.sum[g]; break;
+                                case AggregatedFunction.Mean: res[g] = (uint)acc.sum[g] / (uint)counts[g]; break;
+                                case AggregatedFunction.Min: res[g] = (uint)acc.min[g]; break;
+                                case AggregatedFunction.Max: res[g] = (uint)acc.max[g]; break;
+                                default: throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+                            }
+                        }
+                        return new DataColumn<uint>(res);
+                    }
+                case DataColumn<long> ci8:
+                    {
+                        var data = ci8.Data;
+                        var acc = func == AggregatedFunction.Count ? null : Merge(AccumulateBlocks(data.Length, numThreads,
+                                    () => new IntegerAccumulator(nb), (a, start, end) =>
+                                    {
+                                        for (int i = start; i < end; ++i)
+                                            a.Add(groups[i], data[i]);
+                                    }), (a, b) => a.Merge(b));
+                        var res = new long[nb];
+                        for (int g = 0; g < nb; ++g)
+                        {
+                            switch (func)
+                            {
+                                case AggregatedFunction.Count: res[g] = counts[g]; break;
+                                case AggregatedFunction.Sum: res[g] = acc.sum[g]; break;
+                                case AggregatedFunction.Mean: res[g] = acc.sum[g] / counts[g]; break;
+                                case AggregatedFunction.Min: res[g] = acc.min[g]; break;
+                                case AggregatedFunction.Max: res[g] = acc.max[g]; break;
+                                default: throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+                            }
+                        }
+                        return new DataColumn<long>(res);
+                    }
+                case DataColumn<float> cr4:
+                    {
+                        var data = cr4.Data;
+                        var acc = func == AggregatedFunction.Count ? null : Merge(AccumulateBlocks(data.Length, numThreads,
+                                    () => new RealAccumulator(nb), (a, start, end) =>
+                                    {
+                                        for (int i = start; i < end; ++i)
+                                            a.Add(groups[i], data[i]);
+                                    }), (a, b) => a.Merge(b));
+                        var res = new float[nb];
+                        for (int g = 0; g < nb; ++g)
+                        {
+                            switch (func)
+                            {
+                                case AggregatedFunction.Count: res[g] = counts[g]; break;
+                                case AggregatedFunction.Sum: res[g] = (float)acc.sum[g]; break;
+                                case AggregatedFunction.Mean: res[g] = (float)acc.sum[g] / (uint)counts[g]; break;
+                                case AggregatedFunction.Min: res[g] = (float)acc.Min(g); break;
+                                case AggregatedFunction.Max: res[g] = (float)acc.Max(g, counts[g]); break;
+                                default: throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+                            }
+                        }
+                        return new DataColumn<float>(res);
+                    }
+                case DataColumn<double> cr8:
+                    {
+                        var data = cr8.Data;
+                        var acc = func == AggregatedFunction.Count ? null : Merge(AccumulateBlocks(data.Length, numThreads,
+                                    () => new RealAccumulator(nb), (a, start, end) =>
+                                    {
+                                        for (int i = start; i < end; ++i)
+                                            a.Add(groups[i], data[i]);
+                                    }), (a, b) => a.Merge(b));
+                        var res = new double[nb];
+                        for (int g = 0; g < nb; ++g)
+                        {
+                            switch (func)
+                            {
+                                case AggregatedFunction.Count: res[g] = counts[g]; break;
+                                case AggregatedFunction.Sum: res[g] = acc.sum[g]; break;
+                                case AggregatedFunction.Mean: res[g] = acc.sum[g] / (uint)counts[g]; break;
+                                case AggregatedFunction.Min: res[g] = acc.Min(g); break;
+                                case AggregatedFunction.Max: res[g] = acc.Max(g, counts[g]); break;
+                                default: throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+                            }
+                        }
+                        return new DataColumn<double>(res);
+                    }
+                case DataColumn<DvText> ctx:
+                    return new DataColumn<DvText>(AggregateText(ctx.Data, groups, nb, func));
+                default:
+                    throw new NotImplementedException($"Aggregation is not implemented for type '{col.Kind}'.");
+            }
+        }
+
+        /// <summary>
+        /// Text is aggregated by one thread, the concatenation follows the order of the rows.
+        /// </summary>
+        static DvText[] AggregateText(DvText[] data, int[] groups, int nb, AggregatedFunction func)
+        {
+            var res = new DvText[nb];
+            switch (func)
+            {
+                case AggregatedFunction.Count:
+                case AggregatedFunction.Mean:
+                    for (int g = 0; g < nb; ++g)
+                        res[g] = DvText.NA;
+                    break;
+                case AggregatedFunction.Sum:
+                    var builders = new StringBuilder[nb];
+                    for (int i = 0; i < data.Length; ++i)
+                    {
+                        if (builders[groups[i]] == null)
+                            builders[groups[i]] = new StringBuilder();
+                        builders[groups[i]].Append(data[i].ToString());
+                    }
+                    for (int g = 0; g < nb; ++g)
+                        res[g] = new DvText(builders[g].ToString());
+                    break;
+                case AggregatedFunction.Min:
+                case AggregatedFunction.Max:
+                    var seen = new bool[nb];
+                    int sign = func == AggregatedFunction.Min ? 1 : -1;
+                    for (int i = 0; i < data.Length; ++i)
+                    {
+                        int g = groups[i];
+                        if (!seen[g] || sign * data[i].CompareTo(res[g]) < 0)
+                        {
+                            res[g] = data[i];
+                            seen[g] = true;
+                        }
+                    }
+                    break;
+                default:
+                    throw new NotImplementedException($"Unkown aggregated function '{func}'.");
+            }
+            return res;
+        }
+
+        #endregion
+    }
+}
@@ -17,125 +17,316 @@ namespace Scikit.ML.DataManipulation
     {
         #region type version
 
-        public static IEnumerable<DataFrame> TJoin<TKey>(
-                                IDataFrameView left, IDataFrameView right,
-                                int[] orderLeft, int[] orderRight,
-                                TKey[] keysLeft, TKey[] keysRight,
-                                int[] icolsLeft, int[] icolsRight,
-                                string leftSuffix, string rightSuffix,
-                                JoinStrategy joinType,
-                                Func<TKey, DataFrameGroupKey[]> funcLeft,
-                                Func<TKey, DataFrameGroupKey[]> funcRight)
-            where TKey : IEquatable<TKey>, IComparable<TKey>
+        public static DataFrame TJoin<TMutKey, TImutKey>(
+                            IDataFrameView left, IDataFrameView right,
+                            int[] rowsLeft, int[] rowsRight,
+                            int[] columnsLeft, int[] columnsRight,
+                            IEnumerable<int> colsLeft, IEnumerable<int> colsRight,
+                            bool sort,
+                            string leftSuffix, string rightSuffix,
+                            JoinStrategy joinType,
+                            MultiGetterAt<TMutKey> getterLeft,
+                            MultiGetterAt<TMutKey> getterRight,
+                            Func<TMutKey, TImutKey> conv,
+                            Func<TImutKey, DataFrameGroupKey[]> convLeft,
+                            Func<TImutKey, DataFrameGroupKey[]> convRight)
+            where TMutKey : ITUple, new()
+            where TImutKey : IComparable<TImutKey>, IEquatable<TImutKey>
         {
-            var groupLeft = DataFrameGrouping.TGroupBy<TKey>(left, orderLeft, keysLeft, icolsLeft, funcLeft);
-            var groupRight = DataFrameGrouping.TGroupBy<TKey>(right, orderRight, keysRight, icolsRight, funcRight);
-            var iterLeft = groupLeft.GetEnumerator();
-            var iterRight = groupRight.GetEnumerator();
-            bool contLeft = iterLeft.MoveNext();
-            bool contRight = iterRight.MoveNext();
-            leftSuffix = string.IsNullOrEmpty(leftSuffix) ? string.Empty : leftSuffix;
-            rightSuffix = string.IsNullOrEmpty(rightSuffix) ? string.Empty : rightSuffix;
-            var newColsLeft = left.Columns.Select(c => c + leftSuffix).ToArray();
-            var newColsRight = right.Columns.Select(c => c + rightSuffix).ToArray();
-            var existsCols = new HashSet<string>(newColsLeft);
-            for (int i = 0; i < newColsRight.Length; ++i)
+            var icolsLeft = colsLeft.ToArray();
+            var icolsRight = colsRight.ToArray();
+            var keysLeft = left.EnumerateItems(icolsLeft, true, rowsLeft, getterLeft).Select(c => conv(c)).ToArray();
+            var keysRight = right.EnumerateItems(icolsRight, true, rowsRight, getterRight).Select(c => conv(c)).ToArray();
+            int[] joinLeft, joinRight;
+            if (sort && Math.Min(keysLeft.Length, keysRight.Length) >= HashJoinThreshold)
+                HashJoinRows(keysLeft, keysRight, joinType, out joinLeft, out joinRight);
+            else
             {
-                while (existsCols.Contains(newColsRight[i]))
-                    newColsRight[i] += "_y";
-                existsCols.Add(newColsRight[i]);
+                int[] orderLeft = Enumerable.Range(0, left.Length).ToArray();
+                int[] orderRight = Enumerable.Range(0, right.Length).ToArray();
+                if (sort)
+                {
+                    DataFrameSorting.TSort(left, ref orderLeft, keysLeft, true);
+                    DataFrameSorting.TSort(right, ref orderRight, keysRight, true);
+                }
+                MergeJoinRows(orderLeft, orderRight, keysLeft, keysRight, joinType, out joinLeft, out joinRight);
             }
-            var newCols = newColsLeft.Concat(newColsRight).ToArray();
+            return JoinRows(left, right, joinLeft, joinRight, leftSuffix, rightSuffix);
+        }
+
+        #endregion
 
-            int r;
-            while (contLeft || contRight)
+        #region join engines
+
+        /// <summary>
+        /// The hash join is used when both sides hold at least this number of rows,
+        /// below it, it is not faster than sorting both sides.
+        /// </summary>
+        public const int HashJoinThreshold = 1024;
+
+        /// <summary>
+        /// Merges two sorted sequences of keys. <i>joinLeft</i>, <i>joinRight</i>
+        /// receive the rows to join, -1 means there is no row on one side.
+        /// Within a key, every left row is paired with the first right row,
+        /// then with the second one and so on.
+        /// </summary>
+        /// <param name="orderLeft">rows of the left side sorted by key</param>
+        /// <param name="orderRight">rows of the right side sorted by key</param>
+        /// <param name="keysLeft">keys of the left side</param>
+        /// <param name="keysRight">keys of the right side</param>
+        /// <param name="joinType">join type</param>
+        /// <param name="joinLeft">left rows</param>
+        /// <param name="joinRight">right rows</param>
+        public static void MergeJoinRows<TKey>(int[] orderLeft, int[] orderRight,
+                                               TKey[] keysLeft, TKey[] keysRight,
+                                               JoinStrategy joinType,
+                                               out int[] joinLeft, out int[] joinRight)
+            where TKey : IEquatable<TKey>, IComparable<TKey>
+        {
+            bool keepLeft = joinType == JoinStrategy.Left || joinType == JoinStrategy.Outer;
+            bool keepRight = joinType == JoinStrategy.Right || joinType == JoinStrategy.Outer;
+            var resLeft = new List<int>();
+            var resRight = new List<int>();
+            int il = 0, ir = 0, el, er, r;
+            while (il < orderLeft.Length || ir < orderRight.Length)
             {
-                r = contLeft && contRight
-                    ? iterLeft.Current.Key.CompareTo(iterRight.Current.Key)
-                    : (contRight ? 1 : -1);
+                el = il;
+                if (il < orderLeft.Length)
+                    while (el < orderLeft.Length && keysLeft[orderLeft[el]].Equals(keysLeft[orderLeft[il]]))
+                        ++el;
+                er = ir;
+                if (ir < orderRight.Length)
+                    while (er < orderRight.Length && keysRight[orderRight[er]].Equals(keysRight[orderRight[ir]]))
+                        ++er;
+                r = il < orderLeft.Length && ir < orderRight.Length
+                    ? keysLeft[orderLeft[il]].CompareTo(keysRight[orderRight[ir]])
+                    : (ir < orderRight.Length ? 1 : -1);
                 if (r < 0)
                 {
-                    if (joinType == JoinStrategy.Left || joinType == JoinStrategy.Outer)
-                    {
-                        var df = iterLeft.Current.Value.Copy();
-                        if (!string.IsNullOrEmpty(leftSuffix))
-                            df.RenameColumns(newColsLeft);
-                        for (int i = 0; i < right.ColumnCount; ++i)
+                    if (keepLeft)
+                        for (int i = il; i < el; ++i)
                         {
-                            var kind = right.SchemaI.GetColumnType(i);
-                            var col = df.AddColumn(newColsRight[i], kind, df.Length);
-                            df.GetColumn(col).Set(DataFrameMissingValue.GetMissingOrDefaultMissingValue(kind));
+                            resLeft.Add(orderLeft[i]);
+                            resRight.Add(-1);
                         }
-                        yield return df;
-                    }
-                    contLeft = iterLeft.MoveNext();
+                    il = el;
                 }
                 else if (r > 0)
                 {
-                    if (joinType == JoinStrategy.Right || joinType == JoinStrategy.Outer)
-                    {
-                        var df = iterRight.Current.Value.Copy();
-                        df.RenameColumns(newColsRight);
-                        for (int i = 0; i < left.ColumnCount; ++i)
+                    if (keepRight)
+                        for (int j = ir; j < er; ++j)
                         {
-                            var kind = left.SchemaI.GetColumnType(i);
-                            var col = df.AddColumn(newColsLeft[i], kind, df.Length);
-                            df.GetColumn(col).Set(DataFrameMissingValue.GetMissingOrDefaultMissingValue(kind));
+                            resLeft.Add(-1);
+                            resRight.Add(orderRight[j]);
                         }
-                        df.OrderColumns(newCols);
-                        yield return df;
-                    }
-                    contRight = iterRight.MoveNext();
+                    ir = er;
                 }
                 else
                 {
-                    var dfLeft = iterLeft.Current.Value.Copy();
-                    var dfRight = iterRight.Current.Value.Copy();
-                    if (!string.IsNullOrEmpty(leftSuffix))
-                        dfLeft.RenameColumns(newColsLeft);
-                    dfRight.RenameColumns(newColsRight);
-                    var vleft = dfLeft.Multiply(dfRight.Length, MultiplyStrategy.Block).Copy();
-                    var vright = dfRight.Multiply(dfLeft.Length, MultiplyStrategy.Row).Copy();
-                    for (int i = 0; i < vright.ColumnCount; ++i)
-                        vleft.AddColumn(newColsRight[i], vright.GetColumn(i));
-                    yield return vleft;
+                    for (int j = ir; j < er; ++j)
+                        for (int i = il; i < el; ++i)
+                        {
+                            resLeft.Add(orderLeft[i]);
+                            resRight.Add(orderRight[j]);
+                        }
+                    il = el;
+                    ir = er;
+                }
+            }
+            joinLeft = resLeft.ToArray();
+            joinRight = resRight.ToArray();
+        }
+
+        /// <summary>
+        /// Joins with a hash table built on the smaller side and probed with
+        /// the other one. The rows are returned in the same order
+        /// <see cref="MergeJoinRows"/> produces after a stable sort of both sides
+        /// but only the distinct keys are sorted.
+        /// </summary>
+        /// <param name="keysLeft">keys of the left side</param>
+        /// <param name="keysRight">keys of the right side</param>
+        /// <param name="joinType">join type</param>
+        /// <param name="joinLeft">left rows, -1 if there is no left row</param>
+        /// <param name="joinRight">right rows, -1 if there is no right row</param>
+        public static void HashJoinRows<TKey>(TKey[] keysLeft, TKey[] keysRight,
+                                              JoinStrategy joinType,
+                                              out int[] joinLeft, out int[] joinRight)
+            where TKey : IEquatable<TKey>, IComparable<TKey>
+        {
+            bool keepLeft = joinType == JoinStrategy.Left || joinType == JoinStrategy.Outer;
+            bool keepRight = joinType == JoinStrategy.Right || joinType == JoinStrategy.Outer;
+            bool buildLeft = keysLeft.Length <= keysRight.Length;
+            var buildKeys = buildLeft ? keysLeft : keysRight;
+            var probeKeys = buildLeft ? keysRight : keysLeft;
+            bool keepProbe = buildLeft ? keepRight : keepLeft;
 
-                    contLeft = iterLeft.MoveNext();
-                    contRight = iterRight.MoveNext();
+            // Every distinct key gets a group.
+            var groups = new Dictionary<TKey, int>();
+            var groupKeys = new List<TKey>();
+            var buildGroups = new int[buildKeys.Length];
+            int g;
+            for (int i = 0; i < buildKeys.Length; ++i)
+            {
+                if (!groups.TryGetValue(buildKeys[i], out g))
+                {
+                    g = groupKeys.Count;
+                    groups[buildKeys[i]] = g;
+                    groupKeys.Add(buildKeys[i]);
+                }
+                buildGroups[i] = g;
+            }
+            var probeGroups = new int[probeKeys.Length];
+            for (int i = 0; i < probeKeys.Length; ++i)
+            {
+                if (!groups.TryGetValue(probeKeys[i], out g))
+                {
+                    if (keepProbe)
+                    {
+                        g = groupKeys.Count;
+                        groups[probeKeys[i]] = g;
+                        groupKeys.Add(probeKeys[i]);
+                    }
+                    else
+                        g = -1;
+                }
+                probeGroups[i] = g;
+            }
+
+            int[] buildStart, probeStart;
+            var buildRows = GroupRows(buildGroups, groupKeys.Count, out buildStart);
+            var probeRows = GroupRows(probeGroups, groupKeys.Count, out probeStart);
+            var leftStart = buildLeft ? buildStart : probeStart;
+            var leftRows = buildLeft ? buildRows : probeRows;
+            var rightStart = buildLeft ? probeStart : buildStart;
+            var rightRows = buildLeft ? probeRows : buildRows;
+
+            var sortedGroups = Enumerable.Range(0, groupKeys.Count).ToArray();
+            Array.Sort(groupKeys.ToArray(), sortedGroups);
+
+            long total = 0;
+            int nl, nr;
+            foreach (var gr in sortedGroups)
+            {
+                nl = leftStart[gr + 1] - leftStart[gr];
+                nr = rightStart[gr + 1] - rightStart[gr];
+                if (nl > 0 && nr > 0)
+                    total += (long)nl * nr;
+                else if (nl > 0 && keepLeft)
+                    total += nl;
+                else if (nr > 0 && keepRight)
+                    total += nr;
+            }
+            if (total > int.MaxValue)
+                throw new DataValueError($"The join produces too many rows ({total}).");
+
+            joinLeft = new int[total];
+            joinRight = new int[total];
+            int pos = 0;
+            foreach (var gr in sortedGroups)
+            {
+                nl = leftStart[gr + 1] - leftStart[gr];
+                nr = rightStart[gr + 1] - rightStart[gr];
+                if (nl > 0 && nr > 0)
+                {
+                    for (int j = rightStart[gr]; j < rightStart[gr + 1]; ++j)
+                        for (int i = leftStart[gr]; i < leftStart[gr + 1]; ++i, ++pos)
+                        {
+                            joinLeft[pos] = leftRows[i];
+                            joinRight[pos] = rightRows[j];
+                        }
+                }
+                else if (nl > 0 && keepLeft)
+                {
+                    for (int i = leftStart[gr]; i < leftStart[gr + 1]; ++i, ++pos)
+                    {
+                        joinLeft[pos] = leftRows[i];
+                        joinRight[pos] = -1;
+                    }
+                }
+                else if (nr > 0 && keepRight)
+                {
+                    for (int j = rightStart[gr]; j < rightStart[gr + 1]; ++j, ++pos)
+                    {
+                        joinLeft[pos] = -1;
+                        joinRight[pos] = rightRows[j];
+                    }
                 }
             }
         }
 
-        public static DataFrame TJoin<TMutKey, TImutKey>(
-                            IDataFrameView left, IDataFrameView right,
-                            int[] rowsLeft, int[] rowsRight,
-                            int[] columnsLeft, int[] columnsRight,
-                            IEnumerable<int> colsLeft, IEnumerable<int> colsRight,
-                            bool sort,
-                            string leftSuffix, string rightSuffix,
-                            JoinStrategy joinType,
-                            MultiGetterAt<TMutKey> getterLeft,
-                            MultiGetterAt<TMutKey> getterRight,
-                            Func<TMutKey, TImutKey> conv,
-                            Func<TImutKey, DataFrameGroupKey[]> convLeft,
-                            Func<TImutKey, DataFrameGroupKey[]> convRight)
-            where TMutKey : ITUple, new()
-            where TImutKey : IComparable<TImutKey>, IEquatable<TImutKey>
+        /// <summary>
+        /// Sorts rows by group (counting sort), rows of group g are
+        /// <i>rows[start[g]..start[g+1]]</i>. Groups equal to -1 are skipped.
+        /// </summary>
+        static int[] GroupRows(int[] groups, int nbGroups, out int[] start)
         {
-            var icolsLeft = colsLeft.ToArray();
-            var icolsRight = colsRight.ToArray();
-            int[] orderLeft = rowsLeft == null ? rowsLeft.Select(c => c).ToArray() : Enumerable.Range(0, left.Length).ToArray();
-            int[] orderRight = rowsLeft == null ? rowsRight.Select(c => c).ToArray() : Enumerable.Range(0, right.Length).ToArray();
-            var keysLeft = left.EnumerateItems(icolsLeft, true, rowsLeft, getterLeft).Select(c => conv(c)).ToArray();
-            var keysRight = right.EnumerateItems(icolsRight, true, rowsRight, getterRight).Select(c => conv(c)).ToArray();
-            if (sort)
+            start = new int[nbGroups + 1];
+            foreach (var g in groups)
+                if (g >= 0)
+                    ++start[g + 1];
+            for (int g = 0; g < nbGroups; ++g)
+                start[g + 1] += start[g];
+            var rows = new int[start[nbGroups]];
+            var pos = new int[nbGroups];
+            Array.Copy(start, pos, nbGroups);
+            for (int i = 0; i < groups.Length; ++i)
+                if (groups[i] >= 0)
+                    rows[pos[groups[i]]++] = i;
+            return rows;
+        }
+
+        /// <summary>
+        /// Builds the joined dataframe, every column is copied once.
+        /// Row -1 means the row is missing, it is replaced by a missing value.
+        /// </summary>
+        public static DataFrame JoinRows(IDataFrameView left, IDataFrameView right,
+                                         int[] joinLeft, int[] joinRight,
+                                         string leftSuffix, string rightSuffix)
+        {
+            if (joinLeft.Length != joinRight.Length)
+                throw new DataValueError($"Dimension mismatch {joinLeft.Length} != {joinRight.Length}.");
+            leftSuffix = string.IsNullOrEmpty(leftSuffix) ? string.Empty : leftSuffix;
+            rightSuffix = string.IsNullOrEmpty(rightSuffix) ? string.Empty : rightSuffix;
+            var newColsLeft = left.Columns.Select(c => c + leftSuffix).ToArray();
+            var newColsRight = right.Columns.Select(c => c + rightSuffix).ToArray();
+            var existsCols = new HashSet<string>(newColsLeft);
+            for (int i = 0; i < newColsRight.Length; ++i)
             {
-                DataFrameSorting.TSort(left, ref orderLeft, keysLeft, true);
-                DataFrameSorting.TSort(right, ref orderRight, keysRight, true);
+                while (existsCols.Contains(newColsRight[i]))
+                    newColsRight[i] += "_y";
+                existsCols.Add(newColsRight[i]);
+            }
+
+            var res = new DataFrame(left.CanShuffle && right.CanShuffle);
+            AddJoinedColumns(res, left, joinLeft, newColsLeft);
+            AddJoinedColumns(res, right, joinRight, newColsRight);
+            return res;
+        }
+
+        static void AddJoinedColumns(DataFrame res, IDataFrameView df, int[] rows, string[] names)
+        {
+            var missing = new List<int>();
+            for (int i = 0; i < rows.Length; ++i)
+                if (rows[i] < 0)
+                    missing.Add(i);
+            if (missing.Any())
+                rows = rows.Select(c => c < 0 ? 0 : c).ToArray();
+            for (int i = 0; i < names.Length; ++i)
+            {
+                var kind = df.SchemaI.GetColumnType(i);
+                if (df.Length == 0)
+                {
+                    var col = res.AddColumn(names[i], kind, rows.Length);
+                    res.GetColumn(col).Set(DataFrameMissingValue.GetMissingOrDefaultMissingValue(kind));
+                }
+                else
+                {
+                    var values = df.GetColumn(i, rows);
+                    if (missing.Any())
+                        values.Set(missing, DataFrameMissingValue.GetMissingOrDefaultMissingValue(kind));
+                    res.AddColumn(names[i], values);
+                }
             }
-            var iter = TJoin<TImutKey>(left, right, orderLeft, orderRight, keysLeft, keysRight,
-                             icolsLeft, icolsRight, leftSuffix, rightSuffix, joinType, convLeft, convRight);
-            return DataFrame.Concat(iter);
         }
 
         #endregion
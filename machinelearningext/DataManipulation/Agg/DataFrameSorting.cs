@@ -19,8 +19,17 @@ namespace Scikit.ML.DataManipulation
         /// </summary>
         public const int LimitNumberSortingColumns = 3;
 
+        /// <summary>
+        /// Below this number of rows, a radix sort is not faster than a comparison sort.
+        /// </summary>
+        public const int RadixSortThreshold = 512;
+
         #region typed version
 
+        /// <summary>
+        /// Sorts <i>order</i> by comparing the keys, rows with equal keys
+        /// remain in the same order.
+        /// </summary>
         public static void TSort<T>(IDataFrameView df, ref int[] order, T[] keys, bool ascending)
             where T : IComparable<T>
         {
@@ -30,17 +39,21 @@ namespace Scikit.ML.DataManipulation
                 for (int i = 0; i < order.Length; ++i)
                     order[i] = i;
             }
+            int r;
             if (ascending)
-                Array.Sort(order, (x, y) => keys[x].CompareTo(keys[y]));
+                Array.Sort(order, (x, y) => (r = keys[x].CompareTo(keys[y])) == 0 ? x.CompareTo(y) : r);
             else
-                Array.Sort(order, (x, y) => -keys[x].CompareTo(keys[y]));
+                Array.Sort(order, (x, y) => (r = -keys[x].CompareTo(keys[y])) == 0 ? x.CompareTo(y) : r);
         }
 
         public static ImmutableTuple<T1>[] TSort<T1>(IDataFrameView df, ref int[] order, IEnumerable<string> columns, bool ascending)
             where T1 : IEquatable<T1>, IComparable<T1>
         {
             var keys = df.EnumerateItems<T1>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
@@ -49,7 +62,11 @@ namespace Scikit.ML.DataManipulation
             where T2 : IEquatable<T2>, IComparable<T2>
         {
             var keys = df.EnumerateItems<T1, T2>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1), typeof(T2)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray(),
+                          keys.Select(c => c.Item2).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
@@ -59,7 +76,11 @@ namespace Scikit.ML.DataManipulation
             where T3 : IEquatable<T3>, IComparable<T3>
         {
             var keys = df.EnumerateItems<T1, T2, T3>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1), typeof(T2), typeof(T3)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray(),
+                          keys.Select(c => c.Item2).ToArray(), keys.Select(c => c.Item3).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
@@ -67,7 +88,10 @@ namespace Scikit.ML.DataManipulation
             where T1 : IEquatable<T1>, IComparable<T1>
         {
             var keys = df.EnumerateItems<T1>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
@@ -76,7 +100,11 @@ namespace Scikit.ML.DataManipulation
             where T2 : IEquatable<T2>, IComparable<T2>
         {
             var keys = df.EnumerateItems<T1, T2>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1), typeof(T2)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray(),
+                          keys.Select(c => c.Item2).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
@@ -86,12 +114,182 @@ namespace Scikit.ML.DataManipulation
             where T3 : IEquatable<T3>, IComparable<T3>
         {
             var keys = df.EnumerateItems<T1, T2, T3>(columns, ascending).Select(c => c.ToImTuple()).ToArray();
-            TSort(df, ref order, keys, ascending);
+            if (CanRadixSort(keys.Length, typeof(T1), typeof(T2), typeof(T3)))
+                RadixSort(df, ref order, ascending, keys.Select(c => c.Item1).ToArray(),
+                          keys.Select(c => c.Item2).ToArray(), keys.Select(c => c.Item3).ToArray());
+            else
+                TSort(df, ref order, keys, ascending);
             return keys;
         }
 
         #endregion
 
+        #region radix sort
+
+        /// <summary>
+        /// Tells if a radix sort can be used for keys of these types.
+        /// </summary>
+        public static bool CanRadixSort(int length, params Type[] types)
+        {
+            return length >= RadixSortThreshold && types.All(t =>
+                t == typeof(int) || t == typeof(uint) || t == typeof(long) ||
+                t == typeof(float) || t == typeof(double) || t == typeof(DvText));
+        }
+
+        /// <summary>
+        /// Sorts <i>order</i> with a LSD radix sort. Every array in <i>columns</i>
+        /// contains the values of one sorting column (int, uint, long, float, double or DvText),
+        /// the first one is the most significant. The sort is stable and the order
+        /// is the same as the one <see cref="IComparable{T}"/> defines
+        /// (NaN is lower than any other value).
+        /// Text values are replaced by their rank among the distinct values
+        /// as their comparison depends on the culture.
+        /// </summary>
+        public static void RadixSort(IDataFrameView df, ref int[] order, bool ascending, params Array[] columns)
+        {
+            if (order == null)
+            {
+                order = new int[df.Length];
+                for (int i = 0; i < order.Length; ++i)
+                    order[i] = i;
+            }
+            if (order.Length == 0)
+                return;
+            var keys = new ulong[order.Length];
+            for (int c = columns.Length - 1; c >= 0; --c)
+            {
+                int nbytes = RadixKeys(columns[c], order, keys);
+                if (!ascending)
+                {
+                    ulong mask = nbytes == 8 ? ulong.MaxValue : (1UL << (nbytes * 8)) - 1;
+                    for (int i = 0; i < keys.Length; ++i)
+                        keys[i] ^= mask;
+                }
+                RadixSort(order, keys, nbytes);
+            }
+        }
+
+        /// <summary>
+        /// Sorts <i>order</i> and <i>keys</i> by increasing <i>keys</i>,
+        /// only the <i>nbytes</i> lower bytes of the keys are used.
+        /// The sort is stable.
+        /// </summary>
+        public static void RadixSort(int[] order, ulong[] keys, int nbytes)
+        {
+            if (order.Length != keys.Length)
+                throw new DataValueError($"Dimension mismatch {order.Length} != {keys.Length}.");
+            int n = order.Length;
+            if (n <= 1)
+                return;
+            var srcOrder = order;
+            var srcKeys = keys;
+            var dstOrder = new int[n];
+            var dstKeys = new ulong[n];
+            var counts = new int[256];
+            for (int b = 0; b < nbytes; ++b)
+            {
+                int shift = b * 8;
+                Array.Clear(counts, 0, counts.Length);
+                for (int i = 0; i < n; ++i)
+                    ++counts[(int)((srcKeys[i] >> shift) & 0xFF)];
+                // The pass is useless if all keys share the same byte.
+                if (counts[(int)((srcKeys[0] >> shift) & 0xFF)] == n)
+                    continue;
+                int total = 0;
+                for (int d = 0; d < counts.Length; ++d)
+                {
+                    int c = counts[d];
+                    counts[d] = total;
+                    total += c;
+                }
+                for (int i = 0; i < n; ++i)
+                {
+                    int pos = counts[(int)((srcKeys[i] >> shift) & 0xFF)]++;
+                    dstOrder[pos] = srcOrder[i];
+                    dstKeys[pos] = srcKeys[i];
+                }
+                var tOrder = srcOrder;
+                srcOrder = dstOrder;
+                dstOrder = tOrder;
+                var tKeys = srcKeys;
+                srcKeys = dstKeys;
+                dstKeys = tKeys;
+            }
+            if (srcOrder != order)
+            {
+                Array.Copy(srcOrder, order, n);
+                Array.Copy(srcKeys, keys, n);
+            }
+        }
+
+        /// <summary>
+        /// Converts the values of a column into unsigned integers which
+        /// preserve the order. Returns the number of significant bytes.
+        /// </summary>
+        static int RadixKeys(Array values, int[] order, ulong[] keys)
+        {
+            switch (values)
+            {
+                case int[] ai4:
+                    for (int i = 0; i < order.Length; ++i)
+                        keys[i] = (uint)(ai4[order[i]] ^ int.MinValue);
+                    return 4;
+                case uint[] au4:
+                    for (int i = 0; i < order.Length; ++i)
+                        keys[i] = au4[order[i]];
+                    return 4;
+                case long[] ai8:
+                    for (int i = 0; i < order.Length; ++i)
+                        keys[i] = (ulong)(ai8[order[i]] ^ long.MinValue);
+                    return 8;
+                case float[] ar4:
+                    // A float converted into a double keeps its order, the lower bytes
+                    // are null and the corresponding passes are skipped.
+                    for (int i = 0; i < order.Length; ++i)
+                        keys[i] = DoubleRadixKey(ar4[order[i]]);
+                    return 8;
+                case double[] ar8:
+                    for (int i = 0; i < order.Length; ++i)
+                        keys[i] = DoubleRadixKey(ar8[order[i]]);
+                    return 8;
+                case DvText[] atx:
+                    {
+                        var ranks = new Dictionary<string, int>();
+                        foreach (var v in atx)
+                        {
+                            var str = v.ToString();
+                            if (!ranks.ContainsKey(str))
+                                ranks[str] = ranks.Count;
+                        }
+                        var distinct = ranks.Keys.ToArray();
+                        Array.Sort(distinct);
+                        int rank = 0;
+                        for (int i = 0; i < distinct.Length; ++i)
+                        {
+                            if (i > 0 && distinct[i].CompareTo(distinct[i - 1]) != 0)
+                                ++rank;
+                            ranks[distinct[i]] = rank;
+                        }
+                        for (int i = 0; i < order.Length; ++i)
+                            keys[i] = (uint)ranks[atx[order[i]].ToString()];
+                        return 4;
+                    }
+                default:
+                    throw new NotImplementedException($"Radix sort is not implemented for type '{values.GetType()}'.");
+            }
+        }
+
+        static ulong DoubleRadixKey(double value)
+        {
+            if (double.IsNaN(value))
+                return 0;
+            // -0 and 0 are equal.
+            ulong bits = (ulong)BitConverter.DoubleToInt64Bits(value == 0 ? 0.0 : value);
+            return (bits & 0x8000000000000000) != 0 ? ~bits : bits | 0x8000000000000000;
+        }
+
+        #endregion
+
         #region untyped
 
         static void RecSort(IDataFrameView df, int[] icols, bool ascending)
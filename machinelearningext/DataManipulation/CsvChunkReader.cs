@@ -0,0 +1,420 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using System.Runtime.ExceptionServices;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Reads a text file with several threads in two passes.
+    /// The first pass splits the file into chunks starting
+    /// after a newline and counts the number of lines in every chunk.
+    /// The second pass parses every chunk and writes the values
+    /// straight into the columns of the dataframe at the row
+    /// offset of the chunk. Lines end with <c>\n</c>,
+    /// a trailing <c>\r</c> is removed.
+    /// </summary>
+    internal class CsvChunkReader
+    {
+        /// <summary>
+        /// Maximum number of bytes parsed at once by one thread.
+        /// </summary>
+        public const int MaxChunkSize = 1 << 24;
+
+        const int BufferSize = 1 << 20;
+
+        readonly DataFrameIO.FunctionCreateStreamReader _createStream;
+        readonly Encoding _encoding;
+        readonly int _numThreads;
+        readonly byte _sep;
+        long[] _starts;
+        int[] _rows;
+        int[] _firstRows;
+        int _headerLines;
+        int _maxColumns;
+
+        CsvChunkReader(DataFrameIO.FunctionCreateStreamReader createStream, Encoding encoding, int numThreads, char sep)
+        {
+            _createStream = createStream;
+            _encoding = encoding;
+            _numThreads = numThreads;
+            _sep = (byte)sep;
+        }
+
+        /// <summary>
+        /// Number of lines to parse (header excluded).
+        /// </summary>
+        public int Length => _firstRows[_firstRows.Length - 1] + _rows[_rows.Length - 1];
+
+        /// <summary>
+        /// Number of chunks.
+        /// </summary>
+        public int ChunkCount => _rows.Length;
+
+        /// <summary>
+        /// Maximum number of columns of a line (header excluded).
+        /// </summary>
+        public int MaxColumns => _maxColumns;
+
+        /// <summary>
+        /// Splits the stream into chunks and counts lines (first pass).
+        /// Returns null if the stream cannot be read by chunks
+        /// (not seekable, newline is not a single byte in its encoding
+        /// or the separator is not an ASCII character).
+        /// </summary>
+        public static CsvChunkReader Create(DataFrameIO.FunctionCreateStreamReader createStream,
+                                            bool header, int numThreads, char sep)
+        {
+            if (sep >= 128)
+                return null;
+            Encoding encoding;
+            long dataStart, length;
+            using (var st = createStream())
+            {
+                st.Peek();
+                encoding = st.CurrentEncoding;
+                if (!st.BaseStream.CanSeek || !(encoding is UTF8Encoding || encoding.IsSingleByte))
+                    return null;
+                length = st.BaseStream.Length;
+                dataStart = SkipPreamble(st.BaseStream, encoding);
+                if (header)
+                    dataStart = FindLineStart(st.BaseStream, dataStart, length);
+            }
+
+            var res = new CsvChunkReader(createStream, encoding, numThreads, sep);
+            res._headerLines = header ? 1 : 0;
+            res.SplitChunks(dataStart, length);
+            res.CountLines(length);
+            return res;
+        }
+
+        /// <summary>
+        /// Returns the position of the first byte after the preamble (BOM).
+        /// </summary>
+        static long SkipPreamble(Stream st, Encoding encoding)
+        {
+            var preamble = encoding.GetPreamble();
+            if (preamble.Length == 0 || st.Length < preamble.Length)
+                return 0;
+            var buffer = new byte[preamble.Length];
+            st.Seek(0, SeekOrigin.Begin);
+            int read = st.Read(buffer, 0, buffer.Length);
+            return read == buffer.Length && buffer.SequenceEqual(preamble) ? preamble.Length : 0;
+        }
+
+        /// <summary>
+        /// Returns the position of the first line starting at or after <paramref name="position"/>.
+        /// </summary>
+        static long FindLineStart(Stream st, long position, long length)
+        {
+            var buffer = new byte[1 << 16];
+            st.Seek(position, SeekOrigin.Begin);
+            while (position < length)
+            {
+                int read = st.Read(buffer, 0, buffer.Length);
+                if (read <= 0)
+                    break;
+                int i = Array.IndexOf(buffer, (byte)'\n', 0, read);
+                if (i >= 0)
+                    return position + i + 1;
+                position += read;
+            }
+            return length;
+        }
+
+        void SplitChunks(long dataStart, long length)
+        {
+            long size = length - dataStart;
+            long chunkSize = Math.Max(1, Math.Min(MaxChunkSize, size / (_numThreads * 4)));
+            int nbChunks = size == 0 ? 1 : (int)((size + chunkSize - 1) / chunkSize);
+            _starts = new long[nbChunks + 1];
+            _starts[0] = dataStart;
+            _starts[nbChunks] = length;
+            using (var st = _createStream())
+            {
+                for (int i = 1; i < nbChunks; ++i)
+                {
+                    long pos = dataStart + chunkSize * i;
+                    // A chunk starts after a newline, a chunk is empty if
+                    // a line is longer than the chunk size.
+                    _starts[i] = pos <= _starts[i - 1]
+                                    ? _starts[i - 1]
+                                    : FindLineStart(st.BaseStream, pos - 1, length);
+                }
+            }
+        }
+
+        void RunChunks(Action<int> action)
+        {
+            try
+            {
+                Parallel.For(0, ChunkCount, new ParallelOptions() { MaxDegreeOfParallelism = _numThreads }, action);
+            }
+            catch (AggregateException e)
+            {
+                ExceptionDispatchInfo.Capture(e.InnerExceptions[0]).Throw();
+                throw;
+            }
+        }
+
+        byte[] ReadChunk(StreamReader st, int chunk)
+        {
+            var buffer = new byte[_starts[chunk + 1] - _starts[chunk]];
+            st.BaseStream.Seek(_starts[chunk], SeekOrigin.Begin);
+            int pos = 0;
+            while (pos < buffer.Length)
+            {
+                int read = st.BaseStream.Read(buffer, pos, Math.Min(BufferSize, buffer.Length - pos));
+                if (read <= 0)
+                    throw new EndOfStreamException($"Unexpected end of stream at position {_starts[chunk] + pos}.");
+                pos += read;
+            }
+            return buffer;
+        }
+
+        void CountLines(long length)
+        {
+            _rows = new int[_starts.Length - 1];
+            var maxColumns = new int[_rows.Length];
+            RunChunks(chunk =>
+            {
+                if (_starts[chunk] == _starts[chunk + 1])
+                    return;
+                byte[] buffer;
+                using (var st = _createStream())
+                    buffer = ReadChunk(st, chunk);
+                // The separator is ASCII, UTF-8 never uses its byte
+                // inside a multi-byte character.
+                int nb = 0, nbCol = 1, maxCol = 0;
+                for (int i = 0; i < buffer.Length; ++i)
+                {
+                    if (buffer[i] == '\n')
+                    {
+                        ++nb;
+                        maxCol = Math.Max(maxCol, nbCol);
+                        nbCol = 1;
+                    }
+                    else if (buffer[i] == _sep)
+                        ++nbCol;
+                }
+                // The last line may not end with a newline.
+                if (buffer[buffer.Length - 1] != '\n')
+                {
+                    ++nb;
+                    maxCol = Math.Max(maxCol, nbCol);
+                }
+                _rows[chunk] = nb;
+                maxColumns[chunk] = maxCol;
+            });
+            _maxColumns = maxColumns.Max();
+            _firstRows = new int[_rows.Length];
+            long total = 0;
+            for (int i = 0; i < _rows.Length; ++i)
+            {
+                _firstRows[i] = (int)total;
+                total += _rows[i];
+            }
+            if (total > int.MaxValue)
+                throw new DataValueError($"Too many lines ({total}) for a DataFrame.");
+        }
+
+        /// <summary>
+        /// Parses every chunk into the columns of the dataframe (second pass).
+        /// The dataframe must have <see cref="Length"/> rows.
+        /// </summary>
+        public void Fill(DataFrame df, char sep)
+        {
+            var parsers = new ColumnParser[df.ColumnCount];
+            for (int i = 0; i < parsers.Length; ++i)
+                parsers[i] = ColumnParser.Create(df, i);
+
+            RunChunks(chunk =>
+            {
+                if (_rows[chunk] == 0)
+                    return;
+                char[] text;
+                using (var st = _createStream())
+                    text = _encoding.GetChars(ReadChunk(st, chunk));
+                int row = _firstRows[chunk];
+                int lineStart = 0;
+                while (lineStart < text.Length)
+                {
+                    int lineEnd = Array.IndexOf(text, '\n', lineStart);
+                    int next = lineEnd == -1 ? text.Length : lineEnd + 1;
+                    if (lineEnd == -1)
+                        lineEnd = text.Length;
+                    if (lineEnd > lineStart && text[lineEnd - 1] == '\r')
+                        --lineEnd;
+
+                    int col = 0;
+                    int start = lineStart;
+                    while (true)
+                    {
+                        int end = Array.IndexOf(text, sep, start, lineEnd - start);
+                        if (end == -1)
+                            end = lineEnd;
+                        if (col >= parsers.Length)
+                            throw new FormatException(string.Format("Line {0} has more columns than expected.", row + _headerLines + 1));
+                        parsers[col].Parse(row, text, start, end - start);
+                        ++col;
+                        if (end == lineEnd)
+                            break;
+                        start = end + 1;
+                    }
+                    ++row;
+                    lineStart = next;
+                }
+            });
+        }
+
+        #region parsers
+
+        /// <summary>
+        /// Converts a piece of text and stores it into a column.
+        /// </summary>
+        abstract class ColumnParser
+        {
+            public abstract void Parse(int row, char[] text, int start, int length);
+
+            public static ColumnParser Create(DataFrame df, int col)
+            {
+                var kind = df.Kinds[col];
+                if (kind.IsVector())
+                    throw new NotImplementedException($"Unable to parse vector column {col} ({kind}).");
+                switch (kind.RawKind())
+                {
+                    case DataKind.BL: return new BoolParser(Data<bool>(df, col));
+                    case DataKind.I4: return new IntParser(Data<int>(df, col));
+                    case DataKind.U4: return new UIntParser(Data<uint>(df, col));
+                    case DataKind.I8: return new LongParser(Data<long>(df, col));
+                    case DataKind.R4: return new FloatParser(Data<float>(df, col));
+                    case DataKind.R8: return new DoubleParser(Data<double>(df, col));
+                    case DataKind.TX: return new TextParser(Data<DvText>(df, col));
+                    default:
+                        throw new DataTypeError(string.Format("Type {0} is not handled.", kind));
+                }
+            }
+
+            static DType[] Data<DType>(DataFrame df, int col)
+                where DType : IEquatable<DType>, IComparable<DType>
+            {
+                df.GetTypedColumn(col, out DataColumn<DType> column);
+                return column.Data;
+            }
+
+            /// <summary>
+            /// Parses a non negative integer made of digits only,
+            /// returns false if the text needs the standard parser.
+            /// </summary>
+            protected static bool TryParseDigits(char[] text, int start, int length, int maxDigits, out long value)
+            {
+                value = 0;
+                bool neg = length > 0 && text[start] == '-';
+                if (neg)
+                {
+                    ++start;
+                    --length;
+                }
+                if (length == 0 || length > maxDigits)
+                    return false;
+                for (int i = start; i < start + length; ++i)
+                {
+                    int d = text[i] - '0';
+                    if (d < 0 || d > 9)
+                        return false;
+                    value = value * 10 + d;
+                }
+                if (neg)
+                    value = -value;
+                return true;
+            }
+        }
+
+        class BoolParser : ColumnParser
+        {
+            readonly bool[] _data;
+            public BoolParser(bool[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = bool.Parse(new string(text, start, length));
+            }
+        }
+
+        class IntParser : ColumnParser
+        {
+            readonly int[] _data;
+            public IntParser(int[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = TryParseDigits(text, start, length, 9, out long value)
+                                ? (int)value
+                                : int.Parse(new string(text, start, length));
+            }
+        }
+
+        class UIntParser : ColumnParser
+        {
+            readonly uint[] _data;
+            public UIntParser(uint[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = TryParseDigits(text, start, length, 9, out long value) && value >= 0
+                                ? (uint)value
+                                : uint.Parse(new string(text, start, length));
+            }
+        }
+
+        class LongParser : ColumnParser
+        {
+            readonly long[] _data;
+            public LongParser(long[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = TryParseDigits(text, start, length, 18, out long value)
+                                ? value
+                                : long.Parse(new string(text, start, length));
+            }
+        }
+
+        class FloatParser : ColumnParser
+        {
+            readonly float[] _data;
+            public FloatParser(float[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = float.Parse(new string(text, start, length));
+            }
+        }
+
+        class DoubleParser : ColumnParser
+        {
+            readonly double[] _data;
+            public DoubleParser(double[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                _data[row] = double.Parse(new string(text, start, length));
+            }
+        }
+
+        class TextParser : ColumnParser
+        {
+            readonly DvText[] _data;
+            public TextParser(DvText[] data) { _data = data; }
+            public override void Parse(int row, char[] text, int start, int length)
+            {
+                var copy = new char[length];
+                Array.Copy(text, start, copy, 0, length);
+                _data[row] = new DvText(new ReadOnlyMemory<char>(copy));
+            }
+        }
+
+        #endregion
+    }
+}
@@ -19,9 +19,56 @@ namespace Scikit.ML.DataManipulation
         #region members and easy functions
 
         /// <summary>
-        /// Data for the column.
+        /// Data for the column, null until the loader is called
+        /// if the column was created with a loader.
         /// </summary>
-        DType[] _data;
+        DType[] _buffer;
+
+        /// <summary>
+        /// Loads the data the first time it is accessed, null once it is done.
+        /// </summary>
+        volatile Func<DType[]> _loader;
+
+        /// <summary>
+        /// Data for the column, it calls the loader on first access.
+        /// </summary>
+        DType[] _data
+        {
+            get
+            {
+                if (_loader != null)
+                    Load();
+                return _buffer;
+            }
+            set
+            {
+                _buffer = value;
+                _loader = null;
+            }
+        }
+
+        void Load()
+        {
+            var loader = _loader;
+            if (loader == null)
+                return;
+            lock (loader)
+            {
+                if (_loader == null)
+                    return;
+                var data = loader();
+                if (data == null || data.Length < _length)
+                    throw new DataValueError($"Loader returned {(data == null ? 0 : data.Length)} values, expected {_length}.");
+                _buffer = data;
+                _loader = null;
+            }
+        }
+
+        /// <summary>
+        /// Tells if the data is in memory, false if the column
+        /// was created with a loader which was not called yet.
+        /// </summary>
+        public bool IsLoaded => _loader == null;
 
         /// <summary>
         /// Number of elements.
@@ -103,7 +150,7 @@ namespace Scikit.ML.DataManipulation
         /// <summary>
         /// Number of elements in memory.
         /// </summary>
-        public int MemoryLength => (_data == null ? 0 : _data.Length);
+        public int MemoryLength => _loader != null ? _length : (_buffer == null ? 0 : _buffer.Length);
 
         /// <summary>
         /// Get a pointer on the raw data.
@@ -123,6 +170,21 @@ namespace Scikit.ML.DataManipulation
             }
         }
 
+        /// <summary>
+        /// Returns the buffer without any copy, it may be longer than <see cref="Length"/>.
+        /// Used by operations which modify the column in place.
+        /// </summary>
+        internal DType[] RawData => _data;
+
+        /// <summary>
+        /// Pins the raw data in memory to share it without any copy,
+        /// see <see cref="PinnedColumn"/>.
+        /// </summary>
+        public PinnedColumn Pin()
+        {
+            return new PinnedColumn(_data, _length, Kind);
+        }
+
         public object Get(int row) { return _data[row]; }
 
         public void Set(int row, object value)
@@ -164,6 +226,20 @@ namespace Scikit.ML.DataManipulation
             _length = data.Length;
         }
 
+        /// <summary>
+        /// Builds a column whose data is only retrieved the first time
+        /// it is accessed, <see cref="DataFrameColumnarFile"/>.
+        /// </summary>
+        /// <param name="length">number of rows</param>
+        /// <param name="loader">returns the data, called at most once</param>
+        public DataColumn(int length, Func<DType[]> loader)
+        {
+            if (loader == null)
+                throw new ArgumentNullException(nameof(loader));
+            _length = length;
+            _loader = loader;
+        }
+
         /// <summary>
         /// Resizes the columns.
         /// </summary>
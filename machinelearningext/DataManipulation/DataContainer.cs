@@ -867,32 +867,7 @@ namespace Scikit.ML.DataManipulation
             if (!numRows.HasValue)
                 numRows = DataViewUtils.ComputeRowCount(view);
 
-            var memory = new Dictionary<int, Tuple<int, int>>();
-            var sch = view.Schema;
-            int pos = 0;
-            for (int i = 0; i < sch.Count; ++i)
-            {
-                if (sch[i].IsHidden)
-                    continue;
-                var ty = sch[i].Type;
-                if (!keepVectors && ty.IsVector())
-                {
-                    var tyv = ty.AsVector();
-                    if (tyv.DimCount() != 1)
-                        throw new NotSupportedException("Only arrays with one dimension are supported.");
-                    for (int j = 0; j < tyv.GetDim(0); ++j)
-                    {
-                        AddColumn(string.Format("{0}.{1}", sch[i].Name, j), tyv.ItemType(), (int)numRows.Value);
-                        memory[pos++] = new Tuple<int, int>(i, j);
-                    }
-                }
-                else
-                {
-                    memory[pos] = new Tuple<int, int>(i, -1);
-                    AddColumn(sch[i].Name, ty, (int)numRows.Value);
-                    ++pos;
-                }
-            }
+            var memory = AddColumns(view.Schema, (int)numRows.Value, keepVectors);
 
             ILogWriter logout = new LogWriter((string s) => { });
             ILogWriter logerr = new LogWriter((string s) => { });
@@ -918,11 +893,63 @@ namespace Scikit.ML.DataManipulation
             }
         }
 
+        /// <summary>
+        /// Fills an empty container with the next rows of a cursor
+        /// and stops after <paramref name="nrows"/> rows.
+        /// The cursor can be used again to fill another container with the following rows.
+        /// </summary>
+        /// <param name="cursor">cursor, created with all columns active</param>
+        /// <param name="nrows">maximum number of rows to read, the container has this length</param>
+        /// <param name="keepVectors">keep vectors as they are</param>
+        /// <returns>number of rows read, lower than <paramref name="nrows"/> if the cursor reached the end</returns>
+        public int FillValues(RowCursor cursor, int nrows, bool keepVectors = false)
+        {
+            if (ColumnCount > 0)
+                throw new DataValueError("The container must be empty.");
+            var memory = AddColumns(cursor.Schema, nrows, keepVectors);
+            return FillValues(cursor, memory, nrows);
+        }
+
+        /// <summary>
+        /// Adds one column for every visible column of the schema, vector columns are
+        /// split into one column per slot if <paramref name="keepVectors"/> is false.
+        /// Returns the mapping between the new columns and the schema (column, slot).
+        /// </summary>
+        Dictionary<int, Tuple<int, int>> AddColumns(Schema sch, int nrows, bool keepVectors)
+        {
+            var memory = new Dictionary<int, Tuple<int, int>>();
+            int pos = 0;
+            for (int i = 0; i < sch.Count; ++i)
+            {
+                if (sch[i].IsHidden)
+                    continue;
+                var ty = sch[i].Type;
+                if (!keepVectors && ty.IsVector())
+                {
+                    var tyv = ty.AsVector();
+                    if (tyv.DimCount() != 1)
+                        throw new NotSupportedException("Only arrays with one dimension are supported.");
+                    for (int j = 0; j < tyv.GetDim(0); ++j)
+                    {
+                        AddColumn(string.Format("{0}.{1}", sch[i].Name, j), tyv.ItemType(), nrows);
+                        memory[pos++] = new Tuple<int, int>(i, j);
+                    }
+                }
+                else
+                {
+                    memory[pos] = new Tuple<int, int>(i, -1);
+                    AddColumn(sch[i].Name, ty, nrows);
+                    ++pos;
+                }
+            }
+            return memory;
+        }
+
         /// <summary>
         /// Fills the value with values coming from a RowCursor.
-        /// Called by the previous method.
+        /// Called by the previous methods, stops after nrows rows if nrows >= 0.
         /// </summary>
-        void FillValues(RowCursor cursor, Dictionary<int, Tuple<int, int>> memory)
+        int FillValues(RowCursor cursor, Dictionary<int, Tuple<int, int>> memory, int nrows = -1)
         {
             var getterBL = new ValueGetter<bool>[_colsBL == null ? 0 : _colsBL.Count];
             var getterI4 = new ValueGetter<int>[_colsI4 == null ? 0 : _colsI4.Count];
@@ -1028,7 +1055,7 @@ namespace Scikit.ML.DataManipulation
             var aqvalueTX = new VBufferEqSort<DvText>();
 
             int row = 0;
-            while (cursor.MoveNext())
+            while ((nrows < 0 || row < nrows) && cursor.MoveNext())
             {
                 for (int i = 0; i < _names.Count; ++i)
                 {
@@ -1115,6 +1142,7 @@ namespace Scikit.ML.DataManipulation
                 }
                 ++row;
             }
+            return row;
         }
 
         /// <summary>
@@ -209,6 +209,18 @@ namespace Scikit.ML.DataManipulation
             return _data.AddColumn(name, values.Kind, values.Length, values);
         }
 
+        /// <summary>
+        /// Adds a new column with a specific type, the type must be compatible
+        /// with the column (a key type for a column of uint for example).
+        /// </summary>
+        /// <param name="name">column name</param>
+        /// <param name="kind">column type</param>
+        /// <param name="values">new column</param>
+        public int AddColumn(string name, ColumnType kind, IDataColumn values)
+        {
+            return _data.AddColumn(name, kind, values.Length, values);
+        }
+
         public int AddColumn<DT>(string name, DT[] values)
         {
             var kind = SchemaHelper.GetColumnType<DT>();
@@ -455,12 +467,35 @@ namespace Scikit.ML.DataManipulation
             DataFrameIO.ViewToCsv(this, filename, sep: sep, header: header, encoding: encoding, silent: silent, host: host);
         }
 
+        /// <summary>
+        /// Saves the dataframe in a binary columnar format,
+        /// see <see cref="DataFrameColumnarFile"/> and <see cref="DataFrameIO.ReadColumnar"/>.
+        /// </summary>
+        /// <param name="filename">filename</param>
+        public void ToColumnar(string filename)
+        {
+            DataFrameColumnarFile.Write(this, filename);
+        }
+
         public void FillValues(IDataView view, int nrows = -1, bool keepVectors = false, int? numThreads = 1,
                                IHostEnvironment env = null)
         {
             _data.FillValues(view, nrows: nrows, keepVectors: keepVectors, numThreads: numThreads, env: env);
         }
 
+        /// <summary>
+        /// Fills an empty dataframe with the next rows of a cursor,
+        /// see <see cref="DataContainer.FillValues(RowCursor, int, bool)"/>.
+        /// </summary>
+        /// <param name="cursor">cursor, created with all columns active</param>
+        /// <param name="nrows">maximum number of rows to read</param>
+        /// <param name="keepVectors">keep vectors as they are</param>
+        /// <returns>number of rows read</returns>
+        public int FillValues(RowCursor cursor, int nrows, bool keepVectors = false)
+        {
+            return _data.FillValues(cursor, nrows, keepVectors);
+        }
+
         /// <summary>
         /// Changes the values for an entire row.
         /// </summary>
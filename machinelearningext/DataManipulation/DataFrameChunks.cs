@@ -0,0 +1,136 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.ExceptionServices;
+using System.Threading;
+using System.Threading.Tasks;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Sequence of <see cref="DataFrame"/> produced chunk by chunk,
+    /// usually by <see cref="StreamingDataFrame.Chunks"/>.
+    /// Operators are lazy, they are applied on every chunk when it is produced,
+    /// only a few chunks hold in memory at the same time.
+    /// The sequence can be enumerated multiple times, every enumeration
+    /// reads the source again.
+    /// </summary>
+    public class DataFrameChunks : IEnumerable<DataFrame>
+    {
+        readonly Func<IEnumerable<DataFrame>> _enumerate;
+
+        /// <summary>
+        /// Creates a sequence of chunks.
+        /// </summary>
+        /// <param name="enumerate">returns a new enumeration of the chunks every time it is called</param>
+        public DataFrameChunks(Func<IEnumerable<DataFrame>> enumerate)
+        {
+            _enumerate = enumerate;
+        }
+
+        public IEnumerator<DataFrame> GetEnumerator() { return _enumerate().GetEnumerator(); }
+        IEnumerator IEnumerable.GetEnumerator() { return GetEnumerator(); }
+
+        /// <summary>
+        /// Applies a function on every chunk.
+        /// </summary>
+        public DataFrameChunks Map(Func<DataFrame, DataFrame> func)
+        {
+            var enumerate = _enumerate;
+            return new DataFrameChunks(() => enumerate().Select(func));
+        }
+
+        /// <summary>
+        /// Keeps the rows for which the predicate is true,
+        /// empty chunks are skipped.
+        /// </summary>
+        /// <param name="predicate">returns a boolean column such as <c>df["a"] &gt; 0</c></param>
+        public DataFrameChunks Filter(Func<DataFrame, NumericColumn> predicate)
+        {
+            var enumerate = _enumerate;
+            return new DataFrameChunks(() => enumerate().Select(df => df[predicate(df)].Copy())
+                                                        .Where(df => df.Length > 0));
+        }
+
+        /// <summary>
+        /// Aggregates every chunk into an accumulator.
+        /// </summary>
+        /// <param name="seed">initial value</param>
+        /// <param name="func">merges a chunk into the accumulator</param>
+        public TAcc Aggregate<TAcc>(TAcc seed, Func<TAcc, DataFrame, TAcc> func)
+        {
+            var acc = seed;
+            foreach (var df in this)
+                acc = func(acc, df);
+            return acc;
+        }
+
+        /// <summary>
+        /// Concatenates all chunks into a single dataframe,
+        /// it should only be used when the result holds in memory.
+        /// </summary>
+        public DataFrame Concat()
+        {
+            return DataFrame.Concat(this);
+        }
+
+        /// <summary>
+        /// Produces the chunks in a background thread, at most
+        /// <paramref name="prefetch"/> chunks wait in memory to be consumed.
+        /// The background thread stops if the enumeration stops.
+        /// </summary>
+        public DataFrameChunks Prefetch(int prefetch)
+        {
+            if (prefetch <= 0)
+                return this;
+            var enumerate = _enumerate;
+            return new DataFrameChunks(() => Prefetch(enumerate(), prefetch));
+        }
+
+        static IEnumerable<DataFrame> Prefetch(IEnumerable<DataFrame> chunks, int prefetch)
+        {
+            using (var queue = new BlockingCollection<DataFrame>(prefetch))
+            using (var cancel = new CancellationTokenSource())
+            {
+                ExceptionDispatchInfo error = null;
+                var producer = Task.Run(() =>
+                {
+                    try
+                    {
+                        foreach (var chunk in chunks)
+                            queue.Add(chunk, cancel.Token);
+                    }
+                    catch (OperationCanceledException) when (cancel.IsCancellationRequested)
+                    {
+                    }
+                    catch (Exception e)
+                    {
+                        error = ExceptionDispatchInfo.Capture(e);
+                    }
+                    finally
+                    {
+                        queue.CompleteAdding();
+                    }
+                });
+
+                try
+                {
+                    foreach (var chunk in queue.GetConsumingEnumerable())
+                        yield return chunk;
+                }
+                finally
+                {
+                    cancel.Cancel();
+                    producer.Wait();
+                }
+                if (error != null)
+                    error.Throw();
+            }
+        }
+    }
+}
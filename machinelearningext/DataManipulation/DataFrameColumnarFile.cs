@@ -0,0 +1,606 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.IO.MemoryMappedFiles;
+using System.Linq;
+using System.Text;
+using System.Threading;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Binary columnar format for a <see cref="DataFrame"/>.
+    /// The file starts with a header (magic, version, number of columns and rows, schema)
+    /// followed by a table which gives the position and the size of every column
+    /// and one block per column aligned on <see cref="Alignment"/> bytes.
+    /// <list type="bullet">
+    /// <item>numbers: the raw values, booleans take one byte,</item>
+    /// <item>text: <c>n+1</c> offsets (int64) followed by the utf-8 strings (string heap),</item>
+    /// <item>vectors: the length of every row, the number of defined values of every row,
+    /// the values of all rows (encoded as above), the indices of the sparse rows.</item>
+    /// </list>
+    /// The file is memory mapped when it is read and a column
+    /// is only read the first time it is accessed.
+    /// </summary>
+    public class DataFrameColumnarFile : IDisposable
+    {
+        #region members
+
+        /// <summary>
+        /// Alignment of every column block in the file.
+        /// </summary>
+        public const int Alignment = 64;
+
+        const string Magic = "MLEXTCOL";
+        const int Version = 1;
+
+        MemoryMappedFile _file;
+        readonly object _lock = new object();
+        readonly string _filename;
+        string[] _names;
+        ColumnType[] _kinds;
+        long[] _offsets;
+        long[] _sizes;
+        int _length;
+        long _loadedBytes;
+
+        /// <summary>
+        /// Number of rows.
+        /// </summary>
+        public int Length => _length;
+
+        /// <summary>
+        /// Number of columns.
+        /// </summary>
+        public int ColumnCount => _names.Length;
+
+        /// <summary>
+        /// Column names.
+        /// </summary>
+        public string[] Columns => _names.ToArray();
+
+        /// <summary>
+        /// Column types.
+        /// </summary>
+        public ColumnType[] Kinds => _kinds.ToArray();
+
+        /// <summary>
+        /// Number of bytes of all the column blocks read so far.
+        /// </summary>
+        public long LoadedBytes => Interlocked.Read(ref _loadedBytes);
+
+        #endregion
+
+        #region read
+
+        /// <summary>
+        /// Opens a file created with <see cref="Write(DataFrame, string)"/>.
+        /// Only the header is read, the columns are read by
+        /// <see cref="ToDataFrame"/>.
+        /// </summary>
+        /// <param name="filename">filename</param>
+        public DataFrameColumnarFile(string filename)
+        {
+            _filename = filename;
+            using (var stream = new FileStream(filename, FileMode.Open, FileAccess.Read, FileShare.Read))
+            using (var reader = new BinaryReader(stream, Encoding.UTF8))
+                ReadHeader(reader);
+            _file = MemoryMappedFile.CreateFromFile(filename, FileMode.Open, null, 0, MemoryMappedFileAccess.Read);
+        }
+
+        public void Dispose()
+        {
+            lock (_lock)
+            {
+                if (_file != null)
+                {
+                    _file.Dispose();
+                    _file = null;
+                }
+            }
+        }
+
+        void ReadHeader(BinaryReader reader)
+        {
+            var magic = Encoding.ASCII.GetString(reader.ReadBytes(Magic.Length));
+            if (magic != Magic)
+                throw new DataValueError($"File '{_filename}' is not a columnar dataframe file.");
+            int version = reader.ReadInt32();
+            if (version != Version)
+                throw new DataValueError($"Unexpected version {version} != {Version} for file '{_filename}'.");
+            int ncol = reader.ReadInt32();
+            _length = reader.ReadInt32();
+            _names = new string[ncol];
+            _kinds = new ColumnType[ncol];
+            for (int i = 0; i < ncol; ++i)
+            {
+                _names[i] = reader.ReadString();
+                _kinds[i] = ReadType(reader);
+            }
+            _offsets = new long[ncol];
+            _sizes = new long[ncol];
+            for (int i = 0; i < ncol; ++i)
+            {
+                _offsets[i] = reader.ReadInt64();
+                _sizes[i] = reader.ReadInt64();
+            }
+        }
+
+        static ColumnType ReadType(BinaryReader reader)
+        {
+            bool isVector = reader.ReadBoolean();
+            int size = reader.ReadInt32();
+            var kind = (DataKind)reader.ReadByte();
+            bool isKey = reader.ReadBoolean();
+            PrimitiveType item;
+            if (isKey)
+            {
+                ulong min = reader.ReadUInt64();
+                int count = reader.ReadInt32();
+                bool contiguous = reader.ReadBoolean();
+                item = new KeyType(kind.ToType(), min, count, contiguous);
+            }
+            else
+                item = ColumnTypeHelper.PrimitiveFromKind(kind);
+            return isVector ? (ColumnType)new VectorType(item, size) : item;
+        }
+
+        /// <summary>
+        /// Returns the index of a column.
+        /// </summary>
+        public int GetColumnIndex(string name)
+        {
+            int index = Array.IndexOf(_names, name);
+            if (index < 0)
+                throw new DataNameError($"Unable to find column '{name}' in file '{_filename}'.");
+            return index;
+        }
+
+        /// <summary>
+        /// Creates a dataframe with the columns stored in the file.
+        /// If lazy is true, every column is only read the first time it is accessed
+        /// and the file must not be disposed before that happens.
+        /// </summary>
+        /// <param name="columns">columns to retrieve, all if null</param>
+        /// <param name="lazy">read the columns on first access</param>
+        public DataFrame ToDataFrame(IEnumerable<string> columns = null, bool lazy = true)
+        {
+            return ToDataFrame(columns, lazy, false);
+        }
+
+        /// <summary>
+        /// Same as <see cref="ToDataFrame(IEnumerable{string}, bool)"/>.
+        /// If <paramref name="mapOnLoad"/> is true, every lazy column maps the file
+        /// when it is read and closes it right after, the columns do not depend
+        /// on this instance which can be disposed.
+        /// </summary>
+        internal DataFrame ToDataFrame(IEnumerable<string> columns, bool lazy, bool mapOnLoad)
+        {
+            CheckNotDisposed();
+            var indices = columns == null
+                            ? Enumerable.Range(0, ColumnCount).ToArray()
+                            : columns.Select(c => GetColumnIndex(c)).ToArray();
+            var df = new DataFrame();
+            foreach (var col in indices)
+                df.AddColumn(_names[col], _kinds[col], CreateColumn(col, lazy, mapOnLoad));
+            return df;
+        }
+
+        void CheckNotDisposed()
+        {
+            if (_file == null)
+                throw new ObjectDisposedException(_filename);
+        }
+
+        IDataColumn CreateColumn(int col, bool lazy, bool mapOnLoad)
+        {
+            var kind = _kinds[col];
+            if (kind.IsVector())
+            {
+                switch (kind.ItemType().RawKind())
+                {
+                    case DataKind.BL: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 1, ReadBools));
+                    case DataKind.I4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 4, ReadValues<int>));
+                    case DataKind.U4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 4, ReadValues<uint>));
+                    case DataKind.I8: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 8, ReadValues<long>));
+                    case DataKind.R4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 4, ReadValues<float>));
+                    case DataKind.R8: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadVectors(acc, n, 8, ReadValues<double>));
+                    case DataKind.TX: return CreateColumn(col, lazy, mapOnLoad, ReadTextVectors);
+                    default:
+                        throw new DataTypeError($"Type {kind} is not handled.");
+                }
+            }
+            else
+            {
+                switch (kind.RawKind())
+                {
+                    case DataKind.BL: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadBools(acc, 0, n));
+                    case DataKind.I4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadValues<int>(acc, 0, n));
+                    case DataKind.U4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadValues<uint>(acc, 0, n));
+                    case DataKind.I8: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadValues<long>(acc, 0, n));
+                    case DataKind.R4: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadValues<float>(acc, 0, n));
+                    case DataKind.R8: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => ReadValues<double>(acc, 0, n));
+                    case DataKind.TX: return CreateColumn(col, lazy, mapOnLoad, (acc, n) => { long size; return ReadTexts(acc, 0, n, out size); });
+                    default:
+                        throw new DataTypeError($"Type {kind} is not handled.");
+                }
+            }
+        }
+
+        IDataColumn CreateColumn<DType>(int col, bool lazy, bool mapOnLoad,
+                                        Func<MemoryMappedViewAccessor, int, DType[]> read)
+            where DType : IEquatable<DType>, IComparable<DType>
+        {
+            if (!lazy)
+                return new DataColumn<DType>(LoadColumn(col, read));
+            if (mapOnLoad)
+                return new DataColumn<DType>(_length, () => MapAndLoadColumn(col, read));
+            return new DataColumn<DType>(_length, () => LoadColumn(col, read));
+        }
+
+        /// <summary>
+        /// Maps the block of one column and reads it.
+        /// </summary>
+        DType[] LoadColumn<DType>(int col, Func<MemoryMappedViewAccessor, int, DType[]> read)
+        {
+            if (_sizes[col] == 0)
+                return read(null, 0);
+            MemoryMappedViewAccessor accessor;
+            lock (_lock)
+            {
+                CheckNotDisposed();
+                accessor = _file.CreateViewAccessor(_offsets[col], _sizes[col], MemoryMappedFileAccess.Read);
+            }
+            using (accessor)
+            {
+                var res = read(accessor, _length);
+                Interlocked.Add(ref _loadedBytes, _sizes[col]);
+                return res;
+            }
+        }
+
+        /// <summary>
+        /// Maps the file, reads the block of one column and closes the file.
+        /// </summary>
+        DType[] MapAndLoadColumn<DType>(int col, Func<MemoryMappedViewAccessor, int, DType[]> read)
+        {
+            if (_sizes[col] == 0)
+                return read(null, 0);
+            using (var file = MemoryMappedFile.CreateFromFile(_filename, FileMode.Open, null, 0, MemoryMappedFileAccess.Read))
+            using (var accessor = file.CreateViewAccessor(_offsets[col], _sizes[col], MemoryMappedFileAccess.Read))
+            {
+                var res = read(accessor, _length);
+                Interlocked.Add(ref _loadedBytes, _sizes[col]);
+                return res;
+            }
+        }
+
+        static T[] ReadValues<T>(MemoryMappedViewAccessor accessor, long position, int count)
+            where T : struct
+        {
+            var res = new T[count];
+            if (count > 0)
+                accessor.ReadArray(position, res, 0, count);
+            return res;
+        }
+
+        static bool[] ReadBools(MemoryMappedViewAccessor accessor, long position, int count)
+        {
+            var bytes = ReadValues<byte>(accessor, position, count);
+            var res = new bool[count];
+            Buffer.BlockCopy(bytes, 0, res, 0, count);
+            return res;
+        }
+
+        /// <summary>
+        /// Reads <paramref name="count"/> strings, they all share the same buffer.
+        /// </summary>
+        static DvText[] ReadTexts(MemoryMappedViewAccessor accessor, long position, int count, out long size)
+        {
+            var offsets = ReadValues<long>(accessor, position, count + 1);
+            var bytes = ReadValues<byte>(accessor, position + (count + 1) * 8L, (int)offsets[count]);
+            size = (count + 1) * 8L + bytes.Length;
+            var chars = new char[bytes.Length];
+            var res = new DvText[count];
+            int pos = 0;
+            for (int i = 0; i < count; ++i)
+            {
+                int nb = Encoding.UTF8.GetChars(bytes, (int)offsets[i], (int)(offsets[i + 1] - offsets[i]), chars, pos);
+                res[i] = new DvText(new ReadOnlyMemory<char>(chars, pos, nb));
+                pos += nb;
+            }
+            return res;
+        }
+
+        static VBufferEqSort<T>[] ReadVectors<T>(MemoryMappedViewAccessor accessor, int n, int itemSize,
+                                                 Func<MemoryMappedViewAccessor, long, int, T[]> readValues)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            var lengths = ReadValues<int>(accessor, 0, n);
+            var counts = ReadValues<int>(accessor, n * 4L, n);
+            long position = Align(n * 8L, 8);
+            var values = new T[n][];
+            for (int i = 0; i < n; ++i)
+            {
+                values[i] = readValues(accessor, position, counts[i]);
+                position += (long)counts[i] * itemSize;
+            }
+            return ReadIndices(accessor, Align(position, 8), lengths, counts, values);
+        }
+
+        static VBufferEqSort<DvText>[] ReadTextVectors(MemoryMappedViewAccessor accessor, int n)
+        {
+            var lengths = ReadValues<int>(accessor, 0, n);
+            var counts = ReadValues<int>(accessor, n * 4L, n);
+            long position = Align(n * 8L, 8);
+            long size;
+            var texts = ReadTexts(accessor, position, counts.Sum(), out size);
+            var values = new DvText[n][];
+            int pos = 0;
+            for (int i = 0; i < n; ++i)
+            {
+                values[i] = new DvText[counts[i]];
+                Array.Copy(texts, pos, values[i], 0, counts[i]);
+                pos += counts[i];
+            }
+            return ReadIndices(accessor, Align(position + size, 8), lengths, counts, values);
+        }
+
+        static VBufferEqSort<T>[] ReadIndices<T>(MemoryMappedViewAccessor accessor, long position,
+                                                 int[] lengths, int[] counts, T[][] values)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            var res = new VBufferEqSort<T>[lengths.Length];
+            for (int i = 0; i < res.Length; ++i)
+            {
+                if (counts[i] == lengths[i])
+                    res[i] = new VBufferEqSort<T>(lengths[i], values[i]);
+                else
+                {
+                    var indices = ReadValues<int>(accessor, position, counts[i]);
+                    position += counts[i] * 4L;
+                    res[i] = new VBufferEqSort<T>(lengths[i], counts[i], values[i], indices);
+                }
+            }
+            return res;
+        }
+
+        static long Align(long position, int alignment)
+        {
+            long r = position % alignment;
+            return r == 0 ? position : position + alignment - r;
+        }
+
+        #endregion
+
+        #region write
+
+        /// <summary>
+        /// Saves a dataframe in the columnar format.
+        /// </summary>
+        /// <param name="df">dataframe</param>
+        /// <param name="filename">filename</param>
+        public static void Write(DataFrame df, string filename)
+        {
+            using (var stream = new FileStream(filename, FileMode.Create, FileAccess.ReadWrite))
+                Write(df, stream);
+        }
+
+        /// <summary>
+        /// Saves a dataframe in the columnar format.
+        /// </summary>
+        /// <param name="df">dataframe</param>
+        /// <param name="stream">stream, it must be seekable</param>
+        public static void Write(DataFrame df, Stream stream)
+        {
+            if (!stream.CanSeek)
+                throw new DataValueError("The stream must be seekable.");
+            var names = df.Columns;
+            var kinds = df.Kinds;
+            int n = df.Length;
+            var buffer = new byte[1 << 16];
+            using (var writer = new BinaryWriter(stream, Encoding.UTF8, true))
+            {
+                writer.Write(Encoding.ASCII.GetBytes(Magic));
+                writer.Write(Version);
+                writer.Write(names.Length);
+                writer.Write(n);
+                for (int i = 0; i < names.Length; ++i)
+                {
+                    writer.Write(names[i]);
+                    WriteType(writer, kinds[i]);
+                }
+
+                long table = stream.Position;
+                for (int i = 0; i < names.Length; ++i)
+                {
+                    writer.Write(0L);
+                    writer.Write(0L);
+                }
+
+                var offsets = new long[names.Length];
+                var sizes = new long[names.Length];
+                for (int i = 0; i < names.Length; ++i)
+                {
+                    Pad(writer, Alignment);
+                    offsets[i] = stream.Position;
+                    WriteColumn(writer, df.GetColumn(i).Column, kinds[i], n, buffer);
+                    sizes[i] = stream.Position - offsets[i];
+                }
+
+                long end = stream.Position;
+                stream.Seek(table, SeekOrigin.Begin);
+                for (int i = 0; i < names.Length; ++i)
+                {
+                    writer.Write(offsets[i]);
+                    writer.Write(sizes[i]);
+                }
+                stream.Seek(end, SeekOrigin.Begin);
+            }
+        }
+
+        static void WriteType(BinaryWriter writer, ColumnType type)
+        {
+            var item = type.IsVector() ? type.ItemType() : type;
+            writer.Write(type.IsVector());
+            writer.Write(type.VectorSize());
+            writer.Write((byte)item.RawKind());
+            writer.Write(item.IsKey());
+            if (item.IsKey())
+            {
+                var key = item.AsKey();
+                writer.Write(key.Min);
+                writer.Write(key.Count);
+                writer.Write(key.Contiguous);
+            }
+        }
+
+        static void Pad(BinaryWriter writer, int alignment)
+        {
+            long position = writer.BaseStream.Position;
+            long aligned = Align(position, alignment);
+            for (; position < aligned; ++position)
+                writer.Write((byte)0);
+        }
+
+        static void WriteColumn(BinaryWriter writer, IDataColumn column, ColumnType kind, int n, byte[] buffer)
+        {
+            if (kind.IsVector())
+            {
+                switch (kind.ItemType().RawKind())
+                {
+                    case DataKind.BL: WriteVectors(writer, GetRaw<VBufferEqSort<bool>>(column), n, 1, buffer); break;
+                    case DataKind.I4: WriteVectors(writer, GetRaw<VBufferEqSort<int>>(column), n, 4, buffer); break;
+                    case DataKind.U4: WriteVectors(writer, GetRaw<VBufferEqSort<uint>>(column), n, 4, buffer); break;
+                    case DataKind.I8: WriteVectors(writer, GetRaw<VBufferEqSort<long>>(column), n, 8, buffer); break;
+                    case DataKind.R4: WriteVectors(writer, GetRaw<VBufferEqSort<float>>(column), n, 4, buffer); break;
+                    case DataKind.R8: WriteVectors(writer, GetRaw<VBufferEqSort<double>>(column), n, 8, buffer); break;
+                    case DataKind.TX: WriteTextVectors(writer, GetRaw<VBufferEqSort<DvText>>(column), n, buffer); break;
+                    default:
+                        throw new DataTypeError($"Type {kind} is not handled.");
+                }
+            }
+            else
+            {
+                switch (kind.RawKind())
+                {
+                    case DataKind.BL: WriteValues(writer, GetRaw<bool>(column), 0, n, 1, buffer); break;
+                    case DataKind.I4: WriteValues(writer, GetRaw<int>(column), 0, n, 4, buffer); break;
+                    case DataKind.U4: WriteValues(writer, GetRaw<uint>(column), 0, n, 4, buffer); break;
+                    case DataKind.I8: WriteValues(writer, GetRaw<long>(column), 0, n, 8, buffer); break;
+                    case DataKind.R4: WriteValues(writer, GetRaw<float>(column), 0, n, 4, buffer); break;
+                    case DataKind.R8: WriteValues(writer, GetRaw<double>(column), 0, n, 8, buffer); break;
+                    case DataKind.TX: WriteTexts(writer, GetRaw<DvText>(column).Take(n), n, buffer); break;
+                    default:
+                        throw new DataTypeError($"Type {kind} is not handled.");
+                }
+            }
+        }
+
+        static DType[] GetRaw<DType>(IDataColumn column)
+            where DType : IEquatable<DType>, IComparable<DType>
+        {
+            var typed = column as DataColumn<DType>;
+            if (typed == null)
+                throw new DataTypeError($"Unexpected column type {column.GetType()}, expected {typeof(DataColumn<DType>)}.");
+            return typed.RawData;
+        }
+
+        /// <summary>
+        /// Writes an array of primitive values (bool, int, uint, long, float, double).
+        /// </summary>
+        static void WriteValues<T>(BinaryWriter writer, T[] values, int offset, int count, int itemSize, byte[] buffer)
+            where T : struct
+        {
+            int chunk = buffer.Length / itemSize;
+            for (int i = 0; i < count; i += chunk)
+            {
+                int nb = Math.Min(chunk, count - i);
+                Buffer.BlockCopy(values, (offset + i) * itemSize, buffer, 0, nb * itemSize);
+                writer.Write(buffer, 0, nb * itemSize);
+            }
+        }
+
+        /// <summary>
+        /// Writes the offsets of every string and the string heap.
+        /// The offsets are only known once the heap is written,
+        /// they are written at the end.
+        /// </summary>
+        static void WriteTexts(BinaryWriter writer, IEnumerable<DvText> values, int count, byte[] buffer)
+        {
+            var stream = writer.BaseStream;
+            var offsets = new long[count + 1];
+            long start = stream.Position;
+            WriteValues(writer, offsets, 0, offsets.Length, 8, buffer);
+
+            int i = 0;
+            foreach (var value in values)
+            {
+                var s = value.ToString();
+                int nb = Encoding.UTF8.GetByteCount(s);
+                if (nb > buffer.Length)
+                    buffer = new byte[nb];
+                Encoding.UTF8.GetBytes(s, 0, s.Length, buffer, 0);
+                writer.Write(buffer, 0, nb);
+                offsets[i + 1] = offsets[i] + nb;
+                ++i;
+            }
+            if (i != count)
+                throw new DataValueError($"Unexpected number of strings {i} != {count}.");
+
+            long end = stream.Position;
+            stream.Seek(start, SeekOrigin.Begin);
+            WriteValues(writer, offsets, 0, offsets.Length, 8, buffer);
+            stream.Seek(end, SeekOrigin.Begin);
+        }
+
+        static void WriteVectorHeader<T>(BinaryWriter writer, VBufferEqSort<T>[] values, int n, byte[] buffer)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            var lengths = new int[n];
+            var counts = new int[n];
+            for (int i = 0; i < n; ++i)
+            {
+                lengths[i] = values[i].Length;
+                counts[i] = values[i].Count;
+            }
+            WriteValues(writer, lengths, 0, n, 4, buffer);
+            WriteValues(writer, counts, 0, n, 4, buffer);
+            Pad(writer, 8);
+        }
+
+        static void WriteVectorIndices<T>(BinaryWriter writer, VBufferEqSort<T>[] values, int n, byte[] buffer)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            Pad(writer, 8);
+            for (int i = 0; i < n; ++i)
+                if (!values[i].IsDense)
+                    WriteValues(writer, values[i].Indices, 0, values[i].Count, 4, buffer);
+        }
+
+        static void WriteVectors<T>(BinaryWriter writer, VBufferEqSort<T>[] values, int n, int itemSize, byte[] buffer)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            WriteVectorHeader(writer, values, n, buffer);
+            for (int i = 0; i < n; ++i)
+                if (values[i].Count > 0)
+                    WriteValues(writer, values[i].Values, 0, values[i].Count, itemSize, buffer);
+            WriteVectorIndices(writer, values, n, buffer);
+        }
+
+        static void WriteTextVectors(BinaryWriter writer, VBufferEqSort<DvText>[] values, int n, byte[] buffer)
+        {
+            WriteVectorHeader(writer, values, n, buffer);
+            var texts = values.Take(n).SelectMany(v => v.Values == null ? Enumerable.Empty<DvText>() : v.Values.Take(v.Count));
+            WriteTexts(writer, texts, values.Take(n).Sum(v => v.Count), buffer);
+            WriteVectorIndices(writer, values, n, buffer);
+        }
+
+        #endregion
+    }
+}
@@ -282,15 +282,18 @@ namespace Scikit.ML.DataManipulation
         /// <param name="nrows">number of rows to read</param>
         /// <param name="guess_rows">number of rows used to guess types</param>
         /// <param name="index">add one column with the row index</param>
+        /// <param name="numThreads">number of threads used to parse the data, null for all cores</param>
         /// <returns>DataFrame</returns>
         public static DataFrame ReadStr(string content,
                                     char sep = ',', bool header = true,
                                     string[] names = null, ColumnType[] dtypes = null,
-                                    int nrows = -1, int guess_rows = 10, bool index = false)
+                                    int nrows = -1, int guess_rows = 10, bool index = false,
+                                    int? numThreads = 1)
         {
-            return ReadStream(() => new StreamReader(new MemoryStream(Encoding.UTF8.GetBytes(content))),
+            var bytes = Encoding.UTF8.GetBytes(content);
+            return ReadStream(() => new StreamReader(new MemoryStream(bytes)),
                               sep: sep, header: header, names: names, dtypes: dtypes, nrows: nrows,
-                              guess_rows: guess_rows, index: index);
+                              guess_rows: guess_rows, index: index, numThreads: numThreads);
         }
 
         /// <summary>
@@ -306,16 +309,18 @@ namespace Scikit.ML.DataManipulation
         /// <param name="guess_rows">number of rows used to guess types</param>
         /// <param name="encoding">text encoding</param>
         /// <param name="index">add one column with the row index</param>
+        /// <param name="numThreads">number of threads used to parse the data, null for all cores</param>
         /// <returns>DataFrame</returns>
         public static DataFrame ReadCsv(string filename,
                                 char sep = ',', bool header = true,
                                 string[] names = null, ColumnType[] dtypes = null,
                                 int nrows = -1, int guess_rows = 10,
-                                Encoding encoding = null, bool index = false)
+                                Encoding encoding = null, bool index = false,
+                                int? numThreads = 1)
         {
             return ReadStream(() => new StreamReader(filename, encoding ?? Encoding.ASCII),
                               sep: sep, header: header, names: names, dtypes: dtypes, nrows: nrows,
-                              guess_rows: guess_rows, index: index);
+                              guess_rows: guess_rows, index: index, numThreads: numThreads);
         }
 
         public delegate StreamReader FunctionCreateStreamReader();
@@ -332,21 +337,33 @@ namespace Scikit.ML.DataManipulation
         /// <param name="nrows">number of rows to read</param>
         /// <param name="guess_rows">number of rows used to guess types</param>
         /// <param name="index">add one column with the row index</param>
+        /// <param name="numThreads">number of threads used to parse the data, null for all cores,
+        /// if greater than 1, the stream is split into chunks parsed in parallel,
+        /// the stream must be seekable, otherwise it is read by a single thread</param>
         /// <returns>DataFrame</returns>
         public static DataFrame ReadStream(FunctionCreateStreamReader createStream,
                                 char sep = ',', bool header = true,
                                 string[] names = null, ColumnType[] dtypes = null,
-                                int nrows = -1, int guess_rows = 10, bool index = false)
+                                int nrows = -1, int guess_rows = 10, bool index = false,
+                                int? numThreads = 1)
         {
             var lines = new List<string[]>();
             int rowline = 0;
 
+            // Counts lines with multiple threads if possible,
+            // only the first rows are needed to guess the schema.
+            int nth = numThreads.HasValue ? numThreads.Value : Environment.ProcessorCount;
+            var chunks = nth > 1 && nrows == -1 ? CsvChunkReader.Create(createStream, header, nth, sep) : null;
+            // A line after the first guess_rows may have more columns.
+            int maxCol = 0;
+
             // First pass: schema and number of rows.
             using (var st = createStream())
             {
                 string line = st.ReadLine();
                 int nbline = 0;
-                while (line != null && (nrows == -1 || rowline < nrows))
+                while (line != null && (nrows == -1 || rowline < nrows) &&
+                       (chunks == null || lines.Count < guess_rows))
                 {
                     var spl = line.Split(sep);
                     if (header && nbline == 0)
@@ -357,6 +374,7 @@ namespace Scikit.ML.DataManipulation
                     else
                     {
                         ++rowline;
+                        maxCol = Math.Max(maxCol, spl.Length);
                         if (lines.Count < guess_rows)
                             lines.Add(spl);
                     }
@@ -367,6 +385,11 @@ namespace Scikit.ML.DataManipulation
 
             if (lines.Count == 0)
                 throw new FormatException("File is empty.");
+            if (chunks != null)
+            {
+                rowline = chunks.Length;
+                maxCol = chunks.MaxColumns;
+            }
             int numCol = lines.Select(c => c.Length).Max();
             var df = new DataFrame();
 
@@ -381,26 +404,42 @@ namespace Scikit.ML.DataManipulation
                             rowline);
             }
 
+            // Columns only found after the first guess_rows lines are text columns,
+            // rows with less values keep the default value.
+            for (int i = numCol; i < maxCol; ++i)
+            {
+                df.AddColumn(names != null && i < names.Length ? names[i] : string.Format("c{0}", i),
+                            dtypes != null && i < dtypes.Length && dtypes[i] != null
+                                        ? dtypes[i]
+                                        : TextType.Instance,
+                            rowline);
+            }
+
             // Fills values.
-            using (var st = createStream())
+            if (chunks != null)
+                chunks.Fill(df, sep);
+            else
             {
-                string line = st.ReadLine();
-                int nbline = 0;
-                rowline = 0;
-                while (line != null && (nrows == -1 || rowline < nrows))
+                using (var st = createStream())
                 {
-                    var spl = line.Split(sep);
-                    if (header && nbline == 0)
+                    string line = st.ReadLine();
+                    int nbline = 0;
+                    rowline = 0;
+                    while (line != null && (nrows == -1 || rowline < nrows))
                     {
-                        // Skips.
+                        var spl = line.Split(sep);
+                        if (header && nbline == 0)
+                        {
+                            // Skips.
+                        }
+                        else
+                        {
+                            df.FillValues(rowline, spl);
+                            ++rowline;
+                        }
+                        ++nbline;
+                        line = st.ReadLine();
                     }
-                    else
-                    {
-                        df.FillValues(rowline, spl);
-                        ++rowline;
-                    }
-                    ++nbline;
-                    line = st.ReadLine();
                 }
             }
 
@@ -412,13 +451,30 @@ namespace Scikit.ML.DataManipulation
                     nameIndex += "_";
                 var indexValues = Enumerable.Range(0, df.Length).ToArray();
                 df.AddColumn(nameIndex, indexValues);
-                var newColumns = (new[] { nameIndex }).Concat(names).ToArray();
+                var newColumns = (new[] { nameIndex }).Concat(df.Columns.Where(c => c != nameIndex)).ToArray();
                 df.OrderColumns(newColumns);
             }
 
             return df;
         }
 
+        /// <summary>
+        /// Reads a file created with <see cref="DataFrame.ToColumnar"/>.
+        /// If lazy is true, every column is only read the first time it is accessed:
+        /// the file is memory mapped for the time of the read and closed after,
+        /// it is not kept open between two reads. <see cref="DataFrameColumnarFile"/>
+        /// keeps the file mapped until it is disposed.
+        /// </summary>
+        /// <param name="filename">filename</param>
+        /// <param name="columns">columns to retrieve, all if null</param>
+        /// <param name="lazy">read the columns on first access</param>
+        /// <returns><see cref="DataFrame"/></returns>
+        public static DataFrame ReadColumnar(string filename, IEnumerable<string> columns = null, bool lazy = true)
+        {
+            using (var file = new DataFrameColumnarFile(filename))
+                return file.ToDataFrame(columns, lazy, true);
+        }
+
         /// <summary>
         /// Converts a <see cref="IDataView"/> into a <see cref="DataFrame"/>.
         /// Follows pandas API.
@@ -102,4 +102,72 @@ namespace Scikit.ML.DataManipulation
             return Aggregate(AggregatedFunction.Count);
         }
     }
+
+    /// <summary>
+    /// Results of a group by computed with <see cref="DataFrameHashGrouping"/>.
+    /// Groups are not materialized, every aggregation goes through the data once.
+    /// </summary>
+    public class DataFrameHashGroupResults : IDataFrameViewGroupResults
+    {
+        IDataFrameView _df;
+        int[] _columns;
+        bool _sort;
+        int? _numThreads;
+
+        public DataFrameHashGroupResults(IDataFrameView df, IEnumerable<int> columns, bool sort = true, int? numThreads = null)
+        {
+            _df = df;
+            _columns = columns.ToArray();
+            _sort = sort;
+            _numThreads = numThreads;
+        }
+
+        /// <summary>
+        /// Aggregates over all rows.
+        /// </summary>
+        public DataFrame Aggregate(AggregatedFunction func)
+        {
+            return DataFrameHashGrouping.Aggregate(_df, _columns, func, _sort, _numThreads);
+        }
+
+        /// <summary>
+        /// Sum over all rows.
+        /// </summary>
+        public DataFrame Sum()
+        {
+            return Aggregate(AggregatedFunction.Sum);
+        }
+
+        /// <summary>
+        /// Min over all rows.
+        /// </summary>
+        public DataFrame Min()
+        {
+            return Aggregate(AggregatedFunction.Min);
+        }
+
+        /// <summary>
+        /// Max over all rows.
+        /// </summary>
+        public DataFrame Max()
+        {
+            return Aggregate(AggregatedFunction.Max);
+        }
+
+        /// <summary>
+        /// Average over all rows.
+        /// </summary>
+        public DataFrame Mean()
+        {
+            return Aggregate(AggregatedFunction.Mean);
+        }
+
+        /// <summary>
+        /// Number of rows in every group.
+        /// </summary>
+        public DataFrame Count()
+        {
+            return Aggregate(AggregatedFunction.Count);
+        }
+    }
 }
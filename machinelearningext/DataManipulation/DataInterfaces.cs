@@ -37,6 +37,30 @@ namespace Scikit.ML.DataManipulation
         Row = 2
     }
 
+    /// <summary>
+    /// Arithmetic operations implemented by <see cref="DataFrameOpVectorized"/>.
+    /// </summary>
+    public enum VectorOperation
+    {
+        Addition = 1,
+        Soustraction = 2,
+        Multiplication = 3,
+        Division = 4
+    }
+
+    /// <summary>
+    /// Comparisons implemented by <see cref="DataFrameOpVectorized"/>.
+    /// </summary>
+    public enum VectorComparison
+    {
+        Equal = 1,
+        NotEqual = 2,
+        Sup = 3,
+        SupEqual = 4,
+        Inf = 5,
+        InfEqual = 6
+    }
+
     /// <summary>
     /// Interface for a data container held by a dataframe.
     /// </summary>
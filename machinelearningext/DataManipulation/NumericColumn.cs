@@ -120,6 +120,22 @@ namespace Scikit.ML.DataManipulation
             throw new NotImplementedException("This function must be overwritten.");
         }
 
+        #region in place
+
+        /// <summary>
+        /// Replaces the column by <i>this op c2</i> without allocating a new column.
+        /// Both columns must have the same numerical type.
+        /// </summary>
+        public void InPlace(VectorOperation op, NumericColumn c2) { DataFrameOpVectorized.InPlace(op, this, c2); }
+
+        /// <summary>
+        /// Replaces the column by <i>this op value</i> without allocating a new column.
+        /// <i>T</i> must be the type of the column.
+        /// </summary>
+        public void InPlace<T>(VectorOperation op, T value) where T : struct, IEquatable<T>, IComparable<T> { DataFrameOpVectorized.InPlace(op, this, value); }
+
+        #endregion
+
         #region +
 
         public static NumericColumn operator +(NumericColumn c1, NumericColumn c2) { return DataFrameOpAdditionHelper.Operation(c1, c2); }
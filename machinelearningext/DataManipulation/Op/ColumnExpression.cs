@@ -0,0 +1,448 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Expression over numerical columns such as <c>(a + b) * c &gt; d</c>
+    /// evaluated in one pass over the data. Rows are processed by blocks of
+    /// <see cref="BlockSize"/> elements, every node of the expression
+    /// keeps one buffer of that size, no temporary column is allocated.
+    /// All numerical columns must share the same type, constants are
+    /// converted into that type and must be integers if the columns are.
+    /// Operations rely on <see cref="DataFrameOpVectorized"/>.
+    /// Operators <c>==</c> and <c>!=</c> build comparisons,
+    /// <see cref="Equals(object)"/> compares references.
+    /// </summary>
+    public class ColumnExpression
+    {
+        #region members and constructors
+
+        /// <summary>
+        /// Number of rows processed at once.
+        /// </summary>
+        public const int BlockSize = 4096;
+
+        enum NodeType
+        {
+            Column = 1,
+            Constant = 2,
+            Operation = 3,
+            Comparison = 4,
+            And = 5,
+            Or = 6,
+            Not = 7
+        }
+
+        readonly NodeType _type;
+        readonly NumericColumn _column;
+        readonly double _constant;
+        readonly VectorOperation _operation;
+        readonly VectorComparison _comparison;
+        readonly ColumnExpression _left;
+        readonly ColumnExpression _right;
+        readonly bool _negation;
+
+        ColumnExpression(NodeType type, ColumnExpression left = null, ColumnExpression right = null)
+        {
+            _type = type;
+            _left = left;
+            _right = right;
+        }
+
+        ColumnExpression(VectorOperation op, ColumnExpression left, ColumnExpression right) :
+            this(NodeType.Operation, left, right)
+        {
+            if (left.IsBoolean || right.IsBoolean)
+                throw new DataTypeError($"{op} cannot be applied on a boolean expression.");
+            _operation = op;
+        }
+
+        /// <summary>
+        /// Negation, computed as a multiplication by -1.
+        /// </summary>
+        ColumnExpression(ColumnExpression e1) : this(VectorOperation.Multiplication, e1, Constant(-1))
+        {
+            _negation = true;
+        }
+
+        ColumnExpression(VectorComparison op, ColumnExpression left, ColumnExpression right) :
+            this(NodeType.Comparison, left, right)
+        {
+            if (left.IsBoolean || right.IsBoolean)
+                throw new DataTypeError($"{op} cannot be applied on a boolean expression.");
+            _comparison = op;
+        }
+
+        /// <summary>
+        /// Creates a leaf of the expression from a column.
+        /// </summary>
+        public static ColumnExpression Column(NumericColumn column)
+        {
+            if (column.Kind.IsVector() || (column.Kind.RawKind() != DataKind.BL && !DataFrameOpVectorized.IsVectorizable(column.Kind)))
+                throw new DataTypeError($"Type {column.Kind} cannot be used in an expression.");
+            return new ColumnExpression(column);
+        }
+
+        ColumnExpression(NumericColumn column) : this(NodeType.Column)
+        {
+            _column = column;
+        }
+
+        /// <summary>
+        /// Creates a constant.
+        /// </summary>
+        public static ColumnExpression Constant(double value)
+        {
+            return new ColumnExpression(value);
+        }
+
+        ColumnExpression(double value) : this(NodeType.Constant)
+        {
+            _constant = value;
+        }
+
+        /// <summary>
+        /// Tells if the expression produces booleans.
+        /// </summary>
+        public bool IsBoolean
+        {
+            get
+            {
+                switch (_type)
+                {
+                    case NodeType.Column: return _column.Kind.RawKind() == DataKind.BL;
+                    case NodeType.Constant:
+                    case NodeType.Operation: return false;
+                    default: return true;
+                }
+            }
+        }
+
+        #endregion
+
+        #region operators
+
+        public static implicit operator ColumnExpression(NumericColumn column) { return Column(column); }
+
+        public static ColumnExpression operator +(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Addition, e1, e2); }
+        public static ColumnExpression operator +(ColumnExpression e1, double value) { return new ColumnExpression(VectorOperation.Addition, e1, Constant(value)); }
+        public static ColumnExpression operator +(double value, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Addition, Constant(value), e2); }
+        public static ColumnExpression operator -(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Soustraction, e1, e2); }
+        public static ColumnExpression operator -(ColumnExpression e1, double value) { return new ColumnExpression(VectorOperation.Soustraction, e1, Constant(value)); }
+        public static ColumnExpression operator -(double value, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Soustraction, Constant(value), e2); }
+        public static ColumnExpression operator -(ColumnExpression e1) { return new ColumnExpression(e1); }
+        public static ColumnExpression operator *(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Multiplication, e1, e2); }
+        public static ColumnExpression operator *(ColumnExpression e1, double value) { return new ColumnExpression(VectorOperation.Multiplication, e1, Constant(value)); }
+        public static ColumnExpression operator *(double value, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Multiplication, Constant(value), e2); }
+        public static ColumnExpression operator /(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Division, e1, e2); }
+        public static ColumnExpression operator /(ColumnExpression e1, double value) { return new ColumnExpression(VectorOperation.Division, e1, Constant(value)); }
+        public static ColumnExpression operator /(double value, ColumnExpression e2) { return new ColumnExpression(VectorOperation.Division, Constant(value), e2); }
+
+        public override bool Equals(object o) { return ReferenceEquals(this, o); }
+        public override int GetHashCode() { return base.GetHashCode(); }
+
+        public static ColumnExpression operator ==(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Equal, e1, e2); }
+        public static ColumnExpression operator ==(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.Equal, e1, Constant(value)); }
+        public static ColumnExpression operator ==(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Equal, Constant(value), e2); }
+        public static ColumnExpression operator !=(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.NotEqual, e1, e2); }
+        public static ColumnExpression operator !=(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.NotEqual, e1, Constant(value)); }
+        public static ColumnExpression operator !=(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.NotEqual, Constant(value), e2); }
+        public static ColumnExpression operator >(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Sup, e1, e2); }
+        public static ColumnExpression operator >(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.Sup, e1, Constant(value)); }
+        public static ColumnExpression operator >(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Sup, Constant(value), e2); }
+        public static ColumnExpression operator >=(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.SupEqual, e1, e2); }
+        public static ColumnExpression operator >=(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.SupEqual, e1, Constant(value)); }
+        public static ColumnExpression operator >=(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.SupEqual, Constant(value), e2); }
+        public static ColumnExpression operator <(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Inf, e1, e2); }
+        public static ColumnExpression operator <(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.Inf, e1, Constant(value)); }
+        public static ColumnExpression operator <(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.Inf, Constant(value), e2); }
+        public static ColumnExpression operator <=(ColumnExpression e1, ColumnExpression e2) { return new ColumnExpression(VectorComparison.InfEqual, e1, e2); }
+        public static ColumnExpression operator <=(ColumnExpression e1, double value) { return new ColumnExpression(VectorComparison.InfEqual, e1, Constant(value)); }
+        public static ColumnExpression operator <=(double value, ColumnExpression e2) { return new ColumnExpression(VectorComparison.InfEqual, Constant(value), e2); }
+
+        public static ColumnExpression operator &(ColumnExpression e1, ColumnExpression e2) { return Logical(NodeType.And, e1, e2); }
+        public static ColumnExpression operator |(ColumnExpression e1, ColumnExpression e2) { return Logical(NodeType.Or, e1, e2); }
+        public static ColumnExpression operator !(ColumnExpression e1) { return Logical(NodeType.Not, e1, null); }
+
+        static ColumnExpression Logical(NodeType type, ColumnExpression e1, ColumnExpression e2)
+        {
+            if (!e1.IsBoolean || (!(e2 is null) && !e2.IsBoolean))
+                throw new DataTypeError($"{type} can only be applied on boolean expressions.");
+            return new ColumnExpression(type, e1, e2);
+        }
+
+        #endregion
+
+        #region evaluation
+
+        delegate T[] BlockGetter<T>(int start, int count, out int offset);
+
+        /// <summary>
+        /// Evaluates the expression. The result is a boolean column if the
+        /// last operation is a comparison, a column of the same type as
+        /// the numerical columns otherwise.
+        /// </summary>
+        public NumericColumn Evaluate()
+        {
+            var columns = new List<NumericColumn>();
+            Gather(columns);
+            if (columns.Count == 0)
+                throw new DataValueError("An expression must contain at least one column.");
+            int length = columns[0].Length;
+            if (columns.Any(c => c.Length != length))
+                throw new DataValueError($"All columns must have the same length ({string.Join(", ", columns.Select(c => c.Length))}).");
+            var kinds = columns.Select(c => c.Kind.RawKind()).Where(k => k != DataKind.BL).Distinct().ToArray();
+            if (kinds.Length > 1)
+                throw new DataTypeError($"All numerical columns must have the same type ({string.Join(", ", kinds)}).");
+            switch (kinds.Length == 0 ? DataKind.R8 : kinds[0])
+            {
+                case DataKind.I4: return Evaluate<int>(length);
+                case DataKind.U4: return Evaluate<uint>(length);
+                case DataKind.I8: return Evaluate<long>(length);
+                case DataKind.R4: return Evaluate<float>(length);
+                case DataKind.R8: return Evaluate<double>(length);
+                default:
+                    throw new DataTypeError($"Type {kinds[0]} cannot be used in an expression.");
+            }
+        }
+
+        void Gather(List<NumericColumn> columns)
+        {
+            if (_type == NodeType.Column)
+                columns.Add(_column);
+            _left?.Gather(columns);
+            _right?.Gather(columns);
+        }
+
+        NumericColumn Evaluate<T>(int length)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            if (IsBoolean)
+            {
+                var res = new bool[length];
+                var getter = CompileBoolean<T>(res);
+                Run(getter, res, length);
+                return new NumericColumn(new DataColumn<bool>(res));
+            }
+            else
+            {
+                var res = new T[length];
+                var getter = CompileNumeric(res);
+                Run(getter, res, length);
+                return new NumericColumn(new DataColumn<T>(res));
+            }
+        }
+
+        static void Run<TR>(BlockGetter<TR> getter, TR[] res, int length)
+        {
+            int offset;
+            for (int start = 0; start < length; start += BlockSize)
+            {
+                int count = Math.Min(BlockSize, length - start);
+                var block = getter(start, count, out offset);
+                // The root writes directly into the result unless it is a column.
+                if (block != res)
+                    Array.Copy(block, offset, res, start, count);
+            }
+        }
+
+        static T[] GetData<T>(NumericColumn column)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var col = column.Column as DataColumn<T>;
+            if (col is null)
+                throw new DataTypeError($"Unable to cast {column.Kind} into {typeof(T)}.");
+            return col.RawData;
+        }
+
+        /// <summary>
+        /// Returns a function computing a block of the expression.
+        /// If <i>output</i> is not null, the result is stored in it
+        /// at the same position as the block, otherwise it is stored
+        /// in a buffer owned by the node.
+        /// </summary>
+        BlockGetter<T> CompileNumeric<T>(T[] output = null)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            switch (_type)
+            {
+                case NodeType.Column:
+                    {
+                        var data = GetData<T>(_column);
+                        return (int start, int count, out int offset) => { offset = start; return data; };
+                    }
+                case NodeType.Constant:
+                    {
+                        var buffer = new T[BlockSize];
+                        var value = ConvertConstant<T>(_constant);
+                        for (int i = 0; i < buffer.Length; ++i)
+                            buffer[i] = value;
+                        return (int start, int count, out int offset) => { offset = 0; return buffer; };
+                    }
+                case NodeType.Operation:
+                    {
+                        if (_negation && typeof(T) == typeof(uint))
+                            throw new DataTypeError($"Columns of type {typeof(T).Name} cannot be negated.");
+                        var buffer = output ?? new T[BlockSize];
+                        bool shift = output != null;
+                        var op = _operation;
+                        if (_right._type == NodeType.Constant)
+                        {
+                            var left = _left.CompileNumeric<T>();
+                            var value = ConvertConstant<T>(_right._constant);
+                            return (int start, int count, out int offset) =>
+                            {
+                                int oa;
+                                var a = left(start, count, out oa);
+                                offset = shift ? start : 0;
+                                DataFrameOpVectorized.Operation(op, a, oa, value, buffer, offset, count);
+                                return buffer;
+                            };
+                        }
+                        else if (_left._type == NodeType.Constant)
+                        {
+                            var right = _right.CompileNumeric<T>();
+                            var value = ConvertConstant<T>(_left._constant);
+                            return (int start, int count, out int offset) =>
+                            {
+                                int ob;
+                                var b = right(start, count, out ob);
+                                offset = shift ? start : 0;
+                                DataFrameOpVectorized.ReverseOperation(op, value, b, ob, buffer, offset, count);
+                                return buffer;
+                            };
+                        }
+                        else
+                        {
+                            var left = _left.CompileNumeric<T>();
+                            var right = _right.CompileNumeric<T>();
+                            return (int start, int count, out int offset) =>
+                            {
+                                int oa, ob;
+                                var a = left(start, count, out oa);
+                                var b = right(start, count, out ob);
+                                offset = shift ? start : 0;
+                                DataFrameOpVectorized.Operation(op, a, oa, b, ob, buffer, offset, count);
+                                return buffer;
+                            };
+                        }
+                    }
+                default:
+                    throw new DataTypeError($"{_type} does not produce numbers.");
+            }
+        }
+
+        /// <summary>
+        /// Same as <see cref="CompileNumeric{T}"/> for boolean nodes,
+        /// <i>T</i> is the type of the numerical columns.
+        /// </summary>
+        BlockGetter<bool> CompileBoolean<T>(bool[] output = null)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var buffer = output ?? (_type == NodeType.Column ? null : new bool[BlockSize]);
+            bool shift = output != null;
+            switch (_type)
+            {
+                case NodeType.Column:
+                    {
+                        var data = GetData<bool>(_column);
+                        return (int start, int count, out int offset) => { offset = start; return data; };
+                    }
+                case NodeType.Comparison:
+                    {
+                        if (_right._type == NodeType.Constant || _left._type == NodeType.Constant)
+                        {
+                            bool swap = _right._type != NodeType.Constant;
+                            var op = swap ? DataFrameOpVectorized.Swap(_comparison) : _comparison;
+                            var side = (swap ? _right : _left).CompileNumeric<T>();
+                            var value = ConvertConstant<T>(swap ? _left._constant : _right._constant);
+                            return (int start, int count, out int offset) =>
+                            {
+                                int oa;
+                                var a = side(start, count, out oa);
+                                offset = shift ? start : 0;
+                                DataFrameOpVectorized.Comparison(op, a, oa, value, buffer, offset, count);
+                                return buffer;
+                            };
+                        }
+                        else
+                        {
+                            var op = _comparison;
+                            var left = _left.CompileNumeric<T>();
+                            var right = _right.CompileNumeric<T>();
+                            return (int start, int count, out int offset) =>
+                            {
+                                int oa, ob;
+                                var a = left(start, count, out oa);
+                                var b = right(start, count, out ob);
+                                offset = shift ? start : 0;
+                                DataFrameOpVectorized.Comparison(op, a, oa, b, ob, buffer, offset, count);
+                                return buffer;
+                            };
+                        }
+                    }
+                case NodeType.Not:
+                    {
+                        var left = _left.CompileBoolean<T>();
+                        return (int start, int count, out int offset) =>
+                        {
+                            int oa;
+                            var a = left(start, count, out oa);
+                            offset = shift ? start : 0;
+                            for (int i = 0; i < count; ++i)
+                                buffer[offset + i] = !a[oa + i];
+                            return buffer;
+                        };
+                    }
+                case NodeType.And:
+                case NodeType.Or:
+                    {
+                        bool and = _type == NodeType.And;
+                        var left = _left.CompileBoolean<T>();
+                        var right = _right.CompileBoolean<T>();
+                        return (int start, int count, out int offset) =>
+                        {
+                            int oa, ob;
+                            var a = left(start, count, out oa);
+                            var b = right(start, count, out ob);
+                            offset = shift ? start : 0;
+                            if (and)
+                                for (int i = 0; i < count; ++i)
+                                    buffer[offset + i] = a[oa + i] & b[ob + i];
+                            else
+                                for (int i = 0; i < count; ++i)
+                                    buffer[offset + i] = a[oa + i] | b[ob + i];
+                            return buffer;
+                        };
+                    }
+                default:
+                    throw new DataTypeError($"{_type} does not produce booleans.");
+            }
+        }
+
+        static T ConvertConstant<T>(double value)
+        {
+            if (typeof(T) == typeof(float) || typeof(T) == typeof(double))
+                return (T)Convert.ChangeType(value, typeof(T));
+            if (value != Math.Floor(value))
+                throw new DataValueError($"Constant {value} is not an integer, it cannot be used with columns of type {typeof(T).Name}.");
+            try
+            {
+                return (T)Convert.ChangeType(value, typeof(T));
+            }
+            catch (OverflowException)
+            {
+                throw new DataValueError($"Constant {value} is out of the range of type {typeof(T).Name}.");
+            }
+        }
+
+        #endregion
+    }
+}
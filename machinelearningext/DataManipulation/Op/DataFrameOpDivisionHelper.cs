@@ -29,6 +29,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, int value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryOperation(VectorOperation.Division, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -79,6 +82,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, Int64 value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryOperation(VectorOperation.Division, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -129,6 +135,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, float value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryOperation(VectorOperation.Division, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -179,6 +188,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, double value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryOperation(VectorOperation.Division, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -239,6 +251,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, NumericColumn c2)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryOperation(VectorOperation.Division, c1, c2, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -53,6 +53,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, int value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Equal, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -103,6 +106,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, long value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Equal, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -153,6 +159,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, float value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Equal, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -203,6 +212,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, double value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Equal, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -296,6 +308,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, NumericColumn c2)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Equal, c1, c2, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
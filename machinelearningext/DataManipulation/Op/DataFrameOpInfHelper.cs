@@ -30,6 +30,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, int value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Inf, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -80,6 +83,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, long value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Inf, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -130,6 +136,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, float value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Inf, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -180,6 +189,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, double value)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Inf, c1, value, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
@@ -273,6 +285,9 @@ namespace Scikit.ML.DataManipulation
 
         public static NumericColumn Operation(NumericColumn c1, NumericColumn c2)
         {
+            NumericColumn vec;
+            if (DataFrameOpVectorized.TryComparison(VectorComparison.Inf, c1, c2, out vec))
+                return vec;
             if (c1.Kind.IsVector())
                 throw new NotImplementedException();
             else
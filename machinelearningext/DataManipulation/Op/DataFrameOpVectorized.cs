@@ -0,0 +1,458 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Numerics;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Implements arithmetic operations and comparisons between dense numerical
+    /// columns of the same type (int, uint, long, float, double) with
+    /// <see cref="Vector{T}"/>. Every kernel works on a range of arrays
+    /// and can write its result into one of its inputs,
+    /// it is used by the operators of <see cref="NumericColumn"/>,
+    /// by the in place operations and by <see cref="ColumnExpression"/>.
+    /// </summary>
+    public static class DataFrameOpVectorized
+    {
+        #region operators
+
+        interface IVectorOperator<T> where T : struct
+        {
+            Vector<T> Apply(Vector<T> a, Vector<T> b);
+        }
+
+        struct AdditionOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return a + b; }
+        }
+
+        struct SoustractionOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return a - b; }
+        }
+
+        struct MultiplicationOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return a * b; }
+        }
+
+        struct DivisionOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return a / b; }
+        }
+
+        struct EqualOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return Vector.Equals(a, b); }
+        }
+
+        struct NotEqualOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return ~Vector.Equals(a, b); }
+        }
+
+        struct SupOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return Vector.GreaterThan(a, b); }
+        }
+
+        struct SupEqualOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return Vector.GreaterThanOrEqual(a, b); }
+        }
+
+        struct InfOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return Vector.LessThan(a, b); }
+        }
+
+        struct InfEqualOperator<T> : IVectorOperator<T> where T : struct
+        {
+            public Vector<T> Apply(Vector<T> a, Vector<T> b) { return Vector.LessThanOrEqual(a, b); }
+        }
+
+        #endregion
+
+        #region loops
+
+        // The last elements which do not fill a vector are processed
+        // one by one by broadcasting them into a vector, the results
+        // are the same as the ones of the scalar operators.
+
+        static void Apply<T, TOp>(T[] a, int offa, T[] b, int offb, T[] res, int offr, int count)
+            where T : struct
+            where TOp : struct, IVectorOperator<T>
+        {
+            var op = default(TOp);
+            int n = Vector<T>.Count;
+            int i = 0;
+            for (; i <= count - n; i += n)
+                op.Apply(new Vector<T>(a, offa + i), new Vector<T>(b, offb + i)).CopyTo(res, offr + i);
+            for (; i < count; ++i)
+                res[offr + i] = op.Apply(new Vector<T>(a[offa + i]), new Vector<T>(b[offb + i]))[0];
+        }
+
+        static void Apply<T, TOp>(T[] a, int offa, Vector<T> vb, T[] res, int offr, int count)
+            where T : struct
+            where TOp : struct, IVectorOperator<T>
+        {
+            var op = default(TOp);
+            int n = Vector<T>.Count;
+            int i = 0;
+            for (; i <= count - n; i += n)
+                op.Apply(new Vector<T>(a, offa + i), vb).CopyTo(res, offr + i);
+            for (; i < count; ++i)
+                res[offr + i] = op.Apply(new Vector<T>(a[offa + i]), vb)[0];
+        }
+
+        static void Apply<T, TOp>(Vector<T> va, T[] b, int offb, T[] res, int offr, int count)
+            where T : struct
+            where TOp : struct, IVectorOperator<T>
+        {
+            var op = default(TOp);
+            int n = Vector<T>.Count;
+            int i = 0;
+            for (; i <= count - n; i += n)
+                op.Apply(va, new Vector<T>(b, offb + i)).CopyTo(res, offr + i);
+            for (; i < count; ++i)
+                res[offr + i] = op.Apply(va, new Vector<T>(b[offb + i]))[0];
+        }
+
+        /// <summary>
+        /// A comparison returns a mask, every element is zero or has all its bits set.
+        /// </summary>
+        static void Mask<T>(Vector<T> mask, bool[] res, int offr) where T : struct
+        {
+            var bytes = Vector.AsVectorByte(mask);
+            int step = Vector<byte>.Count / Vector<T>.Count;
+            for (int j = 0; j < Vector<T>.Count; ++j)
+                res[offr + j] = bytes[j * step] != 0;
+        }
+
+        static void Compare<T, TOp>(T[] a, int offa, T[] b, int offb, bool[] res, int offr, int count)
+            where T : struct
+            where TOp : struct, IVectorOperator<T>
+        {
+            var op = default(TOp);
+            int n = Vector<T>.Count;
+            int i = 0;
+            for (; i <= count - n; i += n)
+                Mask(op.Apply(new Vector<T>(a, offa + i), new Vector<T>(b, offb + i)), res, offr + i);
+            for (; i < count; ++i)
+                res[offr + i] = Vector.AsVectorByte(op.Apply(new Vector<T>(a[offa + i]), new Vector<T>(b[offb + i])))[0] != 0;
+        }
+
+        static void Compare<T, TOp>(T[] a, int offa, Vector<T> vb, bool[] res, int offr, int count)
+            where T : struct
+            where TOp : struct, IVectorOperator<T>
+        {
+            var op = default(TOp);
+            int n = Vector<T>.Count;
+            int i = 0;
+            for (; i <= count - n; i += n)
+                Mask(op.Apply(new Vector<T>(a, offa + i), vb), res, offr + i);
+            for (; i < count; ++i)
+                res[offr + i] = Vector.AsVectorByte(op.Apply(new Vector<T>(a[offa + i]), vb))[0] != 0;
+        }
+
+        #endregion
+
+        #region kernels
+
+        /// <summary>
+        /// Computes <i>res[offr + i] = a[offa + i] op b[offb + i]</i> for i in [0, count[.
+        /// <i>res</i> can be <i>a</i> or <i>b</i>.
+        /// </summary>
+        public static void Operation<T>(VectorOperation op, T[] a, int offa, T[] b, int offb, T[] res, int offr, int count)
+            where T : struct
+        {
+            switch (op)
+            {
+                case VectorOperation.Addition: Apply<T, AdditionOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorOperation.Soustraction: Apply<T, SoustractionOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorOperation.Multiplication: Apply<T, MultiplicationOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorOperation.Division: Apply<T, DivisionOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                default:
+                    throw new NotImplementedException($"Unknown operation '{op}'.");
+            }
+        }
+
+        /// <summary>
+        /// Computes <i>res[offr + i] = a[offa + i] op value</i> for i in [0, count[.
+        /// </summary>
+        public static void Operation<T>(VectorOperation op, T[] a, int offa, T value, T[] res, int offr, int count)
+            where T : struct
+        {
+            var vb = new Vector<T>(value);
+            switch (op)
+            {
+                case VectorOperation.Addition: Apply<T, AdditionOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorOperation.Soustraction: Apply<T, SoustractionOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorOperation.Multiplication: Apply<T, MultiplicationOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorOperation.Division: Apply<T, DivisionOperator<T>>(a, offa, vb, res, offr, count); break;
+                default:
+                    throw new NotImplementedException($"Unknown operation '{op}'.");
+            }
+        }
+
+        /// <summary>
+        /// Computes <i>res[offr + i] = value op b[offb + i]</i> for i in [0, count[.
+        /// </summary>
+        public static void ReverseOperation<T>(VectorOperation op, T value, T[] b, int offb, T[] res, int offr, int count)
+            where T : struct
+        {
+            var va = new Vector<T>(value);
+            switch (op)
+            {
+                case VectorOperation.Addition: Apply<T, AdditionOperator<T>>(va, b, offb, res, offr, count); break;
+                case VectorOperation.Soustraction: Apply<T, SoustractionOperator<T>>(va, b, offb, res, offr, count); break;
+                case VectorOperation.Multiplication: Apply<T, MultiplicationOperator<T>>(va, b, offb, res, offr, count); break;
+                case VectorOperation.Division: Apply<T, DivisionOperator<T>>(va, b, offb, res, offr, count); break;
+                default:
+                    throw new NotImplementedException($"Unknown operation '{op}'.");
+            }
+        }
+
+        /// <summary>
+        /// Computes <i>res[offr + i] = a[offa + i] op b[offb + i]</i> for i in [0, count[.
+        /// </summary>
+        public static void Comparison<T>(VectorComparison op, T[] a, int offa, T[] b, int offb, bool[] res, int offr, int count)
+            where T : struct
+        {
+            switch (op)
+            {
+                case VectorComparison.Equal: Compare<T, EqualOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorComparison.NotEqual: Compare<T, NotEqualOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorComparison.Sup: Compare<T, SupOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorComparison.SupEqual: Compare<T, SupEqualOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorComparison.Inf: Compare<T, InfOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                case VectorComparison.InfEqual: Compare<T, InfEqualOperator<T>>(a, offa, b, offb, res, offr, count); break;
+                default:
+                    throw new NotImplementedException($"Unknown comparison '{op}'.");
+            }
+        }
+
+        /// <summary>
+        /// Computes <i>res[offr + i] = a[offa + i] op value</i> for i in [0, count[.
+        /// </summary>
+        public static void Comparison<T>(VectorComparison op, T[] a, int offa, T value, bool[] res, int offr, int count)
+            where T : struct
+        {
+            var vb = new Vector<T>(value);
+            switch (op)
+            {
+                case VectorComparison.Equal: Compare<T, EqualOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorComparison.NotEqual: Compare<T, NotEqualOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorComparison.Sup: Compare<T, SupOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorComparison.SupEqual: Compare<T, SupEqualOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorComparison.Inf: Compare<T, InfOperator<T>>(a, offa, vb, res, offr, count); break;
+                case VectorComparison.InfEqual: Compare<T, InfEqualOperator<T>>(a, offa, vb, res, offr, count); break;
+                default:
+                    throw new NotImplementedException($"Unknown comparison '{op}'.");
+            }
+        }
+
+        /// <summary>
+        /// Returns the comparison to use when both sides are swapped.
+        /// </summary>
+        public static VectorComparison Swap(VectorComparison op)
+        {
+            switch (op)
+            {
+                case VectorComparison.Sup: return VectorComparison.Inf;
+                case VectorComparison.SupEqual: return VectorComparison.InfEqual;
+                case VectorComparison.Inf: return VectorComparison.Sup;
+                case VectorComparison.InfEqual: return VectorComparison.SupEqual;
+                default: return op;
+            }
+        }
+
+        #endregion
+
+        #region columns
+
+        /// <summary>
+        /// Tells if a column can be processed by this class.
+        /// </summary>
+        public static bool IsVectorizable(ColumnType kind)
+        {
+            if (kind.IsVector())
+                return false;
+            switch (kind.RawKind())
+            {
+                case DataKind.I4:
+                case DataKind.U4:
+                case DataKind.I8:
+                case DataKind.R4:
+                case DataKind.R8:
+                    return true;
+                default:
+                    return false;
+            }
+        }
+
+        /// <summary>
+        /// Computes the operation if both columns are dense, have the same type and the same length.
+        /// Returns false otherwise and the caller falls back to the generic implementation.
+        /// </summary>
+        public static bool TryOperation(VectorOperation op, NumericColumn c1, NumericColumn c2, out NumericColumn res)
+        {
+            res = null;
+            if (c1.Length != c2.Length || !IsVectorizable(c1.Kind) || c1.Kind.RawKind() != c2.Kind.RawKind())
+                return false;
+            switch (c1.Kind.RawKind())
+            {
+                case DataKind.I4: return TryOperation<int>(op, c1, c2, out res);
+                case DataKind.U4: return TryOperation<uint>(op, c1, c2, out res);
+                case DataKind.I8: return TryOperation<long>(op, c1, c2, out res);
+                case DataKind.R4: return TryOperation<float>(op, c1, c2, out res);
+                case DataKind.R8: return TryOperation<double>(op, c1, c2, out res);
+                default: return false;
+            }
+        }
+
+        static bool TryOperation<T>(VectorOperation op, NumericColumn c1, NumericColumn c2, out NumericColumn res)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var c1o = c1.Column as DataColumn<T>;
+            var c2o = c2.Column as DataColumn<T>;
+            res = null;
+            if (c1o is null || c2o is null)
+                return false;
+            var data = new T[c1o.Length];
+            Operation(op, c1o.RawData, 0, c2o.RawData, 0, data, 0, data.Length);
+            res = new NumericColumn(new DataColumn<T>(data));
+            return true;
+        }
+
+        /// <summary>
+        /// Computes the operation if the column is dense and its type is <i>T</i>.
+        /// Returns false otherwise.
+        /// </summary>
+        public static bool TryOperation<T>(VectorOperation op, NumericColumn c1, T value, out NumericColumn res)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var c1o = c1.Column as DataColumn<T>;
+            res = null;
+            if (c1o is null || !IsVectorizable(c1.Kind))
+                return false;
+            var data = new T[c1o.Length];
+            Operation(op, c1o.RawData, 0, value, data, 0, data.Length);
+            res = new NumericColumn(new DataColumn<T>(data));
+            return true;
+        }
+
+        /// <summary>
+        /// Computes the comparison if both columns are dense, have the same type and the same length.
+        /// Returns false otherwise.
+        /// </summary>
+        public static bool TryComparison(VectorComparison op, NumericColumn c1, NumericColumn c2, out NumericColumn res)
+        {
+            res = null;
+            if (c1.Length != c2.Length || !IsVectorizable(c1.Kind) || c1.Kind.RawKind() != c2.Kind.RawKind())
+                return false;
+            switch (c1.Kind.RawKind())
+            {
+                case DataKind.I4: return TryComparison<int>(op, c1, c2, out res);
+                case DataKind.U4: return TryComparison<uint>(op, c1, c2, out res);
+                case DataKind.I8: return TryComparison<long>(op, c1, c2, out res);
+                case DataKind.R4: return TryComparison<float>(op, c1, c2, out res);
+                case DataKind.R8: return TryComparison<double>(op, c1, c2, out res);
+                default: return false;
+            }
+        }
+
+        static bool TryComparison<T>(VectorComparison op, NumericColumn c1, NumericColumn c2, out NumericColumn res)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var c1o = c1.Column as DataColumn<T>;
+            var c2o = c2.Column as DataColumn<T>;
+            res = null;
+            if (c1o is null || c2o is null)
+                return false;
+            var data = new bool[c1o.Length];
+            Comparison(op, c1o.RawData, 0, c2o.RawData, 0, data, 0, data.Length);
+            res = new NumericColumn(new DataColumn<bool>(data));
+            return true;
+        }
+
+        /// <summary>
+        /// Computes the comparison if the column is dense and its type is <i>T</i>.
+        /// Returns false otherwise.
+        /// </summary>
+        public static bool TryComparison<T>(VectorComparison op, NumericColumn c1, T value, out NumericColumn res)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var c1o = c1.Column as DataColumn<T>;
+            res = null;
+            if (c1o is null || !IsVectorizable(c1.Kind))
+                return false;
+            var data = new bool[c1o.Length];
+            Comparison(op, c1o.RawData, 0, value, data, 0, data.Length);
+            res = new NumericColumn(new DataColumn<bool>(data));
+            return true;
+        }
+
+        #endregion
+
+        #region in place
+
+        /// <summary>
+        /// Replaces <i>c1</i> by <i>c1 op c2</i> without allocating a new column.
+        /// Both columns must have the same type and the same length.
+        /// </summary>
+        public static void InPlace(VectorOperation op, NumericColumn c1, NumericColumn c2)
+        {
+            if (c1.Length != c2.Length)
+                throw new DataValueError($"Columns must have the same length ({c1.Length} != {c2.Length}).");
+            if (!IsVectorizable(c1.Kind) || c1.Kind.RawKind() != c2.Kind.RawKind())
+                throw new DataTypeError($"{op} in place not implemented for {c1.Kind}, {c2.Kind}.");
+            switch (c1.Kind.RawKind())
+            {
+                case DataKind.I4: InPlace<int>(op, c1, c2); break;
+                case DataKind.U4: InPlace<uint>(op, c1, c2); break;
+                case DataKind.I8: InPlace<long>(op, c1, c2); break;
+                case DataKind.R4: InPlace<float>(op, c1, c2); break;
+                case DataKind.R8: InPlace<double>(op, c1, c2); break;
+                default:
+                    throw new DataTypeError($"{op} in place not implemented for {c1.Kind}, {c2.Kind}.");
+            }
+        }
+
+        static void InPlace<T>(VectorOperation op, NumericColumn c1, NumericColumn c2)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var a = GetRawData<T>(c1, op);
+            var b = GetRawData<T>(c2, op);
+            Operation(op, a, 0, b, 0, a, 0, c1.Length);
+        }
+
+        /// <summary>
+        /// Replaces <i>c1</i> by <i>c1 op value</i> without allocating a new column.
+        /// The column type must be <i>T</i>.
+        /// </summary>
+        public static void InPlace<T>(VectorOperation op, NumericColumn c1, T value)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            if (!IsVectorizable(c1.Kind))
+                throw new DataTypeError($"{op} in place not implemented for {c1.Kind}.");
+            var a = GetRawData<T>(c1, op);
+            Operation(op, a, 0, value, a, 0, c1.Length);
+        }
+
+        static T[] GetRawData<T>(NumericColumn col, VectorOperation op)
+            where T : struct, IEquatable<T>, IComparable<T>
+        {
+            var colo = col.Column as DataColumn<T>;
+            if (colo is null)
+                throw new DataTypeError($"{op} in place not implemented for {col.Kind} and type {typeof(T)}.");
+            return colo.RawData;
+        }
+
+        #endregion
+    }
+}
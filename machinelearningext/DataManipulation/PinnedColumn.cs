@@ -0,0 +1,184 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Runtime.InteropServices;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.DataManipulation
+{
+    /// <summary>
+    /// Pins the buffer of a dense numerical column so that its address
+    /// can be shared with native code (numpy through pythonnet for example)
+    /// without any copy. The column must not be resized while it is pinned.
+    /// The buffer is released by <see cref="Dispose"/> or by the garbage collector.
+    /// </summary>
+    public class PinnedColumn : IDisposable
+    {
+        GCHandle _handle;
+        readonly int _length;
+        readonly DataKind _kind;
+
+        /// <summary>
+        /// Pins an array.
+        /// </summary>
+        /// <param name="data">array to pin</param>
+        /// <param name="length">number of used elements</param>
+        /// <param name="kind">column type</param>
+        public PinnedColumn(Array data, int length, ColumnType kind)
+        {
+            if (kind.IsVector())
+                throw new DataTypeError($"Vector columns cannot be pinned (kind={kind}).");
+            switch (kind.RawKind())
+            {
+                case DataKind.I4:
+                case DataKind.U4:
+                case DataKind.I8:
+                case DataKind.R4:
+                case DataKind.R8:
+                    break;
+                default:
+                    throw new DataTypeError($"Only numerical columns can be pinned (kind={kind}).");
+            }
+            _kind = kind.RawKind();
+            _length = length;
+            _handle = GCHandle.Alloc(data, GCHandleType.Pinned);
+        }
+
+        ~PinnedColumn()
+        {
+            Dispose();
+        }
+
+        /// <summary>
+        /// Releases the buffer.
+        /// </summary>
+        public void Dispose()
+        {
+            if (_handle.IsAllocated)
+                _handle.Free();
+            GC.SuppressFinalize(this);
+        }
+
+        /// <summary>
+        /// Address of the first element.
+        /// </summary>
+        public IntPtr Address
+        {
+            get
+            {
+                if (!_handle.IsAllocated)
+                    throw new ObjectDisposedException(nameof(PinnedColumn));
+                return _handle.AddrOfPinnedObject();
+            }
+        }
+
+        /// <summary>
+        /// Number of elements.
+        /// </summary>
+        public int Length => _length;
+
+        /// <summary>
+        /// Type of the elements.
+        /// </summary>
+        public DataKind Kind => _kind;
+
+        /// <summary>
+        /// Size of one element in bytes.
+        /// </summary>
+        public int ItemSize => GetItemSize(_kind);
+
+        /// <summary>
+        /// Name of the corresponding numpy type.
+        /// </summary>
+        public string DType => GetDType(_kind);
+
+        /// <summary>
+        /// Returns the size of one element of a given kind.
+        /// </summary>
+        public static int GetItemSize(DataKind kind)
+        {
+            switch (kind)
+            {
+                case DataKind.I4: return sizeof(int);
+                case DataKind.U4: return sizeof(uint);
+                case DataKind.I8: return sizeof(long);
+                case DataKind.R4: return sizeof(float);
+                case DataKind.R8: return sizeof(double);
+                default:
+                    throw new DataTypeError($"Unexpected kind {kind}.");
+            }
+        }
+
+        /// <summary>
+        /// Returns the numpy type name for a given kind.
+        /// </summary>
+        public static string GetDType(DataKind kind)
+        {
+            switch (kind)
+            {
+                case DataKind.I4: return "int32";
+                case DataKind.U4: return "uint32";
+                case DataKind.I8: return "int64";
+                case DataKind.R4: return "float32";
+                case DataKind.R8: return "float64";
+                default:
+                    throw new DataTypeError($"Unexpected kind {kind}.");
+            }
+        }
+
+        /// <summary>
+        /// Returns the column type for a numpy type name.
+        /// </summary>
+        public static ColumnType GetColumnType(string dtype)
+        {
+            switch (dtype)
+            {
+                case "int32": return NumberType.I4;
+                case "uint32": return NumberType.U4;
+                case "int64": return NumberType.I8;
+                case "float32": return NumberType.R4;
+                case "float64": return NumberType.R8;
+                default:
+                    throw new DataTypeError($"Unable to pin type '{dtype}'.");
+            }
+        }
+
+        /// <summary>
+        /// Pins a column of a dataframe.
+        /// </summary>
+        public static PinnedColumn Pin(DataFrame df, string name)
+        {
+            return Pin(df, df.GetColumnIndex(name));
+        }
+
+        /// <summary>
+        /// Pins a column of a dataframe.
+        /// </summary>
+        public static PinnedColumn Pin(DataFrame df, int col)
+        {
+            var column = df.GetColumn(col).Column;
+            switch (column)
+            {
+                case DataColumn<int> c: return c.Pin();
+                case DataColumn<uint> c: return c.Pin();
+                case DataColumn<long> c: return c.Pin();
+                case DataColumn<float> c: return c.Pin();
+                case DataColumn<double> c: return c.Pin();
+                default:
+                    throw new DataTypeError($"Column {col} of type {column.Kind} cannot be pinned.");
+            }
+        }
+
+        /// <summary>
+        /// Adds a new column of a given numpy type filled with default values
+        /// and pins it. The caller fills it through the returned address.
+        /// </summary>
+        public static PinnedColumn AddColumn(DataFrame df, string name, string dtype, int length)
+        {
+            var col = df.AddColumn(name, GetColumnType(dtype), length);
+            return Pin(df, col);
+        }
+    }
+}
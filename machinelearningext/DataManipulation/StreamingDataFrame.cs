@@ -1,6 +1,8 @@
 ﻿// See the LICENSE file in the project root for more information.
 
 using System;
+using System.Collections.Generic;
+using System.Linq;
 using System.Text;
 using Microsoft.ML;
 using Microsoft.ML.Data;
@@ -91,5 +93,44 @@ namespace Scikit.ML.DataManipulation
         {
             return DataFrameIO.ReadView(Source, nrows, keepVectors, numThreads, _env);
         }
+
+        /// <summary>
+        /// Reads the data as a sequence of dataframes of <paramref name="chunkSize"/> rows
+        /// (the last one may be smaller). The data is read again every time the sequence
+        /// is enumerated and the memory only depends on the chunk size and the number
+        /// of prefetched chunks, not on the number of rows.
+        /// </summary>
+        /// <param name="chunkSize">number of rows in every chunk</param>
+        /// <param name="keepVectors">keep vectors as they are</param>
+        /// <param name="prefetch">number of chunks read in advance by a background thread,
+        /// 0 to read them in the consuming thread</param>
+        /// <returns><see cref="DataFrameChunks"/></returns>
+        public DataFrameChunks Chunks(int chunkSize = 10000, bool keepVectors = false, int prefetch = 1)
+        {
+            if (chunkSize <= 0)
+                throw new DataValueError($"chunkSize must be strictly positive not {chunkSize}.");
+            var source = Source;
+            return new DataFrameChunks(() => EnumerateChunks(source, chunkSize, keepVectors)).Prefetch(prefetch);
+        }
+
+        static IEnumerable<DataFrame> EnumerateChunks(IDataView view, int chunkSize, bool keepVectors)
+        {
+            using (var cursor = view.GetRowCursor(i => true))
+            {
+                while (true)
+                {
+                    var df = new DataFrame();
+                    int nb = df.FillValues(cursor, chunkSize, keepVectors);
+                    if (nb == chunkSize)
+                        yield return df;
+                    else
+                    {
+                        if (nb > 0)
+                            yield return df.Copy(Enumerable.Range(0, nb), Enumerable.Range(0, df.ColumnCount));
+                        yield break;
+                    }
+                }
+            }
+        }
     }
 }
@@ -3,6 +3,7 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Numerics;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -27,6 +28,10 @@ namespace Scikit.ML.FeaturesTransforms
 {
     /// <summary>
     /// Multiplies features, build polynomial features x1, x1^2, x1x2, x2, x2^2...
+    /// Every degree is computed from the previous one: the monomials starting with xi
+    /// are xi multiplied by the monomials of the previous degree starting with xj, j &gt;= i.
+    /// Sparse vectors only multiply non null coordinates. The output dimension can be
+    /// capped with <c>hashBits</c>, every monomial is then hashed into <c>2^hashBits</c> slots.
     /// </summary>
     public class PolynomialTransform : IDataTransform
     {
@@ -48,8 +53,8 @@ namespace Scikit.ML.FeaturesTransforms
         {
             return new VersionInfo(
                 modelSignature: "POLYTRAN",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(PolynomialTransform).Assembly.FullName);
@@ -59,18 +64,29 @@ namespace Scikit.ML.FeaturesTransforms
 
         #region dimensions
 
-        static Func<int, int>[] Total = new Func<int, int>[] {
-                                k => 0,
-                                k => k,
-                                k => k * (k + 1) / 2,
-                                k => k * (k * k + 3 * k + 2) / 6
-                };
-        static Func<int, int>[] TotalCumulated = new Func<int, int>[] {
-                                k => 0,
-                                k => k,
-                                k => Total[1](k) + Total[2](k),
-                                k => Total[1](k) + Total[2](k) + Total[3](k)
-                };
+        /// <summary>
+        /// Number of monomials of degree <paramref name="degree"/> with <paramref name="k"/> features.
+        /// </summary>
+        public static long Total(long k, int degree)
+        {
+            if (k <= 0)
+                return 0;
+            long res = 1;
+            for (int i = 1; i <= degree; ++i)
+                res = res * (k + i - 1) / i;
+            return res;
+        }
+
+        /// <summary>
+        /// Number of monomials of degree 1 to <paramref name="degree"/> with <paramref name="k"/> features.
+        /// </summary>
+        public static long TotalCumulated(long k, int degree)
+        {
+            long res = 0;
+            for (int d = 1; d <= degree; ++d)
+                res += Total(k, d);
+            return res;
+        }
 
         #endregion
 
@@ -87,6 +103,9 @@ namespace Scikit.ML.FeaturesTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Highest degree of the polynomial features", ShortName = "d")]
             public int degree = 2;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "If > 0, the monomials are hashed into 2^hashBits features, 0 to keep all of them.", ShortName = "hb")]
+            public int hashBits = 0;
+
             // This parameter is not used right now. We could imagine that the transform walk the through the data first
             // and determines and filters out polynomial features. That would add a training step.
             // In that case, transforms usual accepts a parameter which specifies the number of threads this training
@@ -99,6 +118,7 @@ namespace Scikit.ML.FeaturesTransforms
                 ctx.Writer.Write(Column1x1.ArrayToLine(columns));
                 ctx.Writer.Write(degree);
                 ctx.Writer.Write(numThreads ?? -1);
+                ctx.Writer.Write(hashBits);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -108,6 +128,13 @@ namespace Scikit.ML.FeaturesTransforms
                 degree = ctx.Reader.ReadInt32();
                 int nb = ctx.Reader.ReadInt32();
                 numThreads = nb > 0 ? (int?)nb : null;
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    hashBits = ctx.Reader.ReadInt32();
+                    host.CheckDecode(hashBits >= 0 && hashBits <= 30);
+                }
+                else
+                    hashBits = 0;
             }
         }
 
@@ -135,6 +162,7 @@ namespace Scikit.ML.FeaturesTransforms
             _host.CheckValue(input, "input");
             _host.CheckValue(args.columns, "columns");
             _host.Check(args.degree > 1, "degree must be > 1");
+            _host.CheckUserArg(args.hashBits >= 0 && args.hashBits <= 30, nameof(args.hashBits), "must be in [0, 30]");
 
             _input = input;
 
@@ -247,10 +275,10 @@ namespace Scikit.ML.FeaturesTransforms
             switch (typeCol.RawKind())
             {
                 case DataKind.R4:
-                    transform = new PolynomialState<float>(_host, transform ?? Source, _args, (a, b) => a * b);
+                    transform = new PolynomialState<float>(_host, transform ?? Source, _args, (a, b) => a * b, (a, b) => a + b, ScaleFloat);
                     break;
                 case DataKind.U4:
-                    transform = new PolynomialState<UInt32>(_host, transform ?? Source, _args, (a, b) => a * b);
+                    transform = new PolynomialState<UInt32>(_host, transform ?? Source, _args, (a, b) => a * b, (a, b) => a + b);
                     break;
                 default:
                     throw Contracts.ExceptNotSupp("Type '{0}' is not handled yet.", typeCol.RawKind());
@@ -258,6 +286,31 @@ namespace Scikit.ML.FeaturesTransforms
             return transform;
         }
 
+        /// <summary>
+        /// Computes <c>dst[dstOffset + i] = a * src[srcOffset + i]</c> with SIMD instructions.
+        /// </summary>
+        static void ScaleFloat(float a, float[] src, int srcOffset, float[] dst, int dstOffset, int count)
+        {
+            int i = 0;
+            int size = Vector<float>.Count;
+            if (count >= size)
+            {
+                var va = new Vector<float>(a);
+                for (; i <= count - size; i += size)
+                    (va * new Vector<float>(src, srcOffset + i)).CopyTo(dst, dstOffset + i);
+            }
+            for (; i < count; ++i)
+                dst[dstOffset + i] = a * src[srcOffset + i];
+        }
+
+        /// <summary>
+        /// Hashes a monomial index into <c>[0, mask]</c>.
+        /// </summary>
+        static int HashIndex(long index, int mask)
+        {
+            return (int)(HashHelper.Mix(unchecked((ulong)index)) & (ulong)mask);
+        }
+
         #endregion
 
         #region State
@@ -277,6 +330,8 @@ namespace Scikit.ML.FeaturesTransforms
             readonly Arguments _args;
             readonly int _inputCol;
             readonly Func<TInput, TInput, TInput> _multiplication;
+            readonly Func<TInput, TInput, TInput> _addition;
+            readonly Action<TInput, TInput[], int, TInput[], int, int> _scale;
 
             // Unused fo the time begin. This might be required if the transform has a training steps.
             // We want this step to be executed only once when the next transform in the pipeline 
@@ -287,7 +342,18 @@ namespace Scikit.ML.FeaturesTransforms
             public Schema Schema => _schema;
             public IHost Host => _host;
 
-            public PolynomialState(IHostEnvironment host, IDataView input, Arguments args, Func<TInput, TInput, TInput> multiplication)
+            /// <summary>
+            /// Creates the transform.
+            /// </summary>
+            /// <param name="host">host</param>
+            /// <param name="input">input view</param>
+            /// <param name="args">parameters</param>
+            /// <param name="multiplication">multiplication of two coordinates</param>
+            /// <param name="addition">addition of two coordinates, used to merge monomials hashed into the same slot</param>
+            /// <param name="scale">multiplies a range of an array by a constant, null to use <paramref name="multiplication"/></param>
+            public PolynomialState(IHostEnvironment host, IDataView input, Arguments args,
+                                   Func<TInput, TInput, TInput> multiplication, Func<TInput, TInput, TInput> addition,
+                                   Action<TInput, TInput[], int, TInput[], int, int> scale = null)
             {
                 _host = host.Register("PolynomialState");
                 _host.CheckValue(input, "input");
@@ -295,6 +361,12 @@ namespace Scikit.ML.FeaturesTransforms
                 // _lock = new object();
                 _args = args;
                 _multiplication = multiplication;
+                _addition = addition;
+                _scale = scale ?? ((a, src, srcOffset, dst, dstOffset, count) =>
+                {
+                    for (int i = 0; i < count; ++i)
+                        dst[dstOffset + i] = multiplication(a, src[srcOffset + i]);
+                });
                 var column = _args.columns[0];
                 var schema = input.Schema;
                 using (var ch = _host.Start("PolynomialState"))
@@ -307,8 +379,15 @@ namespace Scikit.ML.FeaturesTransforms
                     if (dim > 1)
                         throw _host.Except("Input column type must be a vector of one dimension.");
                     int size = dim > 0 ? type.AsVector().GetDim(0) : 0;
-                    if (size > 0)
-                        size = TotalCumulated[_args.degree](size);
+                    if (_args.hashBits > 0)
+                        size = 1 << _args.hashBits;
+                    else if (size > 0)
+                    {
+                        long total = TotalCumulated(size, _args.degree);
+                        if (total > int.MaxValue)
+                            throw _host.ExceptUserArg(nameof(_args.hashBits), "{0} polynomial features do not fit in a vector, use hashBits to cap the dimension.", total);
+                        size = (int)total;
+                    }
                     ch.Trace("PolynomialTransform {0}->{1}.", dim, size);
 
                     // We extend the input schema. The new type has the same type as the input.
@@ -348,7 +427,7 @@ namespace Scikit.ML.FeaturesTransforms
                 if (predicate(_input.Schema.Count))
                 {
                     var cursor = _input.GetRowCursor(i => PredicatePropagation(i, predicate), rand);
-                    return new PolynomialCursor<TInput>(this, cursor, i => PredicatePropagation(i, predicate), _args, _inputCol, _multiplication);
+                    return new PolynomialCursor<TInput>(this, cursor, i => PredicatePropagation(i, predicate), _args, _inputCol, _addition, _scale);
                 }
                 else
                     // The new column is not required. We do not need to compute it. But we need to keep the same schema.
@@ -360,7 +439,7 @@ namespace Scikit.ML.FeaturesTransforms
                 if (predicate(_input.Schema.Count))
                 {
                     var cursors = _input.GetRowCursorSet(i => PredicatePropagation(i, predicate), n, rand);
-                    return cursors.Select(c => new PolynomialCursor<TInput>(this, c, i => PredicatePropagation(i, predicate), _args, _inputCol, _multiplication)).ToArray();
+                    return cursors.Select(c => new PolynomialCursor<TInput>(this, c, i => PredicatePropagation(i, predicate), _args, _inputCol, _addition, _scale)).ToArray();
                 }
                 else
                     // The new column is not required. We do not need to compute it. But we need to keep the same schema.
@@ -379,12 +458,14 @@ namespace Scikit.ML.FeaturesTransforms
             readonly PolynomialState<TInput> _view;
             readonly RowCursor _inputCursor;
             readonly Arguments _args;
-            readonly Func<TInput, TInput, TInput> _multiplication;
+            readonly Func<TInput, TInput, TInput> _addition;
+            readonly Action<TInput, TInput[], int, TInput[], int, int> _scale;
 
             ValueGetter<VBuffer<TInput>> _inputGetter;
 
             public PolynomialCursor(PolynomialState<TInput> view, RowCursor cursor, Func<int, bool> predicate,
-                                    Arguments args, int column, Func<TInput, TInput, TInput> multiplication)
+                                    Arguments args, int column, Func<TInput, TInput, TInput> addition,
+                                    Action<TInput, TInput[], int, TInput[], int, int> scale)
             {
                 if (!predicate(column))
                     throw view.Host.ExceptValue("Required column is not generated by previous layers.");
@@ -392,7 +473,8 @@ namespace Scikit.ML.FeaturesTransforms
                 _args = args;
                 _inputCursor = cursor;
                 _inputGetter = cursor.GetGetter<VBuffer<TInput>>(column);
-                _multiplication = multiplication;
+                _addition = addition;
+                _scale = scale;
             }
 
             public override RowCursor GetRootCursor()
@@ -454,6 +536,7 @@ namespace Scikit.ML.FeaturesTransforms
 
             /// <summary>
             /// We compute the polynomial features.
+            /// The buffers are allocated once per getter and reused for every row.
             /// </summary>
             private ValueGetter<VBuffer<TInput>> PolynomialBuilder()
             {
@@ -462,119 +545,172 @@ namespace Scikit.ML.FeaturesTransforms
                 // If there are n features, we can expect sum(i=1, d) n^i / i! polynomial features.
                 VBuffer<TInput> features = new VBuffer<TInput>();
                 int degree = _args.degree;
-                var values = new List<TInput>();
-                var indices = new List<int>();
-                int[] tempIndices = new int[3];
-
-                Func<IEnumerable<int>, int, int> computeIndex = (IEnumerable<int> sparseIndices, int nbFeatures) =>
-                {
-                    int nb = 0;
-                    foreach (var i in sparseIndices)
-                    {
-                        tempIndices[nb] = i;
-                        nb += 1;
-                    }
-                    switch (nb)
-                    {
-                        case 1:
-                            return tempIndices[0];
-                        case 2:
-                            int d1 = Total[1](nbFeatures);
-                            int d2 = Total[2](nbFeatures);
-                            return d1 + (d2 - Total[2](nbFeatures - tempIndices[0])) + (tempIndices[1] - tempIndices[0]);
-                        case 3:
-                            int d1_ = Total[1](nbFeatures);
-                            int d2_ = Total[2](nbFeatures);
-                            int d3_ = Total[3](nbFeatures);
-                            int d1d = Total[2](nbFeatures - tempIndices[0]);
-                            int d2d = Total[2](nbFeatures - tempIndices[1]);
-                            return d1_ + d2_ +
-                                   d1d - d2d + tempIndices[2] - tempIndices[1] + // part with N^2
-                                   d3_ - Total[3](nbFeatures - tempIndices[0]);  // part with N^3
-
-                        default:
-                            throw Contracts.ExceptNotSupp("Level should be in [1, 3].");
-                    }
-                };
+                int mask = _args.hashBits > 0 ? (1 << _args.hashBits) - 1 : 0;
+                var comparer = EqualityComparer<TInput>.Default;
+                int[] start = null;
+                int[] next = null;
+                long[] keys = null;
+                TInput[] nzValues = null;
+                int[] nzIndices = null;
 
                 return (ref VBuffer<TInput> polyfeat) =>
                 {
                     _inputGetter(ref features);
-                    int total;
+                    var values = polyfeat.Values;
+                    var indices = polyfeat.Indices;
+
+                    if (features.IsDense && mask == 0)
+                    {
+                        int n = features.Length;
+                        int total = CheckSize(TotalCumulated(n, degree));
+                        if (values == null || values.Length < total)
+                            values = new TInput[total];
+                        EnsureSize(ref start, n);
+                        EnsureSize(ref next, n);
+                        if (n > 0)
+                            Array.Copy(features.Values, values, n);
+                        for (int i = 0; i < n; ++i)
+                            start[i] = i;
+                        int end = n;
+                        int pos = n;
+                        for (int d = 2; d <= degree; ++d)
+                        {
+                            // Monomials starting with xi = xi * monomials of degree d-1 starting with xj, j >= i.
+                            for (int i = 0; i < n; ++i)
+                            {
+                                next[i] = pos;
+                                int count = end - start[i];
+                                _scale(features.Values[i], values, start[i], values, pos, count);
+                                pos += count;
+                            }
+                            var tmp = start;
+                            start = next;
+                            next = tmp;
+                            end = pos;
+                        }
+                        polyfeat = new VBuffer<TInput>(total, values, indices);
+                        return;
+                    }
 
+                    // Only non null coordinates are multiplied.
+                    int m;
+                    TInput[] inValues;
+                    int[] inIndices;
                     if (features.IsDense)
                     {
-                        var poly = EnumeratePosition(features.Count, degree)
-                                            .Select(pos => pos.Select(p => features.Values[p]).Aggregate((a, b) => _multiplication(a, b)))
-                                            .ToArray();
-                        polyfeat = new VBuffer<TInput>(poly.Length, poly);
+                        EnsureSize(ref nzValues, features.Length);
+                        EnsureSize(ref nzIndices, features.Length);
+                        m = 0;
+                        for (int i = 0; i < features.Length; ++i)
+                        {
+                            if (comparer.Equals(features.Values[i], default(TInput)))
+                                continue;
+                            nzValues[m] = features.Values[i];
+                            nzIndices[m] = i;
+                            ++m;
+                        }
+                        inValues = nzValues;
+                        inIndices = nzIndices;
                     }
                     else
                     {
-                        values.Clear();
-                        indices.Clear();
+                        m = features.Count;
+                        inValues = features.Values;
+                        inIndices = features.Indices;
+                    }
 
-                        foreach (var pos in EnumeratePosition(features.Count, degree))
+                    int nb = CheckSize(TotalCumulated(m, degree));
+                    if (values == null || values.Length < nb)
+                        values = new TInput[nb];
+                    if (indices == null || indices.Length < nb)
+                        indices = new int[nb];
+                    EnsureSize(ref keys, nb);
+                    EnsureSize(ref start, m);
+                    EnsureSize(ref next, m);
+
+                    long length = features.Length;
+                    if (m > 0)
+                        Array.Copy(inValues, values, m);
+                    for (int k = 0; k < m; ++k)
+                    {
+                        keys[k] = inIndices[k];
+                        start[k] = k;
+                    }
+                    int last = m;
+                    int p = m;
+                    long offPrev = 0;
+                    long off = length;
+                    for (int d = 2; d <= degree; ++d)
+                    {
+                        for (int a = 0; a < m; ++a)
                         {
-                            values.Add(pos.Select(p => features.Values[p]).Aggregate((a, b) => _multiplication(a, b)));
-                            indices.Add(computeIndex(pos.Select(p => features.Indices[p]), features.Length));
-#if (DEBUG)
-                            if (indices.Count > 1)
-                            {
-                                if (indices[indices.Count - 1] <= indices[indices.Count - 2])
-                                    throw Contracts.Except("Inconsistency");
-                            }
-#endif
+                            next[a] = p;
+                            int count = last - start[a];
+                            _scale(inValues[a], values, start[a], values, p, count);
+                            // Index of monomial (a, b, ...) = index of (b, ...) shifted by a constant
+                            // which only depends on a.
+                            long ia = inIndices[a];
+                            long delta = off - offPrev + Total(length, d) - Total(length - ia, d) -
+                                         (Total(length, d - 1) - Total(length - ia, d - 1));
+                            for (int t = 0; t < count; ++t)
+                                keys[p + t] = keys[start[a] + t] + delta;
+                            p += count;
                         }
-                        total = TotalCumulated[_args.degree](features.Length);
-                        polyfeat = new VBuffer<TInput>(total, values.Count, values.ToArray(), indices.ToArray());
+                        var tmp = start;
+                        start = next;
+                        next = tmp;
+                        last = p;
+                        offPrev = off;
+                        off += Total(length, d);
                     }
-                };
-            }
 
-            static IEnumerable<int[]> EnumeratePosition(int nbfeatures, int degree)
-            {
-                if (degree >= 1)
-                {
-                    var position = new int[1];
-                    for (int i = 0; i < nbfeatures; ++i)
-                    {
-                        position[0] = i;
-                        yield return position;
-                    }
-                }
-                if (degree >= 2)
-                {
-                    var position = new int[2];
-                    for (int i = 0; i < nbfeatures; ++i)
+                    if (mask == 0)
                     {
-                        position[0] = i;
-                        for (int j = i; j < nbfeatures; ++j)
+                        for (int k = 0; k < p; ++k)
+                            indices[k] = (int)keys[k];
+#if (DEBUG)
+                        for (int k = 1; k < p; ++k)
                         {
-                            position[1] = j;
-                            yield return position;
+                            if (indices[k] <= indices[k - 1])
+                                throw Contracts.Except("Inconsistency");
                         }
+#endif
+                        polyfeat = new VBuffer<TInput>(CheckSize(off), p, values, indices);
                     }
-                }
-                if (degree >= 3)
-                {
-                    var position = new int[3];
-                    for (int i = 0; i < nbfeatures; ++i)
+                    else
                     {
-                        position[0] = i;
-                        for (int j = i; j < nbfeatures; ++j)
+                        // Monomials hashed into the same slot are summed.
+                        for (int k = 0; k < p; ++k)
+                            indices[k] = HashIndex(keys[k], mask);
+                        Array.Sort(indices, values, 0, p);
+                        int w = 0;
+                        for (int k = 0; k < p; ++k)
                         {
-                            position[1] = j;
-                            for (int k = j; k < nbfeatures; ++k)
+                            if (w > 0 && indices[w - 1] == indices[k])
+                                values[w - 1] = _addition(values[w - 1], values[k]);
+                            else
                             {
-                                position[2] = k;
-                                yield return position;
+                                indices[w] = indices[k];
+                                values[w] = values[k];
+                                ++w;
                             }
                         }
+                        polyfeat = new VBuffer<TInput>(mask + 1, w, values, indices);
                     }
-                }
-                if (degree >= 4)
-                    throw Contracts.ExceptNotImpl("Not implemented for a degree >= 4");
+                };
+            }
+
+            static void EnsureSize<T>(ref T[] array, int size)
+            {
+                if (array == null || array.Length < size)
+                    array = new T[size];
+            }
+
+            static int CheckSize(long size)
+            {
+                if (size > int.MaxValue)
+                    throw Contracts.Except("{0} polynomial features do not fit in a vector, use hashBits to cap the dimension.", size);
+                return (int)size;
             }
         }
 
@@ -27,6 +27,8 @@ namespace Scikit.ML.FeaturesTransforms
 {
     /// <summary>
     /// Normalizes columns with various stategies.
+    /// The statistics are computed in one parallel pass over the data,
+    /// the mean and the variance with Welford's algorithm.
     /// </summary>
     public class ScalerTransform : IDataTransform, ITrainableTransform
     {
@@ -44,8 +46,8 @@ namespace Scikit.ML.FeaturesTransforms
         {
             return new VersionInfo(
                 modelSignature: "SCALETNS",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(ScalerTransform).Assembly.FullName);
@@ -68,10 +70,14 @@ namespace Scikit.ML.FeaturesTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Scaling strategy.", ShortName = "scale")]
             public ScalerStrategy scaling = ScalerStrategy.meanVar;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to compute the statistics, null for as many as possible.", ShortName = "nt")]
+            public int? numThreads;
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(Column1x1.ArrayToLine(columns));
                 ctx.Writer.Write((int)scaling);
+                ctx.Writer.Write(numThreads ?? -1);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -79,6 +85,13 @@ namespace Scikit.ML.FeaturesTransforms
                 string sr = ctx.Reader.ReadString();
                 columns = Column1x1.ParseMulti(sr);
                 scaling = (ScalerStrategy)ctx.Reader.ReadInt32();
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    int nb = ctx.Reader.ReadInt32();
+                    numThreads = nb > 0 ? (int?)nb : null;
+                }
+                else
+                    numThreads = null;
             }
 
             public void PostProcess()
@@ -256,7 +269,6 @@ namespace Scikit.ML.FeaturesTransforms
                         var indexesCol = new List<int>();
 
                         var textCols = _args.columns.Select(c => c.Source).ToArray();
-                        _scalingStat = new Dictionary<string, List<ColumnStatObs>>();
 
                         for (int i = 0; i < textCols.Length; ++i)
                         {
@@ -269,91 +281,24 @@ namespace Scikit.ML.FeaturesTransforms
                         }
 
                         // Computation
-                        var required = new HashSet<int>(indexesCol);
-                        var requiredIndexes = required.OrderBy(c => c).ToArray();
-                        using (var cur = _input.GetRowCursor(i => required.Contains(i)))
+                        Func<string, List<ColumnStatObs>> create = name =>
                         {
-                            bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextType.Instance).ToArray();
-                            bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BoolType.Instance).ToArray();
-                            bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberType.R4).ToArray();
-                            bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberType.U4 || sch[c].Type.RawKind() == DataKind.U4).ToArray();
-                            ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BoolType.Instance || sch[i].Type.RawKind() == DataKind.BL ? cur.GetGetter<bool>(i) : null).ToArray();
-                            ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.U4 || sch[i].Type.RawKind() == DataKind.U4 ? cur.GetGetter<uint>(i) : null).ToArray();
-                            ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(i) : null).ToArray();
-                            ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.R4 ? cur.GetGetter<float>(i) : null).ToArray();
-                            ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(i) : null).ToArray();
-
-                            var schema = _input.Schema;
-                            for (int i = 0; i < schema.Count; ++i)
+                            switch (_args.scaling)
                             {
-                                string name = schema[i].Name;
-                                if (!required.Contains(i))
-                                    continue;
-                                _scalingStat[name] = new List<ColumnStatObs>();
-                                var t = _scalingStat[name];
-                                switch (_args.scaling)
-                                {
-                                    case ScalerStrategy.meanVar:
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum2));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.nb));
-                                        break;
-                                    case ScalerStrategy.minMax:
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
-                                        break;
-                                    default:
-                                        throw _host.ExceptNotSupp($"Unsupported scaling strategy: {_args.scaling}.");
-                                }
+                                case ScalerStrategy.meanVar:
+                                    return new List<ColumnStatObs>() { new ColumnStatObs(ColumnStatObs.StatKind.meanVar) };
+                                case ScalerStrategy.minMax:
+                                    return new List<ColumnStatObs>() {
+                                        new ColumnStatObs(ColumnStatObs.StatKind.min),
+                                        new ColumnStatObs(ColumnStatObs.StatKind.max)
+                                    };
+                                default:
+                                    throw _host.ExceptNotSupp($"Unsupported scaling strategy: {_args.scaling}.");
                             }
-
-                            float value = 0;
-                            var tvalue = new ReadOnlyMemory<char>();
-                            VBuffer<float> vector = new VBuffer<float>();
-                            uint uvalue = 0;
-                            bool bvalue = true;
-                            var curschema = cur.Schema;
-
-                            while (cur.MoveNext())
-                            {
-                                for (int i = 0; i < requiredIndexes.Length; ++i)
-                                {
-                                    string name = curschema[requiredIndexes[i]].Name;
-                                    if (!_scalingStat.ContainsKey(name))
-                                        continue;
-                                    if (isFloat[i])
-                                    {
-                                        floatGetters[i](ref value);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(value);
-                                    }
-                                    else if (isBool[i])
-                                    {
-                                        boolGetters[i](ref bvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(bvalue);
-                                    }
-                                    else if (isText[i])
-                                    {
-                                        textGetters[i](ref tvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(tvalue.ToString());
-                                    }
-                                    else if (isUint[i])
-                                    {
-                                        uintGetters[i](ref uvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(uvalue);
-                                    }
-                                    else
-                                    {
-                                        vectorGetters[i](ref vector);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(vector);
-                                    }
-                                }
-                            }
-                        }
+                        };
+                        long nbRows;
+                        _scalingStat = ColumnStatistics.Compute(_host, _input, indexesCol, create, _args.numThreads, out nbRows);
+                        ch.Trace("Statistics computed on {0} rows.", nbRows);
 
                         _scalingFactors = GetScalingParameters();
                         _revIndex = ComputeRevIndex();
@@ -411,6 +356,23 @@ namespace Scikit.ML.FeaturesTransforms
             ScalingMethod ComputeMeanVar(IHost host, List<ColumnStatObs> stats,
                                          out VBuffer<float> mean, out VBuffer<float> variance)
             {
+                var welford = stats.Where(c => c.kind == ColumnStatObs.StatKind.meanVar).ToArray();
+                if (welford.Length == 1)
+                {
+                    welford[0].GetMeanVar(out double[] wnb, out double[] wmean, out double[] wvar);
+                    var fmean = new float[wmean.Length];
+                    var fscale = new float[wmean.Length];
+                    for (int i = 0; i < fmean.Length; ++i)
+                    {
+                        fmean[i] = (float)wmean[i];
+                        fscale[i] = wvar[i] > 0 ? (float)(1.0 / Math.Sqrt(wvar[i])) : 0f;
+                    }
+                    mean = new VBuffer<float>(fmean.Length, fmean);
+                    variance = new VBuffer<float>(fscale.Length, fscale);
+                    return ScalingMethod.Affine;
+                }
+
+                // Models saved before version 0x00010002 store sums.
                 var nb = stats.Where(c => c.kind == ColumnStatObs.StatKind.nb).ToArray();
                 var sum = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum).ToArray();
                 var sum2 = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum2).ToArray();
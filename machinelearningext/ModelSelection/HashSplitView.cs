@@ -0,0 +1,203 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Linq;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.ModelSelection
+{
+    /// <summary>
+    /// Adds a column with the part a row belongs to and optionally a column
+    /// with its fold. Both are computed from a hash of the row id and a seed,
+    /// the view keeps no state and the assignment remains the same
+    /// for every cursor, shuffled or not, in parallel or not.
+    /// </summary>
+    public class HashSplitView : IDataView
+    {
+        readonly IDataView _source;
+        readonly IHost _host;
+        readonly Schema _schema;
+        readonly float[] _cumRatios;
+        readonly ulong _seed;
+        readonly int _folds;
+
+        public IDataView Source { get { return _source; } }
+        protected IHost Host { get { return _host; } }
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="input">input view</param>
+        /// <param name="partColumn">name of the column which receives the part</param>
+        /// <param name="ratios">ratios of every part, the sum must be 1</param>
+        /// <param name="seed">seed of the hash</param>
+        /// <param name="foldColumn">name of the column which receives the fold, null for none</param>
+        /// <param name="folds">number of folds, used only if <paramref name="foldColumn"/> is not null</param>
+        public HashSplitView(IHostEnvironment env, IDataView input, string partColumn, float[] ratios,
+                             uint seed, string foldColumn = null, int folds = 0)
+        {
+            Contracts.CheckValue(env, "env");
+            _host = env.Register("HashSplitView");
+            _host.CheckValue(input, "input");
+            _host.CheckValue(ratios, "ratios");
+            _host.Check(string.IsNullOrEmpty(foldColumn) || folds > 1, "folds must be > 1.");
+            _source = input;
+            _seed = seed;
+            _folds = string.IsNullOrEmpty(foldColumn) ? 0 : folds;
+
+            _cumRatios = new float[ratios.Length];
+            for (int i = 1; i < ratios.Length; ++i)
+                _cumRatios[i] = _cumRatios[i - 1] + ratios[i - 1];
+
+            var names = _folds > 0 ? new[] { partColumn, foldColumn } : new[] { partColumn };
+            var types = names.Select(c => (ColumnType)NumberType.I4).ToArray();
+            _schema = Schema.Create(new ExtendedSchema(_source.Schema, names, types));
+        }
+
+        public bool CanShuffle { get { return _source.CanShuffle; } }
+        public Schema Schema { get { return _schema; } }
+        public long? GetRowCount() { return _source.GetRowCount(); }
+
+        bool AnyAddedColumn(Func<int, bool> predicate)
+        {
+            for (int i = _source.Schema.Count; i < _schema.Count; ++i)
+                if (predicate(i))
+                    return true;
+            return false;
+        }
+
+        public RowCursor GetRowCursor(Func<int, bool> predicate, Random rand = null)
+        {
+            var cursor = _source.GetRowCursor(predicate, rand);
+            if (AnyAddedColumn(predicate))
+                return new HashSplitCursor(this, cursor);
+            else
+                // The added columns are not required, only the schema changes.
+                return new SameCursor(cursor, Schema);
+        }
+
+        public RowCursor[] GetRowCursorSet(Func<int, bool> predicate, int n, Random rand = null)
+        {
+            var cursors = _source.GetRowCursorSet(predicate, n, rand);
+            if (AnyAddedColumn(predicate))
+                return cursors.Select(c => new HashSplitCursor(this, c)).ToArray();
+            else
+                return cursors.Select(c => new SameCursor(c, Schema)).ToArray();
+        }
+
+        #region hash
+
+        ulong Hash(RowId id)
+        {
+            return HashHelper.Mix(HashHelper.Mix(id.Low ^ _seed) ^ id.High);
+        }
+
+        int GetPart(ulong hash)
+        {
+            float u = (float)((hash >> 11) * (1.0 / (1UL << 53)));
+            for (int i = _cumRatios.Length - 1; i > 0; --i)
+            {
+                if (u >= _cumRatios[i])
+                    return i;
+            }
+            return 0;
+        }
+
+        int GetFold(ulong hash)
+        {
+            return (int)(HashHelper.Mix(hash) % (ulong)_folds);
+        }
+
+        #endregion
+
+        public class HashSplitCursor : RowCursor
+        {
+            readonly HashSplitView _view;
+            readonly RowCursor _inputCursor;
+            readonly ValueGetter<RowId> _getId;
+            long _lastPosition;
+            ulong _hash;
+
+            public HashSplitCursor(HashSplitView view, RowCursor cursor)
+            {
+                _view = view;
+                _inputCursor = cursor;
+                _getId = _inputCursor.GetIdGetter();
+                _lastPosition = -1;
+            }
+
+            public override RowCursor GetRootCursor()
+            {
+                return this;
+            }
+
+            public override bool IsColumnActive(int col)
+            {
+                if (col < _inputCursor.Schema.Count)
+                    return _inputCursor.IsColumnActive(col);
+                return true;
+            }
+
+            public override ValueGetter<RowId> GetIdGetter()
+            {
+                return _getId;
+            }
+
+            public override CursorState State { get { return _inputCursor.State; } }
+            public override long Batch { get { return _inputCursor.Batch; } }
+            public override long Position { get { return _inputCursor.Position; } }
+            public override Schema Schema { get { return _view.Schema; } }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                    _inputCursor.Dispose();
+                GC.SuppressFinalize(this);
+            }
+
+            public override bool MoveMany(long count)
+            {
+                return _inputCursor.MoveMany(count);
+            }
+
+            public override bool MoveNext()
+            {
+                return _inputCursor.MoveNext();
+            }
+
+            ulong CurrentHash()
+            {
+                if (_lastPosition != _inputCursor.Position)
+                {
+                    var id = new RowId();
+                    _getId(ref id);
+                    _hash = _view.Hash(id);
+                    _lastPosition = _inputCursor.Position;
+                }
+                return _hash;
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(int col)
+            {
+                int nbSource = _view.Source.Schema.Count;
+                if (col < nbSource)
+                    return _inputCursor.GetGetter<TValue>(col);
+                ValueGetter<int> getter;
+                if (col == nbSource)
+                    getter = (ref int dst) => { dst = _view.GetPart(CurrentHash()); };
+                else if (col == nbSource + 1 && _view._folds > 0)
+                    getter = (ref int dst) => { dst = _view.GetFold(CurrentHash()); };
+                else
+                    throw _view.Host.Except("Column index {0} does not exist.", col);
+                var res = getter as ValueGetter<TValue>;
+                if (res == null)
+                    throw _view.Host.Except("Column {0} is of type int not {1}.", col, typeof(TValue));
+                return res;
+            }
+        }
+    }
+}
@@ -35,6 +35,11 @@ namespace Scikit.ML.ModelSelection
     /// a column which tells in which part the data belongs to.
     /// The transform can save the result if requested in that case, the added
     /// column will be removed before the data is saved.
+    /// By default, the split is cached to remain the same every time the data is read.
+    /// In streaming mode, the part is a hash of the row id and the seed,
+    /// nothing is cached and the splits are filtered from the source cursors.
+    /// This mode can also assign a fold to every row for a cross-validation,
+    /// see <see cref="SelectFold"/>.
     /// </summary>
     public class SplitTrainTestTransform : TransformBase, ITaggedDataView
     {
@@ -48,8 +53,8 @@ namespace Scikit.ML.ModelSelection
         {
             return new VersionInfo(
                 modelSignature: "SPLTTRTE",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(SplitTrainTestTransform).Assembly.FullName);
@@ -69,6 +74,15 @@ namespace Scikit.ML.ModelSelection
 
             public float[] fratios;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Streaming mode, the part is a hash of the row id and the seed, the data is neither cached nor copied.", ShortName = "st")]
+            public bool streaming = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of folds (streaming mode only), 0 for no fold column.", ShortName = "k")]
+            public int folds = 0;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Name of the fold column (streaming mode only).", ShortName = "fcol")]
+            public string foldColumn = "fold";
+
             [Argument(ArgumentType.AtMostOnce, HelpText = "File name of the cache if stored on disk.", ShortName = "c")]
             public string cacheFile = null;
 
@@ -134,6 +148,9 @@ namespace Scikit.ML.ModelSelection
         readonly string _cacheFile;
         readonly bool _reuse;
         readonly string[] _tags;
+        readonly bool _streaming;
+        readonly int _folds;
+        readonly string _foldColumn;
         IDataTransform _pipedTransform;
         readonly string _saverSettings;
 
@@ -163,6 +180,15 @@ namespace Scikit.ML.ModelSelection
             Host.CheckUserArg(Math.Abs(sum - 1f) < 1e-5, "Sum of ratios must be 1.");
             int col = SchemaHelper.GetColumnIndex(input.Schema, args.newColumn, true);
             Host.Check(col == -1, $"Column '{args.newColumn}' should not exist.");
+            Host.CheckUserArg(args.folds == 0 || args.folds > 1, "folds must be 0 or > 1.");
+            Host.CheckUserArg(args.folds == 0 || args.streaming, "folds requires the streaming mode.");
+            Host.CheckUserArg(!args.streaming || string.IsNullOrEmpty(args.cacheFile), "cacheFile cannot be used in streaming mode.");
+            if (args.folds > 0)
+            {
+                Host.CheckUserArg(!string.IsNullOrEmpty(args.foldColumn) && args.foldColumn != args.newColumn, "foldColumn must be specified and different from newColumn.");
+                col = SchemaHelper.GetColumnIndex(input.Schema, args.foldColumn, true);
+                Host.Check(col == -1, $"Column '{args.foldColumn}' should not exist.");
+            }
 
             _newColumn = args.newColumn;
             _shuffleInput = args.shuffleInput;
@@ -174,6 +200,10 @@ namespace Scikit.ML.ModelSelection
             _cacheFile = args.cacheFile;
             _reuse = args.reuse;
             _tags = args.tag;
+            _numThreads = args.numThreads;
+            _streaming = args.streaming;
+            _folds = args.folds;
+            _foldColumn = args.folds > 0 ? args.foldColumn : null;
 
             var saveSettings = args.saverSettings as ICommandLineComponentFactory;
             Host.CheckValue(saveSettings, nameof(saveSettings));
@@ -241,6 +271,9 @@ namespace Scikit.ML.ModelSelection
             ctx.Writer.Write(_numThreads.HasValue ? _numThreads.Value : -1);
             ctx.Writer.Write(_tags == null ? "" : string.Join(",", _tags));
             ctx.Writer.Write(_saverSettings);
+            ctx.Writer.Write(_streaming);
+            ctx.Writer.Write(_folds);
+            ctx.Writer.Write(_foldColumn ?? string.Empty);
         }
 
         private SplitTrainTestTransform(IHost host, ModelLoadContext ctx, IDataView input) :
@@ -269,6 +302,14 @@ namespace Scikit.ML.ModelSelection
             string tags = ctx.Reader.ReadString();
             _tags = string.IsNullOrEmpty(tags) ? null : tags.Split(',');
             _saverSettings = ctx.Reader.ReadString();
+            if (ctx.Header.ModelVerWritten >= 0x00010002)
+            {
+                _streaming = ctx.Reader.ReadBoolean();
+                _folds = ctx.Reader.ReadInt32();
+                _foldColumn = ctx.Reader.ReadString();
+                if (string.IsNullOrEmpty(_foldColumn))
+                    _foldColumn = null;
+            }
 
             var saver = ComponentCreation.CreateSaver(Host, _saverSettings);
             if (saver == null)
@@ -335,53 +376,25 @@ namespace Scikit.ML.ModelSelection
                 current = new RowShufflingTransformer(Host, args1, current);
             }
 
-            // We generate a random number.
-            var columnName = current.Schema.GetTempColumnName();
-            var args2 = new GenerateNumberTransform.Arguments()
-            {
-                Column = new GenerateNumberTransform.Column[] { new GenerateNumberTransform.Column() { Name = columnName } },
-                Seed = _seed ?? 42
-            };
-            IDataTransform currentTr = new GenerateNumberTransform(Host, args2, current);
-
-            // We convert this random number into a part.
-            var cRatios = new float[_ratios.Length];
-            cRatios[0] = 0;
-            for (int i = 1; i < _ratios.Length; ++i)
-                cRatios[i] = cRatios[i - 1] + _ratios[i - 1];
-
-            ValueMapper<float, int> mapper = (in float src, ref int dst) =>
+            IDataTransform currentTr;
+            IDataTransform finalTr;
+            string[] toDrop;
+            if (_streaming)
             {
-                for (int i = cRatios.Length - 1; i > 0; --i)
-                {
-                    if (src >= cRatios[i])
-                    {
-                        dst = i;
-                        return;
-                    }
-                }
-                dst = 0;
-            };
-
-            // Get location of columnName
-
-            int index = SchemaHelper.GetColumnIndex(currentTr.Schema, columnName);
-            var ct = currentTr.Schema[index].Type;
-            var view = LambdaColumnMapper.Create(Host, "Key to part mapper", currentTr,
-                                    columnName, _newColumn, ct, NumberType.I4, mapper);
-
-            // We cache the result to avoid the pipeline to change the random number.
-            var args3 = new ExtendedCacheTransform.Arguments()
+                // The part only depends on the row id, there is nothing to cache.
+                var hashed = new HashSplitView(Host, current, _newColumn, _ratios, _seed ?? 42, _foldColumn, _folds);
+                currentTr = new PassThroughTransform(Host, new PassThroughTransform.Arguments(), hashed);
+                finalTr = currentTr;
+                toDrop = new string[] { _newColumn };
+            }
+            else
             {
-                inDataFrame = string.IsNullOrEmpty(_cacheFile),
-                numTheads = _numThreads,
-                cacheFile = _cacheFile,
-                reuse = _reuse,
-            };
-            currentTr = new ExtendedCacheTransform(Host, args3, view);
-
-            // Removing the temporary column.
-            var finalTr = ColumnSelectingTransformer.CreateDrop(Host, currentTr, new string[] { columnName });
+                var columnName = current.Schema.GetTempColumnName();
+                currentTr = AppendRandomPart(current, columnName);
+                // Removing the temporary column.
+                finalTr = ColumnSelectingTransformer.CreateDrop(Host, currentTr, new string[] { columnName });
+                toDrop = new string[] { columnName, _newColumn };
+            }
             var taggedViews = new List<Tuple<string, ITaggedDataView>>();
 
             // filenames
@@ -403,7 +416,6 @@ namespace Scikit.ML.ModelSelection
                             ch.Info("Create part {0}: {1} (tag: {2})", i + 1, _ratios[i], _tags[i]);
                         else
                             ch.Info("Create part {0}: {1} (file: {2})", i + 1, _ratios[i], _filenames[i]);
-                        var ar1 = new RangeFilter.Arguments() { Column = _newColumn, Min = i, Max = i, IncludeMax = true };
                         int pardId = i;
                         var filtView = LambdaFilter.Create<int>(Host, string.Format("Select part {0}", i), currentTr,
                                                                    _newColumn, NumberType.I4,
@@ -413,7 +425,7 @@ namespace Scikit.ML.ModelSelection
                         if (count == 0)
                             throw Host.Except("Part {0} is empty.", i);
 #endif
-                        filtView = ColumnSelectingTransformer.CreateDrop(Host, filtView, new string[] { columnName, _newColumn });
+                        filtView = ColumnSelectingTransformer.CreateDrop(Host, filtView, toDrop);
 
                         if (_filenames != null && _filenames.Any())
                         {
@@ -450,6 +462,80 @@ namespace Scikit.ML.ModelSelection
             }
         }
 
+        /// <summary>
+        /// Adds a random number, converts it into a part and caches the result
+        /// to avoid the pipeline to change the random number.
+        /// </summary>
+        IDataTransform AppendRandomPart(IDataView current, string columnName)
+        {
+            // We generate a random number.
+            var args2 = new GenerateNumberTransform.Arguments()
+            {
+                Column = new GenerateNumberTransform.Column[] { new GenerateNumberTransform.Column() { Name = columnName } },
+                Seed = _seed ?? 42
+            };
+            var currentTr = new GenerateNumberTransform(Host, args2, current);
+
+            // We convert this random number into a part.
+            var cRatios = new float[_ratios.Length];
+            cRatios[0] = 0;
+            for (int i = 1; i < _ratios.Length; ++i)
+                cRatios[i] = cRatios[i - 1] + _ratios[i - 1];
+
+            ValueMapper<float, int> mapper = (in float src, ref int dst) =>
+            {
+                for (int i = cRatios.Length - 1; i > 0; --i)
+                {
+                    if (src >= cRatios[i])
+                    {
+                        dst = i;
+                        return;
+                    }
+                }
+                dst = 0;
+            };
+
+            // Get location of columnName
+
+            int index = SchemaHelper.GetColumnIndex(currentTr.Schema, columnName);
+            var ct = currentTr.Schema[index].Type;
+            var view = LambdaColumnMapper.Create(Host, "Key to part mapper", currentTr,
+                                    columnName, _newColumn, ct, NumberType.I4, mapper);
+
+            // We cache the result to avoid the pipeline to change the random number.
+            var args3 = new ExtendedCacheTransform.Arguments()
+            {
+                inDataFrame = string.IsNullOrEmpty(_cacheFile),
+                numTheads = _numThreads,
+                cacheFile = _cacheFile,
+                reuse = _reuse,
+            };
+            return new ExtendedCacheTransform(Host, args3, view);
+        }
+
+        /// <summary>
+        /// Returns the train and test views for one fold of a cross-validation,
+        /// the views are filtered from <paramref name="view"/> without any copy.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="view">view produced by <see cref="SplitTrainTestTransform"/> in streaming mode with folds</param>
+        /// <param name="foldColumn">name of the fold column</param>
+        /// <param name="fold">fold to use as the test set</param>
+        /// <param name="train">rows not in the fold</param>
+        /// <param name="test">rows in the fold</param>
+        public static void SelectFold(IHostEnvironment env, IDataView view, string foldColumn, int fold,
+                                      out IDataView train, out IDataView test)
+        {
+            Contracts.CheckValue(env, "env");
+            env.CheckValue(view, "view");
+            int col = SchemaHelper.GetColumnIndex(view.Schema, foldColumn);
+            env.Check(view.Schema[col].Type == NumberType.I4, $"Column '{foldColumn}' must be of type I4.");
+            train = LambdaFilter.Create<int>(env, string.Format("Train fold {0}", fold), view,
+                                             foldColumn, NumberType.I4, (in int f) => { return f != fold; });
+            test = LambdaFilter.Create<int>(env, string.Format("Test fold {0}", fold), view,
+                                            foldColumn, NumberType.I4, (in int f) => { return f == fold; });
+        }
+
         #endregion
     }
 }
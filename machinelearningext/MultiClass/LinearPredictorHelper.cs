@@ -0,0 +1,62 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Internal.Calibration;
+using Microsoft.ML.Learners;
+
+
+namespace Scikit.ML.MultiClass
+{
+    /// <summary>
+    /// Extracts the coefficients of a linear model.
+    /// </summary>
+    internal static class LinearPredictorHelper
+    {
+        /// <summary>
+        /// Retrieves the weights and the bias of a linear binary classifier
+        /// or a linear regressor, calibrated or not.
+        /// The check relies on the type of the model, the function returns false
+        /// for any other model or if the dimension is not the expected one.
+        /// </summary>
+        /// <param name="predictor">binary model (a predictor or a value mapper)</param>
+        /// <param name="dim">expected number of features</param>
+        /// <param name="weights">dense weights</param>
+        /// <param name="bias">bias</param>
+        /// <param name="calibrator">calibrator or null if the model is not calibrated</param>
+        public static bool TryGetLinear(object predictor, int dim, out float[] weights,
+                                        out float bias, out ICalibrator calibrator)
+        {
+            weights = null;
+            bias = 0;
+            calibrator = null;
+            if (dim <= 0)
+                return false;
+
+            var calibrated = predictor as CalibratedPredictorBase;
+            var sub = calibrated == null ? (object)predictor : calibrated.SubPredictor;
+            // PoissonRegressionPredictor is a LinearPredictor but returns exp(w.x + b).
+            if (!(sub is LinearBinaryPredictor) && !(sub is LinearRegressionPredictor))
+                return false;
+
+            var linear = (LinearPredictor)sub;
+            var buffer = new VBuffer<float>();
+            linear.GetFeatureWeights(ref buffer);
+            if (buffer.Length != dim)
+                return false;
+
+            weights = new float[dim];
+            if (buffer.IsDense)
+                Array.Copy(buffer.Values, weights, buffer.Count);
+            else
+            {
+                for (int i = 0; i < buffer.Count; ++i)
+                    weights[buffer.Indices[i]] = buffer.Values[i];
+            }
+            bias = linear.Bias;
+            calibrator = calibrated == null ? null : calibrated.Calibrator;
+            return true;
+        }
+    }
+}
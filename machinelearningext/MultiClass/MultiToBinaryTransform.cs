@@ -3,6 +3,7 @@
 using System;
 using System.Linq;
 using System.Collections.Generic;
+using System.Reflection;
 using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
@@ -30,6 +31,9 @@ namespace Scikit.ML.MultiClass
 {
     /// <summary>
     /// Multiplies rows to tranform a multi-class problem into a binary classification problem.
+    /// The copies of a row are virtual, the cursor only changes the label and the new column
+    /// and keeps the other columns of the current row. Algorithm <c>Virtual</c> goes further,
+    /// it only adds a sample of the negative classes and every copy shares the same buffers.
     /// </summary>
     public class MultiToBinaryTransform : IDataTransform
     {
@@ -43,8 +47,8 @@ namespace Scikit.ML.MultiClass
         {
             return new VersionInfo(
                 modelSignature: "MULTIBIN",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002, // negativeRatio
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(MultiToBinaryTransform).Assembly.FullName);
@@ -58,7 +62,12 @@ namespace Scikit.ML.MultiClass
         {
             Default = 1,
             Reweight = 2,
-            Ranking = 3
+            Ranking = 3,
+            /// <summary>
+            /// Every row produces one positive copy and a sample of negative copies,
+            /// see <see cref="Arguments.negativeRatio"/>.
+            /// </summary>
+            Virtual = 4
         }
 
         public class Arguments
@@ -86,6 +95,9 @@ namespace Scikit.ML.MultiClass
             [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to estimate how much a class should resample.", ShortName = "nt")]
             public int? numThreads;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Algorithm Virtual: ratio of negative classes added for every row, 0 for the square root of the number of classes.", ShortName = "nr")]
+            public float negativeRatio = 0f;
+
             #endregion
 
             public void Write(ModelSaveContext ctx, IHost host)
@@ -97,6 +109,7 @@ namespace Scikit.ML.MultiClass
                 ctx.Writer.Write(maxMulti);
                 ctx.Writer.Write(seed);
                 ctx.Writer.Write(numThreads ?? -1);
+                ctx.Writer.Write(negativeRatio);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -114,6 +127,13 @@ namespace Scikit.ML.MultiClass
                 int nb = ctx.Reader.ReadInt32();
                 host.Check(nb > -2, "numThreads");
                 numThreads = nb > 0 ? (int?)nb : null;
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    negativeRatio = ctx.Reader.ReadSingle();
+                    host.Check(negativeRatio >= 0 && negativeRatio <= 1, "negativeRatio");
+                }
+                else
+                    negativeRatio = 0;
             }
         }
 
@@ -135,6 +155,7 @@ namespace Scikit.ML.MultiClass
             Contracts.CheckValue(env, "env");
             _host = env.Register(RegistrationName);
             _host.CheckValue(args, "args");
+            _host.CheckUserArg(args.negativeRatio >= 0 && args.negativeRatio <= 1, nameof(args.negativeRatio), "must be in [0, 1]");
             _input = input;
 
             SchemaHelper.GetColumnIndex(input.Schema, args.label);
@@ -152,6 +173,20 @@ namespace Scikit.ML.MultiClass
             return h.Apply("Loading Model", ch => new MultiToBinaryTransform(h, ctx, input));
         }
 
+        /// <summary>
+        /// Number of negative classes added to every row by algorithm <c>Virtual</c>,
+        /// <c>ratio * (nbClasses - 1)</c> or the square root of <c>nbClasses - 1</c> if ratio is zero.
+        /// </summary>
+        public static int NumberOfNegatives(int nbClasses, float ratio)
+        {
+            if (nbClasses <= 1)
+                return 0;
+            int nb = ratio > 0
+                        ? (int)Math.Round(ratio * (nbClasses - 1))
+                        : (int)Math.Ceiling(Math.Sqrt(nbClasses - 1));
+            return Math.Max(1, Math.Min(nb, nbClasses - 1));
+        }
+
         public void Save(ModelSaveContext ctx)
         {
             _host.CheckValue(ctx, "ctx");
@@ -329,6 +364,7 @@ namespace Scikit.ML.MultiClass
 
             public Dictionary<TLabel, float> LabelDistribution { get { return _labelDistribution; } }
             public float AverageMultiplication { get { return _averageMultiplication; } }
+            public float NegativeRatio { get { return _args.negativeRatio; } }
             public VBuffer<TLabel> GetClasses()
             {
                 Contracts.Check(_labelDistribution != null, "The transform was not trained. The classes cannot be returned yet.");
@@ -399,6 +435,7 @@ namespace Scikit.ML.MultiClass
                 {
                     case MultiplicationAlgorithm.Default:
                     case MultiplicationAlgorithm.Reweight:
+                    case MultiplicationAlgorithm.Virtual:
                         _schema = Schema.Create(new ExtendedSchema(input.Schema,
                                                 new string[] { _args.newColumn },
                                                 new ColumnType[] { BoolType.Instance },
@@ -621,6 +658,9 @@ namespace Scikit.ML.MultiClass
                     case MultiplicationAlgorithm.Ranking:
                         _averageMultiplication = _maxReplica;
                         break;
+                    case MultiplicationAlgorithm.Virtual:
+                        _averageMultiplication = 1 + NumberOfNegatives(max, _args.negativeRatio);
+                        break;
                     default:
                         throw ch.ExceptParam("algo", "Unrecognized algo {0}", _args.algo);
                 }
@@ -665,6 +705,7 @@ namespace Scikit.ML.MultiClass
                 {
                     case MultiplicationAlgorithm.Default:
                     case MultiplicationAlgorithm.Reweight:
+                    case MultiplicationAlgorithm.Virtual:
                         return new MultiToBinaryCursor<TLabelC, TLabel, bool>(this, cursor, _colLabel, _colWeight, _maxReplica, _args.algo, _args.seed);
                     case MultiplicationAlgorithm.Ranking:
                         return new MultiToBinaryCursor<TLabelC, TLabel, uint>(this, cursor, _colLabel, _colWeight, _maxReplica, _args.algo, _args.seed);
@@ -682,6 +723,7 @@ namespace Scikit.ML.MultiClass
                 {
                     case MultiplicationAlgorithm.Default:
                     case MultiplicationAlgorithm.Reweight:
+                    case MultiplicationAlgorithm.Virtual:
                         return cursors.Select(c => new MultiToBinaryCursor<TLabelC, TLabel, bool>(this, c, _colLabel, _colWeight, _maxReplica, _args.algo, _args.seed)).ToArray();
                     case MultiplicationAlgorithm.Ranking:
                         return cursors.Select(c => new MultiToBinaryCursor<TLabelC, TLabel, uint>(this, c, _colLabel, _colWeight, _maxReplica, _args.algo, _args.seed)).ToArray();
@@ -717,6 +759,15 @@ namespace Scikit.ML.MultiClass
             float _maxFreq, _minFreq;
             Random _rand;
 
+            // Algorithm Virtual: the copies are taken from cached tuples, no allocation per row.
+            readonly Dictionary<TLabel, int> _labelIndex;
+            readonly Tuple<TLabel, bool>[] _positives;
+            readonly Tuple<TLabel, bool>[] _negatives;
+            readonly Tuple<TLabel, bool>[] _virtualCopies;
+            readonly Tuple<TLabel, bool>[] _noCopies;
+            readonly int[] _order;
+            readonly int[] _orderPosition;
+
             public MultiToBinaryCursor(MultiToBinaryState<TFeatures, TLabel> view, RowCursor cursor, int colLabel, int colWeight, int maxReplica, MultiplicationAlgorithm algo, int seed)
             {
                 _view = view;
@@ -741,6 +792,26 @@ namespace Scikit.ML.MultiClass
                 _labels = view.LabelDistribution.Select(c => c.Key).ToArray();
                 _copies = null;
                 _copy = -1;
+
+                if (_algo == MultiplicationAlgorithm.Virtual)
+                {
+                    int nbNeg = MultiToBinaryTransform.NumberOfNegatives(_labels.Length, view.NegativeRatio);
+                    _labelIndex = new Dictionary<TLabel, int>();
+                    for (int i = 0; i < _labels.Length; ++i)
+                        _labelIndex[_labels[i]] = i;
+                    _positives = _labels.Select(c => new Tuple<TLabel, bool>(c, true)).ToArray();
+                    _negatives = _labels.Select(c => new Tuple<TLabel, bool>(c, false)).ToArray();
+                    _virtualCopies = new Tuple<TLabel, bool>[1 + nbNeg];
+                    _noCopies = new Tuple<TLabel, bool>[0];
+                    _order = Enumerable.Range(0, _labels.Length).ToArray();
+                    _orderPosition = Enumerable.Range(0, _labels.Length).ToArray();
+
+                    // The row id must hold the index of the copy.
+                    _maxReplica = Math.Max(_maxReplica, _virtualCopies.Length);
+                    _shift = 0;
+                    for (int nb = _maxReplica + 1; nb > 0; nb >>= 1)
+                        _shift += 1;
+                }
             }
 
             public override ValueGetter<RowId> GetIdGetter()
@@ -810,7 +881,8 @@ namespace Scikit.ML.MultiClass
 
                 ++_copy;
 
-                if (_copy >= _copies.Length)
+                // Rows without any copy are skipped.
+                while (_copy >= _copies.Length)
                 {
                     var r = _inputCursor.MoveNext();
                     if (!r)
@@ -836,6 +908,8 @@ namespace Scikit.ML.MultiClass
                     case MultiplicationAlgorithm.Default:
                     case MultiplicationAlgorithm.Reweight:
                         return GetMultiplicatorBool() as Tuple<TLabel, TLabelInter>[];
+                    case MultiplicationAlgorithm.Virtual:
+                        return GetMultiplicatorVirtual() as Tuple<TLabel, TLabelInter>[];
                     case MultiplicationAlgorithm.Ranking:
                         return GetMultiplicatorUint() as Tuple<TLabel, TLabelInter>[];
                     default:
@@ -895,6 +969,42 @@ namespace Scikit.ML.MultiClass
                 }
             }
 
+            /// <summary>
+            /// Returns the positive copy followed by negative classes drawn without replacement
+            /// (partial Fisher-Yates shuffle on the class indices). The returned array is reused.
+            /// A row is skipped if its label is missing or was not seen
+            /// when the label distribution was computed.
+            /// </summary>
+            Tuple<TLabel, bool>[] GetMultiplicatorVirtual()
+            {
+                int pos;
+                if ((_label is float && float.IsNaN((float)(object)_label)) || !_labelIndex.TryGetValue(_label, out pos))
+                    return _noCopies;
+                _virtualCopies[0] = _positives[pos];
+                int last = _order.Length - 1;
+                // Moves the positive class at the end so that it is never drawn.
+                SwapOrder(_orderPosition[pos], last);
+                for (int i = 1; i < _virtualCopies.Length; ++i)
+                {
+                    int k = i - 1 + _rand.Next(last - i + 1);
+                    SwapOrder(k, i - 1);
+                    _virtualCopies[i] = _negatives[_order[i - 1]];
+                }
+                return _virtualCopies;
+            }
+
+            /// <summary>
+            /// Swaps two classes in <c>_order</c> and keeps the inverse permutation up to date.
+            /// </summary>
+            void SwapOrder(int i, int j)
+            {
+                int tmp = _order[i];
+                _order[i] = _order[j];
+                _order[j] = tmp;
+                _orderPosition[_order[i]] = i;
+                _orderPosition[_order[j]] = j;
+            }
+
             Tuple<TLabel, uint>[] GetMultiplicatorUint()
             {
                 int nb;
@@ -1004,6 +1114,48 @@ namespace Scikit.ML.MultiClass
                     throw Contracts.ExceptNotSupp("Outside of the scope of this function. Use GetGetter.");
             }
 
+            /// <summary>
+            /// Retrieves the value once per input row. Vectors are copied into the caller's buffer
+            /// so that every copy of the row can be modified independently.
+            /// </summary>
+            ValueGetter<TValue> GetSharedGetter<TValue>(ValueGetter<TValue> getter)
+            {
+                var type = typeof(TValue);
+                if (type.IsGenericType && type.GetGenericTypeDefinition() == typeof(VBuffer<>))
+                {
+                    Func<ValueGetter<VBuffer<int>>, ValueGetter<VBuffer<int>>> del = GetSharedGetterVector<int>;
+                    var methodInfo = del.GetMethodInfo().GetGenericMethodDefinition().MakeGenericMethod(type.GetGenericArguments()[0]);
+                    return (ValueGetter<TValue>)methodInfo.Invoke(this, new object[] { getter });
+                }
+
+                TValue cached = default(TValue);
+                long position = -1;
+                return (ref TValue value) =>
+                {
+                    if (position != _inputCursor.Position)
+                    {
+                        getter(ref cached);
+                        position = _inputCursor.Position;
+                    }
+                    value = cached;
+                };
+            }
+
+            ValueGetter<VBuffer<T>> GetSharedGetterVector<T>(ValueGetter<VBuffer<T>> getter)
+            {
+                var cached = new VBuffer<T>();
+                long position = -1;
+                return (ref VBuffer<T> value) =>
+                {
+                    if (position != _inputCursor.Position)
+                    {
+                        getter(ref cached);
+                        position = _inputCursor.Position;
+                    }
+                    cached.CopyTo(ref value);
+                };
+            }
+
             public override ValueGetter<TValue> GetGetter<TValue>(int col)
             {
                 if (col == _colLabel)
@@ -1066,7 +1218,7 @@ namespace Scikit.ML.MultiClass
                         var getter = _inputCursor.GetGetter<TValue>(col);
                         if (getter == null)
                             throw Contracts.Except($"Unable to create a getter of type '{typeof(TValue)}' for column {col}:{_view.Source.Schema[col].Name} of type {_view.Source.Schema[col].Type}.");
-                        return getter;
+                        return _algo == MultiplicationAlgorithm.Virtual ? GetSharedGetter(getter) : getter;
                     }
                     catch (Exception e)
                     {
@@ -3,8 +3,10 @@
 using System;
 using System.IO;
 using System.Linq;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.Data;
+using Microsoft.ML.Internal.Calibration;
 using Microsoft.ML.Model;
 using Microsoft.ML.Internal.Internallearn;
 using Microsoft.ML.Internal.Utilities;
@@ -111,6 +113,28 @@ namespace Scikit.ML.MultiClass
             return (ValueMapper<TIn, TOut>)(Delegate)_impl.GetMapper();
         }
 
+        /// <summary>
+        /// Scores a batch of rows in parallel.
+        /// If the binary model is linear and there is no reclassification predictor,
+        /// the contribution of the features is computed once per row and only the class term
+        /// changes from one class to the next one.
+        /// </summary>
+        /// <param name="features">dense features, row after row</param>
+        /// <param name="rows">number of rows</param>
+        /// <param name="scores">scores, row after row, it must contain <c>rows * OutputType.VectorSize()</c> values</param>
+        /// <param name="useLinearScorer">use the linear shortcut when possible</param>
+        public void ScoreBatch(float[] features, int rows, float[] scores, bool useLinearScorer = true)
+        {
+            Host.CheckValue(features, nameof(features));
+            Host.CheckValue(scores, nameof(scores));
+            Host.CheckParam(rows > 0 && features.Length % rows == 0, nameof(rows), "features must contain rows * dimension values");
+            int dim = features.Length / rows;
+            int expected = InputType.VectorSize();
+            Host.CheckParam(expected == 0 || dim == expected, nameof(features), "Unexpected dimension.");
+            Host.CheckParam(scores.Length >= rows * OutputType.VectorSize(), nameof(scores), "too short");
+            _impl.ScoreBatch(features, rows, scores, useLinearScorer);
+        }
+
 #if IMPLIValueMapperDist
         public ValueMapper<TIn, TOut, TDist> GetMapper<TIn, TOut, TDist>()
         {
@@ -168,6 +192,7 @@ namespace Scikit.ML.MultiClass
             IPredictor[] Predictors { get; }
             IPredictor ReclassificationPredictor { get; }
             ValueMapper<VBuffer<float>, VBuffer<float>> GetMapper();
+            void ScoreBatch(float[] features, int rows, float[] scores, bool useLinearScorer);
 #if IMPLIValueMapperDist
             ValueMapper<VBuffer<float>, VBuffer<float>, VBuffer<float>> GetMapperDist();
 #endif
@@ -613,6 +638,89 @@ namespace Scikit.ML.MultiClass
 
             #endregion
 
+            #region batch
+
+            Tuple<float[], float> _linear;
+            bool _linearChecked;
+
+            /// <summary>
+            /// Returns the weights and the bias of the binary model if it is linear, null otherwise
+            /// (see <see cref="LinearPredictorHelper"/>).
+            /// </summary>
+            Tuple<float[], float> GetLinear()
+            {
+                lock (_mappers)
+                {
+                    if (_linearChecked)
+                        return _linear;
+                    _linearChecked = true;
+                    float[] w;
+                    float b;
+                    ICalibrator calibrator;
+                    if (LinearPredictorHelper.TryGetLinear(_predictors[0], _inputType.VectorSize(), out w, out b, out calibrator))
+                        _linear = new Tuple<float[], float>(w, b);
+                    return _linear;
+                }
+            }
+
+            public void ScoreBatch(float[] features, int rows, float[] scores, bool useLinearScorer)
+            {
+                int width = _outputType.VectorSize();
+                int dim = features.Length / rows;
+                var linear = useLinearScorer && _reclassificationPredictor == null ? GetLinear() : null;
+                if (linear != null)
+                {
+                    float[] labelClasses = _classes.Values.Select(c => _labelConverter(c)).ToArray();
+                    if (_labelKey)
+                    {
+                        for (int i = 0; i < labelClasses.Length; ++i)
+                            --labelClasses[i];
+                    }
+                    var w = linear.Item1;
+                    float b = linear.Item2;
+                    // Contribution of every class.
+                    var classTerm = new float[labelClasses.Length];
+                    for (int c = 0; c < classTerm.Length; ++c)
+                        classTerm[c] = _singleColumn ? w[dim] * labelClasses[c] : w[dim + (int)labelClasses[c]];
+
+                    Parallel.For(0, rows, i =>
+                    {
+                        float s = b;
+                        int off = i * dim;
+                        for (int j = 0; j < dim; ++j)
+                            s += w[j] * features[off + j];
+                        off = i * width;
+                        Array.Clear(scores, off, width);
+                        for (int c = 0; c < classTerm.Length; ++c)
+                            scores[off + (_dstIndices == null ? c : _dstIndices[c])] = s + classTerm[c];
+                    });
+                }
+                else
+                {
+                    Parallel.For(0, rows, () => new Tuple<ValueMapper<VBuffer<float>, VBuffer<float>>, float[], VBuffer<float>[]>(
+                                                    GetMapper(), new float[dim], new VBuffer<float>[1]),
+                        (i, state, local) =>
+                        {
+                            Array.Copy(features, i * dim, local.Item2, 0, dim);
+                            var src = new VBuffer<float>(dim, local.Item2);
+                            local.Item1(in src, ref local.Item3[0]);
+                            var dst = local.Item3[0];
+                            int off = i * width;
+                            if (dst.IsDense)
+                                Array.Copy(dst.Values, 0, scores, off, width);
+                            else
+                            {
+                                Array.Clear(scores, off, width);
+                                for (int k = 0; k < dst.Count; ++k)
+                                    scores[off + dst.Indices[k]] = dst.Values[k];
+                            }
+                            return local;
+                        }, local => { });
+                }
+            }
+
+            #endregion
+
             #region IValueMapperDist
 #if IMPLIValueMapperDist
 
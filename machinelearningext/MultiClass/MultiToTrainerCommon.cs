@@ -44,6 +44,9 @@ namespace Scikit.ML.MultiClass
             [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to estimate how much a class should resample.", ShortName = "nt")]
             public int? numThreads;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Algorithm Virtual: ratio of negative classes added for every row, 0 for the square root of the number of classes.", ShortName = "nr")]
+            public float negativeRatio = 0f;
+
             [Argument(ArgumentType.AtMostOnce, HelpText = "Add one column for the label or one column per class.", ShortName = "sc")]
             public bool singleColumn = true;
 
@@ -424,6 +427,7 @@ namespace Scikit.ML.MultiClass
             {
                 case MultiToBinaryTransform.MultiplicationAlgorithm.Default:
                 case MultiToBinaryTransform.MultiplicationAlgorithm.Reweight:
+                case MultiToBinaryTransform.MultiplicationAlgorithm.Virtual:
                     dstName = source.Schema.GetTempColumnName() + "BL";
                     break;
                 case MultiToBinaryTransform.MultiplicationAlgorithm.Ranking:
@@ -441,6 +445,7 @@ namespace Scikit.ML.MultiClass
                 maxMulti = args.maxMulti,
                 seed = args.seed,
                 numThreads = args.numThreads,
+                negativeRatio = args.negativeRatio,
             };
 
             labName = lab.Name;
@@ -2,9 +2,11 @@
 
 using System;
 using System.IO;
+using System.Numerics;
 using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.Data;
+using Microsoft.ML.Internal.Calibration;
 using Microsoft.ML.Internal.Utilities;
 using Microsoft.ML.Model;
 using Microsoft.ML.Internal.Internallearn;
@@ -21,6 +23,11 @@ namespace Scikit.ML.MultiClass
 {
     using TScalarPredictor = IPredictorProducing<float>;
 
+    /// <summary>
+    /// One-vs-all predictor produced by <see cref="OptimizedOVATrainer"/>.
+    /// If every binary model is linear, the weights are stacked into a single matrix
+    /// and a row is scored with one matrix vector product instead of calling every model.
+    /// </summary>
     public sealed class OptimizedOVAPredictor :
         PredictorBase<VBuffer<float>>,
         IValueMapper,
@@ -52,6 +59,8 @@ namespace Scikit.ML.MultiClass
 
         private readonly ColumnType _outputType;
 
+        private readonly Lazy<FusedLinear> _fused;
+
         public override PredictionKind PredictionKind { get { return PredictionKind.MultiClassClassification; } }
 
         public ColumnType InputType { get { return _impl.InputType; } }
@@ -97,6 +106,7 @@ namespace Scikit.ML.MultiClass
 
             _impl = impl;
             _outputType = new VectorType(NumberType.Float, _impl.Predictors.Length);
+            _fused = new Lazy<FusedLinear>(() => FusedLinear.TryCreate(_impl));
         }
 
         private OptimizedOVAPredictor(IHostEnvironment env, ModelLoadContext ctx) : base(env, RegistrationName, ctx)
@@ -122,6 +132,7 @@ namespace Scikit.ML.MultiClass
             }
 
             _outputType = new VectorType(NumberType.Float, _impl.Predictors.Length);
+            _fused = new Lazy<FusedLinear>(() => FusedLinear.TryCreate(_impl));
         }
 
         public static OptimizedOVAPredictor Create(IHostEnvironment env, ModelLoadContext ctx)
@@ -156,7 +167,62 @@ namespace Scikit.ML.MultiClass
         {
             Host.Check(typeof(TIn) == typeof(VBuffer<float>));
             Host.Check(typeof(TOut) == typeof(VBuffer<float>));
-            return (ValueMapper<TIn, TOut>)(Delegate)_impl.GetMapper();
+            return (ValueMapper<TIn, TOut>)(Delegate)GetMapper(true);
+        }
+
+        /// <summary>
+        /// Tells if the binary models are linear and scored with a single matrix.
+        /// </summary>
+        public bool IsFused => _fused.Value != null;
+
+        /// <summary>
+        /// Returns a mapper computing the scores of all classes.
+        /// </summary>
+        /// <param name="useFusedScorer">use the stacked weights if every binary model is linear,
+        /// call every binary model otherwise</param>
+        public ValueMapper<VBuffer<float>, VBuffer<float>> GetMapper(bool useFusedScorer)
+        {
+            var fused = useFusedScorer ? _fused.Value : null;
+            return fused == null ? _impl.GetMapper() : fused.GetMapper();
+        }
+
+        /// <summary>
+        /// Scores a batch of rows.
+        /// </summary>
+        /// <param name="features">dense features, row after row</param>
+        /// <param name="rows">number of rows</param>
+        /// <param name="scores">scores, row after row, it must contain <c>rows * number of classes</c> values</param>
+        /// <param name="useFusedScorer">use one matrix product if every binary model is linear</param>
+        public void ScoreBatch(float[] features, int rows, float[] scores, bool useFusedScorer = true)
+        {
+            Host.CheckValue(features, nameof(features));
+            Host.CheckValue(scores, nameof(scores));
+            Host.CheckParam(rows >= 0 && (rows == 0 || features.Length % rows == 0), nameof(rows), "features must contain rows * dimension values");
+            int nbClasses = _impl.Predictors.Length;
+            Host.CheckParam(scores.Length >= rows * nbClasses, nameof(scores), "too short");
+            if (rows == 0)
+                return;
+            int dim = features.Length / rows;
+            if (_impl.InputType.VectorSize() > 0)
+                Host.CheckParam(dim == _impl.InputType.VectorSize(), nameof(features), "Unexpected dimension.");
+
+            var fused = useFusedScorer ? _fused.Value : null;
+            if (fused != null)
+            {
+                fused.ScoreBatch(features, rows, scores);
+                return;
+            }
+
+            var mapper = _impl.GetMapper();
+            var row = new float[dim];
+            var buf = new VBuffer<float>();
+            for (int i = 0; i < rows; ++i)
+            {
+                Array.Copy(features, i * dim, row, 0, dim);
+                var src = new VBuffer<float>(dim, row);
+                mapper(in src, ref buf);
+                Array.Copy(buf.Values, 0, scores, i * nbClasses, nbClasses);
+            }
         }
 
         public void SaveAsCode(TextWriter writer, RoleMappedSchema names)
@@ -265,6 +331,26 @@ namespace Scikit.ML.MultiClass
                     src.CopyTo(ref dst);
             }
 
+            internal static void ClampAndNormalize(float[] output, int offset, int count)
+            {
+                // Clamp to zero and normalize.
+                Double sum = 0;
+                for (int i = offset; i < offset + count; i++)
+                {
+                    var value = output[i];
+                    if (value >= 0)
+                        sum += value;
+                    else
+                        output[i] = 0;
+                }
+
+                if (sum > 0)
+                {
+                    for (int i = offset; i < offset + count; i++)
+                        output[i] = (float)(output[i] / sum);
+                }
+            }
+
             protected bool IsValid(IValueMapper mapper, ref ColumnType inputType)
             {
                 if (mapper == null)
@@ -383,29 +469,136 @@ namespace Scikit.ML.MultiClass
                                 float score = 0;
                                 maps[i](in tmp, ref score, ref values[i]);
                             });
-                        Normalize(values, maps.Length);
+                        ClampAndNormalize(values, 0, maps.Length);
                         dst = new VBuffer<float>(maps.Length, values, dst.Indices);
                     };
             }
+        }
+
+        /// <summary>
+        /// Stacks the weights of linear binary models into one matrix.
+        /// The matrix is stored transposed (dimension x classes) so that every feature
+        /// updates the scores of all classes with one contiguous loop.
+        /// A binary model is considered as linear if it is a linear binary classifier
+        /// or a linear regressor (see <see cref="LinearPredictorHelper"/>).
+        /// </summary>
+        private sealed class FusedLinear
+        {
+            private readonly int _dim;
+            private readonly int _nbClasses;
+            private readonly float[] _weights;
+            private readonly float[] _bias;
+            private readonly ICalibrator[] _calibrators;
 
-            private void Normalize(float[] output, int count)
+            private FusedLinear(int dim, float[] weights, float[] bias, ICalibrator[] calibrators)
             {
-                // Clamp to zero and normalize.
-                Double sum = 0;
-                for (int i = 0; i < count; i++)
+                _dim = dim;
+                _nbClasses = bias.Length;
+                _weights = weights;
+                _bias = bias;
+                _calibrators = calibrators;
+            }
+
+            /// <summary>
+            /// Returns null if one binary model is not linear.
+            /// </summary>
+            public static FusedLinear TryCreate(ImplBase impl)
+            {
+                int dim = impl.InputType.VectorSize();
+                if (dim <= 0)
+                    return null;
+                var preds = impl.Predictors;
+                bool useDist = impl is ImplDist;
+                var weights = new float[dim * preds.Length];
+                var bias = new float[preds.Length];
+                var calibrators = useDist ? new ICalibrator[preds.Length] : null;
+
+                for (int k = 0; k < preds.Length; ++k)
                 {
-                    var value = output[i];
-                    if (value >= 0)
-                        sum += value;
-                    else
-                        output[i] = 0;
+                    float[] w;
+                    float b;
+                    ICalibrator calibrator;
+                    if (!LinearPredictorHelper.TryGetLinear(preds[k], dim, out w, out b, out calibrator))
+                        return null;
+                    if (useDist)
+                    {
+                        if (calibrator == null)
+                            return null;
+                        calibrators[k] = calibrator;
+                    }
+                    bias[k] = b;
+                    for (int j = 0; j < dim; ++j)
+                        weights[j * preds.Length + k] = w[j];
                 }
+                return new FusedLinear(dim, weights, bias, calibrators);
+            }
 
-                if (sum > 0)
+            public ValueMapper<VBuffer<float>, VBuffer<float>> GetMapper()
+            {
+                return (in VBuffer<float> src, ref VBuffer<float> dst) =>
                 {
-                    for (int i = 0; i < count; i++)
-                        output[i] = (float)(output[i] / sum);
+                    Contracts.Check(src.Length == _dim);
+                    var values = dst.Values;
+                    if (Utils.Size(values) < _nbClasses)
+                        values = new float[_nbClasses];
+                    Array.Copy(_bias, values, _nbClasses);
+                    if (src.IsDense)
+                    {
+                        for (int j = 0; j < src.Count; ++j)
+                            AddScaled(src.Values[j], _weights, j * _nbClasses, values, 0, _nbClasses);
+                    }
+                    else
+                    {
+                        for (int i = 0; i < src.Count; ++i)
+                            AddScaled(src.Values[i], _weights, src.Indices[i] * _nbClasses, values, 0, _nbClasses);
+                    }
+                    Calibrate(values, 0);
+                    dst = new VBuffer<float>(_nbClasses, values, dst.Indices);
+                };
+            }
+
+            /// <summary>
+            /// Computes <c>scores = features * weights + bias</c>, the rows are processed in parallel.
+            /// </summary>
+            public void ScoreBatch(float[] features, int rows, float[] scores)
+            {
+                Parallel.For(0, rows, i =>
+                {
+                    int offOut = i * _nbClasses;
+                    int offIn = i * _dim;
+                    Array.Copy(_bias, 0, scores, offOut, _nbClasses);
+                    for (int j = 0; j < _dim; ++j)
+                        AddScaled(features[offIn + j], _weights, j * _nbClasses, scores, offOut, _nbClasses);
+                    Calibrate(scores, offOut);
+                });
+            }
+
+            private void Calibrate(float[] scores, int offset)
+            {
+                if (_calibrators == null)
+                    return;
+                for (int k = 0; k < _nbClasses; ++k)
+                    scores[offset + k] = _calibrators[k].PredictProbability(scores[offset + k]);
+                ImplBase.ClampAndNormalize(scores, offset, _nbClasses);
+            }
+
+            /// <summary>
+            /// <c>dst[offDst:offDst+n] += a * src[offSrc:offSrc+n]</c>
+            /// </summary>
+            private static void AddScaled(float a, float[] src, int offSrc, float[] dst, int offDst, int n)
+            {
+                if (a == 0)
+                    return;
+                int i = 0;
+                if (Vector.IsHardwareAccelerated)
+                {
+                    int w = Vector<float>.Count;
+                    var va = new Vector<float>(a);
+                    for (; i <= n - w; i += w)
+                        (new Vector<float>(dst, offDst + i) + va * new Vector<float>(src, offSrc + i)).CopyTo(dst, offDst + i);
                 }
+                for (; i < n; ++i)
+                    dst[offDst + i] += a * src[offSrc + i];
             }
         }
     }
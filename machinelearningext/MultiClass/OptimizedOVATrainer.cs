@@ -2,6 +2,7 @@
 
 using System;
 using System.Linq;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -59,6 +60,12 @@ namespace Scikit.ML.MultiClass
             [Argument(ArgumentType.Multiple, HelpText = "Add a cache transform before training. That might required if cursor happen to be in an unstable state",
                 ShortName = "cache", NullName = "<None>", SignatureType = typeof(SignatureDataTransform))]
             public IComponentFactory<IDataTransform> cacheTransform = null;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of binary models trained at the same time, null for all cores.", ShortName = "nt")]
+            public int? numThreads = 1;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Caches the training data once and shares it between the binary models trained in parallel.", ShortName = "cd")]
+            public bool cacheData = true;
         }
 
         private readonly Arguments _args;
@@ -97,29 +104,80 @@ namespace Scikit.ML.MultiClass
             {
                 // Train one-vs-all models.
                 _predictors = new TScalarPredictor[count];
-                for (int i = 0; i < _predictors.Length; i++)
+                int nt = Math.Min(count, DataViewUtils.GetThreadCount(Host, _args.numThreads ?? 0));
+                if (nt <= 1)
                 {
-                    ch.Info("Training learner {0}", i);
-
-                    // We may have instantiated the first trainer to use already. If so capture it;
-                    // otherwise create a new one.
-                    TScalarTrainer trainer;
-                    if (_trainer != null)
-                        trainer = _trainer;
-                    else
+                    for (int i = 0; i < _predictors.Length; i++)
                     {
-                        var temp = ScikitSubComponent<ITrainer, SignatureBinaryClassifierTrainer>.AsSubComponent(_args.predictorType);
-                        trainer = temp.CreateInstance(Host) as TScalarTrainer;
+                        ch.Info("Training learner {0}", i);
+                        _predictors[i] = TrainOne(ch, CreateTrainer(), PrepareData(ch, data, i), CreateCalibrator());
                     }
-                    _trainer = null;
-                    _predictors[i] = TrainOne(ch, trainer, data, i);
                 }
+                else
+                    TrainParallel(ch, data, nt);
             }
             return CreatePredictor();
         }
 
+        private TScalarTrainer CreateTrainer()
+        {
+            // We may have instantiated the first trainer to use already. If so capture it;
+            // otherwise create a new one.
+            TScalarTrainer trainer;
+            if (_trainer != null)
+                trainer = _trainer;
+            else
+            {
+                var temp = ScikitSubComponent<ITrainer, SignatureBinaryClassifierTrainer>.AsSubComponent(_args.predictorType);
+                trainer = temp.CreateInstance(Host) as TScalarTrainer;
+            }
+            _trainer = null;
+            return trainer;
+        }
+
+        /// <summary>
+        /// Trains the binary models with <paramref name="nt"/> threads.
+        /// Every model gets its own trainer and its own label mapping on top of the same
+        /// training data, which is cached once if <c>cacheData</c> is true.
+        /// </summary>
+        private void TrainParallel(IChannel ch, RoleMappedData data, int nt)
+        {
+            if (_args.cacheData && !(data.Data is CacheDataView))
+            {
+                ch.Info("Caching the training data.");
+                var cached = new CacheDataView(Host, data.Data, null);
+                data = new RoleMappedData(cached, data.Schema.GetColumnRoleNames());
+            }
+
+            // Trainers, training data and calibrators are created sequentially,
+            // component creation is not meant to be concurrent.
+            var trainers = new TScalarTrainer[_predictors.Length];
+            var datas = new RoleMappedData[_predictors.Length];
+            var calibrators = new ICalibratorTrainer[_predictors.Length];
+            for (int i = 0; i < trainers.Length; i++)
+            {
+                trainers[i] = CreateTrainer();
+                datas[i] = PrepareData(ch, data, i);
+                calibrators[i] = CreateCalibrator();
+            }
+
+            ch.Info("Training {0} learners with {1} threads", trainers.Length, nt);
+            try
+            {
+                Parallel.For(0, trainers.Length, new ParallelOptions() { MaxDegreeOfParallelism = nt }, i =>
+                {
+                    using (var chi = Host.Start(string.Format("Training learner {0}", i)))
+                        _predictors[i] = TrainOne(chi, trainers[i], datas[i], calibrators[i]);
+                });
+            }
+            catch (AggregateException e)
+            {
+                throw ch.Except(e.InnerExceptions[0], "Unable to train one learner.");
+            }
+        }
+
         // cls is the "class id", zero-based.
-        private TScalarPredictor TrainOne(IChannel ch, TScalarTrainer trainer, RoleMappedData data, int cls)
+        private RoleMappedData PrepareData(IChannel ch, RoleMappedData data, int cls)
         {
             string dstName;
             var view = MapLabels(data, cls, out dstName, ch);
@@ -133,14 +191,24 @@ namespace Scikit.ML.MultiClass
             var roles = data.Schema.GetColumnRoleNames()
                 .Where(kvp => kvp.Key.Value != CR.Label.Value)
                 .Prepend(CR.Label.Bind(dstName));
-            var td = new RoleMappedData(view, roles);
+            return new RoleMappedData(view, roles);
+        }
 
+        // Returns null if probabilities are not requested.
+        private ICalibratorTrainer CreateCalibrator()
+        {
+            if (!_args.useProbabilities)
+                return null;
+            var calSett = ScikitSubComponent<ICalibratorTrainer, SignatureCalibrator>.AsSubComponent(_args.calibratorType);
+            return calSett.CreateInstance(Host);
+        }
+
+        private TScalarPredictor TrainOne(IChannel ch, TScalarTrainer trainer, RoleMappedData td, ICalibratorTrainer calibrator)
+        {
             var predictor = trainer.Train(td);
 
-            if (_args.useProbabilities)
+            if (calibrator != null)
             {
-                var calSett = ScikitSubComponent<ICalibratorTrainer, SignatureCalibrator>.AsSubComponent(_args.calibratorType);
-                var calibrator = calSett.CreateInstance(Host);
                 var res = CalibratorUtils.TrainCalibratorIfNeeded(Host, ch,
                                         calibrator, _args.maxCalibrationExamples,
                                         trainer, predictor, td);
@@ -0,0 +1,738 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Numerics;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Internal.Utilities;
+using Microsoft.ML.Model;
+
+
+namespace Scikit.ML.NearestNeighbors
+{
+    /// <summary>
+    /// Implements a kd tree stored in flat arrays.
+    /// Coordinates are stored in one dense matrix ordered by leaf,
+    /// the tree is balanced, node <c>i</c> has children <c>2i+1</c> and <c>2i+2</c>,
+    /// every leaf holds a bucket of at most <c>leafSize</c> points.
+    /// The tree cannot be modified once built. It follows the same
+    /// conventions as <see cref="KdTree"/>: distances are not squared
+    /// and neighbors are sorted by increasing distance.
+    /// The cosine distance is computed on normalized coordinates,
+    /// vectors with a null norm are not supported.
+    /// </summary>
+    public class FlatKdTree : INearestNeighborsTree
+    {
+        /// <summary>
+        /// Default number of points in a leaf.
+        /// </summary>
+        public const int DefaultLeafSize = 32;
+
+        #region members
+
+        readonly int _dim;
+        readonly int _n;
+        readonly int _leafSize;
+        readonly int _levels;
+        readonly NearestNeighborsDistance _distance;
+        readonly float[] _coords;
+        readonly long[] _ids;
+        readonly int[] _splitDim;
+        readonly float[] _splitValue;
+
+        public int dimension => _dim;
+        public int LeafSize => _leafSize;
+        public NearestNeighborsDistance Distance => _distance;
+        public long Count() { return _n; }
+        public bool Any() { return _n > 0; }
+
+        #endregion
+
+        #region constructor
+
+        /// <summary>
+        /// Builds the tree.
+        /// </summary>
+        /// <param name="coordinates">dense matrix (number of points x dimension), it is modified</param>
+        /// <param name="ids">point ids, <c>coordinates.Length / dimension</c> ids</param>
+        /// <param name="dimension">dimension</param>
+        /// <param name="distance">distance</param>
+        /// <param name="leafSize">maximum number of points in a leaf</param>
+        public FlatKdTree(float[] coordinates, long[] ids, int dimension,
+                          NearestNeighborsDistance distance = NearestNeighborsDistance.L2,
+                          int leafSize = DefaultLeafSize)
+        {
+            Contracts.CheckValue(coordinates, nameof(coordinates));
+            Contracts.CheckValue(ids, nameof(ids));
+            Contracts.CheckParam(dimension > 0, nameof(dimension), "must be positive");
+            Contracts.CheckParam(leafSize > 0, nameof(leafSize), "must be positive");
+            if (coordinates.Length != ids.Length * dimension)
+                throw Contracts.ExceptParam(nameof(coordinates), $"Dimension mismatch {coordinates.Length} != {ids.Length} x {dimension}.");
+
+            _dim = dimension;
+            _n = ids.Length;
+            _leafSize = leafSize;
+            _distance = distance;
+            CheckDistance(distance);
+            _levels = 0;
+            while (((long)_n + (1L << _levels) - 1) >> _levels > leafSize)
+                ++_levels;
+            if (_distance == NearestNeighborsDistance.cosine)
+            {
+                for (int i = 0; i < _n; ++i)
+                    Normalize(coordinates, i * _dim, _dim);
+            }
+
+            int nbNodes = (1 << _levels) - 1;
+            _splitDim = new int[nbNodes];
+            _splitValue = new float[nbNodes];
+            var perm = Enumerable.Range(0, _n).ToArray();
+            if (_n > 0)
+                Build(coordinates, perm, 0, 0, _n, 0);
+
+            // Points are reordered so that every leaf is a contiguous block.
+            _coords = new float[coordinates.Length];
+            _ids = new long[_n];
+            for (int i = 0; i < _n; ++i)
+            {
+                Array.Copy(coordinates, (long)perm[i] * _dim, _coords, (long)i * _dim, _dim);
+                _ids[i] = ids[perm[i]];
+            }
+        }
+
+        /// <summary>
+        /// Builds the tree from a list of points, sparse vectors are densified.
+        /// </summary>
+        public FlatKdTree(IEnumerable<IPointIdFloat> points, int dimension = -1,
+                          NearestNeighborsDistance distance = NearestNeighborsDistance.L2,
+                          int leafSize = DefaultLeafSize) :
+            this(Densify(points, ref dimension), points.Select(c => c.id).ToArray(),
+                 dimension, distance, leafSize)
+        {
+        }
+
+        /// <summary>
+        /// Converts a <see cref="KdTree"/>.
+        /// </summary>
+        public FlatKdTree(KdTree tree, int leafSize = DefaultLeafSize) :
+            this(tree.EnumeratePoints().ToList(), tree.dimension, tree.Distance, leafSize)
+        {
+        }
+
+        public FlatKdTree(ModelLoadContext ctx)
+        {
+            _dim = ctx.Reader.ReadInt32();
+            _n = ctx.Reader.ReadInt32();
+            _leafSize = ctx.Reader.ReadInt32();
+            _levels = ctx.Reader.ReadInt32();
+            _distance = (NearestNeighborsDistance)ctx.Reader.ReadInt32();
+            CheckDistance(_distance);
+            _coords = ctx.Reader.ReadSingleArray();
+            _ids = new long[_n];
+            for (int i = 0; i < _n; ++i)
+                _ids[i] = ctx.Reader.ReadInt64();
+            _splitDim = ctx.Reader.ReadIntArray();
+            _splitValue = ctx.Reader.ReadSingleArray();
+            byte b = ctx.Reader.ReadByte();
+            if (b != 168)
+                throw Contracts.Except("Detected inconsistency in deserializing.");
+            if (_coords.Length != _n * _dim || _splitDim.Length != (1 << _levels) - 1 || _splitValue.Length != _splitDim.Length)
+                throw Contracts.Except("Detected inconsistency in deserializing.");
+        }
+
+        public void Save(ModelSaveContext ctx)
+        {
+            ctx.Writer.Write(_dim);
+            ctx.Writer.Write(_n);
+            ctx.Writer.Write(_leafSize);
+            ctx.Writer.Write(_levels);
+            ctx.Writer.Write((int)_distance);
+            ctx.Writer.WriteSingleArray(_coords);
+            for (int i = 0; i < _n; ++i)
+                ctx.Writer.Write(_ids[i]);
+            ctx.Writer.WriteIntArray(_splitDim);
+            ctx.Writer.WriteSingleArray(_splitValue);
+            ctx.Writer.Write((byte)168);
+        }
+
+        static void CheckDistance(NearestNeighborsDistance distance)
+        {
+            switch (distance)
+            {
+                case NearestNeighborsDistance.cosine:
+                case NearestNeighborsDistance.L1:
+                case NearestNeighborsDistance.L2:
+                    break;
+                default:
+                    throw Contracts.Except("No associated distance for {0}", distance);
+            }
+        }
+
+        static float[] Densify(IEnumerable<IPointIdFloat> points, ref int dimension)
+        {
+            Contracts.CheckValue(points, nameof(points));
+            var list = points as IList<IPointIdFloat> ?? points.ToList();
+            if (dimension <= 0)
+            {
+                if (list.Count == 0)
+                    throw new ArgumentException("Points array must be non-empty if the dimension is not specified.");
+                dimension = list[0].dimension;
+            }
+            var res = new float[(long)list.Count * dimension];
+            for (int i = 0; i < list.Count; ++i)
+            {
+                var p = list[i];
+                if (p.dimension != dimension)
+                    throw new ArgumentException(string.Format("Wrong Point dimension: expected {0}, got {1}", dimension, p.dimension));
+                CopyTo(p.coordinates, res, (long)i * dimension);
+            }
+            return res;
+        }
+
+        internal static void CopyTo(in VBuffer<float> vec, float[] dest, long offset)
+        {
+            if (vec.IsDense)
+                Array.Copy(vec.Values, 0, dest, offset, vec.Length);
+            else
+            {
+                Array.Clear(dest, (int)offset, vec.Length);
+                for (int j = 0; j < vec.Count; ++j)
+                    dest[offset + vec.Indices[j]] = vec.Values[j];
+            }
+        }
+
+        static void Normalize(float[] data, int offset, int dim)
+        {
+            double norm = 0;
+            for (int i = offset; i < offset + dim; ++i)
+                norm += data[i] * data[i];
+            if (norm > 0)
+            {
+                float inv = (float)(1.0 / Math.Sqrt(norm));
+                for (int i = offset; i < offset + dim; ++i)
+                    data[i] *= inv;
+            }
+        }
+
+        #endregion
+
+        #region build
+
+        void Build(float[] coords, int[] perm, int node, int begin, int end, int level)
+        {
+            if (level == _levels)
+                return;
+
+            // Splits along the dimension with the largest spread.
+            int best = 0;
+            float bestSpread = -1;
+            for (int d = 0; d < _dim; ++d)
+            {
+                float mini = float.MaxValue, maxi = float.MinValue;
+                for (int i = begin; i < end; ++i)
+                {
+                    float v = coords[(long)perm[i] * _dim + d];
+                    if (v < mini)
+                        mini = v;
+                    if (v > maxi)
+                        maxi = v;
+                }
+                if (maxi - mini > bestSpread)
+                {
+                    bestSpread = maxi - mini;
+                    best = d;
+                }
+            }
+
+            int mid = begin + (end - begin) / 2;
+            if (end - begin > 1)
+                Select(coords, perm, begin, end, mid, best);
+            _splitDim[node] = best;
+            _splitValue[node] = mid < end ? coords[(long)perm[mid] * _dim + best] : 0f;
+
+            if (end - begin > 1 << 16)
+                Parallel.Invoke(() => Build(coords, perm, node * 2 + 1, begin, mid, level + 1),
+                                () => Build(coords, perm, node * 2 + 2, mid, end, level + 1));
+            else
+            {
+                Build(coords, perm, node * 2 + 1, begin, mid, level + 1);
+                Build(coords, perm, node * 2 + 2, mid, end, level + 1);
+            }
+        }
+
+        /// <summary>
+        /// Partial sort of <c>perm[begin:end]</c> (quickselect) so that
+        /// <c>perm[nth]</c> is at its sorted position for dimension <c>d</c>.
+        /// </summary>
+        void Select(float[] coords, int[] perm, int begin, int end, int nth, int d)
+        {
+            while (end - begin > 1)
+            {
+                float a = coords[(long)perm[begin] * _dim + d];
+                float b = coords[(long)perm[(begin + end) / 2] * _dim + d];
+                float c = coords[(long)perm[end - 1] * _dim + d];
+                float pivot = Math.Max(Math.Min(a, b), Math.Min(Math.Max(a, b), c));
+
+                // Three-way partition, duplicated keys end up in the middle.
+                int lt = begin, i = begin, gt = end - 1, tmp;
+                while (i <= gt)
+                {
+                    float v = coords[(long)perm[i] * _dim + d];
+                    if (v < pivot)
+                    {
+                        tmp = perm[lt]; perm[lt] = perm[i]; perm[i] = tmp;
+                        ++lt;
+                        ++i;
+                    }
+                    else if (v > pivot)
+                    {
+                        tmp = perm[gt]; perm[gt] = perm[i]; perm[i] = tmp;
+                        --gt;
+                    }
+                    else
+                        ++i;
+                }
+                if (nth < lt)
+                    end = lt;
+                else if (nth > gt)
+                    begin = gt + 1;
+                else
+                    return;
+            }
+        }
+
+        #endregion
+
+        #region ids
+
+        /// <summary>
+        /// Add a constant to every id. Needs when elements are loaded from multiple threads.
+        /// </summary>
+        public void MoveId(long add)
+        {
+            for (int i = 0; i < _ids.Length; ++i)
+                _ids[i] += add;
+        }
+
+        public IEnumerable<long> EnumerateIds()
+        {
+            return _ids;
+        }
+
+        /// <summary>
+        /// Returns the points, coordinates are normalized for the cosine distance.
+        /// </summary>
+        public IEnumerable<IPointIdFloat> EnumeratePoints()
+        {
+            for (int i = 0; i < _n; ++i)
+            {
+                var values = new float[_dim];
+                Array.Copy(_coords, (long)i * _dim, values, 0, _dim);
+                yield return new PointIdFloat(_ids[i], new VBuffer<float>(_dim, values), false);
+            }
+        }
+
+        #endregion
+
+        #region distances
+
+        /// <summary>
+        /// Squared L2 distance between two rows.
+        /// </summary>
+        public static float SquaredL2(float[] a, int offa, float[] b, int offb, int dim)
+        {
+            int i = 0;
+            float s = 0;
+            if (Vector.IsHardwareAccelerated)
+            {
+                int w = Vector<float>.Count;
+                var acc = Vector<float>.Zero;
+                for (; i <= dim - w; i += w)
+                {
+                    var d = new Vector<float>(a, offa + i) - new Vector<float>(b, offb + i);
+                    acc += d * d;
+                }
+                s = Vector.Dot(acc, Vector<float>.One);
+            }
+            for (; i < dim; ++i)
+            {
+                float d = a[offa + i] - b[offb + i];
+                s += d * d;
+            }
+            return s;
+        }
+
+        /// <summary>
+        /// L1 distance between two rows.
+        /// </summary>
+        public static float L1(float[] a, int offa, float[] b, int offb, int dim)
+        {
+            int i = 0;
+            float s = 0;
+            if (Vector.IsHardwareAccelerated)
+            {
+                int w = Vector<float>.Count;
+                var acc = Vector<float>.Zero;
+                for (; i <= dim - w; i += w)
+                    acc += Vector.Abs(new Vector<float>(a, offa + i) - new Vector<float>(b, offb + i));
+                s = Vector.Dot(acc, Vector<float>.One);
+            }
+            for (; i < dim; ++i)
+            {
+                float d = a[offa + i] - b[offb + i];
+                s += d > 0 ? d : -d;
+            }
+            return s;
+        }
+
+        /// <summary>
+        /// Computes the internal distance (squared L2 for L2 and cosine).
+        /// </summary>
+        float InternalDistance(float[] target, int offset, int row)
+        {
+            return _distance == NearestNeighborsDistance.L1
+                        ? L1(target, offset, _coords, row * _dim, _dim)
+                        : SquaredL2(target, offset, _coords, row * _dim, _dim);
+        }
+
+        /// <summary>
+        /// Lower bound of the internal distance to any point on the other side of a split.
+        /// </summary>
+        float PlaneDistance(float diff)
+        {
+            return _distance == NearestNeighborsDistance.L1 ? Math.Abs(diff) : diff * diff;
+        }
+
+        /// <summary>
+        /// Converts an internal distance into the distance returned to the user.
+        /// </summary>
+        float FinalDistance(float d)
+        {
+            switch (_distance)
+            {
+                case NearestNeighborsDistance.L2:
+                    return (float)Math.Sqrt(d);
+                case NearestNeighborsDistance.cosine:
+                    // 1 - cos(u, v) = |u - v|^2 / 2 for normalized vectors.
+                    return d * 0.5f;
+                default:
+                    return d;
+            }
+        }
+
+        #endregion
+
+        #region search
+
+        /// <summary>
+        /// Bounded max-heap holding the k closest points found so far,
+        /// it also keeps the offsets between the target and the current cell.
+        /// </summary>
+        class Neighbors
+        {
+            public readonly float[] dist;
+            public readonly int[] rows;
+            public readonly float[] offsets;
+            public int count;
+
+            public Neighbors(int k, int dim)
+            {
+                dist = new float[k];
+                rows = new int[k];
+                offsets = new float[dim];
+            }
+
+            public float Worst => count < dist.Length ? float.MaxValue : dist[0];
+
+            public void Add(float d, int row)
+            {
+                int i;
+                if (count < dist.Length)
+                {
+                    // Sift up.
+                    i = count++;
+                    while (i > 0)
+                    {
+                        int p = (i - 1) / 2;
+                        if (dist[p] >= d)
+                            break;
+                        dist[i] = dist[p];
+                        rows[i] = rows[p];
+                        i = p;
+                    }
+                }
+                else
+                {
+                    if (d >= dist[0])
+                        return;
+                    // Replaces the root and sifts down.
+                    i = 0;
+                    while (true)
+                    {
+                        int c = 2 * i + 1;
+                        if (c >= count)
+                            break;
+                        if (c + 1 < count && dist[c + 1] > dist[c])
+                            ++c;
+                        if (dist[c] <= d)
+                            break;
+                        dist[i] = dist[c];
+                        rows[i] = rows[c];
+                        i = c;
+                    }
+                }
+                dist[i] = d;
+                rows[i] = row;
+            }
+        }
+
+        /// <summary>
+        /// Depth first search, <paramref name="cellDistance"/> is a lower bound
+        /// of the distance between the target and any point in the cell,
+        /// it is updated incrementally with the offset along the split dimension.
+        /// </summary>
+        void Search(float[] target, int offset, int node, int begin, int end, int level,
+                    float cellDistance, Neighbors nns)
+        {
+            if (level == _levels)
+            {
+                for (int row = begin; row < end; ++row)
+                    nns.Add(InternalDistance(target, offset, row), row);
+                return;
+            }
+            int mid = begin + (end - begin) / 2;
+            int d = _splitDim[node];
+            float diff = target[offset + d] - _splitValue[node];
+            float previous = nns.offsets[d];
+            float farDistance = cellDistance - PlaneDistance(previous) + PlaneDistance(diff);
+            if (diff <= 0)
+                Search(target, offset, node * 2 + 1, begin, mid, level + 1, cellDistance, nns);
+            else
+                Search(target, offset, node * 2 + 2, mid, end, level + 1, cellDistance, nns);
+            if (farDistance <= nns.Worst)
+            {
+                nns.offsets[d] = diff;
+                if (diff <= 0)
+                    Search(target, offset, node * 2 + 2, mid, end, level + 1, farDistance, nns);
+                else
+                    Search(target, offset, node * 2 + 1, begin, mid, level + 1, farDistance, nns);
+                nns.offsets[d] = previous;
+            }
+        }
+
+        void SearchRadius(float[] target, int offset, int node, int begin, int end, int level,
+                          float radius, List<KeyValuePair<float, long>> results)
+        {
+            if (level == _levels)
+            {
+                for (int row = begin; row < end; ++row)
+                {
+                    float d = InternalDistance(target, offset, row);
+                    if (d <= radius)
+                        results.Add(new KeyValuePair<float, long>(FinalDistance(d), _ids[row]));
+                }
+                return;
+            }
+            int mid = begin + (end - begin) / 2;
+            float diff = target[offset + _splitDim[node]] - _splitValue[node];
+            bool close = PlaneDistance(diff) <= radius;
+            if (diff <= 0 || close)
+                SearchRadius(target, offset, node * 2 + 1, begin, mid, level + 1, radius, results);
+            if (diff > 0 || close)
+                SearchRadius(target, offset, node * 2 + 2, mid, end, level + 1, radius, results);
+        }
+
+        /// <summary>
+        /// Fills the results for one target, sorted by increasing distance.
+        /// </summary>
+        int QueryOne(float[] target, int offset, Neighbors nns, float[] distances, long[] ids, int outOffset)
+        {
+            if (_distance == NearestNeighborsDistance.cosine)
+                Normalize(target, offset, _dim);
+            nns.count = 0;
+            Array.Clear(nns.offsets, 0, _dim);
+            Search(target, offset, 0, 0, _n, 0, 0f, nns);
+            int nb = nns.count;
+            // Pops the heap, the farthest point comes first.
+            for (int i = nb - 1; i >= 0; --i)
+            {
+                distances[outOffset + i] = FinalDistance(nns.dist[0]);
+                ids[outOffset + i] = _ids[nns.rows[0]];
+                float lastd = nns.dist[nns.count - 1];
+                int lastr = nns.rows[nns.count - 1];
+                --nns.count;
+                if (nns.count > 0)
+                {
+                    int j = 0;
+                    while (true)
+                    {
+                        int c = 2 * j + 1;
+                        if (c >= nns.count)
+                            break;
+                        if (c + 1 < nns.count && nns.dist[c + 1] > nns.dist[c])
+                            ++c;
+                        if (nns.dist[c] <= lastd)
+                            break;
+                        nns.dist[j] = nns.dist[c];
+                        nns.rows[j] = nns.rows[c];
+                        j = c;
+                    }
+                    nns.dist[j] = lastd;
+                    nns.rows[j] = lastr;
+                }
+            }
+            return nb;
+        }
+
+        void ValidateTarget(in VBuffer<float> target)
+        {
+            if (target.Length != _dim)
+                throw new ArgumentException(string.Format("Wrong Point dimension: expected {0}, got {1}", _dim, target.Length));
+        }
+
+        void ValidateSize(int k)
+        {
+            if (k <= 0)
+                throw new ArgumentException("N must be positive.");
+        }
+
+        #endregion
+
+        #region API
+
+        /// <summary>
+        /// Returns the k points closest to the target as pairs (distance, id)
+        /// sorted by increasing distance.
+        /// </summary>
+        public KeyValuePair<float, long>[] NearestNNeighbors(in VBuffer<float> target, int k)
+        {
+            ValidateTarget(in target);
+            ValidateSize(k);
+            var buffer = new float[_dim];
+            CopyTo(in target, buffer, 0);
+            var distances = new float[k];
+            var ids = new long[k];
+            int nb = QueryOne(buffer, 0, new Neighbors(k, _dim), distances, ids, 0);
+            var res = new KeyValuePair<float, long>[nb];
+            for (int i = 0; i < nb; ++i)
+                res[i] = new KeyValuePair<float, long>(distances[i], ids[i]);
+            return res;
+        }
+
+        /// <summary>
+        /// Answers many queries at once, queries are processed in parallel.
+        /// Row <c>i</c> of <paramref name="distances"/> and <paramref name="ids"/> receives
+        /// the neighbors of target <c>i</c> sorted by increasing distance,
+        /// missing neighbors (less than k points) get an infinite distance and id -1.
+        /// </summary>
+        /// <param name="targets">dense matrix (number of targets x dimension), it is not modified</param>
+        /// <param name="k">number of neighbors</param>
+        /// <param name="distances">receives the distances, matrix (number of targets x k)</param>
+        /// <param name="ids">receives the ids, matrix (number of targets x k)</param>
+        /// <param name="numThreads">number of threads, null for all cores</param>
+        public void NearestNNeighbors(float[] targets, int k, float[] distances, long[] ids, int? numThreads = null)
+        {
+            Contracts.CheckValue(targets, nameof(targets));
+            ValidateSize(k);
+            if (targets.Length % _dim != 0)
+                throw Contracts.ExceptParam(nameof(targets), $"Length {targets.Length} is not a multiple of the dimension {_dim}.");
+            int nrows = targets.Length / _dim;
+            if (distances == null || distances.Length < nrows * k)
+                throw Contracts.ExceptParam(nameof(distances), $"Expecting at least {nrows * k} elements.");
+            if (ids == null || ids.Length < nrows * k)
+                throw Contracts.ExceptParam(nameof(ids), $"Expecting at least {nrows * k} elements.");
+
+            var options = new ParallelOptions() { MaxDegreeOfParallelism = numThreads ?? Environment.ProcessorCount };
+            Parallel.For(0, nrows, options,
+                () => new Tuple<Neighbors, float[]>(new Neighbors(k, _dim), new float[_dim]),
+                (row, state, local) =>
+                {
+                    Array.Copy(targets, (long)row * _dim, local.Item2, 0, _dim);
+                    int nb = QueryOne(local.Item2, 0, local.Item1, distances, ids, row * k);
+                    for (int i = nb; i < k; ++i)
+                    {
+                        distances[row * k + i] = float.PositiveInfinity;
+                        ids[row * k + i] = -1;
+                    }
+                    return local;
+                },
+                local => { });
+        }
+
+        /// <summary>
+        /// Answers many queries at once, queries are processed in parallel.
+        /// </summary>
+        public KeyValuePair<float, long>[][] NearestNNeighbors(VBuffer<float>[] targets, int k, int? numThreads = null)
+        {
+            Contracts.CheckValue(targets, nameof(targets));
+            var matrix = new float[(long)targets.Length * _dim];
+            for (int i = 0; i < targets.Length; ++i)
+            {
+                ValidateTarget(in targets[i]);
+                CopyTo(in targets[i], matrix, (long)i * _dim);
+            }
+            var distances = new float[targets.Length * k];
+            var ids = new long[targets.Length * k];
+            NearestNNeighbors(matrix, k, distances, ids, numThreads);
+            var res = new KeyValuePair<float, long>[targets.Length][];
+            for (int i = 0; i < targets.Length; ++i)
+            {
+                int nb = Math.Min(k, _n);
+                res[i] = new KeyValuePair<float, long>[nb];
+                for (int j = 0; j < nb; ++j)
+                    res[i][j] = new KeyValuePair<float, long>(distances[i * k + j], ids[i * k + j]);
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Returns all points within a distance as pairs (distance, id).
+        /// </summary>
+        public IList<KeyValuePair<float, long>> PointsWithinDistance(in VBuffer<float> center, float distance)
+        {
+            ValidateTarget(in center);
+            var buffer = new float[_dim];
+            CopyTo(in center, buffer, 0);
+            var results = new List<KeyValuePair<float, long>>();
+            PointsWithinDistance(buffer, 0, distance, results);
+            return results;
+        }
+
+        /// <summary>
+        /// Adds all points within a distance of a dense center to <paramref name="results"/>
+        /// as pairs (distance, id), the center is stored in <paramref name="center"/>
+        /// at position <paramref name="offset"/>. The method does not allocate
+        /// and can be called by many threads with different buffers.
+        /// The center is normalized in place for the cosine distance.
+        /// </summary>
+        public void PointsWithinDistance(float[] center, int offset, float distance, List<KeyValuePair<float, long>> results)
+        {
+            Contracts.CheckValue(center, nameof(center));
+            Contracts.CheckValue(results, nameof(results));
+            if (offset < 0 || offset + _dim > center.Length)
+                throw Contracts.ExceptParam(nameof(offset), $"Position {offset} + {_dim} is outside the buffer.");
+            if (_distance == NearestNeighborsDistance.cosine)
+                Normalize(center, offset, _dim);
+            float radius;
+            switch (_distance)
+            {
+                case NearestNeighborsDistance.L2:
+                    radius = distance * distance;
+                    break;
+                case NearestNeighborsDistance.cosine:
+                    radius = distance * 2;
+                    break;
+                default:
+                    radius = distance;
+                    break;
+            }
+            if (_n > 0)
+                SearchRadius(center, offset, 0, 0, _n, 0, radius, results);
+        }
+
+        #endregion
+    }
+}
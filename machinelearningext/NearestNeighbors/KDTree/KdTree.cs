@@ -13,7 +13,7 @@ namespace Scikit.ML.NearestNeighbors
     /// <summary>
     /// Implements a kd tree.
     /// </summary>
-    public class KdTree
+    public class KdTree : INearestNeighborsTree
     {
         /// <summary>
         /// Maximum depth for the kdtree.
@@ -125,6 +125,7 @@ namespace Scikit.ML.NearestNeighbors
         #region Properties
 
         public int dimension { get; private set; }
+        public NearestNeighborsDistance Distance => _distance;
         private IKdTreeNode root;
         NearestNeighborsDistance _distance;
         Func<VBuffer<float>, VBuffer<float>, float> _distFunc;
@@ -228,6 +229,11 @@ namespace Scikit.ML.NearestNeighbors
                         yield return el.point;
         }
 
+        public IEnumerable<long> EnumerateIds()
+        {
+            return EnumeratePoints().Select(c => c.id);
+        }
+
         public void Save(ModelSaveContext ctx)
         {
             if (_seed.HasValue)
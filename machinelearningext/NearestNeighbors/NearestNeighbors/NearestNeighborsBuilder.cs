@@ -33,12 +33,12 @@ namespace Scikit.ML.NearestNeighbors
             var cursors = (nt == 1)
                                 ? new RowCursor[] { data.GetRowCursor(i => indexes.Contains(i), rand) }
                                 : data.GetRowCursorSet(i => indexes.Contains(i), nt, rand);
-            KdTree[] kdtrees;
+            INearestNeighborsTree[] kdtrees;
             Dictionary<long, Tuple<TLabel, float>>[] labelsWeights;
             if (nt == 1)
             {
                 labelsWeights = new Dictionary<long, Tuple<TLabel, float>>[1];
-                kdtrees = new KdTree[] { BuildKDTree<TLabel>(data,cursors[0],  featureIndex, labelIndex, idIndex, weightIndex,
+                kdtrees = new INearestNeighborsTree[] { BuildTree<TLabel>(data,cursors[0],  featureIndex, labelIndex, idIndex, weightIndex,
                     out labelsWeights[0], args) };
             }
             else
@@ -46,7 +46,7 @@ namespace Scikit.ML.NearestNeighbors
                 // Multithreading. We assume the distributed set of cursor is well distributed.
                 // No KdTree will be much smaller than the others.
                 Action[] ops = new Action[cursors.Length];
-                kdtrees = new KdTree[cursors.Length];
+                kdtrees = new INearestNeighborsTree[cursors.Length];
                 labelsWeights = new Dictionary<long, Tuple<TLabel, float>>[cursors.Length];
                 for (int i = 0; i < ops.Length; ++i)
                 {
@@ -54,7 +54,7 @@ namespace Scikit.ML.NearestNeighbors
                     kdtrees[i] = null;
                     ops[i] = new Action(() =>
                     {
-                        kdtrees[chunkId] = BuildKDTree<TLabel>(data, cursors[chunkId],
+                        kdtrees[chunkId] = BuildTree<TLabel>(data, cursors[chunkId],
                             featureIndex, labelIndex, idIndex, weightIndex,
                             out labelsWeights[chunkId], args);
                     });
@@ -86,7 +86,7 @@ namespace Scikit.ML.NearestNeighbors
             var labelId = merged.Select(c => c.Key).ToList();
             var treeId = new List<long>();
             for (int i = 0; i < kdtrees.Length; ++i)
-                treeId.AddRange(kdtrees[i].EnumeratePoints().Select(c => c.id));
+                treeId.AddRange(kdtrees[i].EnumerateIds());
             var h1 = new HashSet<long>(labelId);
             var h2 = new HashSet<long>(treeId);
             if (h1.Count != labelId.Count)
@@ -101,7 +101,72 @@ namespace Scikit.ML.NearestNeighbors
 
             // End.
             outLabelsWeights = merged;
-            return new NearestNeighborsTrees(ch, kdtrees);
+            return args.algo == NearestNeighborsAlgorithm.flatkdtree
+                        ? new NearestNeighborsTrees(ch, kdtrees.Cast<FlatKdTree>().ToArray())
+                        : new NearestNeighborsTrees(ch, kdtrees.Cast<KdTree>().ToArray());
+        }
+
+        private static INearestNeighborsTree BuildTree<TLabel>(IDataView data, RowCursor cursor,
+                        int featureIndex, int labelIndex, int idIndex, int weightIndex,
+                        out Dictionary<long, Tuple<TLabel, float>> labelsWeights, NearestNeighborsArguments args)
+            where TLabel : IComparable<TLabel>
+        {
+            switch (args.algo)
+            {
+                case NearestNeighborsAlgorithm.kdtree:
+                    return BuildKDTree<TLabel>(data, cursor, featureIndex, labelIndex, idIndex, weightIndex, out labelsWeights, args);
+                case NearestNeighborsAlgorithm.flatkdtree:
+                    return BuildFlatKDTree<TLabel>(data, cursor, featureIndex, labelIndex, idIndex, weightIndex, out labelsWeights, args);
+                default:
+                    throw Contracts.ExceptNotSupp($"Unexpected algorithm {args.algo}.");
+            }
+        }
+
+        private static FlatKdTree BuildFlatKDTree<TLabel>(IDataView data, RowCursor cursor,
+                        int featureIndex, int labelIndex, int idIndex, int weightIndex,
+                        out Dictionary<long, Tuple<TLabel, float>> labelsWeights, NearestNeighborsArguments args)
+            where TLabel : IComparable<TLabel>
+        {
+            using (cursor)
+            {
+                var featureGetter = cursor.GetGetter<VBuffer<float>>(featureIndex);
+                var labelGetter = labelIndex >= 0 ? cursor.GetGetter<TLabel>(labelIndex) : null;
+                var weightGetter = weightIndex >= 0 ? cursor.GetGetter<float>(weightIndex) : null;
+                var idGetter = idIndex >= 0 ? cursor.GetGetter<long>(idIndex) : null;
+                labelsWeights = new Dictionary<long, Tuple<TLabel, float>>();
+                var coordinates = new List<float>();
+                var ids = new List<long>();
+                int dim = -1;
+                float[] row = null;
+                VBuffer<float> features = new VBuffer<float>();
+                TLabel label = default(TLabel);
+                float weight = 1;
+                long lid = default(long);
+                while (cursor.MoveNext())
+                {
+                    featureGetter(ref features);
+                    if (labelGetter != null)
+                        labelGetter(ref label);
+                    if (weightGetter != null)
+                        weightGetter(ref weight);
+                    if (idGetter != null)
+                        idGetter(ref lid);
+                    else
+                        lid = labelsWeights.Count;
+                    labelsWeights[lid] = new Tuple<TLabel, float>(label, weight);
+                    if (dim == -1)
+                    {
+                        dim = features.Length;
+                        row = new float[dim];
+                    }
+                    else if (features.Length != dim)
+                        throw Contracts.Except("Wrong Point dimension: expected {0}, got {1}", dim, features.Length);
+                    FlatKdTree.CopyTo(in features, row, 0);
+                    coordinates.AddRange(row);
+                    ids.Add(lid);
+                }
+                return new FlatKdTree(coordinates.ToArray(), ids.ToArray(), Math.Max(dim, 1), args.distance);
+            }
         }
 
         private static KdTree BuildKDTree<TLabel>(IDataView data, RowCursor cursor,
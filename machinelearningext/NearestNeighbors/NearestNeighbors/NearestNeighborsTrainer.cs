@@ -160,10 +160,10 @@ namespace Scikit.ML.NearestNeighbors
                                 idIndex, weightIndex, out merged, _args);
 
             // End.
-            return CreateTrainedPredictor(kdtrees.Trees, merged);
+            return CreateTrainedPredictor(kdtrees, merged);
         }
 
-        protected virtual INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(KdTree[] kdtrees,
+        protected virtual INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(NearestNeighborsTrees kdtrees,
             Dictionary<long, Tuple<TLabel, float>> labelsWeights)
             where TLabel : IComparable<TLabel>
         {
@@ -19,7 +19,8 @@ namespace Scikit.ML.NearestNeighbors
 
     public enum NearestNeighborsAlgorithm
     {
-        kdtree = 1
+        kdtree = 1,
+        flatkdtree = 2
     }
 
     public enum NearestNeighborsDistance
@@ -29,16 +30,38 @@ namespace Scikit.ML.NearestNeighbors
         L2 = 4
     }
 
+    /// <summary>
+    /// Members shared by <see cref="KdTree"/> and <see cref="FlatKdTree"/>
+    /// needed to merge trees built on multiple threads.
+    /// </summary>
+    internal interface INearestNeighborsTree
+    {
+        bool Any();
+        void MoveId(long add);
+        IEnumerable<long> EnumerateIds();
+    }
+
     public class NearestNeighborsTrees
     {
         readonly IExceptionContext _host;
         readonly KdTree[] _kdtrees;
+        readonly FlatKdTree[] _flatTrees;
 
         readonly ColumnType _inputType;
         public ColumnType InputType { get { return _inputType; } }
         public KdTree[] Trees { get { return _kdtrees; } }
+        public FlatKdTree[] FlatTrees { get { return _flatTrees; } }
+        public NearestNeighborsAlgorithm Algorithm
+        {
+            get { return _flatTrees == null ? NearestNeighborsAlgorithm.kdtree : NearestNeighborsAlgorithm.flatkdtree; }
+        }
 
-        public long Count() { return _kdtrees.Select(c => c.Count()).Sum(); }
+        public long Count()
+        {
+            return _flatTrees == null
+                    ? _kdtrees.Select(c => c.Count()).Sum()
+                    : _flatTrees.Select(c => c.Count()).Sum();
+        }
 
         public NearestNeighborsTrees(IExceptionContext host, KdTree[] kdtrees)
         {
@@ -49,8 +72,34 @@ namespace Scikit.ML.NearestNeighbors
             _inputType = new VectorType(NumberType.R4, _kdtrees[0].dimension);
         }
 
+        public NearestNeighborsTrees(IExceptionContext host, FlatKdTree[] trees)
+        {
+            Contracts.CheckValue(host, "host");
+            _host = host;
+            _host.Check(!trees.Where(c => c == null).Any(), "kdtree");
+            _flatTrees = trees;
+            _inputType = new VectorType(NumberType.R4, _flatTrees[0].dimension);
+        }
+
+        /// <summary>
+        /// First version of the models (transform and predictors) which store
+        /// the kind of trees, models saved before only contain <see cref="KdTree"/>.
+        /// </summary>
+        public const uint VersionFlatTrees = 0x00010002;
+
         public void Save(ModelSaveContext ctx)
         {
+            ctx.Writer.Write((byte)(_flatTrees != null ? 1 : 0));
+            if (_flatTrees != null)
+            {
+                ctx.Writer.Write(_flatTrees.Length);
+                for (int i = 0; i < _flatTrees.Length; ++i)
+                {
+                    _host.CheckValue(_flatTrees[i], "kdtree");
+                    _flatTrees[i].Save(ctx);
+                }
+                return;
+            }
             ctx.Writer.Write(_kdtrees.Length);
             for (int i = 0; i < _kdtrees.Length; ++i)
             {
@@ -62,7 +111,19 @@ namespace Scikit.ML.NearestNeighbors
         public NearestNeighborsTrees(IHost env, ModelLoadContext ctx)
         {
             _host = env;
+            bool flat = ctx.Header.ModelVerWritten >= VersionFlatTrees && ctx.Reader.ReadByte() == 1;
             int nb = ctx.Reader.ReadInt32();
+            if (flat)
+            {
+                _flatTrees = new FlatKdTree[nb];
+                for (int i = 0; i < _flatTrees.Length; ++i)
+                {
+                    _flatTrees[i] = new FlatKdTree(ctx);
+                    _host.CheckValue(_flatTrees[i], "kdtree");
+                }
+                _inputType = new VectorType(NumberType.R4, _flatTrees[0].dimension);
+                return;
+            }
             _kdtrees = new KdTree[nb];
             for (int i = 0; i < nb; ++i)
             {
@@ -72,24 +133,32 @@ namespace Scikit.ML.NearestNeighbors
             _inputType = new VectorType(NumberType.R4, _kdtrees[0].dimension);
         }
 
+        int TreeCount => _flatTrees == null ? _kdtrees.Length : _flatTrees.Length;
+
+        KeyValuePair<float, long>[] NearestNNeighbors(int tree, PointIdFloat point, int k)
+        {
+            if (_flatTrees != null)
+                return _flatTrees[tree].NearestNNeighbors(point.coordinates, k);
+            // kdtrees returns the opposite of the distance.
+            return _kdtrees[tree].NearestNNeighborsAndDistance(point, k).Select(c => new KeyValuePair<float, long>(-c.Key, c.Value.id)).ToArray();
+        }
+
         public KeyValuePair<float, long>[] NearestNNeighbors(VBuffer<float> target, int k)
         {
             var point = new PointIdFloat(-1, target, false);
             KeyValuePair<float, long>[] neighbors;
-            if (_kdtrees.Length == 1)
-                // kdtrees returns the opposite of the distance.
-                neighbors = _kdtrees[0].NearestNNeighborsAndDistance(point, k).Select(c => new KeyValuePair<float, long>(-c.Key, c.Value.id)).ToArray();
+            if (TreeCount == 1)
+                neighbors = NearestNNeighbors(0, point, k);
             else
             {
-                KeyValuePair<float, long>[][] stack = new KeyValuePair<float, long>[_kdtrees.Length][];
-                var ops = new Action[_kdtrees.Length];
+                KeyValuePair<float, long>[][] stack = new KeyValuePair<float, long>[TreeCount][];
+                var ops = new Action[TreeCount];
                 for (int i = 0; i < ops.Length; ++i)
                 {
                     int chunkId = i;
                     ops[i] = () =>
                     {
-                        // kdtrees returns the opposite of the distance.
-                        stack[chunkId] = _kdtrees[chunkId].NearestNNeighborsAndDistance(point, k).Select(c => new KeyValuePair<float, long>(-c.Key, c.Value.id)).ToArray();
+                        stack[chunkId] = NearestNNeighbors(chunkId, point, k);
                     };
                 }
                 Parallel.Invoke(new ParallelOptions() { MaxDegreeOfParallelism = ops.Length }, ops);
@@ -100,5 +169,36 @@ namespace Scikit.ML.NearestNeighbors
             }
             return neighbors;
         }
+
+        /// <summary>
+        /// Answers many queries at once, queries are processed in parallel.
+        /// </summary>
+        public KeyValuePair<float, long>[][] NearestNNeighbors(VBuffer<float>[] targets, int k, int? numThreads = null)
+        {
+            _host.CheckValue(targets, "targets");
+            var results = new KeyValuePair<float, long>[TreeCount][][];
+            if (_flatTrees != null)
+            {
+                for (int t = 0; t < _flatTrees.Length; ++t)
+                    results[t] = _flatTrees[t].NearestNNeighbors(targets, k, numThreads);
+            }
+            else
+            {
+                var options = new ParallelOptions() { MaxDegreeOfParallelism = numThreads ?? Environment.ProcessorCount };
+                for (int t = 0; t < _kdtrees.Length; ++t)
+                {
+                    int tree = t;
+                    results[t] = new KeyValuePair<float, long>[targets.Length][];
+                    Parallel.For(0, targets.Length, options,
+                                 i => results[tree][i] = NearestNNeighbors(tree, new PointIdFloat(-1, targets[i], false), k));
+                }
+            }
+            if (results.Length == 1)
+                return results[0];
+            var neighbors = new KeyValuePair<float, long>[targets.Length][];
+            for (int i = 0; i < targets.Length; ++i)
+                neighbors[i] = results.SelectMany(c => c[i]).OrderBy(c => c.Key).Take(k).ToArray();
+            return neighbors;
+        }
     }
 }
@@ -128,7 +128,7 @@ namespace Scikit.ML.NearestNeighbors
         {
             _host.Check(typeof(TIn) == typeof(VBuffer<float>));
             _host.CheckValue(_labelWeights, "_labelWeights");
-            _host.Check(algo == NearestNeighborsAlgorithm.kdtree, "algo");
+            _host.Check(algo == NearestNeighborsAlgorithm.kdtree || algo == NearestNeighborsAlgorithm.flatkdtree, "algo");
 
             if (weight == NearestNeighborsWeights.uniform)
             {
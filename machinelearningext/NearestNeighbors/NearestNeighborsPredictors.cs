@@ -31,8 +31,8 @@ namespace Scikit.ML.NearestNeighbors
         {
             return new VersionInfo(
                 modelSignature: "KNNBINCL",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(NearestNeighborsBinaryClassifierPredictor).Assembly.FullName);
@@ -50,10 +50,19 @@ namespace Scikit.ML.NearestNeighbors
             Contracts.CheckValue(host, "host");
             host.CheckValue(kdtrees, "kdtrees");
             host.Check(!kdtrees.Where(c => c == null).Any(), "kdtrees");
+            return Create(host, new NearestNeighborsTrees(host, kdtrees), labelWeights, k, algo, weights);
+        }
+
+        internal static NearestNeighborsBinaryClassifierPredictor Create<TLabel>(IHost host,
+                                NearestNeighborsTrees trees, Dictionary<long, Tuple<TLabel, float>> labelWeights,
+                                int k, NearestNeighborsAlgorithm algo, NearestNeighborsWeights weights)
+            where TLabel : IComparable<TLabel>
+        {
+            Contracts.CheckValue(host, "host");
+            host.CheckValue(trees, "trees");
             NearestNeighborsBinaryClassifierPredictor res;
             using (var ch = host.Start("Creating kNN predictor"))
             {
-                var trees = new NearestNeighborsTrees(host, kdtrees);
                 var pred = new NearestNeighborsValueMapper<TLabel>(host, labelWeights);
                 res = new NearestNeighborsBinaryClassifierPredictor(host, trees, pred, k, algo, weights);
             }
@@ -120,8 +129,8 @@ namespace Scikit.ML.NearestNeighbors
         {
             return new VersionInfo(
                 modelSignature: "KNNMCLCL",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(NearestNeighborsMultiClassClassifierPredictor).Assembly.FullName);
@@ -145,10 +154,19 @@ namespace Scikit.ML.NearestNeighbors
             Contracts.CheckValue(host, "host");
             host.CheckValue(kdtrees, "kdtrees");
             host.Check(!kdtrees.Where(c => c == null).Any(), "kdtrees");
+            return Create(host, new NearestNeighborsTrees(host, kdtrees), labelWeights, k, algo, weights);
+        }
+
+        internal static NearestNeighborsMultiClassClassifierPredictor Create<TLabel>(IHost host,
+                                NearestNeighborsTrees trees, Dictionary<long, Tuple<TLabel, float>> labelWeights,
+                                int k, NearestNeighborsAlgorithm algo, NearestNeighborsWeights weights)
+            where TLabel : IComparable<TLabel>
+        {
+            Contracts.CheckValue(host, "host");
+            host.CheckValue(trees, "trees");
             NearestNeighborsMultiClassClassifierPredictor res;
             using (var ch = host.Start("Creating kNN predictor"))
             {
-                var trees = new NearestNeighborsTrees(host, kdtrees);
                 var pred = new NearestNeighborsValueMapper<TLabel>(host, labelWeights);
                 res = new NearestNeighborsMultiClassClassifierPredictor(host, trees, pred, k, algo, weights);
             }
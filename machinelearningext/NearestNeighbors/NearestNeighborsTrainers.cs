@@ -47,7 +47,7 @@ namespace Scikit.ML.NearestNeighbors
             return base.Train(data);
         }
 
-        protected override INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(KdTree[] kdtrees,
+        protected override INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(NearestNeighborsTrees kdtrees,
             Dictionary<long, Tuple<TLabel, float>> labelsWeights)
         {
             return NearestNeighborsBinaryClassifierPredictor.Create<TLabel>(Host, kdtrees, labelsWeights,
@@ -74,7 +74,7 @@ namespace Scikit.ML.NearestNeighbors
             return base.Train(data);
         }
 
-        protected override INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(KdTree[] kdtrees,
+        protected override INearestNeighborsPredictor CreateTrainedPredictor<TLabel>(NearestNeighborsTrees kdtrees,
             Dictionary<long, Tuple<TLabel, float>> labelsWeights)
         {
             return NearestNeighborsMultiClassClassifierPredictor.Create<TLabel>(Host, kdtrees, labelsWeights,
@@ -38,8 +38,8 @@ namespace Scikit.ML.NearestNeighbors
         {
             return new VersionInfo(
                 modelSignature: "NEARNEST",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(NearestNeighborsTransform).Assembly.FullName);
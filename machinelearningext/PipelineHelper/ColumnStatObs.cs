@@ -13,6 +13,8 @@ namespace Scikit.ML.PipelineHelper
 {
     /// <summary>
     /// Retains statistiques computed in a streaming mode.
+    /// Statistics computed on different parts of the data can be merged
+    /// with <see cref="Merge"/>.
     /// </summary>
     public class ColumnStatObs
     {
@@ -23,15 +25,34 @@ namespace Scikit.ML.PipelineHelper
             sum = 3,
             nb = 4,
             sum2 = 5,
-            hist = 6
+            hist = 6,
+            meanVar = 7
         }
 
+        /// <summary>
+        /// A histogram keeps exact counts until it sees more distinct values,
+        /// it then switches to a <see cref="QuantileSketch"/>.
+        /// </summary>
+        public const int MaxDistinctValues = 100;
+
         public StatKind kind;
+
+        /// <summary>
+        /// Statistics for every coordinate. For kind <c>meanVar</c>,
+        /// it contains the counts, the means, and the sums of squared deviations
+        /// (Welford's algorithm), one after another.
+        /// </summary>
         public VBuffer<double> stat;
         public Dictionary<string, long> text;
         public Dictionary<string, long> distText;
         public Dictionary<double, long> distDouble;
 
+        /// <summary>
+        /// Approximated distribution for a histogram with too many distinct values.
+        /// It is not serialized.
+        /// </summary>
+        public QuantileSketch sketch;
+
         public ColumnStatObs(StatKind kind)
         {
             this.kind = kind;
@@ -39,6 +60,7 @@ namespace Scikit.ML.PipelineHelper
             text = null;
             distText = null;
             distDouble = null;
+            sketch = null;
         }
 
         #region read write
@@ -95,9 +117,29 @@ namespace Scikit.ML.PipelineHelper
             return sb.ToString();
         }
 
+        /// <summary>
+        /// Returns an approximated histogram if the column has too many distinct values.
+        /// </summary>
+        Dictionary<double, long> SketchHistogram(int nbins = 10)
+        {
+            var counts = sketch.Histogram(nbins, out double[] bounds);
+            var res = new Dictionary<double, long>();
+            for (int i = 0; i < counts.Length; ++i)
+                res[(bounds[i] + bounds[i + 1]) / 2] = counts[i];
+            return res;
+        }
+
+        string SketchToString()
+        {
+            var qs = new[] { 0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1 };
+            var values = sketch.Quantiles(qs);
+            return string.Format("Approximated distribution (n={0}, rank error < {1:P2}): {2}", sketch.Count, sketch.RankError,
+                                 string.Join(" ", qs.Select((q, i) => string.Format("Q{0}:{1}", q * 100, values[i]))));
+        }
+
         public string ToString(bool jsonFormat)
         {
-            if (kind == StatKind.hist && distDouble == null && distText == null)
+            if (kind == StatKind.hist && distDouble == null && distText == null && sketch == null)
                 throw Contracts.Except("No distribution.");
             var allRows = new List<string>();
 
@@ -105,8 +147,15 @@ namespace Scikit.ML.PipelineHelper
             {
                 if (text != null && text.Count > 0)
                     allRows.Add(string.Format("{{\"{0}\": {1}}}", "stat", ToJson(text)));
+                if (kind == StatKind.meanVar && stat.Count > 0)
+                {
+                    GetMeanVar(out double[] nb, out double[] mean, out double[] variance);
+                    allRows.Add(string.Format("{{\"mean\": [{0}], \"var\": [{1}]}}", string.Join(", ", mean), string.Join(", ", variance)));
+                }
                 if (distDouble != null && distDouble.Count > 0)
                     allRows.Add(string.Format("{{\"{0}\": {1}}}", "distFloat", ToJson(distDouble)));
+                if (sketch != null && sketch.Count > 0)
+                    allRows.Add(string.Format("{{\"{0}\": {1}}}", "distFloatApprox", ToJson(SketchHistogram())));
                 if (distText != null && distText.Count > 0)
                     allRows.Add(string.Format("{{\"{0}\": {1}}}", "distText", ToJson(distText)));
             }
@@ -118,6 +167,12 @@ namespace Scikit.ML.PipelineHelper
                     var rows = text.OrderBy(c => c.Key).Select(c => string.Format("{0}:\"{1}\"", c.Value, c.Key));
                     allRows.Add(string.Format("{0}({1}): {2}", kind.ToString(), text.Count, string.Join(" ", rows)));
                 }
+                else if (kind == StatKind.meanVar)
+                {
+                    GetMeanVar(out double[] nb, out double[] mean, out double[] variance);
+                    allRows.Add(string.Format("mean[{0}]: {1}", mean.Length, string.Join(" ", mean.Select((c, i) => string.Format("{0}:{1}", i, c)))));
+                    allRows.Add(string.Format("var[{0}]: {1}", variance.Length, string.Join(" ", variance.Select((c, i) => string.Format("{0}:{1}", i, c)))));
+                }
                 else if (kind != StatKind.hist)
                 {
                     if (stat.Count <= 1)
@@ -148,6 +203,8 @@ namespace Scikit.ML.PipelineHelper
                     }
                     allRows.Add(string.Join(" ", rows));
                 }
+                if (sketch != null && sketch.Count > 0)
+                    allRows.Add(SketchToString());
                 if (distText != null && distText.Any())
                 {
                     var rows = new List<string>();
@@ -168,8 +225,20 @@ namespace Scikit.ML.PipelineHelper
 
         #region init
 
+        bool InitMeanVar(int dim)
+        {
+            if (stat.Count == 0)
+            {
+                stat = new VBuffer<double>(dim * 3, new double[dim * 3]);
+                return true;
+            }
+            return false;
+        }
+
         bool Init(double value)
         {
+            if (kind == StatKind.meanVar)
+                return InitMeanVar(1);
             if (stat.Count == 0)
             {
                 stat = new VBuffer<double>(1, new double[] { double.NaN });
@@ -194,6 +263,8 @@ namespace Scikit.ML.PipelineHelper
 
         bool Init(VBuffer<double> value)
         {
+            if (kind == StatKind.meanVar)
+                return InitMeanVar(value.Length);
             if (stat.Count == 0)
             {
                 stat = new VBuffer<double>();
@@ -207,6 +278,8 @@ namespace Scikit.ML.PipelineHelper
 
         bool Init(VBuffer<float> value_)
         {
+            if (kind == StatKind.meanVar)
+                return InitMeanVar(value_.Length);
             if (stat.Count == 0)
             {
                 var value = new VBuffer<float>();
@@ -228,6 +301,16 @@ namespace Scikit.ML.PipelineHelper
         {
             if (double.IsNaN(value) || double.IsInfinity(value))
                 return;
+            if (kind == StatKind.meanVar)
+            {
+                UpdateMeanVar(value, i);
+                return;
+            }
+            if (kind == StatKind.hist)
+            {
+                UpdateHist(value, 1);
+                return;
+            }
             if (kind != StatKind.hist && stat.Count == 1 && double.IsNaN(stat.Values[0]))
                 r = true;
             if (r)
@@ -245,9 +328,6 @@ namespace Scikit.ML.PipelineHelper
                     case StatKind.nb:
                         stat.Values[i] = 1;
                         break;
-                    case StatKind.hist:
-                        distDouble[value] = 1;
-                        break;
                     default:
                         throw Contracts.ExceptNotImpl();
                 }
@@ -271,15 +351,45 @@ namespace Scikit.ML.PipelineHelper
                     case StatKind.nb:
                         stat.Values[i] += 1;
                         break;
-                    case StatKind.hist:
-                        distDouble[value] = distDouble.ContainsKey(value) ? distDouble[value] + 1 : 1;
-                        break;
                     default:
                         throw Contracts.ExceptNotImpl();
                 }
             }
         }
 
+        /// <summary>
+        /// Welford's algorithm, numerically stable and mergeable.
+        /// </summary>
+        void UpdateMeanVar(double value, int i)
+        {
+            int dim = stat.Length / 3;
+            var values = stat.Values;
+            double n = values[i] + 1;
+            double delta = value - values[dim + i];
+            values[i] = n;
+            values[dim + i] += delta / n;
+            values[2 * dim + i] += delta * (value - values[dim + i]);
+        }
+
+        void UpdateHist(double value, long count)
+        {
+            if (sketch != null)
+            {
+                sketch.Add(value, count);
+                return;
+            }
+            if (distDouble == null)
+                distDouble = new Dictionary<double, long>();
+            distDouble[value] = distDouble.ContainsKey(value) ? distDouble[value] + count : count;
+            if (distDouble.Count > MaxDistinctValues)
+            {
+                sketch = new QuantileSketch();
+                foreach (var pair in distDouble)
+                    sketch.Add(pair.Key, pair.Value);
+                distDouble = null;
+            }
+        }
+
         #endregion
 
         #region update for a string
@@ -309,6 +419,7 @@ namespace Scikit.ML.PipelineHelper
                     case StatKind.sum2:
                     case StatKind.nb:
                     case StatKind.hist:
+                    case StatKind.meanVar:
                         keys = text.OrderBy(c => -c.Value).Select(c => c.Key).ToArray();
                         var sum = keys.Take(20).Select(k => text[k]).Sum();
                         for (int j = 0; j < 20; ++j)
@@ -363,7 +474,7 @@ namespace Scikit.ML.PipelineHelper
             bool r = Init(value);
             if (value.IsDense)
             {
-                for (int i = 0; i < stat.Count; ++i)
+                for (int i = 0; i < value.Count; ++i)
                     Update(value.Values[i], i, r);
             }
             else
@@ -378,7 +489,7 @@ namespace Scikit.ML.PipelineHelper
             bool r = Init(value);
             if (value.IsDense)
             {
-                for (int i = 0; i < stat.Count; ++i)
+                for (int i = 0; i < value.Count; ++i)
                     Update(value.Values[i], i, r);
             }
             else
@@ -389,5 +500,141 @@ namespace Scikit.ML.PipelineHelper
         }
 
         #endregion
+
+        #region merge
+
+        /// <summary>
+        /// Returns the number of observations, the mean and the variance of every coordinate
+        /// for kind <c>meanVar</c>.
+        /// </summary>
+        public void GetMeanVar(out double[] nb, out double[] mean, out double[] variance)
+        {
+            if (kind != StatKind.meanVar)
+                throw Contracts.Except("Kind must be meanVar not {0}.", kind);
+            int dim = stat.Length / 3;
+            var values = stat.DenseValues().ToArray();
+            nb = new double[dim];
+            mean = new double[dim];
+            variance = new double[dim];
+            for (int i = 0; i < dim; ++i)
+            {
+                nb[i] = values[i];
+                mean[i] = values[dim + i];
+                variance[i] = nb[i] == 0 ? 0 : values[2 * dim + i] / nb[i];
+            }
+        }
+
+        /// <summary>
+        /// Merges statistics of the same kind computed on another part of the data.
+        /// Means and variances are merged with Chan's formula, histograms
+        /// and sketches are added. Text counts are added but not truncated.
+        /// </summary>
+        public void Merge(ColumnStatObs other)
+        {
+            Contracts.CheckValue(other, nameof(other));
+            if (other.kind != kind)
+                throw Contracts.Except("Cannot merge statistics {0} and {1}.", kind, other.kind);
+
+            if (other.stat.Count > 0)
+            {
+                if (stat.Count == 0)
+                    other.stat.CopyTo(ref stat);
+                else if (kind != StatKind.hist)
+                {
+                    if (stat.Length != other.stat.Length || !stat.IsDense || !other.stat.IsDense)
+                        throw Contracts.Except("Dimension mismatch {0} != {1}.", stat.Length, other.stat.Length);
+                    if (kind == StatKind.meanVar)
+                        MergeMeanVar(other.stat.Values);
+                    else
+                        MergeValues(other.stat.Values);
+                }
+            }
+
+            if (other.text != null)
+            {
+                if (text == null)
+                    text = new Dictionary<string, long>();
+                foreach (var pair in other.text)
+                    text[pair.Key] = text.ContainsKey(pair.Key) ? text[pair.Key] + pair.Value : pair.Value;
+            }
+            if (other.distText != null)
+            {
+                if (distText == null)
+                    distText = new Dictionary<string, long>();
+                foreach (var pair in other.distText)
+                    distText[pair.Key] = distText.ContainsKey(pair.Key) ? distText[pair.Key] + pair.Value : pair.Value;
+            }
+            if (other.distDouble != null)
+            {
+                foreach (var pair in other.distDouble)
+                    UpdateHist(pair.Key, pair.Value);
+            }
+            if (other.sketch != null)
+            {
+                if (sketch == null)
+                {
+                    sketch = new QuantileSketch();
+                    if (distDouble != null)
+                    {
+                        foreach (var pair in distDouble)
+                            sketch.Add(pair.Key, pair.Value);
+                        distDouble = null;
+                    }
+                }
+                sketch.Merge(other.sketch);
+            }
+        }
+
+        void MergeValues(double[] values)
+        {
+            for (int i = 0; i < stat.Count; ++i)
+            {
+                double b = values[i];
+                if (double.IsNaN(b))
+                    continue;
+                double a = stat.Values[i];
+                if (double.IsNaN(a))
+                {
+                    stat.Values[i] = b;
+                    continue;
+                }
+                switch (kind)
+                {
+                    case StatKind.min:
+                        stat.Values[i] = Math.Min(a, b);
+                        break;
+                    case StatKind.max:
+                        stat.Values[i] = Math.Max(a, b);
+                        break;
+                    case StatKind.sum:
+                    case StatKind.sum2:
+                    case StatKind.nb:
+                        stat.Values[i] = a + b;
+                        break;
+                    default:
+                        throw Contracts.ExceptNotImpl();
+                }
+            }
+        }
+
+        void MergeMeanVar(double[] values)
+        {
+            int dim = stat.Length / 3;
+            var cur = stat.Values;
+            for (int i = 0; i < dim; ++i)
+            {
+                double nb = values[i];
+                if (nb == 0)
+                    continue;
+                double na = cur[i];
+                double n = na + nb;
+                double delta = values[dim + i] - cur[dim + i];
+                cur[i] = n;
+                cur[dim + i] += delta * nb / n;
+                cur[2 * dim + i] += values[2 * dim + i] + delta * delta * na * nb / n;
+            }
+        }
+
+        #endregion
     }
 }
\ No newline at end of file
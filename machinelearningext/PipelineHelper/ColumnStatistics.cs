@@ -0,0 +1,174 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Computes <see cref="ColumnStatObs"/> on columns of a view in one pass.
+    /// Every cursor returned by <c>GetRowCursorSet</c> fills its own statistics
+    /// in a separate thread, they are merged at the end with <see cref="ColumnStatObs.Merge"/>.
+    /// </summary>
+    public static class ColumnStatistics
+    {
+        /// <summary>
+        /// Computes the statistics.
+        /// </summary>
+        /// <param name="host">environment</param>
+        /// <param name="input">view to walk through</param>
+        /// <param name="columns">columns to describe</param>
+        /// <param name="create">creates the empty statistics for a column name</param>
+        /// <param name="numThreads">number of threads, null for as many as possible</param>
+        /// <param name="nbRows">number of rows</param>
+        /// <returns>statistics for every column name</returns>
+        public static Dictionary<string, List<ColumnStatObs>> Compute(IHostEnvironment host, IDataView input, IEnumerable<int> columns,
+                                                                      Func<string, List<ColumnStatObs>> create, int? numThreads,
+                                                                      out long nbRows)
+        {
+            Contracts.CheckValue(host, nameof(host));
+            host.CheckValue(input, nameof(input));
+            host.CheckValue(columns, nameof(columns));
+            host.CheckValue(create, nameof(create));
+
+            var required = new HashSet<int>(columns);
+            int nt = DataViewUtils.GetThreadCount(host, numThreads ?? 0);
+            var cursors = nt <= 1 ? null : input.GetRowCursorSet(i => required.Contains(i), nt);
+            if (cursors == null)
+                cursors = new[] { input.GetRowCursor(i => required.Contains(i)) };
+
+            var partials = new Dictionary<string, List<ColumnStatObs>>[cursors.Length];
+            var rows = new long[cursors.Length];
+            var ops = new Action[cursors.Length];
+            for (int i = 0; i < ops.Length; ++i)
+            {
+                int chunkId = i;
+                ops[i] = new Action(() =>
+                {
+                    using (var cursor = cursors[chunkId])
+                        partials[chunkId] = Fill(cursor, required, create, out rows[chunkId]);
+                });
+            }
+
+            if (ops.Length == 1)
+                ops[0]();
+            else
+                Parallel.Invoke(new ParallelOptions() { }, ops);
+
+            // finalization
+            var res = partials[0];
+            for (int k = 1; k < partials.Length; ++k)
+            {
+                foreach (var pair in partials[k])
+                {
+                    var stats = res[pair.Key];
+                    for (int j = 0; j < stats.Count; ++j)
+                        stats[j].Merge(pair.Value[j]);
+                }
+            }
+            nbRows = rows.Sum();
+            return res;
+        }
+
+        static Dictionary<string, List<ColumnStatObs>> Fill(RowCursor cur, HashSet<int> required,
+                                                            Func<string, List<ColumnStatObs>> create, out long nbRows)
+        {
+            var sch = cur.Schema;
+            var requiredIndexes = required.OrderBy(c => c).ToArray();
+            bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextType.Instance).ToArray();
+            bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BoolType.Instance).ToArray();
+            bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberType.R4).ToArray();
+            bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberType.U4 || sch[c].Type.RawKind() == DataKind.U4).ToArray();
+            bool[] isInt = requiredIndexes.Select(c => sch[c].Type == NumberType.I4 || sch[c].Type.RawKind() == DataKind.I4).ToArray();
+            bool[] isInt8 = requiredIndexes.Select(c => sch[c].Type == NumberType.I8 || sch[c].Type.RawKind() == DataKind.I8).ToArray();
+
+            ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BoolType.Instance || sch[i].Type.RawKind() == DataKind.BL ? cur.GetGetter<bool>(i) : null).ToArray();
+            ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.U4 || sch[i].Type.RawKind() == DataKind.U4 ? cur.GetGetter<uint>(i) : null).ToArray();
+            ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(i) : null).ToArray();
+            ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.R4 ? cur.GetGetter<float>(i) : null).ToArray();
+            ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(i) : null).ToArray();
+            ValueGetter<int>[] intGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.I4 || sch[i].Type.RawKind() == DataKind.I4 ? cur.GetGetter<int>(i) : null).ToArray();
+            ValueGetter<long>[] int8Getters = requiredIndexes.Select(i => sch[i].Type == NumberType.I8 || sch[i].Type.RawKind() == DataKind.I8 ? cur.GetGetter<long>(i) : null).ToArray();
+
+            var stats = new Dictionary<string, List<ColumnStatObs>>();
+            var colStats = new List<ColumnStatObs>[requiredIndexes.Length];
+            for (int i = 0; i < requiredIndexes.Length; ++i)
+            {
+                string name = sch[requiredIndexes[i]].Name;
+                var t = create(name);
+                if (t == null)
+                    continue;
+                stats[name] = t;
+                colStats[i] = t;
+            }
+
+            float value = 0;
+            var tvalue = new ReadOnlyMemory<char>();
+            var vector = new VBuffer<float>();
+            uint uvalue = 0;
+            var bvalue = true;
+            var int4 = (int)0;
+            var int8 = (long)0;
+            nbRows = 0;
+
+            while (cur.MoveNext())
+            {
+                ++nbRows;
+                for (int i = 0; i < requiredIndexes.Length; ++i)
+                {
+                    var t = colStats[i];
+                    if (t == null)
+                        continue;
+                    if (isFloat[i])
+                    {
+                        floatGetters[i](ref value);
+                        foreach (var st in t)
+                            st.Update(value);
+                    }
+                    else if (isBool[i])
+                    {
+                        boolGetters[i](ref bvalue);
+                        foreach (var st in t)
+                            st.Update(bvalue);
+                    }
+                    else if (isText[i])
+                    {
+                        textGetters[i](ref tvalue);
+                        foreach (var st in t)
+                            st.Update(tvalue.ToString());
+                    }
+                    else if (isUint[i])
+                    {
+                        uintGetters[i](ref uvalue);
+                        foreach (var st in t)
+                            st.Update(uvalue);
+                    }
+                    else if (isInt[i])
+                    {
+                        intGetters[i](ref int4);
+                        foreach (var st in t)
+                            st.Update((double)int4);
+                    }
+                    else if (isInt8[i])
+                    {
+                        int8Getters[i](ref int8);
+                        foreach (var st in t)
+                            st.Update((double)int8);
+                    }
+                    else
+                    {
+                        vectorGetters[i](ref vector);
+                        foreach (var st in t)
+                            st.Update(vector);
+                    }
+                }
+            }
+            return stats;
+        }
+    }
+}
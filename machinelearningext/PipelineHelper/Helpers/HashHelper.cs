@@ -0,0 +1,26 @@
+﻿// See the LICENSE file in the project root for more information.
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Helpers about hashing.
+    /// </summary>
+    public static class HashHelper
+    {
+        /// <summary>
+        /// splitmix64 finalizer, every bit of the input changes
+        /// about half of the bits of the output.
+        /// </summary>
+        public static ulong Mix(ulong z)
+        {
+            unchecked
+            {
+                z += 0x9E3779B97F4A7C15UL;
+                z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+                z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+                return z ^ (z >> 31);
+            }
+        }
+    }
+}
@@ -0,0 +1,270 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.ML;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Streaming quantile sketch (KLL, Karnin, Lang, Liberty, 2016).
+    /// Items are stored in levels, an item at level h stands for 2^h observations.
+    /// When a level is full, it is sorted and one item out of two is promoted
+    /// to the next level (the first or the second one chosen at random).
+    /// The memory is bounded by about <c>3k</c> doubles whatever the number of observations,
+    /// and two sketches built on different parts of the data can be merged.
+    /// With <c>k = 200</c>, the rank of a quantile returned by the sketch is
+    /// within 1.65% of the requested rank with probability 99%. The error decreases in <c>1/k</c>.
+    /// </summary>
+    public class QuantileSketch
+    {
+        public const int DefaultK = 200;
+        const double Shrink = 2.0 / 3;
+
+        readonly int _k;
+        readonly Random _rand;
+        readonly List<List<double>> _levels;
+        long _count;
+        double _min;
+        double _max;
+
+        /// <summary>
+        /// Creates an empty sketch.
+        /// </summary>
+        /// <param name="k">capacity of the highest level, it controls the accuracy</param>
+        /// <param name="seed">seed for the random compactions</param>
+        public QuantileSketch(int k = DefaultK, int seed = 0)
+        {
+            Contracts.CheckParam(k >= 8, nameof(k), "must be >= 8");
+            _k = k;
+            _rand = new Random(seed);
+            _levels = new List<List<double>>() { new List<double>() };
+            _count = 0;
+            _min = double.NaN;
+            _max = double.NaN;
+        }
+
+        /// <summary>
+        /// Number of observations.
+        /// </summary>
+        public long Count => _count;
+        public double Min => _min;
+        public double Max => _max;
+        public int K => _k;
+
+        /// <summary>
+        /// Number of items kept in memory.
+        /// </summary>
+        public int RetainedItems => _levels.Sum(c => c.Count);
+
+        /// <summary>
+        /// Bound on the normalized rank error (probability 99%).
+        /// </summary>
+        public double RankError => 0.0165 * DefaultK / _k;
+
+        public void Add(double value)
+        {
+            Add(value, 1);
+        }
+
+        /// <summary>
+        /// Adds a value observed <paramref name="weight"/> times.
+        /// The weight is decomposed in powers of two, one item per level.
+        /// </summary>
+        public void Add(double value, long weight)
+        {
+            if (double.IsNaN(value) || weight <= 0)
+                return;
+            UpdateMinMax(value, value);
+            _count += weight;
+            bool several = weight > 1;
+            for (int h = 0; weight > 0; ++h, weight >>= 1)
+            {
+                if ((weight & 1) != 0)
+                {
+                    EnsureLevel(h);
+                    _levels[h].Add(value);
+                }
+            }
+            if (several || _levels[0].Count >= Capacity(0))
+                Compress();
+        }
+
+        /// <summary>
+        /// Merges another sketch into this one.
+        /// </summary>
+        public void Merge(QuantileSketch other)
+        {
+            Contracts.CheckValue(other, nameof(other));
+            if (other._count == 0)
+                return;
+            for (int h = 0; h < other._levels.Count; ++h)
+            {
+                EnsureLevel(h);
+                _levels[h].AddRange(other._levels[h]);
+            }
+            _count += other._count;
+            UpdateMinMax(other._min, other._max);
+            Compress();
+        }
+
+        void UpdateMinMax(double min, double max)
+        {
+            if (double.IsNaN(_min) || min < _min)
+                _min = min;
+            if (double.IsNaN(_max) || max > _max)
+                _max = max;
+        }
+
+        void EnsureLevel(int h)
+        {
+            while (_levels.Count <= h)
+                _levels.Add(new List<double>());
+        }
+
+        int Capacity(int h)
+        {
+            int depth = _levels.Count - 1 - h;
+            return Math.Max(2, (int)Math.Ceiling(_k * Math.Pow(Shrink, depth)));
+        }
+
+        void Compress()
+        {
+            for (int h = 0; h < _levels.Count; ++h)
+            {
+                var level = _levels[h];
+                if (level.Count < Capacity(h))
+                    continue;
+                EnsureLevel(h + 1);
+                level.Sort();
+                // An odd item stays at this level, the weight is preserved.
+                int n = level.Count - level.Count % 2;
+                var up = _levels[h + 1];
+                for (int i = _rand.Next(2); i < n; i += 2)
+                    up.Add(level[i]);
+                level.RemoveRange(0, n);
+            }
+        }
+
+        void SortedItems(out double[] values, out long[] weights)
+        {
+            int nb = RetainedItems;
+            values = new double[nb];
+            weights = new long[nb];
+            int pos = 0;
+            for (int h = 0; h < _levels.Count; ++h)
+            {
+                foreach (var v in _levels[h])
+                {
+                    values[pos] = v;
+                    weights[pos] = 1L << h;
+                    ++pos;
+                }
+            }
+            Array.Sort(values, weights);
+        }
+
+        /// <summary>
+        /// Returns an approximation of the quantile <paramref name="q"/>.
+        /// </summary>
+        public double Quantile(double q)
+        {
+            return Quantiles(new[] { q })[0];
+        }
+
+        /// <summary>
+        /// Returns an approximation of several quantiles with one sort.
+        /// </summary>
+        public double[] Quantiles(double[] qs)
+        {
+            Contracts.CheckValue(qs, nameof(qs));
+            var res = new double[qs.Length];
+            if (_count == 0)
+            {
+                for (int i = 0; i < res.Length; ++i)
+                    res[i] = double.NaN;
+                return res;
+            }
+            SortedItems(out double[] values, out long[] weights);
+            for (int i = 0; i < qs.Length; ++i)
+            {
+                Contracts.CheckParam(qs[i] >= 0 && qs[i] <= 1, nameof(qs), "quantiles must be in [0, 1]");
+                if (qs[i] == 0)
+                {
+                    res[i] = _min;
+                    continue;
+                }
+                if (qs[i] == 1)
+                {
+                    res[i] = _max;
+                    continue;
+                }
+                double target = qs[i] * _count;
+                long cum = 0;
+                res[i] = _max;
+                for (int j = 0; j < values.Length; ++j)
+                {
+                    cum += weights[j];
+                    if (cum >= target)
+                    {
+                        res[i] = values[j];
+                        break;
+                    }
+                }
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Returns an approximation of the proportion of observations lower or equal to <paramref name="value"/>.
+        /// </summary>
+        public double Rank(double value)
+        {
+            if (_count == 0)
+                return double.NaN;
+            long cum = 0;
+            for (int h = 0; h < _levels.Count; ++h)
+            {
+                long weight = 1L << h;
+                foreach (var v in _levels[h])
+                {
+                    if (v <= value)
+                        cum += weight;
+                }
+            }
+            return (double)cum / _count;
+        }
+
+        /// <summary>
+        /// Returns an approximate histogram with <paramref name="nbins"/> bins of the same width
+        /// between the minimum and the maximum. The counts sum to <see cref="Count"/>.
+        /// </summary>
+        /// <param name="nbins">number of bins</param>
+        /// <param name="bounds">the <c>nbins + 1</c> bounds of the bins</param>
+        /// <returns>approximated number of observations in every bin</returns>
+        public long[] Histogram(int nbins, out double[] bounds)
+        {
+            Contracts.CheckParam(nbins > 0, nameof(nbins), "must be > 0");
+            bounds = new double[nbins + 1];
+            var counts = new long[nbins];
+            if (_count == 0)
+                return counts;
+            double width = (_max - _min) / nbins;
+            for (int i = 0; i <= nbins; ++i)
+                bounds[i] = _min + width * i;
+            bounds[nbins] = _max;
+            for (int h = 0; h < _levels.Count; ++h)
+            {
+                long weight = 1L << h;
+                foreach (var v in _levels[h])
+                {
+                    int b = width > 0 ? (int)((v - _min) / width) : 0;
+                    counts[Math.Max(0, Math.Min(b, nbins - 1))] += weight;
+                }
+            }
+            return counts;
+        }
+    }
+}
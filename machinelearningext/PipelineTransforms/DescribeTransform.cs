@@ -29,6 +29,9 @@ namespace Scikit.ML.PipelineTransforms
 {
     /// <summary>
     /// Compute various statistics on a list of columns.
+    /// The statistics are computed in one parallel pass over the data.
+    /// Histograms are exact up to <see cref="ColumnStatObs.MaxDistinctValues"/> distinct values,
+    /// they are approximated with a <see cref="QuantileSketch"/> beyond that limit.
     /// </summary>
     public class DescribeTransform : IDataTransform, ISaveAsOnnx
     {
@@ -40,8 +43,8 @@ namespace Scikit.ML.PipelineTransforms
         {
             return new VersionInfo(
                 modelSignature: "DESCTRNS",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(DescribeTransform).Assembly.FullName);
@@ -52,7 +55,7 @@ namespace Scikit.ML.PipelineTransforms
             [Argument(ArgumentType.MultipleUnique, HelpText = "Columns to describe (min, max, mean, ...).", ShortName = "col")]
             public string[] columns;
 
-            [Argument(ArgumentType.MultipleUnique, HelpText = "Compute an histogram for this column. Limited to 100 values.", ShortName = "hist")]
+            [Argument(ArgumentType.MultipleUnique, HelpText = "Compute an histogram for this column. Exact up to 100 distinct values, approximated with a quantile sketch beyond.", ShortName = "hist")]
             public string[] hists;
 
             [Argument(ArgumentType.AtMostOnce, HelpText = "Saves the statistics in a file.", ShortName = "dout")]
@@ -77,6 +80,9 @@ namespace Scikit.ML.PipelineTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "If not null, every display will start by <name> and end by </name>")]
             public string name = "desc";
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to compute the statistics, null for as many as possible.", ShortName = "nt")]
+            public int? numThreads;
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(columns == null ? string.Empty : string.Join(",", columns));
@@ -88,6 +94,7 @@ namespace Scikit.ML.PipelineTransforms
                 ctx.Writer.Write(oneRowPerColumn ? 1 : 0);
                 ctx.Writer.Write(jsonFormat ? 1 : 0);
                 ctx.Writer.Write(name);
+                ctx.Writer.Write(numThreads ?? -1);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -113,6 +120,13 @@ namespace Scikit.ML.PipelineTransforms
                 oneRowPerColumn = ctx.Reader.ReadInt32() == 1;
                 jsonFormat = ctx.Reader.ReadInt32() == 1;
                 name = ctx.Reader.ReadString();
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    nb = ctx.Reader.ReadInt32();
+                    numThreads = nb > 0 ? (int?)nb : null;
+                }
+                else
+                    numThreads = null;
             }
 
             public void PostProcess()
@@ -126,12 +140,25 @@ namespace Scikit.ML.PipelineTransforms
 
         IDataView _input;
         IDataView _statistics;
+        Dictionary<string, List<ColumnStatObs>> _columnStatistics;
         Arguments _args;
         IHost _host;
         object _lock;
 
         public IDataView Source { get { return _input; } }
 
+        /// <summary>
+        /// Returns the statistics for every described column, they are computed if needed.
+        /// </summary>
+        public Dictionary<string, List<ColumnStatObs>> Statistics
+        {
+            get
+            {
+                ComputeStatistics();
+                return _columnStatistics;
+            }
+        }
+
         public DescribeTransform(IHostEnvironment env, Arguments args, IDataView input)
         {
             Contracts.CheckValue(env, "env");
@@ -211,7 +238,7 @@ namespace Scikit.ML.PipelineTransforms
             {
                 if (_statistics == null)
                 {
-                    var stats = new Dictionary<string, List<ColumnStatObs>>();
+                    Dictionary<string, List<ColumnStatObs>> stats;
 
                     using (var ch = _host.Start("Computing statistics"))
                     {
@@ -226,15 +253,6 @@ namespace Scikit.ML.PipelineTransforms
                                 ch.Info("    <{0}>Schema: {1}</{0}>", _args.name, SchemaHelper.ToString(_input.Schema));
                         }
 
-                        if (_args.dimension)
-                        {
-                            var nbRows = DataViewHelper.ComputeRowCount(_input);
-                            if (_args.jsonFormat)
-                                ch.Info("    <{0}>{{\"NbRows\":\"{1}\"}},</{0}>", _args.name, nbRows);
-                            else
-                                ch.Info("    <{0}>NbRows: {1}</{0}>", _args.name, nbRows);
-                        }
-
                         var sch = _input.Schema;
                         var indexesCol = new List<int>();
                         var textCols = new List<string>();
@@ -256,108 +274,31 @@ namespace Scikit.ML.PipelineTransforms
                             indexesCol.Add(index);
                         }
 
-                        // Computation
-                        var required = new HashSet<int>(indexesCol);
-                        var requiredIndexes = required.OrderBy(c => c).ToArray();
-                        using (var cur = _input.GetRowCursor(i => required.Contains(i)))
+                        // Computation, the number of rows is computed in the same pass.
+                        var cols = _args.columns == null ? null : new HashSet<string>(_args.columns);
+                        var hists = _args.hists == null ? null : new HashSet<string>(_args.hists);
+                        Func<string, List<ColumnStatObs>> create = name =>
                         {
-                            bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextType.Instance).ToArray();
-                            bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BoolType.Instance).ToArray();
-                            bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberType.R4).ToArray();
-                            bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberType.U4 || sch[c].Type.RawKind() == DataKind.U4).ToArray();
-                            bool[] isInt = requiredIndexes.Select(c => sch[c].Type == NumberType.I4 || sch[c].Type.RawKind() == DataKind.I4).ToArray();
-                            bool[] isInt8 = requiredIndexes.Select(c => sch[c].Type == NumberType.I8 || sch[c].Type.RawKind() == DataKind.I8).ToArray();
-
-                            ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BoolType.Instance || sch[i].Type.RawKind() == DataKind.BL ? cur.GetGetter<bool>(i) : null).ToArray();
-                            ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.U4 || sch[i].Type.RawKind() == DataKind.U4 ? cur.GetGetter<uint>(i) : null).ToArray();
-                            ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(i) : null).ToArray();
-                            ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.R4 ? cur.GetGetter<float>(i) : null).ToArray();
-                            ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(i) : null).ToArray();
-                            ValueGetter<int>[] intGetters = requiredIndexes.Select(i => sch[i].Type == NumberType.I4 || sch[i].Type.RawKind() == DataKind.I4 ? cur.GetGetter<int>(i) : null).ToArray();
-                            ValueGetter<long>[] int8Getters = requiredIndexes.Select(i => sch[i].Type == NumberType.I8 || sch[i].Type.RawKind() == DataKind.I8 ? cur.GetGetter<long>(i) : null).ToArray();
-
-                            var cols = _args.columns == null ? null : new HashSet<string>(_args.columns);
-                            var hists = _args.hists == null ? null : new HashSet<string>(_args.hists);
-                            var schema = _input.Schema;
-
-                            for (int i = 0; i < schema.Count; ++i)
+                            var t = new List<ColumnStatObs>();
+                            if (cols != null && cols.Contains(name))
                             {
-                                string name = schema[i].Name;
-                                if (!required.Contains(i))
-                                    continue;
-                                stats[name] = new List<ColumnStatObs>();
-                                var t = stats[name];
-                                if (cols != null && cols.Contains(name))
-                                {
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum2));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.nb));
-                                }
-                                if (hists != null && hists.Contains(name))
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.hist));
+                                t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
+                                t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
+                                t.Add(new ColumnStatObs(ColumnStatObs.StatKind.meanVar));
                             }
+                            if (hists != null && hists.Contains(name))
+                                t.Add(new ColumnStatObs(ColumnStatObs.StatKind.hist));
+                            return t;
+                        };
+                        long nbRows;
+                        stats = ColumnStatistics.Compute(_host, _input, indexesCol, create, _args.numThreads, out nbRows);
 
-                            float value = 0;
-                            var tvalue = new ReadOnlyMemory<char>();
-                            var vector = new VBuffer<float>();
-                            uint uvalue = 0;
-                            var bvalue = true;
-                            var int4 = (int)0;
-                            var int8 = (long)0;
-
-                            while (cur.MoveNext())
-                            {
-                                for (int i = 0; i < requiredIndexes.Length; ++i)
-                                {
-                                    string name = cur.Schema[requiredIndexes[i]].Name;
-                                    if (!stats.ContainsKey(name))
-                                        continue;
-                                    if (isFloat[i])
-                                    {
-                                        floatGetters[i](ref value);
-                                        foreach (var t in stats[name])
-                                            t.Update(value);
-                                    }
-                                    else if (isBool[i])
-                                    {
-                                        boolGetters[i](ref bvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(bvalue);
-                                    }
-                                    else if (isText[i])
-                                    {
-                                        textGetters[i](ref tvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(tvalue.ToString());
-                                    }
-                                    else if (isUint[i])
-                                    {
-                                        uintGetters[i](ref uvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(uvalue);
-                                    }
-                                    else if (isInt[i])
-                                    {
-                                        intGetters[i](ref int4);
-                                        foreach (var t in stats[name])
-                                            t.Update((double)int4);
-                                    }
-                                    else if (isInt8[i])
-                                    {
-                                        int8Getters[i](ref int8);
-                                        foreach (var t in stats[name])
-                                            t.Update((double)int8);
-                                    }
-                                    else
-                                    {
-                                        vectorGetters[i](ref vector);
-                                        foreach (var t in stats[name])
-                                            t.Update(vector);
-                                    }
-                                }
-                            }
+                        if (_args.dimension)
+                        {
+                            if (_args.jsonFormat)
+                                ch.Info("    <{0}>{{\"NbRows\":\"{1}\"}},</{0}>", _args.name, nbRows);
+                            else
+                                ch.Info("    <{0}>NbRows: {1}</{0}>", _args.name, nbRows);
                         }
 
                         if (_args.oneRowPerColumn || _args.jsonFormat)
@@ -393,6 +334,7 @@ namespace Scikit.ML.PipelineTransforms
                         if (!_args.jsonFormat)
                             ch.Info("End DescribeTransform {0}", _args.name);
                     }
+                    _columnStatistics = stats;
                     _statistics = _input;
                 }
             }
@@ -46,10 +46,16 @@ namespace Scikit.ML.PipelineTransforms
     /// <summary>
     /// Cache data in memory or on disk. If async is true, the cache is asynchronous
     /// (different thread) and relies for some scenarios on class DataFrame.
+    /// If segmented is true, the cache is split into segments,
+    /// the least recently used segments are spilled on disk when the memory budget
+    /// is reached (see <see cref="SegmentedCacheView"/>). The segments are filled
+    /// with one cursor and keep the order of the source unless numThreads is greater than 1,
+    /// the rows are then grouped by thread and their order changes.
+    /// The spilled segments are removed when the transform is disposed.
     /// This transform can be used to overwrite some values in the middle of the pipeline
     /// while doing prediction.
     /// </summary>
-    public class ExtendedCacheTransform : TransformBase, ICanSaveOnnx
+    public class ExtendedCacheTransform : TransformBase, ICanSaveOnnx, IDisposable
     {
         #region identification
 
@@ -62,8 +68,8 @@ namespace Scikit.ML.PipelineTransforms
         {
             return new VersionInfo(
                 modelSignature: "EXTCACHT",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(ExtendedCacheTransform).Assembly.FullName);
@@ -81,7 +87,8 @@ namespace Scikit.ML.PipelineTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Asynchronous (use CacheView).", ShortName = "as")]
             public bool async = false;
 
-            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to fill the cache.", ShortName = "nt")]
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to fill the cache. The segmented cache uses one thread by default " +
+                "to keep the order of the source, with more threads the rows coming from the same thread stay together.", ShortName = "nt")]
             public int? numTheads = null;
 
             [Argument(ArgumentType.AtMostOnce, HelpText = "File name of the cache if stored on disk.", ShortName = "f")]
@@ -93,6 +100,21 @@ namespace Scikit.ML.PipelineTransforms
             [Argument(ArgumentType.Multiple, HelpText = "Saver settings if data is saved on disk (default is binary).", ShortName = "saver",
                       SignatureType = typeof(SignatureDataSaver))]
             public IComponentFactory<IDataSaver> saverSettings = new ScikitSubComponent<IDataSaver, SignatureDataSaver>("binary");
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Cache the data in segments, " +
+                "the least recently used segments are spilled on disk when the memory budget is reached. " +
+                "The segments are filled with one thread unless nt > 1 which also changes the order of the rows.", ShortName = "seg")]
+            public bool segmented = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of rows in a segment (segmented cache).", ShortName = "ss")]
+            public int segmentSize = 100000;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Memory budget in megabytes (segmented cache).", ShortName = "mem")]
+            public int memoryBudget = 1024;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Directory where segments are spilled, temporary folder if empty (segmented cache). " +
+                "It is not saved with the model.", ShortName = "dir")]
+            public string spillDirectory = null;
         }
 
         #endregion
@@ -105,10 +127,19 @@ namespace Scikit.ML.PipelineTransforms
         readonly bool _async;
         readonly int? _numThreads;
         readonly string _saverSettings;
+        readonly bool _segmented;
+        readonly int _segmentSize;
+        readonly int _memoryBudget;
+        readonly string _spillDirectory;
         readonly IDataTransform _pipedTransform;
 
         public override Schema OutputSchema { get { return Source.Schema; } }
 
+        /// <summary>
+        /// Counters of the segmented cache (null if the cache is not segmented).
+        /// </summary>
+        public CacheStatistics Statistics => (_pipedTransform as SegmentedCacheView)?.Statistics;
+
         #endregion
 
         #region public constructor / serialization / load / save
@@ -120,6 +151,9 @@ namespace Scikit.ML.PipelineTransforms
             Host.CheckUserArg(args.inDataFrame || !string.IsNullOrEmpty(args.cacheFile), "cacheFile cannot be empty if inDataFrame is false.");
             Host.CheckUserArg(!args.async || args.inDataFrame, "inDataFrame must be true if async is true.");
             Host.CheckUserArg(!args.numTheads.HasValue || args.numTheads > 0, "numThread must be > 0 if specified.");
+            Host.CheckUserArg(!args.segmented || !args.async, "async must be false if segmented is true.");
+            Host.CheckUserArg(args.segmentSize > 0, "segmentSize must be > 0.");
+            Host.CheckUserArg(args.memoryBudget >= 0, "memoryBudget must be >= 0.");
             var saverSettings = args.saverSettings as ICommandLineComponentFactory;
             Host.CheckValue(saverSettings, nameof(saverSettings));
             _saverSettings = string.Format("{0}{{{1}}}", saverSettings.Name, saverSettings.GetSettingsString());
@@ -131,6 +165,10 @@ namespace Scikit.ML.PipelineTransforms
             _reuse = args.reuse;
             _async = args.async;
             _numThreads = args.numTheads;
+            _segmented = args.segmented;
+            _segmentSize = args.segmentSize;
+            _memoryBudget = args.memoryBudget;
+            _spillDirectory = args.spillDirectory;
 
             var saver = ComponentCreation.CreateSaver(Host, _saverSettings);
             if (saver == null)
@@ -164,6 +202,9 @@ namespace Scikit.ML.PipelineTransforms
                 ctx.Writer.Write(_cacheFile);
                 ctx.Writer.Write(_reuse);
             }
+            ctx.Writer.Write(_segmented);
+            ctx.Writer.Write(_segmentSize);
+            ctx.Writer.Write(_memoryBudget);
         }
 
         private ExtendedCacheTransform(IHost host, ModelLoadContext ctx, IDataView input) :
@@ -190,6 +231,20 @@ namespace Scikit.ML.PipelineTransforms
                 _reuse = ctx.Reader.ReadBoolean();
                 host.CheckValue(_cacheFile, "_cacheFile");
             }
+            if (ctx.Header.ModelVerWritten >= 0x00010002)
+            {
+                _segmented = ctx.Reader.ReadBoolean();
+                _segmentSize = ctx.Reader.ReadInt32();
+                _memoryBudget = ctx.Reader.ReadInt32();
+            }
+            else
+            {
+                _segmented = false;
+                _segmentSize = 100000;
+                _memoryBudget = 1024;
+            }
+            // The spill directory depends on the machine, a loaded model uses the temporary folder.
+            _spillDirectory = null;
 
             var saver = ComponentCreation.CreateSaver(Host, _saverSettings);
             if (saver == null)
@@ -200,6 +255,14 @@ namespace Scikit.ML.PipelineTransforms
 
         #endregion
 
+        /// <summary>
+        /// Removes the segments spilled on disk if the cache is segmented.
+        /// </summary>
+        public void Dispose()
+        {
+            (_pipedTransform as SegmentedCacheView)?.Dispose();
+        }
+
         #region IDataTransform API
 
         /// <summary>
@@ -242,10 +305,12 @@ namespace Scikit.ML.PipelineTransforms
         #region transform own logic
 
         /// <summary>
-        /// Creation of the pipeline knowing parameters _inDataFrame, _cacheFile, _reuse.
+        /// Creation of the pipeline knowing parameters _segmented, _inDataFrame, _cacheFile, _reuse.
         /// </summary>
         protected IDataTransform CreatePipeline(IHostEnvironment env, IDataView input)
         {
+            if (_segmented)
+                return new SegmentedCacheView(env, input, _segmentSize, (long)_memoryBudget << 20, _spillDirectory, _numThreads);
             if (_inDataFrame)
             {
                 if (_async)
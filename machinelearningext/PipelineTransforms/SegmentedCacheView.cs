@@ -0,0 +1,677 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Model;
+using Scikit.ML.PipelineHelper;
+using Scikit.ML.DataManipulation;
+
+
+namespace Scikit.ML.PipelineTransforms
+{
+    /// <summary>
+    /// Counters of a <see cref="SegmentedCacheView"/>.
+    /// </summary>
+    public class CacheStatistics
+    {
+        /// <summary>
+        /// Number of segments.
+        /// </summary>
+        public long Segments;
+
+        /// <summary>
+        /// Number of segments written on disk.
+        /// </summary>
+        public long SpilledSegments;
+
+        /// <summary>
+        /// Estimated size in memory of all segments.
+        /// </summary>
+        public long BytesCached;
+
+        /// <summary>
+        /// Estimated size in memory of the segments currently in memory.
+        /// </summary>
+        public long BytesInMemory;
+
+        /// <summary>
+        /// Size of the files written on disk.
+        /// </summary>
+        public long BytesSpilled;
+
+        /// <summary>
+        /// Number of times a segment was requested and was in memory.
+        /// </summary>
+        public long Hits;
+
+        /// <summary>
+        /// Number of times a segment was requested and had to be read from disk.
+        /// </summary>
+        public long Misses;
+
+        public CacheStatistics Clone()
+        {
+            return (CacheStatistics)MemberwiseClone();
+        }
+
+        public override string ToString()
+        {
+            return string.Format("segments={0} spilled={1} cached={2}B in-memory={3}B on-disk={4}B hits={5} misses={6}",
+                                 Segments, SpilledSegments, BytesCached, BytesInMemory, BytesSpilled, Hits, Misses);
+        }
+    }
+
+    /// <summary>
+    /// Caches a view into segments of a fixed number of rows.
+    /// The segments are filled the first time a cursor is requested, with one cursor
+    /// by default or in parallel with the cursors returned by <see cref="IDataView.GetRowCursorSet"/>.
+    /// The segments stay in memory as long as their estimated size fits in a memory budget,
+    /// the least recently used segments are written on disk
+    /// (<see cref="DataFrameColumnarFile"/>) and read again when they are needed.
+    /// Every segment is a <see cref="DataFrame"/>, the row order is the order of the source
+    /// if the cache is filled with one thread, the rows coming from the same thread stay together otherwise
+    /// and the order depends on the thread scheduling.
+    /// The counters (<see cref="Statistics"/>) are logged on the host channel
+    /// every time a cursor or a cursor set is disposed.
+    /// </summary>
+    public class SegmentedCacheView : IDataTransform, IDisposable
+    {
+        #region members
+
+        class Segment
+        {
+            public int Id;
+            public long Start;
+            public int Length;
+            public long Bytes;
+            public DataFrame Data;
+            public string Filename;
+            public LinkedListNode<Segment> Node;
+        }
+
+        const int ArrayOverhead = 24;
+
+        /// <summary>
+        /// Spill directories not removed yet, finalizers do not run when the process exits
+        /// so the remaining ones are removed then.
+        /// </summary>
+        static readonly ConcurrentDictionary<string, bool> _pendingDirectories = new ConcurrentDictionary<string, bool>();
+
+        static SegmentedCacheView()
+        {
+            AppDomain.CurrentDomain.ProcessExit += (sender, e) =>
+            {
+                foreach (var dir in _pendingDirectories.Keys)
+                    DeleteDirectory(dir);
+            };
+        }
+
+        readonly IHost _host;
+        readonly IDataView _source;
+        readonly int _segmentSize;
+        readonly long _memoryBudget;
+        readonly string _spillRoot;
+        readonly int? _numThreads;
+        readonly int[] _toSegment;
+        readonly int[] _fromSegment;
+
+        readonly object _fillLock = new object();
+        readonly object _lock = new object();
+        readonly LinkedList<Segment> _lru = new LinkedList<Segment>();
+        readonly CacheStatistics _stats = new CacheStatistics();
+        Segment[] _segments;
+        string _spillDirectory;
+        long _length;
+        int _lastId;
+
+        public IDataView Source => _source;
+        public Schema Schema => _source.Schema;
+        public bool CanShuffle => true;
+
+        /// <summary>
+        /// Returns a copy of the counters.
+        /// </summary>
+        public CacheStatistics Statistics
+        {
+            get
+            {
+                lock (_lock)
+                    return _stats.Clone();
+            }
+        }
+
+        #endregion
+
+        #region constructor
+
+        /// <summary>
+        /// Creates the cache, it is filled the first time a cursor is requested.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="input">source</param>
+        /// <param name="segmentSize">number of rows in a segment</param>
+        /// <param name="memoryBudget">maximum number of bytes kept in memory (estimation),
+        /// the most recently used segment always stays in memory</param>
+        /// <param name="spillDirectory">directory where segments are written, temporary folder if null</param>
+        /// <param name="numThreads">number of threads used to fill the cache, 1 if null to keep the order of the source</param>
+        public SegmentedCacheView(IHostEnvironment env, IDataView input, int segmentSize, long memoryBudget,
+                                  string spillDirectory = null, int? numThreads = null)
+        {
+            _host = env.Register("SegmentedCacheView");
+            _host.CheckValue(input, "input");
+            _host.CheckParam(segmentSize > 0, nameof(segmentSize), "must be > 0");
+            _host.CheckParam(memoryBudget >= 0, nameof(memoryBudget), "must be >= 0");
+            _host.CheckParam(!numThreads.HasValue || numThreads.Value > 0, nameof(numThreads), "must be > 0");
+            _source = input;
+            _segmentSize = segmentSize;
+            _memoryBudget = memoryBudget;
+            _spillRoot = string.IsNullOrEmpty(spillDirectory) ? Path.GetTempPath() : spillDirectory;
+            _numThreads = numThreads;
+
+            // Hidden columns are not cached.
+            var schema = input.Schema;
+            _toSegment = new int[schema.Count];
+            var fromSegment = new List<int>();
+            for (int i = 0; i < schema.Count; ++i)
+            {
+                if (schema[i].IsHidden)
+                    _toSegment[i] = -1;
+                else
+                {
+                    _toSegment[i] = fromSegment.Count;
+                    fromSegment.Add(i);
+                }
+            }
+            _fromSegment = fromSegment.ToArray();
+        }
+
+        ~SegmentedCacheView()
+        {
+            Dispose(false);
+        }
+
+        /// <summary>
+        /// Removes the files written on disk, the cache cannot be used after that.
+        /// </summary>
+        public void Dispose()
+        {
+            Dispose(true);
+            GC.SuppressFinalize(this);
+        }
+
+        void Dispose(bool disposing)
+        {
+            var dir = _spillDirectory;
+            _spillDirectory = null;
+            if (dir != null)
+            {
+                DeleteDirectory(dir);
+                bool removed;
+                _pendingDirectories.TryRemove(dir, out removed);
+            }
+        }
+
+        static void DeleteDirectory(string dir)
+        {
+            if (!Directory.Exists(dir))
+                return;
+            try
+            {
+                Directory.Delete(dir, true);
+            }
+            catch (IOException)
+            {
+                // The folder stays in the temporary folder.
+            }
+            catch (UnauthorizedAccessException)
+            {
+                // The folder stays in the temporary folder.
+            }
+        }
+
+        public void Save(ModelSaveContext ctx)
+        {
+            throw Contracts.ExceptNotSupp();
+        }
+
+        #endregion
+
+        #region cache
+
+        void FillCacheIfNotFilled()
+        {
+            lock (_fillLock)
+            {
+                if (_segments != null)
+                    return;
+
+                using (var ch = _host.Start("Filling the segmented cache"))
+                {
+                    int nth = _numThreads ?? 1;
+                    var cursors = nth > 1
+                                    ? _source.GetRowCursorSet(i => true, nth)
+                                    : new[] { _source.GetRowCursor(i => true) };
+                    var filled = new List<Segment>[cursors.Length];
+                    Parallel.For(0, cursors.Length, new ParallelOptions() { MaxDegreeOfParallelism = cursors.Length }, t =>
+                    {
+                        filled[t] = new List<Segment>();
+                        using (var cursor = cursors[t])
+                        {
+                            int nb = _segmentSize;
+                            while (nb == _segmentSize)
+                            {
+                                var df = new DataFrame();
+                                nb = df.FillValues(cursor, _segmentSize, true);
+                                if (nb == 0)
+                                    break;
+                                if (nb < _segmentSize)
+                                    df = df.Copy(Enumerable.Range(0, nb), Enumerable.Range(0, df.ColumnCount));
+                                filled[t].Add(AddSegment(df));
+                            }
+                        }
+                    });
+
+                    var segments = filled.SelectMany(c => c).ToArray();
+                    long start = 0;
+                    foreach (var seg in segments)
+                    {
+                        seg.Start = start;
+                        start += seg.Length;
+                    }
+                    _length = start;
+                    _segments = segments;
+                    ch.Info("Cache filled with {0} threads, {1} rows, {2}", cursors.Length, _length, Statistics);
+                }
+            }
+        }
+
+        void LogStatistics()
+        {
+            using (var ch = _host.Start("Segmented cache"))
+                ch.Info("{0}", Statistics);
+        }
+
+        Segment AddSegment(DataFrame df)
+        {
+            var seg = new Segment()
+            {
+                Length = df.Length,
+                Bytes = EstimateBytes(df),
+                Data = df
+            };
+            List<Segment> victims;
+            lock (_lock)
+            {
+                seg.Id = _lastId++;
+                seg.Node = _lru.AddFirst(seg);
+                ++_stats.Segments;
+                _stats.BytesCached += seg.Bytes;
+                _stats.BytesInMemory += seg.Bytes;
+                victims = EvictLocked();
+            }
+            Spill(victims);
+            return seg;
+        }
+
+        /// <summary>
+        /// Returns a segment, reads it from disk if it was spilled.
+        /// </summary>
+        DataFrame GetSegment(int index)
+        {
+            var seg = _segments[index];
+            List<Segment> victims;
+            DataFrame df;
+            lock (seg)
+            {
+                df = seg.Data;
+                bool hit = df != null;
+                if (!hit)
+                {
+                    if (_spillDirectory == null)
+                        throw _host.Except("The cache was disposed.");
+                    df = DataFrameIO.ReadColumnar(seg.Filename, lazy: false);
+                    seg.Data = df;
+                }
+                lock (_lock)
+                {
+                    if (hit)
+                        ++_stats.Hits;
+                    else
+                        ++_stats.Misses;
+                    if (seg.Node == null)
+                    {
+                        seg.Node = _lru.AddFirst(seg);
+                        _stats.BytesInMemory += seg.Bytes;
+                    }
+                    else if (seg.Node != _lru.First)
+                    {
+                        _lru.Remove(seg.Node);
+                        _lru.AddFirst(seg.Node);
+                    }
+                    victims = EvictLocked();
+                }
+            }
+            Spill(victims);
+            return df;
+        }
+
+        /// <summary>
+        /// Removes the least recently used segments until the budget is met.
+        /// The segments are written on disk by <see cref="Spill"/> outside the lock.
+        /// </summary>
+        List<Segment> EvictLocked()
+        {
+            var victims = new List<Segment>();
+            while (_stats.BytesInMemory > _memoryBudget && _lru.Count > 1)
+            {
+                var last = _lru.Last.Value;
+                _lru.RemoveLast();
+                last.Node = null;
+                _stats.BytesInMemory -= last.Bytes;
+                victims.Add(last);
+            }
+            return victims;
+        }
+
+        void Spill(List<Segment> victims)
+        {
+            foreach (var seg in victims)
+            {
+                lock (seg)
+                {
+                    // The segment may have been requested again since it was evicted.
+                    if (seg.Node != null || seg.Data == null)
+                        continue;
+                    if (seg.Filename == null)
+                    {
+                        var filename = Path.Combine(GetSpillDirectory(), string.Format("segment{0}.bin", seg.Id));
+                        DataFrameColumnarFile.Write(seg.Data, filename);
+                        seg.Filename = filename;
+                        long size = new FileInfo(filename).Length;
+                        lock (_lock)
+                        {
+                            ++_stats.SpilledSegments;
+                            _stats.BytesSpilled += size;
+                        }
+                    }
+                    seg.Data = null;
+                }
+            }
+        }
+
+        string GetSpillDirectory()
+        {
+            lock (_lock)
+            {
+                if (_spillDirectory == null)
+                {
+                    _spillDirectory = Path.Combine(_spillRoot, "extcache_" + Guid.NewGuid().ToString("N"));
+                    Directory.CreateDirectory(_spillDirectory);
+                    _pendingDirectories[_spillDirectory] = true;
+                }
+                return _spillDirectory;
+            }
+        }
+
+        /// <summary>
+        /// Estimates the number of bytes a dataframe takes in memory.
+        /// </summary>
+        static long EstimateBytes(DataFrame df)
+        {
+            long bytes = 0;
+            var kinds = df.Kinds;
+            for (int c = 0; c < kinds.Length; ++c)
+            {
+                var column = df.GetColumn(c).Column;
+                var kind = kinds[c];
+                if (kind.IsVector())
+                {
+                    switch (kind.ItemType().RawKind())
+                    {
+                        case DataKind.BL: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<bool>>, 1); break;
+                        case DataKind.I4: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<int>>, 4); break;
+                        case DataKind.U4: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<uint>>, 4); break;
+                        case DataKind.I8: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<long>>, 8); break;
+                        case DataKind.R4: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<float>>, 4); break;
+                        case DataKind.R8: bytes += EstimateBytes(column as DataColumn<VBufferEqSort<double>>, 8); break;
+                        case DataKind.TX:
+                            bytes += (column as DataColumn<VBufferEqSort<DvText>>).Data.Sum(v =>
+                                        2 * ArrayOverhead + (v.IsDense ? 0 : 4L * v.Count) +
+                                        (v.Count == 0 ? 0 : v.Values.Take(v.Count).Sum(t => EstimateBytes(t))));
+                            break;
+                        default:
+                            throw Contracts.ExceptNotSupp($"Type {kind} is not handled.");
+                    }
+                }
+                else
+                {
+                    switch (kind.RawKind())
+                    {
+                        case DataKind.BL: bytes += df.Length; break;
+                        case DataKind.I4:
+                        case DataKind.U4:
+                        case DataKind.R4: bytes += 4L * df.Length; break;
+                        case DataKind.I8:
+                        case DataKind.R8: bytes += 8L * df.Length; break;
+                        case DataKind.TX: bytes += (column as DataColumn<DvText>).Data.Sum(t => EstimateBytes(t)); break;
+                        default:
+                            throw Contracts.ExceptNotSupp($"Type {kind} is not handled.");
+                    }
+                }
+            }
+            return bytes;
+        }
+
+        static long EstimateBytes(DvText text)
+        {
+            return ArrayOverhead + 2L * text.str.Length;
+        }
+
+        static long EstimateBytes<T>(DataColumn<VBufferEqSort<T>> column, int itemSize)
+            where T : IEquatable<T>, IComparable<T>
+        {
+            return column.Data.Sum(v => 2 * ArrayOverhead + (long)v.Count * (itemSize + (v.IsDense ? 0 : 4)));
+        }
+
+        #endregion
+
+        #region IDataView API
+
+        public long? GetRowCount()
+        {
+            lock (_fillLock)
+                return _segments == null ? _source.GetRowCount() : _length;
+        }
+
+        public RowCursor GetRowCursor(Func<int, bool> needCol, Random rand = null)
+        {
+            FillCacheIfNotFilled();
+            var order = GetOrder(rand);
+            return new SegmentedCursor(this, needCol, order, Enumerable.Range(0, order.Length).ToArray(), rand, LogStatistics);
+        }
+
+        public RowCursor[] GetRowCursorSet(Func<int, bool> needCol, int n, Random rand = null)
+        {
+            FillCacheIfNotFilled();
+            var order = GetOrder(rand);
+            n = Math.Max(1, Math.Min(n, order.Length));
+            var res = new RowCursor[n];
+            // The statistics are logged once the last cursor of the set is disposed.
+            int remaining = n;
+            Action onDispose = () =>
+            {
+                if (Interlocked.Decrement(ref remaining) == 0)
+                    LogStatistics();
+            };
+            for (int i = 0; i < n; ++i)
+            {
+                var batches = Enumerable.Range(0, order.Length).Where(k => k % n == i).ToArray();
+                res[i] = new SegmentedCursor(this, needCol, batches.Select(k => order[k]).ToArray(), batches,
+                                             rand == null ? null : new Random(rand.Next()), onDispose);
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Order in which the segments are visited, shuffled if rand is not null.
+        /// </summary>
+        int[] GetOrder(Random rand)
+        {
+            var order = Enumerable.Range(0, _segments.Length).ToArray();
+            if (rand != null)
+            {
+                for (int i = order.Length - 1; i > 0; --i)
+                {
+                    int j = rand.Next(i + 1);
+                    var t = order[i];
+                    order[i] = order[j];
+                    order[j] = t;
+                }
+            }
+            return order;
+        }
+
+        /// <summary>
+        /// Walks through a list of segments, the rows of every segment are shuffled
+        /// if rand is not null. The batch of a row is the position of its segment
+        /// in the global order so that a consolidated cursor set keeps that order.
+        /// </summary>
+        class SegmentedCursor : RowCursor
+        {
+            readonly SegmentedCacheView _view;
+            readonly Func<int, bool> _needCol;
+            readonly Func<int, bool> _needSegmentCol;
+            readonly int[] _order;
+            readonly int[] _batches;
+            readonly Random _rand;
+            Action _onDispose;
+            int _current;
+            RowCursor _cursor;
+            long _position;
+            CursorState _state;
+
+            public SegmentedCursor(SegmentedCacheView view, Func<int, bool> needCol, int[] order, int[] batches,
+                                   Random rand, Action onDispose)
+            {
+                _view = view;
+                _needCol = needCol;
+                _needSegmentCol = i => needCol(view._fromSegment[i]);
+                _order = order;
+                _batches = batches;
+                _rand = rand;
+                _onDispose = onDispose;
+                _current = -1;
+                _position = -1;
+                _state = CursorState.NotStarted;
+            }
+
+            public override CursorState State { get { return _state; } }
+            public override long Batch { get { return _current < 0 || _current >= _batches.Length ? 0 : _batches[_current]; } }
+            public override long Position { get { return _position; } }
+            public override Schema Schema { get { return _view.Schema; } }
+            public override RowCursor GetRootCursor() { return this; }
+
+            public override bool IsColumnActive(int col)
+            {
+                return _view._toSegment[col] >= 0 && _needCol(col);
+            }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing && _cursor != null)
+                {
+                    _cursor.Dispose();
+                    _cursor = null;
+                }
+                if (disposing && _onDispose != null)
+                {
+                    _onDispose();
+                    _onDispose = null;
+                }
+                _state = CursorState.Done;
+                GC.SuppressFinalize(this);
+            }
+
+            public override bool MoveNext()
+            {
+                if (_state == CursorState.Done)
+                    return false;
+                while (_cursor == null || !_cursor.MoveNext())
+                {
+                    if (_cursor != null)
+                    {
+                        _cursor.Dispose();
+                        _cursor = null;
+                    }
+                    if (++_current >= _order.Length)
+                    {
+                        _state = CursorState.Done;
+                        return false;
+                    }
+                    _cursor = _view.GetSegment(_order[_current]).GetRowCursor(_needSegmentCol, _rand);
+                }
+                ++_position;
+                _state = CursorState.Good;
+                return true;
+            }
+
+            public override bool MoveMany(long count)
+            {
+                Contracts.CheckParam(count > 0, nameof(count));
+                for (; count > 0; --count)
+                    if (!MoveNext())
+                        return false;
+                return true;
+            }
+
+            /// <summary>
+            /// The getter asks the cursor of the current segment
+            /// for a new getter every time the segment changes.
+            /// </summary>
+            public override ValueGetter<TValue> GetGetter<TValue>(int col)
+            {
+                if (!IsColumnActive(col))
+                    throw Contracts.Except("Column {0} is not active.", col);
+                int index = _view._toSegment[col];
+                RowCursor owner = null;
+                ValueGetter<TValue> getter = null;
+                return (ref TValue value) =>
+                {
+                    if (owner != _cursor)
+                    {
+                        getter = _cursor.GetGetter<TValue>(index);
+                        owner = _cursor;
+                    }
+                    getter(ref value);
+                };
+            }
+
+            public override ValueGetter<RowId> GetIdGetter()
+            {
+                RowCursor owner = null;
+                ValueGetter<RowId> getter = null;
+                ulong start = 0;
+                return (ref RowId id) =>
+                {
+                    if (owner != _cursor)
+                    {
+                        getter = _cursor.GetIdGetter();
+                        owner = _cursor;
+                        start = (ulong)_view._segments[_order[_current]].Start;
+                    }
+                    getter(ref id);
+                    id = new RowId(id.Low + start, id.High);
+                };
+            }
+        }
+
+        #endregion
+    }
+}
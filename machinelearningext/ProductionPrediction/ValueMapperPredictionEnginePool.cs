@@ -0,0 +1,582 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+
+
+namespace Scikit.ML.ProductionPrediction
+{
+    using Stopwatch = System.Diagnostics.Stopwatch;
+
+    /// <summary>
+    /// Thread safe histogram of durations, bucket <c>i</c> counts
+    /// the durations in <c>[2^(i-1), 2^i[</c> microseconds.
+    /// </summary>
+    public class LatencyHistogram
+    {
+        public const int NumberOfBuckets = 32;
+
+        readonly long[] _buckets = new long[NumberOfBuckets];
+        long _count;
+        long _totalTicks;
+
+        /// <summary>
+        /// Number of recorded durations.
+        /// </summary>
+        public long Count => Interlocked.Read(ref _count);
+
+        /// <summary>
+        /// Average duration in milliseconds.
+        /// </summary>
+        public double Mean
+        {
+            get
+            {
+                var n = Count;
+                return n == 0 ? 0 : Interlocked.Read(ref _totalTicks) * 1000.0 / Stopwatch.Frequency / n;
+            }
+        }
+
+        /// <summary>
+        /// Returns a copy of the buckets.
+        /// </summary>
+        public long[] Buckets
+        {
+            get
+            {
+                var res = new long[NumberOfBuckets];
+                for (int i = 0; i < res.Length; ++i)
+                    res[i] = Interlocked.Read(ref _buckets[i]);
+                return res;
+            }
+        }
+
+        /// <summary>
+        /// Records a duration measured with <see cref="Stopwatch.GetTimestamp"/>.
+        /// </summary>
+        public void Record(long ticks)
+        {
+            long micro = ticks * 1000000 / Stopwatch.Frequency;
+            int bucket = 0;
+            while (micro > 0 && bucket < NumberOfBuckets - 1)
+            {
+                micro >>= 1;
+                ++bucket;
+            }
+            Interlocked.Increment(ref _buckets[bucket]);
+            Interlocked.Add(ref _totalTicks, ticks);
+            Interlocked.Increment(ref _count);
+        }
+
+        /// <summary>
+        /// Returns an upper bound of the quantile <paramref name="q"/> in milliseconds.
+        /// </summary>
+        public double Percentile(double q)
+        {
+            Contracts.CheckParam(q >= 0 && q <= 1, nameof(q), "must be in [0, 1]");
+            var buckets = Buckets;
+            long total = buckets.Sum();
+            if (total == 0)
+                return 0;
+            long threshold = (long)Math.Ceiling(q * total);
+            long cum = 0;
+            for (int i = 0; i < buckets.Length; ++i)
+            {
+                cum += buckets[i];
+                if (cum >= threshold && cum > 0)
+                    return (1L << i) / 1000.0;
+            }
+            return (1L << (NumberOfBuckets - 1)) / 1000.0;
+        }
+
+        public override string ToString()
+        {
+            return string.Format("n={0} mean={1:F3}ms p50<={2}ms p90<={3}ms p99<={4}ms",
+                                 Count, Mean, Percentile(0.5), Percentile(0.9), Percentile(0.99));
+        }
+    }
+
+    /// <summary>
+    /// Pool of prediction engines for a model taking a vector of floats as input.
+    /// The model is loaded once, the predictor is shared by all engines,
+    /// every engine owns its own cursor and output buffer and is used by one thread at a time.
+    /// <see cref="Predict"/> blocks until an engine is available,
+    /// <see cref="PredictAsync"/> queues the request, a worker takes the queued requests
+    /// (at most <c>maxRequestsPerRent</c>) and runs them one after the other with the same engine:
+    /// the engine is rented once for all of them, every request is still scored alone.
+    /// The pool measures the time spent waiting for an engine and the time spent in every prediction.
+    /// <see cref="Dispose"/> waits for the rented engines to be returned.
+    /// </summary>
+    public class ValueMapperPredictionEnginePool : IDisposable
+    {
+        #region internal types
+
+        class Engine
+        {
+            public ValueMapper<VBuffer<float>, float> Mapper;
+            public ValueMapper<VBuffer<float>, VBuffer<float>> MapperVector;
+            public VBuffer<float> Output;
+        }
+
+        abstract class Request
+        {
+            public long Enqueued;
+            public abstract void Run(ValueMapperPredictionEnginePool pool, Engine engine);
+            public abstract void Fail(Exception e);
+        }
+
+        class Request<TDst> : Request
+        {
+            readonly Func<Engine, TDst> _predict;
+            public readonly TaskCompletionSource<TDst> Result;
+
+            public Request(Func<Engine, TDst> predict)
+            {
+                _predict = predict;
+                Result = new TaskCompletionSource<TDst>(TaskCreationOptions.RunContinuationsAsynchronously);
+                Enqueued = Stopwatch.GetTimestamp();
+            }
+
+            public override void Run(ValueMapperPredictionEnginePool pool, Engine engine)
+            {
+                TDst res;
+                try
+                {
+                    res = pool.Measure(engine, _predict);
+                }
+                catch (Exception e)
+                {
+                    Result.TrySetException(e);
+                    return;
+                }
+                Result.TrySetResult(res);
+            }
+
+            public override void Fail(Exception e)
+            {
+                Result.TrySetException(e);
+            }
+        }
+
+        #endregion
+
+        readonly IHostEnvironment _env;
+        readonly bool _outputIsFloat;
+        readonly int _poolSize;
+        readonly int _maxRequestsPerRent;
+        readonly ValueMapperFromTransformFloat<VBuffer<float>> _valueMapper;
+        readonly ConcurrentBag<Engine> _available;
+        readonly SemaphoreSlim _semaphore;
+        readonly LatencyHistogram _queueTime;
+        readonly LatencyHistogram _latency;
+        readonly object _lock = new object();
+        BlockingCollection<Request> _requests;
+        CancellationTokenSource _cancel;
+        Task[] _workers;
+        int _created;
+        int _rented;
+        bool _disposed;
+
+        /// <summary>
+        /// Maximum number of engines.
+        /// </summary>
+        public int PoolSize => _poolSize;
+
+        /// <summary>
+        /// Number of engines created so far.
+        /// </summary>
+        public int EngineCount => _created;
+
+        /// <summary>
+        /// Time spent by a request waiting for an engine.
+        /// </summary>
+        public LatencyHistogram QueueTime => _queueTime;
+
+        /// <summary>
+        /// Time spent computing one prediction.
+        /// </summary>
+        public LatencyHistogram Latency => _latency;
+
+        /// <summary>
+        /// Constructor
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="modelName">filename</param>
+        /// <param name="output">name of the output column</param>
+        /// <param name="outputIsFloat">output is a float (true) or a vector of floats (false)</param>
+        /// <param name="poolSize">maximum number of engines, number of processors if &lt;= 0</param>
+        /// <param name="maxRequestsPerRent">maximum number of queued requests processed by an engine in a row</param>
+        /// <param name="conc">number of concurrency threads</param>
+        /// <param name="features">features name</param>
+        public ValueMapperPredictionEnginePool(IHostEnvironment env, string modelName,
+                string output = "Probability", bool outputIsFloat = true, int poolSize = 0,
+                int maxRequestsPerRent = 16, int conc = 1, string features = "Features") :
+            this(env, ReadModel(modelName), output, outputIsFloat, poolSize, maxRequestsPerRent, conc, features)
+        {
+        }
+
+        /// <summary>
+        /// Constructor, the model is read once from the stream.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="modelStream">stream</param>
+        /// <param name="output">name of the output column</param>
+        /// <param name="outputIsFloat">output is a float (true) or a vector of floats (false)</param>
+        /// <param name="poolSize">maximum number of engines, number of processors if &lt;= 0</param>
+        /// <param name="maxRequestsPerRent">maximum number of queued requests processed by an engine in a row</param>
+        /// <param name="conc">number of concurrency threads</param>
+        /// <param name="features">features name</param>
+        public ValueMapperPredictionEnginePool(IHostEnvironment env, Stream modelStream,
+                string output = "Probability", bool outputIsFloat = true, int poolSize = 0,
+                int maxRequestsPerRent = 16, int conc = 1, string features = "Features")
+        {
+            _env = env;
+            if (_env == null)
+                throw Contracts.Except("env must not be null");
+            _env.CheckParam(maxRequestsPerRent > 0, nameof(maxRequestsPerRent), "must be > 0");
+            _outputIsFloat = outputIsFloat;
+            _poolSize = poolSize > 0 ? poolSize : Environment.ProcessorCount;
+            _maxRequestsPerRent = maxRequestsPerRent;
+
+            var inputs = new FloatVectorInput[0];
+            var view = ComponentCreation.CreateStreamingDataView<FloatVectorInput>(_env, inputs);
+
+            long modelPosition = modelStream.Position;
+            var predictor = ComponentCreation.LoadPredictorOrNull(_env, modelStream);
+            if (predictor == null)
+                throw _env.Except("Unable to load a model.");
+            modelStream.Seek(modelPosition, SeekOrigin.Begin);
+            var transforms = ComponentCreation.LoadTransforms(_env, modelStream, view);
+            if (transforms == null)
+                throw _env.Except("Unable to load a model.");
+
+            var data = _env.CreateExamples(transforms, features);
+            if (data == null)
+                throw _env.Except("Cannot create rows.");
+            var scorer = _env.CreateDefaultScorer(data, predictor);
+            if (scorer == null)
+                throw _env.Except("Cannot create a scorer.");
+
+            // Every engine binds the same scorer, and then the same predictor, to its own cursor.
+            _valueMapper = new ValueMapperFromTransformFloat<VBuffer<float>>(_env, scorer, features, output, conc: conc);
+            _available = new ConcurrentBag<Engine>();
+            _semaphore = new SemaphoreSlim(_poolSize, _poolSize);
+            _queueTime = new LatencyHistogram();
+            _latency = new LatencyHistogram();
+        }
+
+        static Stream ReadModel(string modelName)
+        {
+            using (var fs = File.OpenRead(modelName))
+            {
+                var ms = new MemoryStream();
+                fs.CopyTo(ms);
+                ms.Position = 0;
+                return ms;
+            }
+        }
+
+        /// <summary>
+        /// Stops the workers and waits for the rented engines to be returned,
+        /// the threads waiting for an engine fail with <see cref="ObjectDisposedException"/>.
+        /// </summary>
+        public void Dispose()
+        {
+            Task[] workers;
+            lock (_lock)
+            {
+                if (_disposed)
+                    return;
+                _disposed = true;
+                workers = _workers;
+                if (_requests != null)
+                {
+                    _requests.CompleteAdding();
+                    _cancel.Cancel();
+                }
+            }
+            if (workers != null)
+            {
+                try
+                {
+                    Task.WaitAll(workers);
+                }
+                catch (AggregateException)
+                {
+                    // Workers stop on cancellation.
+                }
+                Request req;
+                while (_requests.TryTake(out req))
+                    req.Fail(new ObjectDisposedException(nameof(ValueMapperPredictionEnginePool)));
+                _requests.Dispose();
+                _cancel.Dispose();
+            }
+            lock (_lock)
+            {
+                while (_rented > 0)
+                    Monitor.Wait(_lock);
+                _valueMapper.Dispose();
+            }
+            // The semaphore is not disposed, threads still waiting for an engine
+            // must acquire it to fail. Its wait handle is never created.
+        }
+
+        #region engines
+
+        Engine CreateEngine()
+        {
+            lock (_lock)
+            {
+                if (_disposed)
+                    throw new ObjectDisposedException(nameof(ValueMapperPredictionEnginePool));
+                var engine = new Engine();
+                if (_outputIsFloat)
+                    engine.Mapper = _valueMapper.GetMapper<VBuffer<float>, float>();
+                else
+                    engine.MapperVector = _valueMapper.GetMapper<VBuffer<float>, VBuffer<float>>();
+                ++_created;
+                return engine;
+            }
+        }
+
+        Engine Rent(long enqueued)
+        {
+            _semaphore.Wait();
+            lock (_lock)
+            {
+                if (_disposed)
+                {
+                    // The next waiting thread fails the same way.
+                    _semaphore.Release();
+                    throw new ObjectDisposedException(nameof(ValueMapperPredictionEnginePool));
+                }
+                ++_rented;
+            }
+            _queueTime.Record(Stopwatch.GetTimestamp() - enqueued);
+            Engine engine;
+            if (_available.TryTake(out engine))
+                return engine;
+            try
+            {
+                return CreateEngine();
+            }
+            catch
+            {
+                Return(null);
+                throw;
+            }
+        }
+
+        /// <summary>
+        /// Gives an engine back, null if the engine could not be created.
+        /// </summary>
+        void Return(Engine engine)
+        {
+            lock (_lock)
+            {
+                if (engine != null)
+                    _available.Add(engine);
+                _semaphore.Release();
+                if (--_rented == 0)
+                    Monitor.PulseAll(_lock);
+            }
+        }
+
+        TDst Measure<TDst>(Engine engine, Func<Engine, TDst> predict)
+        {
+            long start = Stopwatch.GetTimestamp();
+            var res = predict(engine);
+            _latency.Record(Stopwatch.GetTimestamp() - start);
+            return res;
+        }
+
+        /// <summary>
+        /// Creates all engines and runs one prediction with each of them
+        /// so that the first requests do not pay for the initialization.
+        /// </summary>
+        /// <param name="features">any valid feature vector</param>
+        public void Warmup(float[] features)
+        {
+            var engines = new List<Engine>();
+            try
+            {
+                for (int i = 0; i < _poolSize; ++i)
+                {
+                    var engine = Rent(Stopwatch.GetTimestamp());
+                    engines.Add(engine);
+                    if (_outputIsFloat)
+                        PredictFloat(engine, features);
+                    else
+                        PredictVector(engine, features);
+                }
+            }
+            finally
+            {
+                foreach (var engine in engines)
+                    Return(engine);
+            }
+        }
+
+        #endregion
+
+        #region predictions
+
+        float PredictFloat(Engine engine, float[] features)
+        {
+            if (engine.Mapper == null)
+                throw _env.Except("The mapper is outputting a vector not a float.");
+            float res = 0f;
+            var buf = new VBuffer<float>(features.Length, features);
+            engine.Mapper(in buf, ref res);
+            return res;
+        }
+
+        float[] PredictVector(Engine engine, float[] features)
+        {
+            if (engine.MapperVector == null)
+                throw _env.Except("The mapper is outputting a float not a vector.");
+            var buf = new VBuffer<float>(features.Length, features);
+            engine.MapperVector(in buf, ref engine.Output);
+            if (!engine.Output.IsDense)
+                throw _env.Except("The output of the predictor or transform must be dense.");
+            return engine.Output.DenseValues().ToArray();
+        }
+
+        TDst Predict<TDst>(Func<Engine, TDst> predict)
+        {
+            var engine = Rent(Stopwatch.GetTimestamp());
+            try
+            {
+                return Measure(engine, predict);
+            }
+            finally
+            {
+                Return(engine);
+            }
+        }
+
+        /// <summary>
+        /// Produces a prediction, waits for an engine if all of them are busy.
+        /// </summary>
+        /// <param name="features">feature vector</param>
+        /// <returns>prediction as float</returns>
+        public float Predict(float[] features)
+        {
+            return Predict(engine => PredictFloat(engine, features));
+        }
+
+        /// <summary>
+        /// Produces a prediction, waits for an engine if all of them are busy.
+        /// </summary>
+        /// <param name="features">feature vector</param>
+        /// <returns>predictions</returns>
+        public float[] PredictVector(float[] features)
+        {
+            return Predict(engine => PredictVector(engine, features));
+        }
+
+        /// <summary>
+        /// Queues a prediction, a background worker computes it with the same engine
+        /// as the other requests received at the same time, each of them is scored alone.
+        /// </summary>
+        /// <param name="features">feature vector, it must not be modified until the task completes</param>
+        /// <returns>prediction as float</returns>
+        public Task<float> PredictAsync(float[] features)
+        {
+            return Enqueue(new Request<float>(engine => PredictFloat(engine, features)));
+        }
+
+        /// <summary>
+        /// Queues a prediction, a background worker computes it with the same engine
+        /// as the other requests received at the same time, each of them is scored alone.
+        /// </summary>
+        /// <param name="features">feature vector, it must not be modified until the task completes</param>
+        /// <returns>predictions</returns>
+        public Task<float[]> PredictVectorAsync(float[] features)
+        {
+            return Enqueue(new Request<float[]>(engine => PredictVector(engine, features)));
+        }
+
+        Task<TDst> Enqueue<TDst>(Request<TDst> req)
+        {
+            lock (_lock)
+            {
+                if (_disposed)
+                    throw new ObjectDisposedException(nameof(ValueMapperPredictionEnginePool));
+                if (_workers == null)
+                {
+                    _requests = new BlockingCollection<Request>();
+                    _cancel = new CancellationTokenSource();
+                    _workers = Enumerable.Range(0, _poolSize)
+                                         .Select(i => Task.Factory.StartNew(ProcessRequests, TaskCreationOptions.LongRunning))
+                                         .ToArray();
+                }
+                _requests.Add(req);
+            }
+            return req.Result.Task;
+        }
+
+        void ProcessRequests()
+        {
+            var group = new List<Request>(_maxRequestsPerRent);
+            try
+            {
+                foreach (var first in _requests.GetConsumingEnumerable(_cancel.Token))
+                {
+                    group.Add(first);
+                    Request req;
+                    while (group.Count < _maxRequestsPerRent && _requests.TryTake(out req))
+                        group.Add(req);
+
+                    // The requests share one rent of an engine, they are not scored in one pass:
+                    // an engine maps one row at a time through its cursor and scoring a multi-row
+                    // view would rebind the scorer to a new data view for every group.
+                    Engine engine = null;
+                    try
+                    {
+                        engine = Rent(group[0].Enqueued);
+                        for (int i = 1; i < group.Count; ++i)
+                            _queueTime.Record(Stopwatch.GetTimestamp() - group[i].Enqueued);
+                        foreach (var r in group)
+                            r.Run(this, engine);
+                    }
+                    catch (Exception e)
+                    {
+                        foreach (var r in group)
+                            r.Fail(e);
+                    }
+                    finally
+                    {
+                        if (engine != null)
+                            Return(engine);
+                        group.Clear();
+                    }
+                }
+            }
+            catch (OperationCanceledException)
+            {
+                foreach (var r in group)
+                    r.Fail(new ObjectDisposedException(nameof(ValueMapperPredictionEnginePool)));
+            }
+        }
+
+        #endregion
+
+        public override string ToString()
+        {
+            var sb = new StringBuilder();
+            sb.AppendFormat("engines={0}/{1}", EngineCount, PoolSize);
+            sb.AppendFormat(" queue: {0}", QueueTime);
+            sb.AppendFormat(" latency: {0}", Latency);
+            return sb.ToString();
+        }
+    }
+}
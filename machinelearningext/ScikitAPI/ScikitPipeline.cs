@@ -4,6 +4,8 @@ using System;
 using System.IO;
 using System.Collections.Generic;
 using System.Linq;
+using System.Runtime.InteropServices;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.Data;
 using Microsoft.ML.Model;
@@ -55,6 +57,15 @@ namespace Scikit.ML.ScikitAPI
         private bool _dispose;
         private ValueMapperDataFrameFromTransform _fastValueMapperObject;
         private ValueMapper<DataFrame, DataFrame> _fastValueMapper;
+        private ValueMapperFromTransformFloat<VBuffer<float>> _batchValueMapperObject;
+        private BatchRowMapper[] _batchMappers;
+        private string _batchColumns;
+        private int _batchOutputDim;
+
+        /// <summary>
+        /// Computes the prediction for one row and writes it in output at position offset.
+        /// </summary>
+        private delegate void BatchRowMapper(in VBuffer<float> features, float[] output, int offset);
 
         #endregion
 
@@ -93,6 +104,12 @@ namespace Scikit.ML.ScikitAPI
 
         public void Dispose()
         {
+            if (_batchValueMapperObject != null)
+            {
+                _batchValueMapperObject.Dispose();
+                _batchValueMapperObject = null;
+                _batchMappers = null;
+            }
             if (_dispose)
             {
                 (_env as ConsoleEnvironment).Dispose();
@@ -384,6 +401,21 @@ namespace Scikit.ML.ScikitAPI
             return new StreamingDataFrame(Predict(data.Source), _env);
         }
 
+        /// <summary>
+        /// Computes the predictions for data stored in a <see cref="StreamingDataFrame"/>
+        /// and returns them as a sequence of dataframes of <paramref name="chunkSize"/> rows.
+        /// The predictions are computed when the sequence is enumerated,
+        /// the memory does not depend on the number of rows.
+        /// </summary>
+        /// <param name="data">data</param>
+        /// <param name="chunkSize">number of rows in every chunk</param>
+        /// <param name="keepVectors">keep vectors as they are</param>
+        /// <param name="prefetch">number of chunks computed in advance by a background thread</param>
+        public DataFrameChunks Predict(StreamingDataFrame data, int chunkSize, bool keepVectors = false, int prefetch = 1)
+        {
+            return Predict(data).Chunks(chunkSize, keepVectors, prefetch);
+        }
+
         /// <summary>
         /// Computes the predictions for data stored in a <see cref="IDataView"/>.
         /// This method can be called from any thread as it creates new getters.
@@ -458,6 +490,207 @@ namespace Scikit.ML.ScikitAPI
 
         #endregion
 
+        #region batch predictions
+
+        /// <summary>
+        /// Computes predictions for a batch of rows stored in a contiguous
+        /// row-major float matrix and writes them into a buffer allocated by the caller.
+        /// It avoids the creation of any <see cref="DataFrame"/> and makes only one call
+        /// for all rows, which matters when the pipeline is called from Python
+        /// through pythonnet. The pipeline must take a single vector of floats as input.
+        /// The first call is slower as it creates getters.
+        /// It must not be called from different threads.
+        /// If <paramref name="conc"/> &gt; 1, the rows are split into
+        /// <paramref name="conc"/> blocks scored in parallel, every block
+        /// uses its own copy of the pipeline.
+        /// </summary>
+        /// <param name="features">address of the first feature, nrows * ncols floats</param>
+        /// <param name="nrows">number of rows</param>
+        /// <param name="ncols">number of features</param>
+        /// <param name="output">address of the output buffer</param>
+        /// <param name="outputLength">number of floats the output buffer can hold</param>
+        /// <param name="featureColumn">name of the features column</param>
+        /// <param name="outputColumn">output column, a float, a vector of floats, a key or a boolean</param>
+        /// <param name="conc">number of threads used to compute the predictions</param>
+        /// <returns>number of floats written for every row</returns>
+        public int PredictBatch(IntPtr features, int nrows, int ncols, IntPtr output, int outputLength,
+                                string featureColumn = "Feature", string outputColumn = "Score", int conc = 1)
+        {
+            var dim = GetBatchOutputDimension(featureColumn, outputColumn, conc);
+            if ((long)nrows * dim > outputLength)
+                throw _env.Except($"Output buffer is too small, it needs {nrows * dim} floats not {outputLength}.");
+            long addrIn = features.ToInt64();
+            long addrOut = output.ToInt64();
+            int nbBlocks = Math.Max(1, Math.Min(_batchMappers.Length, nrows));
+            if (nbBlocks == 1)
+                PredictBlock(_batchMappers[0], addrIn, addrOut, 0, nrows, ncols, dim);
+            else
+            {
+                int blockSize = (nrows + nbBlocks - 1) / nbBlocks;
+                Parallel.For(0, nbBlocks, b =>
+                {
+                    int start = b * blockSize;
+                    int end = Math.Min(nrows, start + blockSize);
+                    PredictBlock(_batchMappers[b], addrIn, addrOut, start, end, ncols, dim);
+                });
+            }
+            return dim;
+        }
+
+        static void PredictBlock(BatchRowMapper mapper, long addrIn, long addrOut, int start, int end, int ncols, int dim)
+        {
+            var row = new float[ncols];
+            var res = new float[dim];
+            long offset = ncols * sizeof(float);
+            long offsetOut = dim * sizeof(float);
+            addrIn += start * offset;
+            addrOut += start * offsetOut;
+            for (int i = start; i < end; ++i, addrIn += offset, addrOut += offsetOut)
+            {
+                Marshal.Copy(new IntPtr(addrIn), row, 0, ncols);
+                var buf = new VBuffer<float>(ncols, row);
+                mapper(in buf, res, 0);
+                Marshal.Copy(res, 0, new IntPtr(addrOut), dim);
+            }
+        }
+
+        /// <summary>
+        /// Computes predictions for a batch of rows stored in a contiguous
+        /// row-major float matrix, see the other overload.
+        /// </summary>
+        /// <param name="features">features, nrows * ncols floats</param>
+        /// <param name="nrows">number of rows</param>
+        /// <param name="output">output buffer</param>
+        /// <param name="featureColumn">name of the features column</param>
+        /// <param name="outputColumn">output column, a float, a vector of floats, a key or a boolean</param>
+        /// <param name="conc">number of threads used to compute the predictions</param>
+        /// <returns>number of floats written for every row</returns>
+        public int PredictBatch(float[] features, int nrows, float[] output,
+                                string featureColumn = "Feature", string outputColumn = "Score", int conc = 1)
+        {
+            if (nrows <= 0 || features.Length % nrows != 0)
+                throw _env.Except($"Unable to split {features.Length} features into {nrows} rows.");
+            var hf = GCHandle.Alloc(features, GCHandleType.Pinned);
+            var ho = GCHandle.Alloc(output, GCHandleType.Pinned);
+            try
+            {
+                return PredictBatch(hf.AddrOfPinnedObject(), nrows, features.Length / nrows,
+                                    ho.AddrOfPinnedObject(), output.Length,
+                                    featureColumn, outputColumn, conc);
+            }
+            finally
+            {
+                hf.Free();
+                ho.Free();
+            }
+        }
+
+        /// <summary>
+        /// Returns the number of floats <see cref="PredictBatch"/> writes for every row.
+        /// </summary>
+        public int GetBatchOutputDimension(string featureColumn = "Feature", string outputColumn = "Score", int conc = 1)
+        {
+            var key = $"{featureColumn}|{outputColumn}|{conc}";
+            if (_batchMappers == null || _batchColumns != key)
+                CreateBatchMapper(featureColumn, outputColumn, conc);
+            return _batchOutputDim;
+        }
+
+        protected void CreateBatchMapper(string featureColumn, string outputColumn, int conc)
+        {
+            if (_batchValueMapperObject != null)
+                _batchValueMapperObject.Dispose();
+
+            IDataTransform tr = _transforms.Last().transform;
+            if (_predictor != null && _predictor.predictor != null)
+            {
+                var roles = new RoleMappedData(tr, _roles ?? new List<KeyValuePair<RoleMappedSchema.ColumnRole, string>>());
+                tr = PredictorHelper.Predict(_env, _predictor.predictor, roles);
+            }
+
+            _batchValueMapperObject = new ValueMapperFromTransformFloat<VBuffer<float>>(_env, tr, featureColumn, outputColumn,
+                                                                                         conc: conc, ignoreOtherColumn: true);
+            var outType = _batchValueMapperObject.OutputType;
+            if (outType.IsVector())
+            {
+                if (outType.ItemType().RawKind() != DataKind.R4 || outType.VectorSize() == 0)
+                    throw _env.ExceptNotSupp($"Output column '{outputColumn}' must be a vector of floats of known size not {outType}.");
+                _batchOutputDim = outType.VectorSize();
+            }
+            else
+            {
+                if (outType.RawKind() != DataKind.R4 && outType.RawKind() != DataKind.U4 && outType.RawKind() != DataKind.BL)
+                    throw _env.ExceptNotSupp($"Output column '{outputColumn}' must be a float, a key or a boolean not {outType}.");
+                _batchOutputDim = 1;
+            }
+
+            // Every thread needs its own mapper, a mapper holds a cursor.
+            _batchMappers = new BatchRowMapper[Math.Max(1, conc)];
+            for (int i = 0; i < _batchMappers.Length; ++i)
+                _batchMappers[i] = CreateBatchRowMapper(outType);
+            _batchColumns = $"{featureColumn}|{outputColumn}|{conc}";
+        }
+
+        BatchRowMapper CreateBatchRowMapper(ColumnType outType)
+        {
+            if (outType.IsVector())
+            {
+                var mapper = _batchValueMapperObject.GetMapper<VBuffer<float>, VBuffer<float>>();
+                var dim = outType.VectorSize();
+                var res = new VBuffer<float>();
+                return (in VBuffer<float> features, float[] output, int offset) =>
+                {
+                    mapper(in features, ref res);
+                    if (res.IsDense)
+                        Array.Copy(res.Values, 0, output, offset, dim);
+                    else
+                    {
+                        Array.Clear(output, offset, dim);
+                        for (int i = 0; i < res.Count; ++i)
+                            output[offset + res.Indices[i]] = res.Values[i];
+                    }
+                };
+            }
+            else
+            {
+                switch (outType.RawKind())
+                {
+                    case DataKind.R4:
+                        {
+                            var mapper = _batchValueMapperObject.GetMapper<VBuffer<float>, float>();
+                            return (in VBuffer<float> features, float[] output, int offset) =>
+                            {
+                                mapper(in features, ref output[offset]);
+                            };
+                        }
+                    case DataKind.U4:
+                        {
+                            var mapper = _batchValueMapperObject.GetMapper<VBuffer<float>, uint>();
+                            uint res = 0;
+                            return (in VBuffer<float> features, float[] output, int offset) =>
+                            {
+                                mapper(in features, ref res);
+                                output[offset] = res;
+                            };
+                        }
+                    case DataKind.BL:
+                        {
+                            var mapper = _batchValueMapperObject.GetMapper<VBuffer<float>, bool>();
+                            bool res = false;
+                            return (in VBuffer<float> features, float[] output, int offset) =>
+                            {
+                                mapper(in features, ref res);
+                                output[offset] = res ? 1f : 0f;
+                            };
+                        }
+                    default:
+                        throw _env.ExceptNotSupp($"Unexpected output type {outType}.");
+                }
+            }
+        }
+
+        #endregion
+
         #region onnx
 
         /// <summary>
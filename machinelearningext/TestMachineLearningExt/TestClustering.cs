@@ -262,6 +262,133 @@ namespace TestMachineLearningExt
             }
         }
 
+        /// <summary>
+        /// Checks both clusterings are the same up to a relabelling of the clusters.
+        /// </summary>
+        static void AssertSameClusters(IList<IPointIdFloat> points, Dictionary<long, int> expected, int[] clusters)
+        {
+            Assert.AreEqual(points.Count, clusters.Length);
+            Assert.AreEqual(points.Count, expected.Count);
+            var map = new Dictionary<int, int>();
+            var reverse = new Dictionary<int, int>();
+            map[DBScan.NOISE] = DBScan.NOISE;
+            reverse[DBScan.NOISE] = DBScan.NOISE;
+            for (int i = 0; i < points.Count; ++i)
+            {
+                int exp = expected[points[i].id];
+                if (!map.ContainsKey(exp) && !reverse.ContainsKey(clusters[i]))
+                {
+                    map[exp] = clusters[i];
+                    reverse[clusters[i]] = exp;
+                }
+                Assert.IsTrue(map.ContainsKey(exp), string.Format("Point {0}", i));
+                Assert.AreEqual(map[exp], clusters[i], string.Format("Point {0}", i));
+            }
+        }
+
+        [TestMethod]
+        public void TestDBScanSequentialSemantics()
+        {
+            // A has 2 neighbours, B 3, C 2 (themselves included), minPoints is 3.
+            var points = new List<IPointIdFloat>()
+            {
+                new PointIdFloat(0, new float[] { 0f }),
+                new PointIdFloat(1, new float[] { 1f }),
+                new PointIdFloat(2, new float[] { 2f }),
+            };
+            // The sequential version visits A first, labels it as noise and never changes it.
+            var clusters = new DBScan(points).Cluster(1.1f, 3);
+            Assert.AreEqual(DBScan.NOISE, clusters[0]);
+            Assert.AreEqual(1, clusters[1]);
+            Assert.AreEqual(1, clusters[2]);
+            // The parallel version replays the same order.
+            foreach (var nt in new[] { 1, 2 })
+            {
+                var parallel = new ParallelDBScan(points, nt, batchSize: 1).Cluster(1.1f, 3);
+                Assert.IsTrue(new[] { DBScan.NOISE, 1, 1 }.SequenceEqual(parallel));
+            }
+        }
+
+        [TestMethod]
+        public void TestParallelDBScan()
+        {
+            var rand = new Random(0);
+            var centers = new[] { new[] { 0f, 0f }, new[] { 10f, 0f }, new[] { 0f, 10f }, new[] { 20f, 20f } };
+            var points = new List<IPointIdFloat>();
+            for (int i = 0; i < 2000; ++i)
+            {
+                var c = centers[rand.Next(centers.Length)];
+                points.Add(new PointIdFloat(i, c.Select(x => x + (float)(rand.NextDouble() * 6 - 3)).ToArray()));
+            }
+
+            foreach (var epsilon in new[] { 0.2f, 0.5f, 1f })
+            {
+                foreach (var minPoints in new[] { 1, 3, 8 })
+                {
+                    var seq = new DBScan(points);
+                    var expected = seq.Cluster(epsilon, minPoints);
+                    foreach (var nt in new int?[] { 1, 2, null })
+                    {
+                        var dbscan = new ParallelDBScan(points, nt, batchSize: 100);
+                        var clusters = dbscan.Cluster(epsilon, minPoints);
+                        AssertSameClusters(points, expected, clusters);
+
+                        var scores = dbscan.Score(epsilon, clusters);
+                        var mapping = Enumerable.Range(0, points.Count).ToDictionary(i => points[i].id, i => clusters[i]);
+                        for (int i = 0; i < points.Count; i += 50)
+                        {
+                            if (clusters[i] == DBScan.NOISE)
+                                Assert.IsTrue(float.IsPositiveInfinity(scores[i]));
+                            else
+                                Assert.AreEqual(seq.Score(points[i], epsilon, mapping), scores[i], 1e-4);
+                        }
+                    }
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestDBScanTransformParallel()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var dataFilePath = FileHelper.GetTestFile("three_classes_2d.txt");
+            var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
+
+            using (var env = EnvHelper.NewTestEnvironment(conc: 1))
+            {
+                var loader = new TextLoader(env, new TextLoader.Arguments()
+                {
+                    HasHeader = true,
+                    Column = new[] { TextLoader.Column.Parse("RowId:R4:0"),
+                                     TextLoader.Column.Parse("Features:R4:1-2")}
+                }).Read(new MultiFileSource(dataFilePath));
+
+                var outputs = new List<string>();
+                // The parallel version gives the same clusters as the sequential one (nt=1).
+                // Epsilon is given, an estimated radius is one of the distances between two points.
+                foreach (var nt in new[] { "1", "2", "4" })
+                {
+                    var xf = env.CreateTransform(string.Format("DBScan{{col=Features eps=0.25 nt={0}}}", nt), loader);
+                    var outputDataFilePath = FileHelper.GetOutputFile(string.Format("outputDataFilePath{0}.txt", nt), methodName);
+                    var saver = env.CreateSaver("Text{header=- schema=-}");
+                    using (var fs2 = File.Create(outputDataFilePath))
+                        saver.SaveData(fs2, TestTransformHelper.AddFlatteningTransform(env, xf),
+                                                StreamHelper.GetColumnsIndex(xf.Schema, new[] { "Features", "ClusterId" }));
+                    outputs.Add(File.ReadAllText(outputDataFilePath));
+
+                    if (nt == "2")
+                    {
+                        StreamHelper.SaveModel(env, xf, outModelFilePath);
+                        var outData = FileHelper.GetOutputFile("outData1.txt", methodName);
+                        var outData2 = FileHelper.GetOutputFile("outData2.txt", methodName);
+                        TestTransformHelper.SerializationTestTransform(env, outModelFilePath, xf, loader, outData, outData2);
+                    }
+                }
+                Assert.AreEqual(outputs[0], outputs[1]);
+                Assert.AreEqual(outputs[0], outputs[2]);
+            }
+        }
+
         #endregion
 
         #region Optics
@@ -477,6 +604,147 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestParallelOptics()
+        {
+            var rand = new Random(0);
+            var centers = new[] { new[] { 0f, 0f }, new[] { 10f, 0f }, new[] { 0f, 10f } };
+            var points = new List<IPointIdFloat>();
+            for (int i = 0; i < 1000; ++i)
+            {
+                var c = centers[rand.Next(centers.Length)];
+                points.Add(new PointIdFloat(i, c.Select(x => x + (float)(rand.NextDouble() * 6 - 3)).ToArray()));
+            }
+            float epsilon = 1f, epsilonPrime = 0.5f;
+            int minPoints = 5;
+
+            // Core points are clustered as DBScan does with the same radius.
+            var dbscan = new ParallelDBScan(points, 1).Cluster(epsilonPrime, minPoints);
+            int[] expected = null;
+            foreach (var spill in new[] { false, true })
+            {
+                foreach (var nt in new int?[] { 1, 2 })
+                {
+                    using (var store = new OpticsPointStore(2, spill))
+                    {
+                        foreach (var p in points)
+                        {
+                            var coordinates = p.coordinates;
+                            store.Add(in coordinates);
+                        }
+                        var optics = new ParallelOptics(store, nt, batchSize: 50);
+                        optics.Ordering(epsilon, minPoints);
+                        Assert.IsTrue(Enumerable.Range(0, points.Count).Select(i => store.GetOrder(i)).OrderBy(c => c)
+                                                .SequenceEqual(Enumerable.Range(0, points.Count)));
+                        if (spill)
+                            Assert.IsTrue(File.Exists(store.Filename));
+
+                        var clusters = optics.Cluster(epsilonPrime);
+                        if (expected == null)
+                            expected = clusters;
+                        else
+                            Assert.IsTrue(expected.SequenceEqual(clusters));
+
+                        var map = new Dictionary<int, int>();
+                        for (int i = 0; i < points.Count; ++i)
+                        {
+                            if (store.GetCore(i) > epsilonPrime)
+                                continue;
+                            Assert.AreNotEqual(DBScan.NOISE, dbscan[i]);
+                            if (map.ContainsKey(dbscan[i]))
+                                Assert.AreEqual(map[dbscan[i]], clusters[i]);
+                            else
+                                map[dbscan[i]] = clusters[i];
+                        }
+                        Assert.AreEqual(map.Count, map.Values.Distinct().Count());
+                    }
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestParallelOpticsSameAsOptics()
+        {
+            // Distances are distinct enough for both priority queues to pop points in the same order.
+            var coordinates = new[] {
+                new[] { -0.53f, -0.79f }, new[] { -0.21f, -0.69f }, new[] { -0.87f, -0.2f }, new[] { 0.84f, 0.6f },
+                new[] { 0.53f, -0.56f }, new[] { 6.07f, -0.45f }, new[] { 5.35f, -0.79f }, new[] { 5.43f, 0.85f },
+                new[] { 6.66f, 0.61f }, new[] { 6.6f, -0.61f }, new[] { -0.38f, 6.25f }, new[] { 0.46f, 6.71f },
+                new[] { 0.76f, 5.17f }, new[] { 0.21f, 6.34f }, new[] { 0.01f, 5.36f }, new[] { 12f, 12f }
+            };
+            var points = coordinates.Select((c, i) => (IPointIdFloat)new PointIdFloat(i, c)).ToList();
+            float epsilon = 1.5f;
+            int minPoints = 2;
+
+            var expected = new Optics(points).Ordering(epsilon, minPoints);
+            using (var store = new OpticsPointStore(2))
+            {
+                foreach (var c in coordinates)
+                    store.Add(c);
+                var optics = new ParallelOptics(store, 1);
+                optics.Ordering(epsilon, minPoints);
+
+                var order = Enumerable.Range(0, points.Count).Select(i => (long)store.GetOrder(i)).ToArray();
+                Assert.IsTrue(expected.ordering.Select(p => p.id).SequenceEqual(order));
+                for (int i = 0; i < points.Count; ++i)
+                {
+                    float? reach;
+                    expected.reachabilityDistances.TryGetValue(i, out reach);
+                    if (reach.HasValue)
+                        Assert.AreEqual(reach.Value, store.GetReachability(i), 1e-5f);
+                    else
+                        Assert.IsTrue(float.IsPositiveInfinity(store.GetReachability(i)));
+                    var core = expected.coreDistancesCache[i];
+                    if (core.HasValue)
+                        Assert.AreEqual(core.Value, store.GetCore(i), 1e-5f);
+                    else
+                        Assert.IsTrue(float.IsPositiveInfinity(store.GetCore(i)));
+                }
+
+                var clusters = expected.Cluster(1f);
+                var parallelClusters = optics.Cluster(1f);
+                for (int i = 0; i < points.Count; ++i)
+                    Assert.AreEqual(clusters[i], parallelClusters[i]);
+            }
+        }
+
+        [TestMethod]
+        public void TestOpticsTransformParallelSpill()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var dataFilePath = FileHelper.GetTestFile("three_classes_2d.txt");
+            var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
+
+            using (var env = EnvHelper.NewTestEnvironment())
+            {
+                var loader = env.CreateLoader("text{col=RowId:I4:0 col=Features:R4:1-2 header=+}",
+                                              new MultiFileSource(dataFilePath));
+                var outputs = new List<string>();
+                foreach (var options in new[] { "nt=2", "nt=1 spill=+", "nt=2 spill=+" })
+                {
+                    var xf = env.CreateTransform(string.Format("Optics{{col=Features epsilons=0.3 minPoints=6 {0}}}", options), loader);
+                    var outputDataFilePath = FileHelper.GetOutputFile(string.Format("outputDataFilePath{0}.txt", outputs.Count), methodName);
+                    var saver = env.CreateSaver("Text{header=- schema=-}");
+                    using (var fs2 = File.Create(outputDataFilePath))
+                        saver.SaveData(fs2, TestTransformHelper.AddFlatteningTransform(env, xf),
+                                        StreamHelper.GetColumnsIndex(xf.Schema, new[] { "Features", "ClusterId", "Score" }));
+                    var lines = File.ReadAllLines(outputDataFilePath).Select(c => c.Split('\t')).Where(c => c.Length == 4);
+                    Assert.IsTrue(lines.Select(c => c[1]).Distinct().Count() > 1);
+                    outputs.Add(File.ReadAllText(outputDataFilePath));
+
+                    if (outputs.Count == 3)
+                    {
+                        StreamHelper.SaveModel(env, xf, outModelFilePath);
+                        var outData = FileHelper.GetOutputFile("outData1.txt", methodName);
+                        var outData2 = FileHelper.GetOutputFile("outData2.txt", methodName);
+                        TestTransformHelper.SerializationTestTransform(env, outModelFilePath, xf, loader, outData, outData2);
+                    }
+                }
+                Assert.AreEqual(outputs[0], outputs[1]);
+                Assert.AreEqual(outputs[0], outputs[2]);
+            }
+        }
+
         [TestMethod]
         public void TestOpticsOrderingTransform()
         {
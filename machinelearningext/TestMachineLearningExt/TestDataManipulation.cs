@@ -39,6 +39,37 @@ namespace TestMachineLearningExt
             Assert.AreEqual(sch[1].Type, NumberType.R4);
         }
 
+        [TestMethod]
+        public void TestStreamingDataFrameChunks()
+        {
+            var iris = FileHelper.GetTestFile("iris.txt");
+            var sdf = StreamingDataFrame.ReadCsv(iris, sep: '\t');
+            var df = sdf.ToDataFrame();
+            foreach (var prefetch in new[] { 0, 1, 3 })
+            {
+                var chunks = sdf.Chunks(40, prefetch: prefetch);
+                var lengths = chunks.Select(c => c.Length).ToArray();
+                Assert.AreEqual(string.Join(",", lengths), "40,40,40,30");
+                Assert.IsTrue(chunks.Concat() == df);
+
+                var first = chunks.First();
+                Assert.AreEqual(first.Shape, new Tuple<int, int>(40, 5));
+
+                var mapped = chunks.Map(c =>
+                {
+                    c["Ratio"] = c["Sepal_length"] / c["Sepal_width"];
+                    return c;
+                });
+                Assert.AreEqual(mapped.Concat().Shape, new Tuple<int, int>(150, 6));
+
+                var filtered = chunks.Filter(c => c["Label"] == 1);
+                Assert.AreEqual(filtered.Aggregate(0, (n, c) => n + c.Length), 50);
+
+                var sum = chunks.Aggregate(0.0, (s, c) => s + (c["Sepal_length"].Column as DataColumn<float>).Data.Sum());
+                Assert.AreEqual(sum, (df["Sepal_length"].Column as DataColumn<float>).Data.Sum(), 1e-3);
+            }
+        }
+
         [TestMethod]
         public void TestReadCsvSimple()
         {
@@ -133,6 +164,45 @@ namespace TestMachineLearningExt
             Assert.IsTrue(df1 == df2);
         }
 
+        [TestMethod]
+        public void TestReadCsvParallel()
+        {
+            var iris = FileHelper.GetTestFile("iris.txt");
+            var df1 = DataFrameIO.ReadCsv(iris, sep: '\t');
+            foreach (var th in new int?[] { 2, 3, 4, null })
+            {
+                var df2 = DataFrameIO.ReadCsv(iris, sep: '\t', numThreads: th);
+                Assert.AreEqual(df1.Shape, df2.Shape);
+                Assert.IsTrue(df1 == df2);
+            }
+
+            var text = "AA,BB,CC\r\n0,1,text\r\n1,1.1,text2\r\n-2,3,\r\n3,4,t";
+            var df3 = DataFrameIO.ReadStr(text);
+            var df4 = DataFrameIO.ReadStr(text, numThreads: 4);
+            Assert.AreEqual(df3.ToString(), df4.ToString());
+            Assert.AreEqual(df4.Shape, new Tuple<int, int>(4, 3));
+            Assert.AreEqual(df4.iloc[2, 0], -2);
+        }
+
+        [TestMethod]
+        public void TestReadCsvLateWideLine()
+        {
+            // The last line has one more column than the lines used to guess the schema.
+            var lines = Enumerable.Range(0, 100).Select(i => string.Format("{0},{1}", i, i * 2)).ToList();
+            lines.Add("100,200,extra");
+            var text = "AA,BB\n" + string.Join("\n", lines);
+            var df1 = DataFrameIO.ReadStr(text, guess_rows: 10, numThreads: 1);
+            Assert.AreEqual(new Tuple<int, int>(101, 3), df1.Shape);
+            Assert.AreEqual("extra", df1.iloc[100, 2].ToString());
+            Assert.AreEqual(200, df1.iloc[100, 1]);
+            foreach (var th in new[] { 2, 4 })
+            {
+                var df2 = DataFrameIO.ReadStr(text, guess_rows: 10, numThreads: th);
+                Assert.AreEqual(df1.Shape, df2.Shape);
+                Assert.AreEqual(df1.ToString(), df2.ToString());
+            }
+        }
+
         [TestMethod]
         public void TestReadStrIndex()
         {
@@ -143,6 +213,91 @@ namespace TestMachineLearningExt
             Assert.AreEqual(exp, tos);
         }
 
+        [TestMethod]
+        public void TestReadColumnar()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var df = new DataFrame();
+            df.AddColumn("BL", new[] { true, false, true });
+            df.AddColumn("I4", new[] { 1, -2, 3 });
+            df.AddColumn("U4", new uint[] { 1, 2, 3 });
+            df.AddColumn("I8", new long[] { 1, -2, long.MaxValue });
+            df.AddColumn("R4", new[] { 1.5f, float.NaN, -3f });
+            df.AddColumn("R8", new[] { 1.5, double.NaN, -3 });
+            df.AddColumn("TX", new[] { "a", "", "\u00e9t\u00e9" });
+            df.AddColumn("KEY", new KeyType(typeof(uint), 0, 5), new DataColumn<uint>(new uint[] { 0, 5, 2 }));
+            df.AddColumn("VBL", new[] { new[] { true, false }, new[] { false }, new bool[0] });
+            df.AddColumn("VI4", new[] { new[] { 1, 2 }, new[] { 3 }, new int[0] });
+            df.AddColumn("VR4", new[] { new[] { 1f, 2f }, new[] { 3f }, new[] { 4f, 5f, 6f } });
+            df.AddColumn("VTX", new[] { new[] { "a", "bb" }, new string[0], new[] { "\u00e9" } });
+            df.AddColumn("VR8", new DataColumn<VBufferEqSort<double>>(new[] {
+                new VBufferEqSort<double>(5, 2, new[] { 1.0, 2.0 }, new[] { 1, 3 }),
+                new VBufferEqSort<double>(3, new[] { 1.0, 2.0, 3.0 }),
+                new VBufferEqSort<double>(4, 0, new double[0], new int[0]),
+            }));
+
+            var outfile = FileHelper.GetOutputFile("columnar.bin", methodName);
+            df.ToColumnar(outfile);
+            foreach (var lazy in new[] { true, false })
+            {
+                var df2 = DataFrameIO.ReadColumnar(outfile, lazy: lazy);
+                Assert.AreEqual(df.Shape, df2.Shape);
+                for (int i = 0; i < df.ColumnCount; ++i)
+                {
+                    Assert.AreEqual(df.Columns[i], df2.Columns[i]);
+                    Assert.AreEqual(df.Kinds[i], df2.Kinds[i]);
+                    Assert.IsTrue(df.GetColumn(i).Column.Equals(df2.GetColumn(i).Column));
+                }
+                Assert.AreEqual(df2.Kinds[7].KeyCount(), 5);
+                Assert.AreEqual(df2.iloc[2, 6].ToString(), "\u00e9t\u00e9");
+            }
+        }
+
+        [TestMethod]
+        public void TestReadColumnarLazy()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            int nrows = 1000;
+            var df = new DataFrame();
+            for (int c = 0; c < 50; ++c)
+                df.AddColumn($"c{c}", Enumerable.Range(0, nrows).Select(i => (double)(i * c)).ToArray());
+            var outfile = FileHelper.GetOutputFile("columnar50.bin", methodName);
+            df.ToColumnar(outfile);
+
+            using (var file = new DataFrameColumnarFile(outfile))
+            {
+                Assert.AreEqual(file.ColumnCount, 50);
+                Assert.AreEqual(file.Length, nrows);
+                var df2 = file.ToDataFrame();
+                Assert.AreEqual(file.LoadedBytes, 0);
+                Assert.AreEqual(df2.iloc[10, 3], 30.0);
+                Assert.AreEqual(df2.iloc[10, 7], 70.0);
+                Assert.AreEqual(df2.iloc[999, 49], 999.0 * 49);
+                Assert.AreEqual(file.LoadedBytes, 3 * nrows * sizeof(double));
+                for (int c = 0; c < 50; ++c)
+                {
+                    var col = df2.GetColumn(c).Column as DataColumn<double>;
+                    Assert.AreEqual(col.IsLoaded, c == 3 || c == 7 || c == 49);
+                }
+            }
+
+            var df3 = DataFrameIO.ReadColumnar(outfile, new[] { "c5", "c2" }, lazy: false);
+            Assert.AreEqual(df3.Shape, new Tuple<int, int>(nrows, 2));
+            Assert.AreEqual(df3.iloc[4, 0], 20.0);
+            Assert.AreEqual(df3.iloc[4, 1], 8.0);
+
+            // The file is not kept open between two lazy reads.
+            var df4 = DataFrameIO.ReadColumnar(outfile, lazy: true);
+            using (var fs = new FileStream(outfile, FileMode.Open, FileAccess.ReadWrite, FileShare.None))
+            {
+            }
+            Assert.AreEqual(df4.iloc[10, 3], 30.0);
+            using (var fs = new FileStream(outfile, FileMode.Open, FileAccess.ReadWrite, FileShare.None))
+            {
+            }
+            Assert.AreEqual(df4.iloc[999, 49], 999.0 * 49);
+        }
+
         #endregion
 
         #region DataFrame ML
@@ -479,6 +634,145 @@ namespace TestMachineLearningExt
             Assert.AreEqual(df.iloc[1, 3], true);
         }
 
+        [TestMethod]
+        public void TestDataFrameOpVectorized()
+        {
+            // 37 is not a multiple of the vector size, the last elements go through the tail loop.
+            int n = 37;
+            var rand = new Random(0);
+            var af = Enumerable.Range(0, n).Select(i => (float)rand.Next(-5, 5)).ToArray();
+            var bf = Enumerable.Range(0, n).Select(i => (float)rand.Next(-5, 5)).ToArray();
+            af[3] = float.NaN;
+            var ai = Enumerable.Range(0, n).Select(i => rand.Next(-50, 50)).ToArray();
+            var bi = Enumerable.Range(0, n).Select(i => rand.Next(1, 7)).ToArray();
+            var df = new DataFrame();
+            df.AddColumn("AF", af.ToArray());
+            df.AddColumn("BF", bf.ToArray());
+            df.AddColumn("AI", ai.ToArray());
+            df.AddColumn("BI", bi.ToArray());
+            df.AddColumn("AD", af.Select(c => (double)c).ToArray());
+            df.AddColumn("BD", bf.Select(c => (double)c).ToArray());
+
+            var sum = df["AF"] + df["BF"];
+            var div = df["AI"] / df["BI"];
+            var sub = df["AI"] - 3;
+            var mul = df["AD"] * df["BD"];
+            var sup = df["AF"] > df["BF"];
+            var neq = df["AF"] != 1f;
+            var infEq = df["AI"] <= 0;
+            for (int i = 0; i < n; ++i)
+            {
+                Assert.AreEqual(sum.Get(i), af[i] + bf[i]);
+                Assert.AreEqual(div.Get(i), ai[i] / bi[i]);
+                Assert.AreEqual(sub.Get(i), ai[i] - 3);
+                Assert.AreEqual(mul.Get(i), (double)af[i] * bf[i]);
+                Assert.AreEqual(sup.Get(i), af[i] > bf[i]);
+                Assert.AreEqual(neq.Get(i), af[i] != 1f);
+                Assert.AreEqual(infEq.Get(i), ai[i] <= 0);
+            }
+
+            df["AI"].InPlace(VectorOperation.Multiplication, df["BI"]);
+            df["AF"].InPlace(VectorOperation.Addition, 1f);
+            for (int i = 0; i < n; ++i)
+            {
+                Assert.AreEqual(df.iloc[i, 2], ai[i] * bi[i]);
+                Assert.AreEqual(df.iloc[i, 0], af[i] + 1f);
+            }
+            try
+            {
+                df["AF"].InPlace(VectorOperation.Addition, df["BI"]);
+                Assert.Fail("Types are different.");
+            }
+            catch (DataTypeError)
+            {
+            }
+        }
+
+        [TestMethod]
+        public void TestDataFrameOpExpression()
+        {
+            int n = ColumnExpression.BlockSize * 2 + 13;
+            var rand = new Random(0);
+            var a = Enumerable.Range(0, n).Select(i => rand.NextDouble()).ToArray();
+            var b = Enumerable.Range(0, n).Select(i => rand.NextDouble()).ToArray();
+            var c = Enumerable.Range(0, n).Select(i => rand.NextDouble()).ToArray();
+            var d = Enumerable.Range(0, n).Select(i => rand.NextDouble()).ToArray();
+            var df = new DataFrame();
+            df.AddColumn("a", a);
+            df.AddColumn("b", b);
+            df.AddColumn("c", c);
+            df.AddColumn("d", d);
+
+            var expr = (ColumnExpression.Column(df["a"]) + df["b"]) * df["c"] > df["d"];
+            Assert.IsTrue(expr.IsBoolean);
+            var res = expr.Evaluate();
+            var exp = (df["a"] + df["b"]) * df["c"] > df["d"];
+            var num = (1 - ColumnExpression.Column(df["a"]) / 2 - df["b"]).Evaluate();
+            var both = ((ColumnExpression.Column(df["a"]) < 0.5) & !(0.2 > ColumnExpression.Column(df["b"]))).Evaluate();
+            for (int i = 0; i < n; ++i)
+            {
+                Assert.AreEqual(res.Get(i), exp.Get(i));
+                Assert.AreEqual(res.Get(i), (a[i] + b[i]) * c[i] > d[i]);
+                Assert.AreEqual(num.Get(i), 1 - a[i] / 2 - b[i]);
+                Assert.AreEqual(both.Get(i), a[i] < 0.5 && !(0.2 > b[i]));
+            }
+
+            df.AddColumn("i", Enumerable.Range(0, n).ToArray());
+            try
+            {
+                (ColumnExpression.Column(df["a"]) + df["i"]).Evaluate();
+                Assert.Fail("Types are different.");
+            }
+            catch (DataTypeError)
+            {
+            }
+        }
+
+        [TestMethod]
+        public void TestDataFrameOpExpressionIntegers()
+        {
+            var df = new DataFrame();
+            df.AddColumn("i", new[] { 1, 2, 3 });
+            df.AddColumn("u", new uint[] { 1, 2, 3 });
+
+            var expr = ColumnExpression.Column(df["i"]);
+            Assert.IsTrue(expr.Equals(expr));
+            Assert.IsFalse(expr.Equals(ColumnExpression.Column(df["i"])));
+            Assert.AreEqual(expr.GetHashCode(), expr.GetHashCode());
+
+            var neg = (-ColumnExpression.Column(df["i"]) + 2).Evaluate();
+            for (int i = 0; i < 3; ++i)
+                Assert.AreEqual(neg.Get(i), 1 - i);
+            var sum = (ColumnExpression.Column(df["u"]) + 2).Evaluate();
+            for (int i = 0; i < 3; ++i)
+                Assert.AreEqual(sum.Get(i), (uint)(i + 3));
+
+            try
+            {
+                (ColumnExpression.Column(df["i"]) + 0.5).Evaluate();
+                Assert.Fail("0.5 is not an integer.");
+            }
+            catch (DataValueError)
+            {
+            }
+            try
+            {
+                (ColumnExpression.Column(df["u"]) - (-1)).Evaluate();
+                Assert.Fail("-1 is not an unsigned integer.");
+            }
+            catch (DataValueError)
+            {
+            }
+            try
+            {
+                (-ColumnExpression.Column(df["u"])).Evaluate();
+                Assert.Fail("Unsigned columns cannot be negated.");
+            }
+            catch (DataTypeError)
+            {
+            }
+        }
+
         #endregion
 
         #region DataFrame Copy
@@ -555,6 +849,28 @@ namespace TestMachineLearningExt
             Assert.AreEqual(tx, "i,x\n0,0.5\n1,1.5");
         }
 
+        [TestMethod]
+        public void TestPinnedColumn()
+        {
+            var df = new DataFrame();
+            df.AddColumn("i", new int[] { 0, 1 });
+            using (var pin = PinnedColumn.AddColumn(df, "x", "float32", 2))
+            {
+                Assert.AreEqual(pin.Length, 2);
+                Assert.AreEqual(pin.DType, "float32");
+                System.Runtime.InteropServices.Marshal.Copy(new float[] { 0.5f, 1.5f }, 0, pin.Address, 2);
+            }
+            Assert.AreEqual(df.ToString(), "i,x\n0,0.5\n1,1.5");
+            using (var pin = PinnedColumn.Pin(df, "i"))
+            {
+                var values = new int[2];
+                System.Runtime.InteropServices.Marshal.Copy(pin.Address, values, 0, 2);
+                Assert.AreEqual(values[1], 1);
+                System.Runtime.InteropServices.Marshal.Copy(new int[] { 5, 6 }, 0, pin.Address, 2);
+            }
+            Assert.AreEqual(df.iloc[1, 0], 6);
+        }
+
         #endregion
 
         #region dataframe function
@@ -660,6 +976,40 @@ namespace TestMachineLearningExt
             Assert.AreEqual(df.iloc[0, 1], 1.1f);
         }
 
+        [TestMethod]
+        public void TestDataFrameSortRadix()
+        {
+            var rand = new Random(0);
+            int n = DataFrameSorting.RadixSortThreshold * 3;
+            var values = new[] { float.NaN, -0f, 0f, -1.5f, 2.5f, float.NegativeInfinity, float.PositiveInfinity };
+            var ai = Enumerable.Range(0, n).Select(i => rand.Next(-20, 20)).ToArray();
+            var af = Enumerable.Range(0, n).Select(i => values[rand.Next(0, values.Length)]).ToArray();
+            var at = Enumerable.Range(0, n).Select(i => $"t{rand.Next(0, 50)}").ToArray();
+            var df = new DataFrame();
+            df.AddColumn("AA", ai);
+            df.AddColumn("BB", af);
+            df.AddColumn("CC", at);
+            df.AddColumn("ID", Enumerable.Range(0, n).ToArray());
+
+            var exp = Enumerable.Range(0, n).OrderBy(i => ai[i]).ThenBy(i => af[i]).ToArray();
+            var copy = df.Copy();
+            copy.TSort<int, float>(new[] { 0, 1 });
+            for (int i = 0; i < n; ++i)
+                Assert.AreEqual(copy.iloc[i, 3], exp[i]);
+
+            exp = Enumerable.Range(0, n).OrderByDescending(i => ai[i]).ThenByDescending(i => af[i]).ToArray();
+            copy = df.Copy();
+            copy.TSort<int, float>(new[] { 0, 1 }, false);
+            for (int i = 0; i < n; ++i)
+                Assert.AreEqual(copy.iloc[i, 3], exp[i]);
+
+            exp = Enumerable.Range(0, n).OrderBy(i => at[i]).ToArray();
+            copy = df.Copy();
+            copy.Sort(new[] { "CC" });
+            for (int i = 0; i < n; ++i)
+                Assert.AreEqual(copy.iloc[i, 3], exp[i]);
+        }
+
         [TestMethod]
         public void TestDataFrameSortUnTyped()
         {
@@ -1136,6 +1486,68 @@ namespace TestMachineLearningExt
             Assert.AreEqual(exp, text);
         }
 
+        [TestMethod]
+        public void TestDataFrameGroupByHash()
+        {
+            var rand = new Random(0);
+            int n = DataFrameHashGrouping.MinRowsPerThread * 3 + 7;
+            var k1 = Enumerable.Range(0, n).Select(i => rand.Next(0, 3)).ToArray();
+            var k2 = Enumerable.Range(0, n).Select(i => rand.Next(-2, 2)).ToArray();
+            var k3 = Enumerable.Range(0, n).Select(i => rand.Next(0, 2) == 1).ToArray();
+            var k4 = Enumerable.Range(0, n).Select(i => $"t{rand.Next(0, 4)}").ToArray();
+            var k5 = Enumerable.Range(0, n).Select(i => (long)rand.Next(0, 2)).ToArray();
+            var v1 = Enumerable.Range(0, n).Select(i => rand.Next(-100, 100)).ToArray();
+            var v2 = Enumerable.Range(0, n).Select(i => (double)rand.Next(-100, 100)).ToArray();
+            var df = new DataFrame();
+            df.AddColumn("V1", v1);
+            df.AddColumn("K1", k1);
+            df.AddColumn("K2", k2);
+            df.AddColumn("K3", k3);
+            df.AddColumn("K4", k4);
+            df.AddColumn("K5", k5);
+            df.AddColumn("V2", v2);
+
+            var exp = Enumerable.Range(0, n)
+                        .GroupBy(i => new Tuple<int, int, bool, string, long>(k1[i], k2[i], k3[i], k4[i], k5[i]))
+                        .OrderBy(g => g.Key.Item1).ThenBy(g => g.Key.Item2).ThenBy(g => g.Key.Item3)
+                        .ThenBy(g => g.Key.Item4).ThenBy(g => g.Key.Item5)
+                        .ToArray();
+
+            var gr = df.GroupBy(new[] { 1, 2, 3, 4, 5 });
+            var count = gr.Count();
+            var sum = gr.Sum();
+            var min = gr.Min();
+            var max = gr.Max();
+            Assert.AreEqual(count.Shape, new Tuple<int, int>(exp.Length, 7));
+            Assert.AreEqual(string.Join(",", count.Columns), "K1,K2,K3,K4,K5,V1,V2");
+            for (int g = 0; g < exp.Length; ++g)
+            {
+                var rows = exp[g].ToArray();
+                Assert.AreEqual(count.iloc[g, 0], exp[g].Key.Item1);
+                Assert.AreEqual(count.iloc[g, 1], exp[g].Key.Item2);
+                Assert.AreEqual(count.iloc[g, 2], exp[g].Key.Item3);
+                Assert.AreEqual(count.iloc[g, 3].ToString(), exp[g].Key.Item4);
+                Assert.AreEqual(count.iloc[g, 4], exp[g].Key.Item5);
+                Assert.AreEqual(count.iloc[g, 5], rows.Length);
+                Assert.AreEqual(sum.iloc[g, 5], rows.Sum(i => v1[i]));
+                Assert.AreEqual(sum.iloc[g, 6], rows.Sum(i => v2[i]));
+                Assert.AreEqual(min.iloc[g, 5], rows.Min(i => v1[i]));
+                Assert.AreEqual(min.iloc[g, 6], rows.Min(i => v2[i]));
+                Assert.AreEqual(max.iloc[g, 5], rows.Max(i => v1[i]));
+                Assert.AreEqual(max.iloc[g, 6], rows.Max(i => v2[i]));
+            }
+
+            // Without sorting, groups follow the order of their first row.
+            var unsorted = DataFrameHashGrouping.Aggregate(df, new[] { 1, 2, 3, 4, 5 }, AggregatedFunction.Count, false, 2);
+            var first = exp.Select(g => g.First()).OrderBy(i => i).ToArray();
+            Assert.AreEqual(unsorted.Length, first.Length);
+            for (int g = 0; g < first.Length; ++g)
+            {
+                Assert.AreEqual(unsorted.iloc[g, 0], k1[first[g]]);
+                Assert.AreEqual(unsorted.iloc[g, 4], k5[first[g]]);
+            }
+        }
+
         [TestMethod]
         public void TestDataFrameJoin()
         {
@@ -1232,6 +1644,46 @@ namespace TestMachineLearningExt
             Assert.AreEqual(exp, tos);
         }
 
+        [TestMethod]
+        public void TestDataFrameJoinHash()
+        {
+            var rand = new Random(0);
+            var keysLeft = Enumerable.Range(0, 1500).Select(i => rand.Next(0, 300)).ToArray();
+            var keysRight = Enumerable.Range(0, 1000).Select(i => rand.Next(100, 400)).ToArray();
+            var df1 = new DataFrame();
+            df1.AddColumn("AA", keysLeft);
+            df1.AddColumn("VL", Enumerable.Range(0, keysLeft.Length).ToArray());
+            var df2 = new DataFrame();
+            df2.AddColumn("AA", keysRight);
+            df2.AddColumn("VR", Enumerable.Range(0, keysRight.Length).ToArray());
+            var orderLeft = Enumerable.Range(0, keysLeft.Length).OrderBy(i => keysLeft[i]).ToArray();
+            var orderRight = Enumerable.Range(0, keysRight.Length).OrderBy(i => keysRight[i]).ToArray();
+
+            foreach (var joinType in new[] { JoinStrategy.Inner, JoinStrategy.Left, JoinStrategy.Right, JoinStrategy.Outer })
+            {
+                int[] mergeLeft, mergeRight, hashLeft, hashRight;
+                DataFrameJoining.MergeJoinRows(orderLeft, orderRight, keysLeft, keysRight, joinType, out mergeLeft, out mergeRight);
+                DataFrameJoining.HashJoinRows(keysLeft, keysRight, joinType, out hashLeft, out hashRight);
+                Assert.IsTrue(mergeLeft.SequenceEqual(hashLeft));
+                Assert.IsTrue(mergeRight.SequenceEqual(hashRight));
+
+                // Same pairs when the hash table is built on the other side.
+                var swapped = joinType == JoinStrategy.Left ? JoinStrategy.Right : (joinType == JoinStrategy.Right ? JoinStrategy.Left : joinType);
+                DataFrameJoining.HashJoinRows(keysRight, keysLeft, swapped, out hashRight, out hashLeft);
+                var pairs = new HashSet<Tuple<int, int>>(mergeLeft.Select((c, i) => new Tuple<int, int>(c, mergeRight[i])));
+                Assert.AreEqual(mergeLeft.Length, hashLeft.Length);
+                Assert.IsTrue(hashLeft.Select((c, i) => new Tuple<int, int>(c, hashRight[i])).All(c => pairs.Contains(c)));
+
+                var res = df1.Join(df2, new[] { 0 }, new[] { 0 }, joinType: joinType);
+                Assert.AreEqual(res.Shape, new Tuple<int, int>(mergeLeft.Length, 4));
+                for (int i = 0; i < mergeLeft.Length; ++i)
+                {
+                    Assert.AreEqual(res.iloc[i, 1], mergeLeft[i] < 0 ? int.MinValue : mergeLeft[i]);
+                    Assert.AreEqual(res.iloc[i, 3], mergeRight[i] < 0 ? int.MinValue : mergeRight[i]);
+                }
+            }
+        }
+
         [TestMethod]
         public void TestDataFrameJoinHeadTail()
         {
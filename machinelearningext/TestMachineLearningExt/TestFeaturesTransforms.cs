@@ -170,6 +170,89 @@ namespace TestMachineLearningExt
             }
         }
 
+        static List<float[]> ComputePolynomial(IHostEnvironment host, IDataView data, int degree, int hashBits)
+        {
+            var args = new PolynomialTransform.Arguments
+            {
+                columns = new[] { new Column1x1() { Source = "X", Name = "poly" } },
+                degree = degree,
+                hashBits = hashBits
+            };
+            var poly = new PolynomialTransform(host, args, data);
+            var res = new List<float[]>();
+            using (var cursor = poly.GetRowCursor(i => true))
+            {
+                var getter = cursor.GetGetter<VBuffer<float>>(1);
+                // The buffer is reused on purpose.
+                var got = new VBuffer<float>();
+                while (cursor.MoveNext())
+                {
+                    getter(ref got);
+                    res.Add(got.DenseValues().ToArray());
+                }
+            }
+            return res;
+        }
+
+        static IEnumerable<float> ExpectedMonomials(float[] x, int degree)
+        {
+            for (int i = 0; i < x.Length; ++i)
+                yield return x[i];
+            if (degree >= 2)
+            {
+                for (int i = 0; i < x.Length; ++i)
+                    for (int j = i; j < x.Length; ++j)
+                        yield return x[i] * x[j];
+            }
+            if (degree >= 3)
+            {
+                for (int i = 0; i < x.Length; ++i)
+                    for (int j = i; j < x.Length; ++j)
+                        for (int k = j; k < x.Length; ++k)
+                            yield return x[i] * x[j] * x[k];
+            }
+        }
+
+        [TestMethod]
+        public void TestI_PolynomialTransformSparseDenseHash()
+        {
+            var dense = new[] {
+                new float[] { 1, 0, 10, 0, 100 },
+                new float[] { 0, 2, 3, 5, 0 },
+                new float[] { 0, 0, 0, 0, 0 },
+                new float[] { 1, 2, 3, 4, 5 },
+            };
+            var inputsDense = dense.Select(x => new ExampleASparse() { X = new VBuffer<float>(5, x) }).ToArray();
+            var inputsSparse = dense.Select(x =>
+            {
+                var ind = Enumerable.Range(0, x.Length).Where(i => x[i] != 0).ToArray();
+                return new ExampleASparse() { X = new VBuffer<float>(5, ind.Length, ind.Select(i => x[i]).ToArray(), ind) };
+            }).ToArray();
+
+            using (var host = EnvHelper.NewTestEnvironment())
+            {
+                for (int degree = 2; degree <= 3; ++degree)
+                {
+                    var resDense = ComputePolynomial(host, host.CreateStreamingDataView(inputsDense), degree, 0);
+                    var resSparse = ComputePolynomial(host, host.CreateStreamingDataView(inputsSparse), degree, 0);
+                    var resHash = ComputePolynomial(host, host.CreateStreamingDataView(inputsSparse), degree, 4);
+                    var resHashDense = ComputePolynomial(host, host.CreateStreamingDataView(inputsDense), degree, 4);
+                    Assert.AreEqual(dense.Length, resDense.Count);
+                    for (int r = 0; r < dense.Length; ++r)
+                    {
+                        var exp = ExpectedMonomials(dense[r], degree).ToArray();
+                        CollectionAssert.AreEqual(exp, resDense[r]);
+                        CollectionAssert.AreEqual(exp, resSparse[r]);
+
+                        // Hashing moves the monomials but keeps their sum.
+                        Assert.AreEqual(16, resHash[r].Length);
+                        Assert.AreEqual(exp.Sum(), resHash[r].Sum(), 1e-3f * (1 + Math.Abs(exp.Sum())));
+                        CollectionAssert.AreEqual(resHash[r], resHashDense[r]);
+                    }
+                }
+            }
+        }
+
         #endregion
 
         #region ScalerTransform
@@ -253,6 +336,57 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestI_ScalerTransformParallelMeanVar()
+        {
+            var rnd = new Random(0);
+            // A large offset makes the naive sum of squares lose precision.
+            var inputs = Enumerable.Range(0, 10000)
+                                   .Select(i => new ExampleA() { X = new float[] { (float)(rnd.NextDouble() + 1e4), (float)(rnd.NextDouble() * 3) } })
+                                   .ToArray();
+            using (var host = EnvHelper.NewTestEnvironment())
+            {
+                var results = new List<float[]>[2];
+                var threads = new[] { 1, 4 };
+                for (int t = 0; t < threads.Length; ++t)
+                {
+                    var data = host.CreateStreamingDataView(inputs);
+                    var args = new ScalerTransform.Arguments
+                    {
+                        columns = new[] { new Column1x1() { Name = "X", Source = "X" } },
+                        scaling = ScalerTransform.ScalerStrategy.meanVar,
+                        numThreads = threads[t]
+                    };
+                    var scaled = new ScalerTransform(host, args, data);
+                    results[t] = new List<float[]>();
+                    using (var cursor = scaled.GetRowCursor(i => true))
+                    {
+                        var colGetter = cursor.GetGetter<VBuffer<float>>(0);
+                        VBuffer<float> got = new VBuffer<float>();
+                        while (cursor.MoveNext())
+                        {
+                            colGetter(ref got);
+                            results[t].Add(got.DenseValues().ToArray());
+                        }
+                    }
+                }
+
+                Assert.AreEqual(inputs.Length, results[0].Count);
+                Assert.AreEqual(inputs.Length, results[1].Count);
+                for (int j = 0; j < 2; ++j)
+                {
+                    var col = results[0].Select(c => (double)c[j]).ToArray();
+                    var mean = col.Average();
+                    var std = Math.Sqrt(col.Select(c => (c - mean) * (c - mean)).Average());
+                    Assert.AreEqual(0, mean, 1e-3);
+                    Assert.AreEqual(1, std, 1e-2);
+                }
+                for (int i = 0; i < inputs.Length; ++i)
+                    for (int j = 0; j < 2; ++j)
+                        Assert.AreEqual(results[0][i][j], results[1][i][j], 1e-3);
+            }
+        }
+
         [TestMethod]
         public void TestI_ScalerTransformSparse()
         {
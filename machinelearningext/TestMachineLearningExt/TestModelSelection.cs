@@ -5,6 +5,7 @@ using System;
 using System.Linq;
 using System.IO;
 using System.Collections.Generic;
+using Microsoft.ML;
 using Microsoft.ML.Data;
 using Scikit.ML.PipelineHelper;
 using Scikit.ML.TestHelper;
@@ -267,6 +268,91 @@ namespace TestMachineLearningExt
             TestDataSplitTrainTestSerializationIris("text{schema=- header=+}");
         }
 
+        static void ReadPartsAndFolds(RowCursor cursor, Dictionary<int, Tuple<int, int>> res)
+        {
+            var getY = cursor.GetGetter<int>(SchemaHelper.GetColumnIndex(cursor.Schema, "Y"));
+            var getPart = cursor.GetGetter<int>(SchemaHelper.GetColumnIndex(cursor.Schema, "Part"));
+            var getFold = cursor.GetGetter<int>(SchemaHelper.GetColumnIndex(cursor.Schema, "Fold"));
+            int y = 0, part = 0, fold = 0;
+            while (cursor.MoveNext())
+            {
+                getY(ref y);
+                getPart(ref part);
+                getFold(ref fold);
+                lock (res)
+                {
+                    if (res.ContainsKey(y))
+                        throw new Exception(string.Format("Row {0} seen twice.", y));
+                    res[y] = new Tuple<int, int>(part, fold);
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestTransSplitTrainTestStreamingFolds()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
+            int nbRows = 1000;
+            using (var host = EnvHelper.NewTestEnvironment(conc: 4))
+            {
+                var inputs = Enumerable.Range(0, nbRows).Select(i => new InputOutput { X = new float[] { 0, 1 }, Y = i }).ToArray();
+                var data = host.CreateStreamingDataView(inputs);
+
+                var args = new SplitTrainTestTransform.Arguments
+                {
+                    newColumn = "Part",
+                    streaming = true,
+                    folds = 5,
+                    foldColumn = "Fold",
+                    seed = 5
+                };
+                var transformedData = new SplitTrainTestTransform(host, args, data);
+
+                // A single cursor and a set of cursors must give the same assignment.
+                var seq = new Dictionary<int, Tuple<int, int>>();
+                using (var cursor = transformedData.GetRowCursor(i => true))
+                    ReadPartsAndFolds(cursor, seq);
+                var par = new Dictionary<int, Tuple<int, int>>();
+                var cursors = transformedData.GetRowCursorSet(i => true, 4);
+                System.Threading.Tasks.Parallel.ForEach(cursors, c => { using (c) ReadPartsAndFolds(c, par); });
+
+                Assert.AreEqual(nbRows, seq.Count);
+                Assert.AreEqual(nbRows, par.Count);
+                foreach (var pair in seq)
+                    Assert.AreEqual(pair.Value, par[pair.Key]);
+
+                int nbTrain = seq.Count(c => c.Value.Item1 == 0);
+                Assert.IsTrue(Math.Abs(nbTrain - nbRows * 2 / 3) < 60, $"nbTrain={nbTrain}");
+                for (int f = 0; f < args.folds; ++f)
+                {
+                    int nbFold = seq.Count(c => c.Value.Item2 == f);
+                    Assert.IsTrue(Math.Abs(nbFold - nbRows / args.folds) < 50, $"fold {f}: {nbFold}");
+
+                    SplitTrainTestTransform.SelectFold(host, transformedData, "Fold", f, out IDataView train, out IDataView test);
+                    var testRows = new Dictionary<int, Tuple<int, int>>();
+                    using (var cursor = test.GetRowCursor(i => true))
+                        ReadPartsAndFolds(cursor, testRows);
+                    Assert.AreEqual(nbFold, testRows.Count);
+                    Assert.IsTrue(testRows.All(c => c.Value.Item2 == f));
+                    Assert.AreEqual(nbRows - nbFold, DataViewUtils.ComputeRowCount(train));
+                }
+
+                // The assignment survives serialization.
+                StreamHelper.SaveModel(host, transformedData, outModelFilePath);
+                using (var fs = File.OpenRead(outModelFilePath))
+                {
+                    var deserializedData = host.LoadTransforms(fs, data);
+                    var loaded = new Dictionary<int, Tuple<int, int>>();
+                    using (var cursor = deserializedData.GetRowCursor(i => true))
+                        ReadPartsAndFolds(cursor, loaded);
+                    Assert.AreEqual(nbRows, loaded.Count);
+                    foreach (var pair in seq)
+                        Assert.AreEqual(pair.Value, loaded[pair.Key]);
+                }
+            }
+        }
+
         #endregion
     }
 }
@@ -161,6 +161,71 @@ namespace TestMachineLearningExt
             TestMultiToBinaryTransformVector(MultiToBinaryTransform.MultiplicationAlgorithm.Reweight, 2);
         }
 
+        [TestMethod]
+        public void TestTransMultiToBinVirtual()
+        {
+            foreach (var ratio in new[] { 0f, 0.5f, 1f })
+            {
+                foreach (var max in new[] { 1, 10 })
+                {
+                    using (var host = EnvHelper.NewTestEnvironment())
+                    {
+                        var inputs = Enumerable.Range(0, 10).Select(i => new InputOutputU()
+                        {
+                            X = new float[] { 0.1f * i, 1.1f * i },
+                            Y = (uint)(i % 5)
+                        }).ToArray();
+                        var data = host.CreateStreamingDataView(inputs);
+                        var args = new MultiToBinaryTransform.Arguments
+                        {
+                            label = "Y",
+                            algo = MultiToBinaryTransform.MultiplicationAlgorithm.Virtual,
+                            maxMulti = max,
+                            negativeRatio = ratio
+                        };
+                        var multiplied = new MultiToBinaryTransform(host, args, data);
+                        int copies = 1 + MultiToBinaryTransform.NumberOfNegatives(5, ratio);
+
+                        using (var cursor = multiplied.GetRowCursor(i => true))
+                        {
+                            var featuresGetter = cursor.GetGetter<VBuffer<float>>(0);
+                            var labelGetter = cursor.GetGetter<uint>(1);
+                            var binGetter = cursor.GetGetter<bool>(2);
+                            var cont = new List<Tuple<long, uint, bool>>();
+                            var features = new VBuffer<float>();
+                            uint got = 0;
+                            bool bin = false;
+                            while (cursor.MoveNext())
+                            {
+                                featuresGetter(ref features);
+                                Assert.AreEqual(0.1f * cursor.Position, features.Values[0], 1e-5);
+                                Assert.AreEqual(1.1f * cursor.Position, features.Values[1], 1e-5);
+                                // The next copy of the row must not see this modification.
+                                features.Values[0] = -1;
+                                labelGetter(ref got);
+                                binGetter(ref bin);
+                                cont.Add(new Tuple<long, uint, bool>(cursor.Position, got, bin));
+                            }
+
+                            Assert.AreEqual(10 * copies, cont.Count);
+                            foreach (var row in cont.GroupBy(c => c.Item1))
+                            {
+                                Assert.AreEqual(copies, row.Count());
+                                Assert.AreEqual(copies, row.Select(c => c.Item2).Distinct().Count());
+                                var positive = row.Where(c => c.Item3).ToArray();
+                                Assert.AreEqual(1, positive.Length);
+                                Assert.AreEqual((uint)(row.Key % 5), positive[0].Item2);
+                            }
+                        }
+                    }
+                }
+            }
+            Assert.AreEqual(2, MultiToBinaryTransform.NumberOfNegatives(5, 0f));
+            Assert.AreEqual(32, MultiToBinaryTransform.NumberOfNegatives(1001, 0f));
+            Assert.AreEqual(4, MultiToBinaryTransform.NumberOfNegatives(5, 1f));
+            Assert.AreEqual(0, MultiToBinaryTransform.NumberOfNegatives(1, 0f));
+        }
+
         #endregion
 
         #region MultiToBinary Predictors
@@ -417,6 +482,51 @@ namespace TestMachineLearningExt
             TrainMultiToBinaryPredictorSparse(false, false);
         }
 
+        [TestMethod]
+        public void TrainMultiToBinaryPredictorVirtualScoreBatch()
+        {
+            foreach (var singleColumn in new[] { true, false })
+            {
+                var dataFilePath = FileHelper.GetTestFile("mc_iris.txt");
+                using (var env = EnvHelper.NewTestEnvironment(conc: 1))
+                {
+                    var loader = env.CreateLoader("Text{col=Label:R4:0 col=Slength:R4:1 col=Swidth:R4:2 col=Plength:R4:3 col=Pwidth:R4:4 header=+}",
+                                                  new MultiFileSource(dataFilePath));
+                    var concat = env.CreateTransform("Concat{col=Features:Slength,Swidth}", loader);
+                    var roles = env.CreateExamples(concat, "Features", "Label");
+                    var iova = string.Format("iova{{p=lr sc={0} al=Virtual nr=0.5}}", singleColumn ? "+" : "-");
+                    var trainer = env.CreateTrainer(iova);
+                    MultiToBinaryPredictor predictor;
+                    using (var ch = env.Start("train"))
+                        predictor = trainer.Train(env, ch, roles) as MultiToBinaryPredictor;
+                    Assert.IsNotNull(predictor);
+
+                    int rows = 50;
+                    int width = predictor.OutputType.VectorSize();
+                    var rnd = new Random(0);
+                    var features = Enumerable.Range(0, rows * 2).Select(i => (float)(rnd.NextDouble() * 4 + 4)).ToArray();
+                    var mapper = (predictor as IValueMapper).GetMapper<VBuffer<float>, VBuffer<float>>();
+                    var expected = new float[rows * width];
+                    var dst = new VBuffer<float>();
+                    for (int i = 0; i < rows; ++i)
+                    {
+                        var src = new VBuffer<float>(2, new[] { features[i * 2], features[i * 2 + 1] });
+                        mapper(in src, ref dst);
+                        var dense = dst.DenseValues().ToArray();
+                        Array.Copy(dense, 0, expected, i * width, width);
+                    }
+
+                    foreach (var linear in new[] { true, false })
+                    {
+                        var scores = new float[rows * width];
+                        predictor.ScoreBatch(features, rows, scores, linear);
+                        for (int i = 0; i < scores.Length; ++i)
+                            Assert.AreEqual(expected[i], scores[i], 1e-4f * (1 + Math.Abs(expected[i])));
+                    }
+                }
+            }
+        }
+
         #endregion
 
         #region OptimizedOVA
@@ -533,6 +643,50 @@ namespace TestMachineLearningExt
             OptimizedOVA(0.2f, "U4", "lr");
         }
 
+        [TestMethod]
+        public void TestOptimizedOVAParallelFused()
+        {
+            var trainFile = FileHelper.GetTestFile("types/iris_train.idv");
+            using (var env = EnvHelper.NewTestEnvironment(conc: 1))
+            {
+                var loader = env.CreateLoader("Binary", new MultiFileSource(trainFile));
+                var xf = env.CreateTransform("concat{col=Features:Slength,Swidth}", loader);
+                var roles = env.CreateExamples(xf, "Features", "Label");
+                OptimizedOVAPredictor pred1, pred2;
+                using (var ch = env.Start("Train"))
+                {
+                    pred1 = env.CreateTrainer("oova{p=lr nt=1}").Train(env, ch, roles) as OptimizedOVAPredictor;
+                    pred2 = env.CreateTrainer("oova{p=lr nt=2}").Train(env, ch, roles) as OptimizedOVAPredictor;
+                }
+                Assert.IsNotNull(pred1);
+                Assert.IsNotNull(pred2);
+                Assert.IsTrue(pred1.IsFused);
+                Assert.IsTrue(pred2.IsFused);
+
+                int rows = 20, nbClasses = pred1.OutputType.VectorSize();
+                var rand = new Random(0);
+                var features = Enumerable.Range(0, rows * 2).Select(i => (float)(rand.NextDouble() * 8)).ToArray();
+                var fused = new float[rows * nbClasses];
+                var perClass = new float[rows * nbClasses];
+                var parallel = new float[rows * nbClasses];
+                pred1.ScoreBatch(features, rows, fused);
+                pred1.ScoreBatch(features, rows, perClass, false);
+                pred2.ScoreBatch(features, rows, parallel);
+                for (int i = 0; i < fused.Length; ++i)
+                {
+                    Assert.AreEqual(perClass[i], fused[i], 1e-4);
+                    Assert.AreEqual(fused[i], parallel[i], 1e-4);
+                }
+
+                var mapper = pred1.GetMapper<VBuffer<float>, VBuffer<float>>();
+                var res = new VBuffer<float>();
+                var src = new VBuffer<float>(2, features.Take(2).ToArray());
+                mapper(in src, ref res);
+                for (int k = 0; k < nbClasses; ++k)
+                    Assert.AreEqual(fused[k], res.Values[k], 1e-5);
+            }
+        }
+
         static void OptimizedOVA(float downsampling, string type, string model)
         {
             var methodName = string.Format("{0}-D{1}-{2}-{3}", System.Reflection.MethodBase.GetCurrentMethod().Name, downsampling, type, model);
@@ -14,9 +14,9 @@ namespace TestMachineLearningExt
     public class TestNearestNeighbors
     {
         static void TrainkNNBinaryClassification(int k, NearestNeighborsWeights weight, int threads, float ratio = 0.2f,
-                                                 string distance = "L2", int conc = 0)
+                                                 string distance = "L2", int conc = 0, string algo = "kdtree")
         {
-            var methodName = string.Format("{0}-k{1}-W{2}-T{3}-D{4}", System.Reflection.MethodBase.GetCurrentMethod().Name, k, weight, threads, distance);
+            var methodName = string.Format("{0}-k{1}-W{2}-T{3}-D{4}-A{5}", System.Reflection.MethodBase.GetCurrentMethod().Name, k, weight, threads, distance, algo);
             var dataFilePath = FileHelper.GetTestFile("iris_binary.txt");
             var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
             var outData = FileHelper.GetOutputFile("outData1.txt", methodName);
@@ -33,8 +33,8 @@ namespace TestMachineLearningExt
                     concat = env.CreateTransform("Scaler{col=Features}", concat);
                 var roles = env.CreateExamples(concat, "Features", "Label");
                 string modelDef;
-                modelDef = string.Format("knn{{k={0} weighting={1} nt={2} distance={3} seed=1}}", k,
-                                         weight == NearestNeighborsWeights.distance ? "distance" : "uniform", threads, distance);
+                modelDef = string.Format("knn{{k={0} weighting={1} nt={2} distance={3} seed=1 algo={4}}}", k,
+                                         weight == NearestNeighborsWeights.distance ? "distance" : "uniform", threads, distance, algo);
                 var trainer = env.CreateTrainer(modelDef);
                 using (var ch = env.Start("test"))
                 {
@@ -78,9 +78,9 @@ namespace TestMachineLearningExt
         }
 
         public static void TrainkNNMultiClassification(int k, NearestNeighborsWeights weight, int threads, float ratio = 0.2f,
-                                                       string distance = "L2")
+                                                       string distance = "L2", string algo = "kdtree")
         {
-            var methodName = string.Format("{0}-k{1}-W{2}-T{3}-D{4}", System.Reflection.MethodBase.GetCurrentMethod().Name, k, weight, threads, distance);
+            var methodName = string.Format("{0}-k{1}-W{2}-T{3}-D{4}-A{5}", System.Reflection.MethodBase.GetCurrentMethod().Name, k, weight, threads, distance, algo);
             var dataFilePath = FileHelper.GetTestFile("iris.txt");
             var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
             var outData = FileHelper.GetOutputFile("outData1.txt", methodName);
@@ -95,8 +95,8 @@ namespace TestMachineLearningExt
                 var concat = env.CreateTransform("Concat{col=Features:Slength,Swidth}", loader);
                 var roles = env.CreateExamples(concat, "Features", "Label");
                 string modelDef;
-                modelDef = string.Format("knnmc{{k={0} weighting={1} nt={2} distance={3}}}", k,
-                                         weight == NearestNeighborsWeights.distance ? "distance" : "uniform", threads, distance);
+                modelDef = string.Format("knnmc{{k={0} weighting={1} nt={2} distance={3} algo={4}}}", k,
+                                         weight == NearestNeighborsWeights.distance ? "distance" : "uniform", threads, distance, algo);
                 var trainer = env.CreateTrainer(modelDef);
                 using (var ch = env.Start("test"))
                 {
@@ -204,6 +204,14 @@ namespace TestMachineLearningExt
             TrainkNNBinaryClassification(10, NearestNeighborsWeights.uniform, 2);
         }
 
+        [TestMethod]
+        public void TestI_TrainkNNBinaryClassificationFlatKdTree()
+        {
+            TrainkNNBinaryClassification(1, NearestNeighborsWeights.uniform, 1, ratio: 0.05f, algo: "flatkdtree");
+            TrainkNNBinaryClassification(5, NearestNeighborsWeights.uniform, 2, algo: "flatkdtree");
+            TrainkNNBinaryClassification(10, NearestNeighborsWeights.uniform, 1, distance: "L1", algo: "flatkdtree");
+        }
+
         [TestMethod]
         public void TestI_TrainkNNMultiClassification()
         {
@@ -220,6 +228,13 @@ namespace TestMachineLearningExt
             TrainkNNMultiClassification(10, NearestNeighborsWeights.uniform, 2);
         }
 
+        [TestMethod]
+        public void TestI_TrainkNNMultiClassificationFlatKdTree()
+        {
+            TrainkNNMultiClassification(1, NearestNeighborsWeights.uniform, 1, ratio: 0.05f, algo: "flatkdtree");
+            TrainkNNMultiClassification(10, NearestNeighborsWeights.uniform, 2, algo: "flatkdtree");
+        }
+
         [TestMethod]
         public void TestI_TrainkNNTransformId()
         {
@@ -717,5 +717,68 @@ namespace TestMachineLearningExt
         }
 
         #endregion
+
+        #region flat kdtree
+
+        static List<IPointIdFloat> RandomPoints(Random rand, int n, int dim)
+        {
+            var points = new List<IPointIdFloat>();
+            for (int i = 0; i < n; ++i)
+                points.Add(new PointIdFloat(i * 3 + 1, Enumerable.Range(0, dim).Select(d => (float)rand.NextDouble()).ToArray()));
+            return points;
+        }
+
+        [TestMethod]
+        public void FlatKdTreeNearestNNeighborsTest()
+        {
+            var rand = new Random(0);
+            foreach (var dim in new[] { 1, 3, 17 })
+            {
+                foreach (var n in new[] { 1, 5, 100, 1000 })
+                {
+                    var points = RandomPoints(rand, n, dim);
+                    var flat = new FlatKdTree(points, leafSize: 8);
+                    Assert.AreEqual(n, flat.Count());
+                    var targets = RandomPoints(rand, 20, dim);
+                    var batch = flat.NearestNNeighbors(targets.Select(c => c.coordinates).ToArray(), 5, 2);
+                    for (int t = 0; t < targets.Count; ++t)
+                    {
+                        var expected = points.Select(c => c.DistanceTo(targets[t])).OrderBy(c => c).Take(5).ToArray();
+                        var res = flat.NearestNNeighbors(targets[t].coordinates, 5);
+                        Assert.AreEqual(expected.Length, res.Length);
+                        Assert.AreEqual(expected.Length, batch[t].Length);
+                        for (int i = 0; i < expected.Length; ++i)
+                        {
+                            Assert.AreEqual(expected[i], res[i].Key, 1e-4);
+                            Assert.AreEqual(res[i].Key, batch[t][i].Key);
+                            Assert.AreEqual(res[i].Value, batch[t][i].Value);
+                            Assert.AreEqual(res[i].Key, points[(int)(res[i].Value / 3)].DistanceTo(targets[t]), 1e-4);
+                        }
+                    }
+                }
+            }
+        }
+
+        [TestMethod]
+        public void FlatKdTreeFromKdTreeTest()
+        {
+            var rand = new Random(0);
+            var points = RandomPoints(rand, 500, 4);
+            var kdt = new KdTree(points, seed: 0);
+            var flat = new FlatKdTree(kdt);
+            Assert.AreEqual(kdt.Count(), flat.Count());
+            Assert.IsTrue(flat.EnumerateIds().OrderBy(c => c).SequenceEqual(points.Select(c => c.id)));
+            foreach (var target in RandomPoints(rand, 20, 4))
+            {
+                var expected = kdt.NearestNNeighbors(target, 3).Select(c => c.id).ToArray();
+                var res = flat.NearestNNeighbors(target.coordinates, 3).Select(c => c.Value).ToArray();
+                Assert.IsTrue(expected.SequenceEqual(res));
+                var within = flat.PointsWithinDistance(target.coordinates, 0.3f).Select(c => c.Value).OrderBy(c => c);
+                var expectedWithin = points.Where(c => c.DistanceTo(target) <= 0.3f).Select(c => c.id);
+                Assert.IsTrue(expectedWithin.SequenceEqual(within));
+            }
+        }
+
+        #endregion
     }
 }
\ No newline at end of file
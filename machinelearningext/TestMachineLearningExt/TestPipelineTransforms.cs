@@ -75,6 +75,153 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestI_DescribeTransformParallelHist()
+        {
+            using (var env = EnvHelper.NewTestEnvironment())
+            {
+                var rnd = new Random(0);
+                var inputs = Enumerable.Range(0, 5000).Select(i => new ExampleA0() { X = (float)rnd.NextDouble() }).ToArray();
+                // The cache can be split into several cursors.
+                var data = new CacheDataView(env, env.CreateStreamingDataView(inputs), null);
+                var sorted = inputs.Select(c => (double)c.X).OrderBy(c => c).ToArray();
+                var stats = new Dictionary<int, List<ColumnStatObs>>();
+                foreach (var nt in new[] { 1, 4 })
+                {
+                    var args = new DescribeTransform.Arguments() { columns = new[] { "X" }, hists = new[] { "X" }, numThreads = nt, dimension = true };
+                    var tr = new DescribeTransform(env, args, data);
+                    int nb = 0;
+                    using (var cursor = tr.GetRowCursor(i => true))
+                    {
+                        while (cursor.MoveNext())
+                            ++nb;
+                    }
+                    Assert.AreEqual(5000, nb);
+                    stats[nt] = tr.Statistics["X"];
+                }
+
+                var st1 = stats[1].ToDictionary(c => c.kind, c => c);
+                var st4 = stats[4].ToDictionary(c => c.kind, c => c);
+                Assert.AreEqual(sorted[0], st1[ColumnStatObs.StatKind.min].stat.Values[0], 1e-6);
+                Assert.AreEqual(st1[ColumnStatObs.StatKind.min].stat.Values[0], st4[ColumnStatObs.StatKind.min].stat.Values[0]);
+                Assert.AreEqual(sorted[sorted.Length - 1], st1[ColumnStatObs.StatKind.max].stat.Values[0], 1e-6);
+                Assert.AreEqual(st1[ColumnStatObs.StatKind.max].stat.Values[0], st4[ColumnStatObs.StatKind.max].stat.Values[0]);
+
+                st1[ColumnStatObs.StatKind.meanVar].GetMeanVar(out double[] nb1, out double[] mean1, out double[] var1);
+                st4[ColumnStatObs.StatKind.meanVar].GetMeanVar(out double[] nb4, out double[] mean4, out double[] var4);
+                double expMean = sorted.Average();
+                double expVar = sorted.Select(c => (c - expMean) * (c - expMean)).Average();
+                Assert.AreEqual(5000.0, nb1[0]);
+                Assert.AreEqual(5000.0, nb4[0]);
+                Assert.AreEqual(expMean, mean1[0], 1e-6);
+                Assert.AreEqual(mean1[0], mean4[0], 1e-6);
+                Assert.AreEqual(expVar, var1[0], 1e-6);
+                Assert.AreEqual(var1[0], var4[0], 1e-6);
+
+                // More than 100 distinct values, the histograms are approximated.
+                var sketch1 = st1[ColumnStatObs.StatKind.hist].sketch;
+                var sketch4 = st4[ColumnStatObs.StatKind.hist].sketch;
+                Assert.IsNotNull(sketch1);
+                Assert.IsNotNull(sketch4);
+                Assert.AreEqual(5000L, sketch1.Count);
+                Assert.AreEqual(5000L, sketch4.Count);
+                Assert.AreEqual(sketch1.Min, sketch4.Min);
+                Assert.AreEqual(sketch1.Max, sketch4.Max);
+                foreach (var q in new[] { 0.1, 0.25, 0.5, 0.75, 0.9 })
+                {
+                    double rank1 = (double)sorted.Count(c => c <= sketch1.Quantile(q)) / sorted.Length;
+                    double rank4 = (double)sorted.Count(c => c <= sketch4.Quantile(q)) / sorted.Length;
+                    Assert.AreEqual(q, rank1, sketch1.RankError, string.Format("nt=1 q={0}", q));
+                    Assert.AreEqual(q, rank4, sketch4.RankError, string.Format("nt=4 q={0}", q));
+                }
+                var counts1 = sketch1.Histogram(10, out double[] bounds1);
+                var counts4 = sketch4.Histogram(10, out double[] bounds4);
+                for (int i = 0; i < bounds1.Length; ++i)
+                    Assert.AreEqual(bounds1[i], bounds4[i], 1e-10);
+                for (int i = 0; i < counts1.Length; ++i)
+                {
+                    // Every bin boundary is approximated within the rank error in both sketches.
+                    double tol = sorted.Length * (sketch1.RankError + sketch4.RankError) * 2;
+                    Assert.AreEqual((double)counts1[i], (double)counts4[i], tol);
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestQuantileSketchMerge()
+        {
+            var rnd = new Random(0);
+            var values = Enumerable.Range(0, 100000).Select(i => rnd.NextDouble() * 100).ToArray();
+            var parts = Enumerable.Range(0, 4).Select(i => new QuantileSketch(seed: i)).ToArray();
+            for (int i = 0; i < values.Length; ++i)
+                parts[i % parts.Length].Add(values[i]);
+            var sketch = parts[0];
+            for (int i = 1; i < parts.Length; ++i)
+                sketch.Merge(parts[i]);
+
+            Assert.AreEqual((long)values.Length, sketch.Count);
+            Assert.AreEqual(values.Min(), sketch.Min);
+            Assert.AreEqual(values.Max(), sketch.Max);
+            Assert.IsTrue(sketch.RetainedItems <= 4 * sketch.K);
+
+            var sorted = values.OrderBy(c => c).ToArray();
+            foreach (var q in new[] { 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99 })
+            {
+                var v = sketch.Quantile(q);
+                double rank = (double)sorted.Count(c => c <= v) / sorted.Length;
+                Assert.IsTrue(Math.Abs(rank - q) <= sketch.RankError, string.Format("q={0} rank={1}", q, rank));
+                Assert.AreEqual(q, sketch.Rank(v), sketch.RankError);
+            }
+
+            var counts = sketch.Histogram(10, out double[] bounds);
+            Assert.AreEqual(11, bounds.Length);
+            Assert.AreEqual((long)values.Length, counts.Sum());
+            foreach (var c in counts)
+                Assert.AreEqual(values.Length / 10.0, (double)c, values.Length * sketch.RankError * 2);
+        }
+
+        [TestMethod]
+        public void TestColumnStatObsMerge()
+        {
+            var rnd = new Random(0);
+            var values = Enumerable.Range(0, 1000).Select(i => (float)(rnd.NextDouble() * 10 + 1e4)).ToArray();
+            var kinds = new[] { ColumnStatObs.StatKind.meanVar, ColumnStatObs.StatKind.min, ColumnStatObs.StatKind.max,
+                                ColumnStatObs.StatKind.sum, ColumnStatObs.StatKind.nb, ColumnStatObs.StatKind.hist };
+            foreach (var kind in kinds)
+            {
+                var all = new ColumnStatObs(kind);
+                var parts = new[] { new ColumnStatObs(kind), new ColumnStatObs(kind), new ColumnStatObs(kind) };
+                for (int i = 0; i < values.Length; ++i)
+                {
+                    all.Update(values[i]);
+                    // The last part stays empty.
+                    parts[i % 2].Update(values[i]);
+                }
+                var merged = parts[2];
+                merged.Merge(parts[0]);
+                merged.Merge(parts[1]);
+
+                if (kind == ColumnStatObs.StatKind.meanVar)
+                {
+                    all.GetMeanVar(out double[] nb, out double[] mean, out double[] variance);
+                    merged.GetMeanVar(out double[] nb2, out double[] mean2, out double[] variance2);
+                    double expMean = values.Select(c => (double)c).Average();
+                    double expVar = values.Select(c => ((double)c - expMean) * ((double)c - expMean)).Average();
+                    Assert.AreEqual(1000.0, nb2[0]);
+                    Assert.AreEqual(expMean, mean2[0], 1e-6);
+                    Assert.AreEqual(expVar, variance2[0], 1e-6);
+                    Assert.AreEqual(variance[0], variance2[0], 1e-6);
+                }
+                else if (kind == ColumnStatObs.StatKind.hist)
+                {
+                    Assert.IsNotNull(merged.sketch);
+                    Assert.AreEqual((long)values.Length, merged.sketch.Count);
+                }
+                else
+                    Assert.AreEqual(all.stat.Values[0], merged.stat.Values[0], 1e-6 * Math.Abs(all.stat.Values[0]));
+            }
+        }
+
         #endregion
 
         #region PassThroughTransform
@@ -301,6 +448,84 @@ namespace TestMachineLearningExt
             }
         }
 
+        static float[] ReadColumn(IDataView view, int col)
+        {
+            var values = new List<float>();
+            using (var cursor = view.GetRowCursor(i => i == col))
+            {
+                var getter = cursor.GetGetter<float>(col);
+                float value = 0;
+                while (cursor.MoveNext())
+                {
+                    getter(ref value);
+                    values.Add(value);
+                }
+            }
+            return values.ToArray();
+        }
+
+        [TestMethod]
+        public void TestDataViewCacheSegmented()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var dataFilePath = FileHelper.GetTestFile("mc_iris.txt");
+            var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
+            var spill = FileHelper.GetOutputFile("spill", methodName);
+
+            using (var env = EnvHelper.NewTestEnvironment())
+            {
+                var loader = env.CreateLoader("Text{col=Label:R4:0 col=Slength:R4:1 col=Swidth:R4:2 col=Plength:R4:3 col=Pwidth:R4:4 header=+}",
+                    new MultiFileSource(dataFilePath));
+                var expected = ReadColumn(loader, 1);
+
+                foreach (var nt in new int?[] { null, 1, 2 })
+                {
+                    // A budget of 0 keeps only the last used segment in memory.
+                    var args = new ExtendedCacheTransform.Arguments
+                    {
+                        segmented = true,
+                        segmentSize = 20,
+                        memoryBudget = 0,
+                        numTheads = nt,
+                        spillDirectory = spill
+                    };
+                    var cache = new ExtendedCacheTransform(env, args, loader);
+                    var got = ReadColumn(cache, 1);
+                    if (nt != 2)
+                        Assert.AreEqual(string.Join(",", expected), string.Join(",", got));
+                    else
+                        Assert.AreEqual(string.Join(",", expected.OrderBy(c => c)), string.Join(",", got.OrderBy(c => c)));
+
+                    var stats = cache.Statistics;
+                    Assert.IsTrue(stats.Segments >= 8);
+                    Assert.AreEqual(stats.SpilledSegments, stats.Segments - 1);
+                    Assert.IsTrue(stats.BytesSpilled > 0);
+                    Assert.AreEqual(stats.Hits + stats.Misses, stats.Segments);
+
+                    got = ReadColumn(cache, 1);
+                    Assert.AreEqual(expected.Length, got.Length);
+                    stats = cache.Statistics;
+                    Assert.AreEqual(stats.Hits + stats.Misses, stats.Segments * 2);
+                    Assert.IsTrue(stats.Misses >= stats.Segments);
+
+                    // Disposing the transform removes the spilled segments.
+                    Assert.AreEqual(1, Directory.GetDirectories(spill, "extcache_*").Length);
+                    cache.Dispose();
+                    Assert.AreEqual(0, Directory.GetDirectories(spill, "extcache_*").Length);
+                }
+
+                var sorted = env.CreateTransform("cachedf{seg=+ ss=50}", loader);
+                StreamHelper.SaveModel(env, sorted, outModelFilePath);
+                using (var fs = File.OpenRead(outModelFilePath))
+                {
+                    var deserializedData = env.LoadTransforms(fs, loader);
+                    var stats = (deserializedData as ExtendedCacheTransform).Statistics;
+                    Assert.IsNotNull(stats);
+                    Assert.AreEqual(string.Join(",", expected), string.Join(",", ReadColumn(deserializedData, 1)));
+                }
+            }
+        }
+
         [TestMethod]
         public void Testl_SortInMemoryShuffle()
         {
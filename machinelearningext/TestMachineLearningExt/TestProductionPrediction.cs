@@ -6,6 +6,7 @@ using System.IO;
 using System.Linq;
 using System.Text;
 using System.Collections.Generic;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.Data;
 using Microsoft.ML.Transforms;
@@ -462,6 +463,71 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestValueMapperPredictionEnginePool()
+        {
+            var name = FileHelper.GetTestFile("bc-lr.zip");
+            using (var env = EnvHelper.NewTestEnvironment())
+            {
+                var exp = new float[100];
+                using (var engine = new ValueMapperPredictionEngineFloat(env, name))
+                {
+                    var feat = new float[] { 5, 1, 1, 1, 2, 1, 3, 1, 1 };
+                    for (int i = 0; i < exp.Length; ++i)
+                    {
+                        feat[0] = i;
+                        exp[i] = engine.Predict(feat);
+                    }
+                }
+
+                using (var pool = new ValueMapperPredictionEnginePool(env, name, poolSize: 3, maxRequestsPerRent: 4))
+                {
+                    pool.Warmup(new float[] { 5, 1, 1, 1, 2, 1, 3, 1, 1 });
+                    Assert.AreEqual(3, pool.EngineCount);
+
+                    var res = new float[exp.Length];
+                    Parallel.For(0, exp.Length, i =>
+                    {
+                        var feat = new float[] { i, 1, 1, 1, 2, 1, 3, 1, 1 };
+                        res[i] = pool.Predict(feat);
+                    });
+                    for (int i = 0; i < exp.Length; ++i)
+                        Assert.AreEqual(exp[i], res[i]);
+
+                    var tasks = Enumerable.Range(0, exp.Length)
+                                          .Select(i => pool.PredictAsync(new float[] { i, 1, 1, 1, 2, 1, 3, 1, 1 }))
+                                          .ToArray();
+                    Task.WaitAll(tasks);
+                    for (int i = 0; i < exp.Length; ++i)
+                        Assert.AreEqual(exp[i], tasks[i].Result);
+
+                    Assert.AreEqual(3, pool.EngineCount);
+                    Assert.AreEqual(exp.Length * 2, pool.Latency.Count);
+                    Assert.AreEqual(exp.Length * 2 + 3, pool.QueueTime.Count);
+                    Assert.IsTrue(pool.Latency.Percentile(0.5) <= pool.Latency.Percentile(0.99));
+                    Assert.IsFalse(string.IsNullOrEmpty(pool.ToString()));
+                }
+
+                // Dispose waits for the rented engines, the other requests fail.
+                var pool2 = new ValueMapperPredictionEnginePool(env, name, poolSize: 2);
+                var running = Enumerable.Range(0, 50)
+                                        .Select(i => Task.Run(() => pool2.Predict(new float[] { i, 1, 1, 1, 2, 1, 3, 1, 1 })))
+                                        .ToArray();
+                pool2.Dispose();
+                for (int i = 0; i < running.Length; ++i)
+                {
+                    try
+                    {
+                        Assert.AreEqual(exp[i], running[i].Result);
+                    }
+                    catch (AggregateException e)
+                    {
+                        Assert.IsInstanceOfType(e.InnerException, typeof(ObjectDisposedException));
+                    }
+                }
+            }
+        }
+
         [TestMethod]
         public void TestLambdaColumnPassThroughTransform()
         {
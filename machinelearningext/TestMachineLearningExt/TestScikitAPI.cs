@@ -140,6 +140,12 @@ namespace TestMachineLearningExt
                     var dfs = df.ToString();
                     var dfs2 = dfs.Replace("\n", ";");
                     Assert.IsTrue(dfs2.StartsWith("X.0,X.1,X.2,X.3,X.4,X.5,X.6,X.7,X.8,PredictedLabel,Score.0,Score.1;-1,-10,-100,1,10,100,100,1000,10000"));
+
+                    var chunks = pipe.Predict(data2, chunkSize: 3).ToArray();
+                    Assert.AreEqual(chunks.Length, 2);
+                    Assert.AreEqual(chunks[0].Shape, new Tuple<int, int>(3, 12));
+                    Assert.AreEqual(chunks[1].Shape, new Tuple<int, int>(1, 12));
+                    Assert.IsTrue(DataFrame.Concat(chunks) == df);
                 }
             }
         }
@@ -331,6 +337,63 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestScikitAPI_SimplePredictor_PredictBatch()
+        {
+            var inputs = new[] {
+                new ExampleA() { X = new float[] { 1, 10, 100 } },
+                new ExampleA() { X = new float[] { 2, 3, 5 } },
+                new ExampleA() { X = new float[] { 2, 4, 5 } },
+                new ExampleA() { X = new float[] { 2, 4, 7 } },
+            };
+
+            var inputs2 = new[] {
+                new ExampleA() { X = new float[] { -1, -10, -100 } },
+                new ExampleA() { X = new float[] { -2, -3, -5 } },
+                new ExampleA() { X = new float[] { 3, 4, 5 } },
+                new ExampleA() { X = new float[] { 3, 4, 7 } },
+            };
+            DataFrame df1, df2;
+            using (var host = EnvHelper.NewTestEnvironment(conc: 1))
+            {
+                var data = host.CreateStreamingDataView(inputs);
+                var data2 = host.CreateStreamingDataView(inputs2);
+                df1 = DataFrameIO.ReadView(data, env: host, keepVectors: true);
+                df2 = DataFrameIO.ReadView(data2, env: host, keepVectors: true);
+            }
+
+            using (var host = EnvHelper.NewTestEnvironment(conc: 1))
+            {
+                using (var pipe = new ScikitPipeline(new[] { "poly{col=X}" }, "km{k=2}", host))
+                {
+                    DataFrame pred = null;
+                    var predictor = pipe.Train(df1, feature: "X");
+                    Assert.IsTrue(predictor != null);
+                    pipe.Predict(df2, ref pred);
+
+                    var features = inputs2.SelectMany(c => c.X).ToArray();
+                    var labels = new float[4];
+                    var dim = pipe.PredictBatch(features, 4, labels, "X", "PredictedLabel");
+                    Assert.AreEqual(dim, 1);
+                    for (int i = 0; i < labels.Length; ++i)
+                        Assert.AreEqual(labels[i], (float)(uint)pred.loc[i, "PredictedLabel"]);
+
+                    var scores = new float[8];
+                    dim = pipe.PredictBatch(features, 4, scores, "X", "Score");
+                    Assert.AreEqual(dim, 2);
+                    Assert.IsTrue(scores.All(c => !float.IsNaN(c)));
+                    Assert.IsTrue(scores.Any(c => c != 0));
+
+                    // Rows scored by blocks in parallel.
+                    var scores2 = new float[8];
+                    dim = pipe.PredictBatch(features, 4, scores2, "X", "Score", conc: 3);
+                    Assert.AreEqual(dim, 2);
+                    for (int i = 0; i < scores.Length; ++i)
+                        Assert.AreEqual(scores[i], scores2[i], 1e-5);
+                }
+            }
+        }
+
         [TestMethod]
         public void TestScikitAPI_TrainingWithIris()
         {
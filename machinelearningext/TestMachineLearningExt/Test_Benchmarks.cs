@@ -15,6 +15,7 @@ using Scikit.ML.PipelineTransforms;
 using Scikit.ML.TestHelper;
 using Scikit.ML.ProductionPrediction;
 using Scikit.ML.DataManipulation;
+using Scikit.ML.NearestNeighbors;
 
 
 namespace TestMachineLearningExt
@@ -304,5 +305,57 @@ namespace TestMachineLearningExt
             df.ToCsv(filename);
             Assert.AreEqual(dico.Count, 48);
         }
+
+        [TestMethod]
+        public void TestFlatKdTreeNearestNNeighbors()
+        {
+            var rand = new Random(0);
+            var dico = new Dictionary<Tuple<int, int, string>, double>();
+            foreach (var dim in new[] { 4, 16 })
+            {
+                int n = 20000;
+                var points = new List<IPointIdFloat>();
+                for (int i = 0; i < n; ++i)
+                    points.Add(new PointIdFloat(i, Enumerable.Range(0, dim).Select(d => (float)rand.NextDouble()).ToArray()));
+                var targets = points.Take(500).Select(c => c.coordinates).ToArray();
+
+                var sw = new Stopwatch();
+                sw.Start();
+                var kdt = new KdTree(points, seed: 0);
+                sw.Stop();
+                dico[new Tuple<int, int, string>(n, dim, "build-kdtree")] = sw.Elapsed.TotalSeconds;
+
+                sw.Restart();
+                var flat = new FlatKdTree(points);
+                sw.Stop();
+                dico[new Tuple<int, int, string>(n, dim, "build-flatkdtree")] = sw.Elapsed.TotalSeconds;
+
+                sw.Restart();
+                var expected = targets.Select(c => kdt.NearestNNeighbors(new PointIdFloat(0, c, false), 5)).ToArray();
+                sw.Stop();
+                dico[new Tuple<int, int, string>(n, dim, "query-kdtree")] = sw.Elapsed.TotalSeconds;
+
+                sw.Restart();
+                var res = targets.Select(c => flat.NearestNNeighbors(c, 5)).ToArray();
+                sw.Stop();
+                dico[new Tuple<int, int, string>(n, dim, "query-flatkdtree")] = sw.Elapsed.TotalSeconds;
+
+                sw.Restart();
+                var batch = flat.NearestNNeighbors(targets, 5);
+                sw.Stop();
+                dico[new Tuple<int, int, string>(n, dim, "batch-flatkdtree")] = sw.Elapsed.TotalSeconds;
+
+                for (int i = 0; i < targets.Length; ++i)
+                {
+                    Assert.IsTrue(expected[i].Select(c => c.id).SequenceEqual(res[i].Select(c => c.Value)));
+                    Assert.IsTrue(res[i].SequenceEqual(batch[i]));
+                }
+            }
+            var df = DataFrameIO.Convert(dico, "N", "dim", "step", "time(s)");
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var filename = FileHelper.GetOutputFile("benchmark_FlatKdTree.txt", methodName);
+            df.ToCsv(filename);
+            Assert.AreEqual(dico.Count, 10);
+        }
     }
 }
@@ -0,0 +1,87 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using Scikit.ML.DataManipulation;
+
+
+namespace TestProfileBenchmark
+{
+    public static class Benchmark_ColumnOp
+    {
+        /// <summary>
+        /// Computes <c>(a + b) * c &gt; d</c> element by element
+        /// as the operators did before they were vectorized.
+        /// </summary>
+        static DataColumn<bool> ScalarExpression(double[] a, double[] b, double[] c, double[] d)
+        {
+            var t1 = new DataColumn<double>(a.Length);
+            for (int i = 0; i < a.Length; ++i)
+                t1.Set(i, a[i] + b[i]);
+            var t2 = new DataColumn<double>(a.Length);
+            var d1 = t1.Data;
+            for (int i = 0; i < a.Length; ++i)
+                t2.Set(i, d1[i] * c[i]);
+            var res = new DataColumn<bool>(a.Length);
+            var d2 = t2.Data;
+            for (int i = 0; i < a.Length; ++i)
+                res.Set(i, d2[i] > d[i]);
+            return res;
+        }
+
+        /// <summary>
+        /// Compares four ways of computing <c>(a + b) * c &gt; d</c> on columns of doubles:
+        /// the scalar loops, the vectorized operators (one column per operation),
+        /// the in place operations and <see cref="ColumnExpression"/>.
+        /// </summary>
+        public static DataFrame BenchmarkColumnOp(int[] nrows, int repeat = 5)
+        {
+            var dico = new Dictionary<Tuple<int, string, string>, double>();
+            var rnd = new Random(0);
+            foreach (var n in nrows)
+            {
+                var data = new double[4][];
+                for (int k = 0; k < data.Length; ++k)
+                {
+                    data[k] = new double[n];
+                    for (int i = 0; i < n; ++i)
+                        data[k][i] = rnd.NextDouble();
+                }
+                var cols = new NumericColumn[4];
+                for (int k = 0; k < cols.Length; ++k)
+                    cols[k] = new NumericColumn(new DataColumn<double>(data[k]));
+
+                var engines = new Dictionary<string, Action>()
+                {
+                    { "scalar", () => ScalarExpression(data[0], data[1], data[2], data[3]) },
+                    { "operators", () => { var r = (cols[0] + cols[1]) * cols[2] > cols[3]; } },
+                    {
+                        "inplace", () =>
+                        {
+                            var tmp = new NumericColumn(cols[0].Column.Copy());
+                            tmp.InPlace(VectorOperation.Addition, cols[1]);
+                            tmp.InPlace(VectorOperation.Multiplication, cols[2]);
+                            var r = tmp > cols[3];
+                        }
+                    },
+                    { "expression", () => ((ColumnExpression.Column(cols[0]) + cols[1]) * cols[2] > cols[3]).Evaluate() },
+                };
+
+                foreach (var pair in engines)
+                {
+                    double time = 0, memory = 0;
+                    for (int r = 0; r < repeat; ++r)
+                    {
+                        var res = Benchmark_Optics.Measure(pair.Value);
+                        time += res.Item1;
+                        memory = Math.Max(memory, res.Item2);
+                    }
+                    Console.WriteLine("{0} n={1} time={2}s memory={3}", pair.Key, n, time / repeat, memory);
+                    dico[new Tuple<int, string, string>(n, pair.Key, "time(s)")] = time / repeat;
+                    dico[new Tuple<int, string, string>(n, pair.Key, "memory(MB)")] = memory / (1024.0 * 1024);
+                }
+            }
+            return DataFrameIO.Convert(dico, "N", "engine", "metric", "value");
+        }
+    }
+}
@@ -0,0 +1,121 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Threading;
+using Scikit.ML.Clustering;
+using Scikit.ML.DataManipulation;
+using Scikit.ML.NearestNeighbors;
+
+
+namespace TestProfileBenchmark
+{
+    public static class Benchmark_Optics
+    {
+        /// <summary>
+        /// Generates <paramref name="nrows"/> points around <paramref name="nblobs"/> random centers.
+        /// </summary>
+        public static float[] GenerateBlobs(int nrows, int dimension, int nblobs = 5, float spread = 1f, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var centers = new float[nblobs * dimension];
+            for (int i = 0; i < centers.Length; ++i)
+                centers[i] = (float)(rnd.NextDouble() * 20);
+            var res = new float[nrows * dimension];
+            for (int i = 0; i < nrows; ++i)
+            {
+                int c = rnd.Next(nblobs);
+                for (int j = 0; j < dimension; ++j)
+                    res[i * dimension + j] = centers[c * dimension + j] + (float)((rnd.NextDouble() * 2 - 1) * spread);
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Measures the wall time and the peak of managed memory while running an action.
+        /// The managed memory is sampled every 10 milliseconds.
+        /// </summary>
+        public static Tuple<double, long> Measure(Action action)
+        {
+            GC.Collect();
+            GC.WaitForPendingFinalizers();
+            GC.Collect();
+            long start = GC.GetTotalMemory(true);
+            long peak = start;
+            bool running = true;
+            var sampler = new Thread(() =>
+            {
+                while (Volatile.Read(ref running))
+                {
+                    long mem = GC.GetTotalMemory(false);
+                    if (mem > Interlocked.Read(ref peak))
+                        Interlocked.Exchange(ref peak, mem);
+                    Thread.Sleep(10);
+                }
+            });
+            sampler.Start();
+            var sw = Stopwatch.StartNew();
+            action();
+            sw.Stop();
+            Volatile.Write(ref running, false);
+            sampler.Join();
+            return new Tuple<double, long>(sw.Elapsed.TotalSeconds, Interlocked.Read(ref peak) - start);
+        }
+
+        /// <summary>
+        /// Compares <see cref="Optics"/> with <see cref="ParallelOptics"/> in memory and spilled
+        /// on disk. The original implementation is skipped above <paramref name="maxOriginal"/> points.
+        /// </summary>
+        public static DataFrame BenchmarkOptics(int[] nrows, int[] dimensions, float epsilon = 1f, int minPoints = 10,
+                                                int[] numThreads = null, int maxOriginal = 20000)
+        {
+            var dico = new Dictionary<Tuple<int, int, string, int, string>, double>();
+            foreach (var dim in dimensions)
+            {
+                // The radius grows with the dimension to keep neighborhoods of similar sizes.
+                float eps = epsilon * (float)Math.Sqrt(dim / 2.0);
+                foreach (var n in nrows)
+                {
+                    var data = GenerateBlobs(n, dim);
+                    if (n <= maxOriginal)
+                    {
+                        var res = Measure(() =>
+                        {
+                            var points = new List<IPointIdFloat>();
+                            for (int i = 0; i < n; ++i)
+                                points.Add(new PointIdFloat(i, data.Skip(i * dim).Take(dim)));
+                            new Optics(points).Ordering(eps, minPoints);
+                        });
+                        Console.WriteLine("Optics n={0} dim={1} time={2}s memory={3}", n, dim, res.Item1, res.Item2);
+                        dico[new Tuple<int, int, string, int, string>(n, dim, "Optics", 1, "time(s)")] = res.Item1;
+                        dico[new Tuple<int, int, string, int, string>(n, dim, "Optics", 1, "memory(MB)")] = res.Item2 / (1024.0 * 1024);
+                    }
+
+                    foreach (var spill in new[] { false, true })
+                    {
+                        foreach (var th in numThreads ?? new[] { 1, 2, 4 })
+                        {
+                            var name = spill ? "ParallelOptics-spill" : "ParallelOptics";
+                            var res = Measure(() =>
+                            {
+                                using (var store = new OpticsPointStore(dim, spill))
+                                {
+                                    for (int i = 0; i < n; ++i)
+                                        store.Add(data, i * dim);
+                                    var optics = new ParallelOptics(store, th);
+                                    optics.Ordering(eps, minPoints);
+                                }
+                            });
+                            Console.WriteLine("{0} n={1} dim={2} nt={3} time={4}s memory={5}", name, n, dim, th, res.Item1, res.Item2);
+                            dico[new Tuple<int, int, string, int, string>(n, dim, name, th, "time(s)")] = res.Item1;
+                            dico[new Tuple<int, int, string, int, string>(n, dim, name, th, "memory(MB)")] = res.Item2 / (1024.0 * 1024);
+                        }
+                    }
+                }
+            }
+            return DataFrameIO.Convert(dico, "N", "dim", "engine", "number of threads", "metric", "value");
+        }
+    }
+}
@@ -0,0 +1,89 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using Microsoft.ML;
+using Scikit.ML.DataManipulation;
+using Scikit.ML.MultiClass;
+using Scikit.ML.PipelineHelper;
+using Scikit.ML.TestHelper;
+
+
+namespace TestProfileBenchmark
+{
+    public static class Benchmark_OptimizedOVA
+    {
+        /// <summary>
+        /// Generates a dataframe with a vector column <c>Features</c> and a label
+        /// in <c>[0, nbClasses[</c>, every class is a blob around a random center.
+        /// </summary>
+        public static DataFrame GenerateClasses(int nrows, int dimension, int nbClasses, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var centers = new float[nbClasses * dimension];
+            for (int i = 0; i < centers.Length; ++i)
+                centers[i] = (float)(rnd.NextDouble() * 20);
+            var features = new float[nrows][];
+            var labels = new float[nrows];
+            for (int i = 0; i < nrows; ++i)
+            {
+                int c = i % nbClasses;
+                labels[i] = c;
+                features[i] = new float[dimension];
+                for (int j = 0; j < dimension; ++j)
+                    features[i][j] = centers[c * dimension + j] + (float)(rnd.NextDouble() * 2 - 1);
+            }
+            var df = new DataFrame();
+            df.AddColumn("Label", labels);
+            df.AddColumn("Features", features);
+            return df;
+        }
+
+        /// <summary>
+        /// Compares the training time of <see cref="OptimizedOVATrainer"/> with one thread
+        /// and all threads, and the scoring time of the per class scorer and the fused scorer
+        /// for a number of classes going from 10 to 1000.
+        /// </summary>
+        public static DataFrame BenchmarkOptimizedOVA(int[] nbClasses, int dimension = 20, int nrowsPerClass = 10, int nscore = 10000)
+        {
+            var dico = new Dictionary<Tuple<int, string, string>, double>();
+            foreach (var nc in nbClasses)
+            {
+                var df = GenerateClasses(Math.Max(1000, nc * nrowsPerClass), dimension, nc);
+                var rnd = new Random(0);
+                var features = Enumerable.Range(0, nscore * dimension).Select(i => (float)(rnd.NextDouble() * 20)).ToArray();
+                var scores = new float[nscore * nc];
+
+                using (var env = EnvHelper.NewTestEnvironment(conc: 1))
+                {
+                    var roles = env.CreateExamples(df, "Features", "Label");
+                    OptimizedOVAPredictor pred = null;
+                    foreach (var nt in new[] { 1, Environment.ProcessorCount })
+                    {
+                        var trainer = env.CreateTrainer(string.Format("oova{{p=lr nt={0}}}", nt));
+                        var sw = Stopwatch.StartNew();
+                        using (var ch = env.Start("Train"))
+                            pred = trainer.Train(env, ch, roles) as OptimizedOVAPredictor;
+                        sw.Stop();
+                        var name = nt == 1 ? "train-1thread" : "train-parallel";
+                        Console.WriteLine("{0} classes={1} time={2}s", name, nc, sw.Elapsed.TotalSeconds);
+                        dico[new Tuple<int, string, string>(nc, name, "time(s)")] = sw.Elapsed.TotalSeconds;
+                    }
+
+                    foreach (var fused in new[] { false, true })
+                    {
+                        var sw = Stopwatch.StartNew();
+                        pred.ScoreBatch(features, nscore, scores, fused);
+                        sw.Stop();
+                        var name = fused ? "score-fused" : "score-perclass";
+                        Console.WriteLine("{0} classes={1} time={2}s", name, nc, sw.Elapsed.TotalSeconds);
+                        dico[new Tuple<int, string, string>(nc, name, "time(s)")] = sw.Elapsed.TotalSeconds;
+                    }
+                }
+            }
+            return DataFrameIO.Convert(dico, "classes", "engine", "metric", "value");
+        }
+    }
+}
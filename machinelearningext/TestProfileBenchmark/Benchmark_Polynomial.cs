@@ -0,0 +1,101 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Scikit.ML.DataManipulation;
+using Scikit.ML.FeaturesTransforms;
+using Scikit.ML.PipelineHelper;
+using Scikit.ML.TestHelper;
+
+
+namespace TestProfileBenchmark
+{
+    public static class Benchmark_Polynomial
+    {
+        public class SparseText
+        {
+            [VectorType(10000)]
+            public VBuffer<float> X;
+        }
+
+        public class DenseRow
+        {
+            [VectorType(100)]
+            public VBuffer<float> X;
+        }
+
+        /// <summary>
+        /// Generates sparse rows which look like text features: a few non null coordinates
+        /// among <c>dimension</c>, the small indices are more frequent.
+        /// </summary>
+        public static SparseText[] GenerateSparseText(int nrows, int dimension, int nnz, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var res = new SparseText[nrows];
+            for (int i = 0; i < nrows; ++i)
+            {
+                var ind = Enumerable.Range(0, nnz)
+                                    .Select(k => (int)(dimension * Math.Pow(rnd.NextDouble(), 3)))
+                                    .Distinct().OrderBy(k => k).ToArray();
+                var values = ind.Select(k => (float)(rnd.Next(3) + 1)).ToArray();
+                res[i] = new SparseText() { X = new VBuffer<float>(dimension, ind.Length, values, ind) };
+            }
+            return res;
+        }
+
+        static double Walk(IDataView view)
+        {
+            var sw = Stopwatch.StartNew();
+            int col = SchemaHelper.GetColumnIndex(view.Schema, "poly");
+            using (var cursor = view.GetRowCursor(i => i == col))
+            {
+                var getter = cursor.GetGetter<VBuffer<float>>(col);
+                var buffer = new VBuffer<float>();
+                while (cursor.MoveNext())
+                    getter(ref buffer);
+            }
+            sw.Stop();
+            return sw.Elapsed.TotalSeconds;
+        }
+
+        /// <summary>
+        /// Measures <see cref="PolynomialTransform"/> at degree 2 on sparse text-like features
+        /// of dimension 10000 with or without hashing, and on dense features of dimension 100.
+        /// </summary>
+        public static DataFrame BenchmarkPolynomial(int[] nrows, int nnz = 30)
+        {
+            var dico = new Dictionary<Tuple<int, string, string>, double>();
+            foreach (var n in nrows)
+            {
+                var sparse = GenerateSparseText(n, 10000, nnz);
+                var rnd = new Random(0);
+                var dense = Enumerable.Range(0, n).Select(i => new DenseRow()
+                {
+                    X = new VBuffer<float>(100, Enumerable.Range(0, 100).Select(k => (float)rnd.NextDouble()).ToArray())
+                }).ToArray();
+
+                using (var env = EnvHelper.NewTestEnvironment(conc: 1))
+                {
+                    var configs = new[]
+                    {
+                        new Tuple<string, IDataView, string>("sparse-10000", env.CreateStreamingDataView(sparse), "Poly{col=poly:X d=2}"),
+                        new Tuple<string, IDataView, string>("sparse-10000-hash18", env.CreateStreamingDataView(sparse), "Poly{col=poly:X d=2 hb=18}"),
+                        new Tuple<string, IDataView, string>("dense-100", env.CreateStreamingDataView(dense), "Poly{col=poly:X d=2}"),
+                    };
+                    foreach (var config in configs)
+                    {
+                        var poly = env.CreateTransform(config.Item3, config.Item2);
+                        var time = Walk(poly);
+                        Console.WriteLine("{0} rows={1} time={2}s", config.Item1, n, time);
+                        dico[new Tuple<int, string, string>(n, config.Item1, "time(s)")] = time;
+                    }
+                }
+            }
+            return DataFrameIO.Convert(dico, "rows", "engine", "metric", "value");
+        }
+    }
+}
@@ -0,0 +1,89 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.IO;
+using System.Text;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Globalization;
+using Scikit.ML.DataManipulation;
+
+
+namespace TestProfileBenchmark
+{
+    public static class Benchmark_ReadCsv
+    {
+        /// <summary>
+        /// Generates a csv file with one integer label, <paramref name="nfeatures"/>
+        /// float features and one text column, about 10 bytes per feature and row.
+        /// </summary>
+        public static long GenerateCsv(string filename, long nrows, int nfeatures, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var line = new StringBuilder();
+            using (var st = new StreamWriter(filename, false, Encoding.ASCII, 1 << 20))
+            {
+                line.Append("Label");
+                for (int j = 0; j < nfeatures; ++j)
+                    line.Append($",F{j}");
+                line.Append(",Text");
+                st.WriteLine(line.ToString());
+                for (long i = 0; i < nrows; ++i)
+                {
+                    line.Clear();
+                    line.Append(rnd.Next(0, 10));
+                    for (int j = 0; j < nfeatures; ++j)
+                    {
+                        line.Append(',');
+                        line.Append(((float)rnd.NextDouble()).ToString(CultureInfo.InvariantCulture));
+                    }
+                    line.Append(",t");
+                    line.Append(i % 1000);
+                    st.WriteLine(line.ToString());
+                }
+            }
+            return new FileInfo(filename).Length;
+        }
+
+        /// <summary>
+        /// Measures the time taken by <see cref="DataFrameIO.ReadCsv"/>
+        /// for different number of threads.
+        /// </summary>
+        public static DataFrame ReadCsvTime(string filename, int[] numThreads, int ncall)
+        {
+            var dico = new Dictionary<Tuple<int, int, long>, double>();
+            long size = new FileInfo(filename).Length;
+            var sw = new Stopwatch();
+            foreach (var th in numThreads)
+            {
+                for (int call = 1; call <= ncall; ++call)
+                {
+                    GC.Collect();
+                    sw.Reset();
+                    sw.Start();
+                    var df = DataFrameIO.ReadCsv(filename, numThreads: th);
+                    sw.Stop();
+                    Console.WriteLine("ReadCsv numThreads={0} call={1} shape={2} time={3}", th, call, df.Shape, sw.Elapsed);
+                    dico[new Tuple<int, int, long>(th, call, size)] = sw.Elapsed.TotalSeconds;
+                }
+            }
+            return DataFrameIO.Convert(dico, "number of threads", "call", "size", "time(s)");
+        }
+
+        /// <summary>
+        /// Generates a file of about <paramref name="gigabytes"/> GB if it does not exist
+        /// and measures the reading time.
+        /// </summary>
+        public static DataFrame BenchmarkReadCsv(string filename, double gigabytes, int nfeatures = 20,
+                                                 int[] numThreads = null, int ncall = 2)
+        {
+            if (!File.Exists(filename))
+            {
+                long nrows = (long)(gigabytes * (1L << 30) / (10 * (nfeatures + 1)));
+                Console.WriteLine("Generates '{0}' with {1} rows.", filename, nrows);
+                GenerateCsv(filename, nrows, nfeatures);
+            }
+            return ReadCsvTime(filename, numThreads ?? new[] { 1, 2, 4, 8 }, ncall);
+        }
+    }
+}
@@ -6,6 +6,47 @@ namespace TestProfileBenchmark
     {
         static void Main(string[] args)
         {
+            if (args.Length > 1 && args[0] == "readcsv")
+            {
+                // TestProfileBenchmark readcsv <filename> [<size in GB>]
+                var gb = args.Length > 2 ? double.Parse(args[2]) : 2.0;
+                var dfcsv = Benchmark_ReadCsv.BenchmarkReadCsv(args[1], gb);
+                Console.WriteLine(dfcsv.ToString());
+                return;
+            }
+
+            if (args.Length > 0 && args[0] == "optics")
+            {
+                // TestProfileBenchmark optics
+                var dfoptics = Benchmark_Optics.BenchmarkOptics(new[] { 1000, 10000, 100000 }, new[] { 2, 50 });
+                Console.WriteLine(dfoptics.ToString());
+                return;
+            }
+
+            if (args.Length > 0 && args[0] == "columnop")
+            {
+                // TestProfileBenchmark columnop
+                var dfop = Benchmark_ColumnOp.BenchmarkColumnOp(new[] { 1000000, 10000000 });
+                Console.WriteLine(dfop.ToString());
+                return;
+            }
+
+            if (args.Length > 0 && args[0] == "ova")
+            {
+                // TestProfileBenchmark ova
+                var dfova = Benchmark_OptimizedOVA.BenchmarkOptimizedOVA(new[] { 10, 100, 1000 });
+                Console.WriteLine(dfova.ToString());
+                return;
+            }
+
+            if (args.Length > 0 && args[0] == "poly")
+            {
+                // TestProfileBenchmark poly
+                var dfpoly = Benchmark_Polynomial.BenchmarkPolynomial(new[] { 1000, 10000 });
+                Console.WriteLine(dfpoly.ToString());
+                return;
+            }
+
             var cl = DynamicCSFunctions_example_diabetes.ReturnMLClassRF(@"C:\xavierdupre\__home_\GitHub\jupytalk\_doc\notebooks\2018\msexp\diabetes.csv");
             cl.Train();
             cl.Predict(new double[] { 0, 1, 2, 3, 4, 5, 6, 7, 8, 9 });